@@ -0,0 +1,117 @@
+"""Batch Writer module for chunked multi-row inserts.
+
+This module groups rows for one INSERT statement into fixed-size chunks and
+sends each chunk with ``executemany``, which the MySQL driver turns into a
+single multi-row ``VALUES`` list. When a chunk fails the rows are retried one
+by one, so errors are reported against the offending row while the rest of
+the chunk is still written. With savepoints enabled, a failed chunk or row is
+rolled back to a savepoint first, so statements that the driver runs row by
+row cannot leave part of a failed chunk behind in the transaction.
+"""
+
+from db import DatabaseError
+
+DEFAULT_BATCH_SIZE = 1000
+# Reusing a name replaces the older savepoint, so these never accumulate.
+CHUNK_SAVEPOINT = 'batch_chunk'
+ROW_SAVEPOINT = 'batch_row'
+
+
+class BatchWriter:
+    """Buffer rows for one statement and write them in chunks."""
+
+    def __init__(self, cursor, query, batch_size=DEFAULT_BATCH_SIZE,
+                 on_error=None, progress=None, written_key='inserted',
+                 depends_on=None, savepoints=False, dry_run=False):
+        """Initialize the writer for ``query`` with an empty buffer.
+
+        ``on_error`` is called with the label and error of every row that
+        could not be written. If a ``progress`` Counter is given, its
+        ``written_key`` and ``failed`` counts are advanced as chunks are
+        written. The rows queued in the ``depends_on`` writer are written
+        before each chunk of this one, for rows that reference them. With
+        ``savepoints`` each chunk and retried row is written after a
+        savepoint and rolled back to it if it fails. With ``dry_run``
+        queued rows are counted as written but never sent.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+
+        self.cursor = cursor
+        self.query = query
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.progress = progress
+        self.written_key = written_key
+        self.depends_on = depends_on
+        self.savepoints = savepoints
+        self.dry_run = dry_run
+        self.rows = []
+        self.labels = []
+        self.written = 0
+        self.failed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def add(self, row, label=None):
+        """Queue a row, writing the chunk once it is full."""
+        self.rows.append(row)
+        self.labels.append(label)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the queued rows, falling back to one row at a time."""
+        if not self.rows:
+            return
+
+        if self.depends_on is not None:
+            self.depends_on.flush()
+
+        rows, labels = self.rows, self.labels
+        self.rows, self.labels = [], []
+
+        written, failed = self.written, len(self.failed)
+        if self.dry_run:
+            self.written += len(rows)
+        else:
+            self._savepoint(CHUNK_SAVEPOINT)
+            try:
+                self.cursor.executemany(self.query, rows)
+                self.written += len(rows)
+            except (DatabaseError, ValueError):
+                self._rollback_to(CHUNK_SAVEPOINT)
+                self._write_rows(rows, labels)
+
+        if self.progress is not None:
+            self.progress[self.written_key] += self.written - written
+            self.progress['failed'] += len(self.failed) - failed
+
+    def _write_rows(self, rows, labels):
+        """Write rows one at a time, reporting the ones that fail."""
+        for row, label in zip(rows, labels):
+            self._savepoint(ROW_SAVEPOINT)
+            try:
+                self.cursor.execute(self.query, row)
+                self.written += 1
+            except (DatabaseError, ValueError) as err:
+                self._rollback_to(ROW_SAVEPOINT)
+                self.failed.append((label, err))
+                if self.on_error:
+                    self.on_error(label, err)
+
+    def _savepoint(self, name):
+        """Set a savepoint if savepoints are enabled."""
+        if self.savepoints:
+            self.cursor.execute(f"SAVEPOINT {name}")
+
+    def _rollback_to(self, name):
+        """Roll back to a savepoint if savepoints are enabled."""
+        if self.savepoints:
+            self.cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
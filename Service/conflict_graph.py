@@ -0,0 +1,90 @@
+"""Conflict Graph module for finding sections that share students.
+
+Two sections conflict when some student is enrolled in both, and the weight
+of the conflict is the number of students they share. The graph is built from
+the (student, section) pairs of a period in a single pass: the sections of
+each student are gathered into a set, and every pair of them is counted, so
+the work grows with the pairs each student actually has instead of with the
+square of the number of sections.
+
+Sections are ordered for scheduling with DSatur: the next section is always
+the one whose conflicting sections already use the most distinct colors
+(time groups), breaking ties by the number of students it shares.
+"""
+
+import heapq
+from collections import Counter, defaultdict
+from itertools import combinations
+
+
+def conflict_graph(enrollments):
+    """Map each section to the sections sharing students with it.
+
+    ``enrollments`` are (student ID, section ID) pairs. Returns a dict
+    mapping section IDs to dicts of conflicting section IDs and the number
+    of students shared; sections without conflicts are left out.
+    """
+    sections_by_student = defaultdict(set)
+    for student_id, section_id in enrollments:
+        sections_by_student[student_id].add(section_id)
+
+    shared = Counter()
+    for sections in sections_by_student.values():
+        if len(sections) > 1:
+            shared.update(combinations(sorted(sections), 2))
+
+    graph = defaultdict(dict)
+    for (section_id, other_id), count in shared.items():
+        graph[section_id][other_id] = count
+        graph[other_id][section_id] = count
+    return dict(graph)
+
+
+def section_conflicts(section_ids, graph, min_shared=1):
+    """List the conflicts of each section by index.
+
+    Returns, for each section of ``section_ids``, the indexes of the
+    sections sharing at least ``min_shared`` students with it.
+    """
+    index = {section_id: position
+             for position, section_id in enumerate(section_ids)}
+    return [[index[other_id]
+             for other_id, shared in graph.get(section_id, {}).items()
+             if shared >= min_shared and other_id in index]
+            for section_id in section_ids]
+
+
+def dsatur_order(section_ids, graph):
+    """Order sections by DSatur over their conflict graph.
+
+    Returns the indexes of ``section_ids`` in the order they get colored,
+    and the color each one got; sections with the same color share no
+    students.
+    """
+    conflicts = section_conflicts(section_ids, graph)
+    degrees = [sum(graph.get(section_id, {}).values())
+               for section_id in section_ids]
+    saturation = [set() for _ in section_ids]
+    colors = [None] * len(section_ids)
+    heap = [(0, -degree, index) for index, degree in enumerate(degrees)]
+    heapq.heapify(heap)
+
+    order = []
+    while heap:
+        neighbor_colors, _, index = heapq.heappop(heap)
+        if colors[index] is not None or (
+                -neighbor_colors != len(saturation[index])):
+            continue
+
+        color = 0
+        while color in saturation[index]:
+            color += 1
+        colors[index] = color
+        order.append(index)
+
+        for other in conflicts[index]:
+            if colors[other] is None and color not in saturation[other]:
+                saturation[other].add(color)
+                heapq.heappush(heap, (-len(saturation[other]),
+                                      -degrees[other], other))
+    return order, colors
@@ -47,6 +47,26 @@ class CourseTakenService:
         )
         return cursor.fetchall()
 
+    def get_students_with_activity_grade(self, section_id, activity_id):
+        """Get a section's students together with their grade in an activity.
+
+        Students without a grade for the activity are included with
+        ``grade_id`` and ``grade`` set to None.
+        """
+        cursor = self.db.connect()
+        cursor.execute(
+            "SELECT u.id AS user_id, u.name AS user_name, "
+            "u.email AS user_email, ct.final_grade, "
+            "g.id AS grade_id, g.grade "
+            "FROM Courses_Taken ct "
+            "JOIN Users u ON ct.user_id = u.id "
+            "LEFT JOIN Grades g ON g.user_id = ct.user_id "
+            "AND g.activity_id = %s "
+            "WHERE ct.section_id = %s",
+            (activity_id, section_id)
+        )
+        return cursor.fetchall()
+
     def get_courses_taken_by_user(self, user_id):
         """Get all courses taken by a specific user."""
         cursor = self.db.connect()
@@ -88,6 +108,20 @@ class CourseTakenService:
         )
         self.db.commit()
 
+    def update_final_grades(self, section_id, final_grades):
+        """Update the final grades of several students in a section."""
+        if not final_grades:
+            return
+
+        cursor = self.db.connect()
+        cursor.executemany(
+            "UPDATE Courses_Taken SET final_grade = %s "
+            "WHERE user_id = %s AND section_id = %s",
+            [(final_grade, user_id, section_id)
+             for user_id, final_grade in final_grades.items()]
+        )
+        self.db.commit()
+
     def is_student_enrolled(self, user_id, section_id):
         """Check if a student is enrolled in a specific section."""
         cursor = self.db.connect()
@@ -0,0 +1,237 @@
+"""Grade Engine module for vectorized section grade calculations.
+
+This module loads a section's evaluation scheme and grades into NumPy arrays
+(a students x activities grade matrix plus per-activity and per-topic weight
+vectors) and computes every topic and final grade with array operations,
+following the weighting rules of the grade calculation page.
+"""
+
+import numpy as np
+from db import DatabaseConnection
+
+# Percentages are stored multiplied by 10 (e.g. 30% is saved as 300), so a
+# stored percentage is turned into a fraction by dividing it by 1000.
+PERCENTAGE_SCALE = 1000.0
+MISSING_GRADE = 1.0
+PERCENTAGE_TOLERANCE = 0.001
+
+
+class SectionGradebook:
+    """Grade matrix and weight vectors describing one section."""
+
+    def __init__(self, section, topics, activities, user_ids, grades):
+        """Build the arrays from the rows loaded by GradeEngine.
+
+        A NULL grade counts as missing. A student with a grade that is not
+        a number is kept in ``errors``, mapped to the reason.
+        """
+        self.section = section
+        self.topics = topics
+        self.activities = activities
+        self.user_ids = list(user_ids)
+        self.student_index = {user_id: row
+                              for row, user_id in enumerate(self.user_ids)}
+
+        topic_index = {topic['id']: k for k, topic in enumerate(topics)}
+        activity_index = {activity['id']: col
+                          for col, activity in enumerate(activities)}
+        activity_topics = np.array(
+            [topic_index[activity['topic_id']] for activity in activities],
+            dtype=np.intp)
+
+        self.errors = {}
+        self.grades = np.full((len(self.user_ids), len(activities)), np.nan)
+        for grade in grades:
+            row = self.student_index.get(grade['user_id'])
+            col = activity_index.get(grade['activity_id'])
+            if row is None or col is None or grade['grade'] is None:
+                continue
+            try:
+                value = float(grade['grade'])
+            except (TypeError, ValueError):
+                value = np.nan
+            if not np.isfinite(value):
+                self.errors[grade['user_id']] = (
+                    f"Invalid grade {grade['grade']!r} for activity "
+                    f"{grade['activity_id']}")
+                continue
+            self.grades[row, col] = value
+
+        self.membership = np.zeros((len(activities), len(topics)))
+        self.membership[np.arange(len(activities)), activity_topics] = 1.0
+        self.topic_columns = [np.flatnonzero(self.membership[:, k])
+                              for k in range(len(topics))]
+
+        self.topic_is_percentage = np.array(
+            [bool(topic['weight_or_percentage']) for topic in topics],
+            dtype=bool)
+        self.optional = np.array(
+            [bool(activity['optional_flag']) for activity in activities],
+            dtype=bool)
+
+        activity_weights = np.array(
+            [float(activity['weight']) for activity in activities])
+        self.activity_weights = np.where(
+            self.topic_is_percentage[activity_topics],
+            activity_weights / PERCENTAGE_SCALE, activity_weights)
+
+        topic_weights = np.array([float(topic['weight']) for topic in topics])
+        if section['weight_or_percentage']:
+            topic_weights = topic_weights / PERCENTAGE_SCALE
+        self.topic_weights = topic_weights
+
+
+class GradeEngine:
+    """Service class computing section grades with vectorized operations."""
+
+    def __init__(self):
+        """Initialize the grade engine with database connection."""
+        self.db = DatabaseConnection()
+
+    def load_section(self, section_id, user_ids=None):
+        """Load a section's structure and grades into a SectionGradebook.
+
+        Uses a constant number of queries regardless of the number of
+        students, topics or activities. When ``user_ids`` is omitted every
+        student enrolled in the section is loaded.
+        """
+        cursor = self.db.connect()
+
+        cursor.execute(
+            "SELECT id, weight_or_percentage FROM Sections WHERE id = %s",
+            (section_id,)
+        )
+        section = cursor.fetchone()
+        if not section:
+            raise ValueError("Section not found")
+
+        cursor.execute(
+            "SELECT * FROM Topics WHERE section_id = %s ORDER BY id",
+            (section_id,)
+        )
+        topics = cursor.fetchall()
+
+        cursor.execute(
+            "SELECT a.* FROM Activities a "
+            "JOIN Topics t ON a.topic_id = t.id "
+            "WHERE t.section_id = %s "
+            "ORDER BY a.topic_id, a.instance",
+            (section_id,)
+        )
+        activities = cursor.fetchall()
+
+        if user_ids is None:
+            cursor.execute(
+                "SELECT user_id FROM Courses_Taken WHERE section_id = %s",
+                (section_id,)
+            )
+            user_ids = [row['user_id'] for row in cursor.fetchall()]
+
+        grades = []
+        if user_ids:
+            placeholders = ", ".join(["%s"] * len(user_ids))
+            cursor.execute(
+                "SELECT g.user_id, g.activity_id, g.grade "
+                "FROM Grades g "
+                "JOIN Activities a ON g.activity_id = a.id "
+                "JOIN Topics t ON a.topic_id = t.id "
+                f"WHERE t.section_id = %s AND g.user_id IN ({placeholders})",
+                (section_id, *user_ids)
+            )
+            grades = cursor.fetchall()
+
+        return SectionGradebook(section, topics, activities, user_ids, grades)
+
+    def compute(self, gradebook):
+        """Compute every activity, topic and final grade of a gradebook.
+
+        Missing grades of mandatory activities count as 1.0, missing
+        optional activities are left out of their topic, and a topic or
+        section without weight gets 1.0. Returns a dict of arrays indexed
+        by student row (and activity or topic column).
+        """
+        graded = ~np.isnan(gradebook.grades)
+        included = graded | ~gradebook.optional
+        activity_grades = np.where(graded, gradebook.grades, MISSING_GRADE)
+        weights = included * gradebook.activity_weights
+        contributions = activity_grades * weights
+
+        topic_sums = contributions @ gradebook.membership
+        topic_total_weights = weights @ gradebook.membership
+        has_weight = topic_total_weights > 0
+        topic_grades = np.divide(topic_sums, topic_total_weights,
+                                 out=np.full_like(topic_sums, MISSING_GRADE),
+                                 where=has_weight)
+
+        incomplete = (gradebook.topic_is_percentage & has_weight
+                      & (np.abs(topic_total_weights - 1.0)
+                         > PERCENTAGE_TOLERANCE))
+        missing_percentages = np.where(
+            incomplete, (1.0 - topic_total_weights) * 100.0, 0.0)
+
+        topic_contributions = topic_grades * gradebook.topic_weights
+        total_weight = float(gradebook.topic_weights.sum())
+        if total_weight > 0:
+            final_grades = topic_contributions.sum(axis=1) / total_weight
+        else:
+            final_grades = np.full(len(gradebook.user_ids), MISSING_GRADE)
+
+        return {
+            'included': included,
+            'activity_grades': activity_grades,
+            'contributions': contributions,
+            'topic_grades': topic_grades,
+            'topic_total_weights': topic_total_weights,
+            'missing_percentages': missing_percentages,
+            'topic_contributions': topic_contributions,
+            'final_grades': np.round(final_grades * 10) / 10,
+            'total_weight': total_weight
+        }
+
+    def final_grades(self, gradebook, result):
+        """Map each student of a computed gradebook to its final grade.
+
+        Students with errors in their grades are left out.
+        """
+        return {user_id: float(result['final_grades'][row])
+                for user_id, row in gradebook.student_index.items()
+                if user_id not in gradebook.errors}
+
+    def student_breakdown(self, gradebook, result, user_id):
+        """Build the per-topic breakdown shown on the grade page."""
+        row = gradebook.student_index[user_id]
+        topic_calculations = []
+
+        for k, topic in enumerate(gradebook.topics):
+            activity_calculations = []
+            for col in gradebook.topic_columns[k]:
+                grade = None
+                if result['included'][row, col]:
+                    grade = float(result['activity_grades'][row, col])
+                activity_calculations.append({
+                    'activity': gradebook.activities[col],
+                    'grade': grade,
+                    'contribution': float(result['contributions'][row, col])
+                })
+
+            topic_calculations.append({
+                'topic': topic,
+                'activities': activity_calculations,
+                'grade': float(result['topic_grades'][row, k]),
+                'total_weight': float(result['topic_total_weights'][row, k]),
+                'missing_percentage': float(
+                    result['missing_percentages'][row, k]),
+                'final_contribution': float(
+                    result['topic_contributions'][row, k])
+            })
+
+        return {
+            'topic_calculations': topic_calculations,
+            'final_grade': float(result['final_grades'][row]),
+            'total_weight': result['total_weight']
+        }
+
+    def calculate_section(self, section_id, user_ids=None):
+        """Load and compute a section, returning the gradebook and result."""
+        gradebook = self.load_section(section_id, user_ids)
+        return gradebook, self.compute(gradebook)
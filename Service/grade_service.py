@@ -1,10 +1,12 @@
 """Grade Service module for managing student grades and calculations.
 
 This module provides CRUD operations for grades, including grade calculations,
-final grade computation, and academic performance tracking.
+final grade computation, and academic performance tracking. All grade math
+is delegated to the shared GradeEngine.
 """
 
 from db import DatabaseConnection
+from Service.grade_engine import GradeEngine
 
 
 class GradeService:
@@ -13,6 +15,7 @@ class GradeService:
     def __init__(self):
         """Initialize the grade service with database connection."""
         self.db = DatabaseConnection()
+        self.engine = GradeEngine()
 
     def get_all(self):
         """Get all grades from the database."""
@@ -85,102 +88,96 @@ class GradeService:
         )
         self.db.commit()
 
-    def delete(self, grade_id):
-        """Delete a grade record."""
-        cursor = self.db.connect()
-        cursor.execute("DELETE FROM Grades WHERE id = %s", (grade_id,))
-        self.db.commit()
+    def bulk_upsert(self, activity_id, grades):
+        """Write the grades of an activity in a single batch.
 
-    def _fetch_grade_calculation_data(self, user_id, section_id):
-        """Fetch all data needed for grade calculation (query method)."""
-        cursor = self.db.connect()
+        ``grades`` maps user ids to grades. Existing grades are read once to
+        classify every row, then all new and changed grades are written with
+        one multi-row ``INSERT ... ON DUPLICATE KEY UPDATE`` on the
+        ``(user_id, activity_id)`` key and committed together. Returns the
+        number of inserted, updated and unchanged rows.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not grades:
+            return counts
 
+        cursor = self.db.connect()
         cursor.execute(
-            "SELECT id, name, weight, weight_or_percentage "
-            "FROM Topics WHERE section_id = %s",
-            (section_id,)
+            "SELECT user_id, grade FROM Grades WHERE activity_id = %s",
+            (activity_id,)
         )
-        topics = cursor.fetchall()
-
-        for topic in topics:
-            topic_id = topic['id']
+        existing = {row['user_id']: row['grade'] for row in cursor.fetchall()}
+
+        rows = []
+        for user_id, grade in grades.items():
+            if user_id not in existing:
+                counts['inserted'] += 1
+            elif self._same_grade(existing[user_id], grade):
+                counts['unchanged'] += 1
+                continue
+            else:
+                counts['updated'] += 1
+            rows.append((grade, user_id, activity_id))
 
+        if rows:
+            placeholders = ", ".join(["(%s, %s, %s)"] * len(rows))
             cursor.execute(
-                "SELECT id, instance, weight, optional_flag "
-                "FROM Activities WHERE topic_id = %s",
-                (topic_id,)
+                "INSERT INTO Grades (grade, user_id, activity_id) "
+                f"VALUES {placeholders} "
+                "ON DUPLICATE KEY UPDATE grade = VALUES(grade)",
+                tuple(value for row in rows for value in row)
             )
-            topic['activities'] = cursor.fetchall()
-
-            for activity in topic['activities']:
-                activity_id = activity['id']
-                cursor.execute(
-                    "SELECT grade FROM Grades "
-                    "WHERE user_id = %s AND activity_id = %s",
-                    (user_id, activity_id)
-                )
-                activity['grade_result'] = cursor.fetchone()
-
-        return topics
-
-    def _calculate_activity_grade(self, activity, is_percentage):
-        """Calculate grade contribution for a single activity."""
-        activity_weight = activity['weight']
-        is_optional = activity['optional_flag']
-        grade_result = activity['grade_result']
-
-        if not grade_result:
-            if is_optional:
-                return 0, 0
-            activity_grade = 1.0
-        else:
-            activity_grade = float(grade_result['grade'])
-
-        if is_percentage:
-            contribution = activity_grade * (activity_weight / 100)
-            weight_contribution = activity_weight / 100
-        else:
-            contribution = activity_grade * activity_weight
-            weight_contribution = activity_weight
-
-        return contribution, weight_contribution
-
-    def _calculate_topic_grade(self, topic):
-        """Calculate the final grade for a single topic."""
-        is_percentage = topic['weight_or_percentage']
-        topic_grade = 0
-        topic_total_weight = 0
-
-        for activity in topic['activities']:
-            contribution, weight_contrib = self._calculate_activity_grade(
-                activity, is_percentage)
-
-            if contribution == 0 and weight_contrib == 0:
-                continue
+            self.db.commit()
+        return counts
 
-            topic_grade += contribution
-            topic_total_weight += weight_contrib
+    def _same_grade(self, stored, grade):
+        """Check if a stored grade, which may be NULL, equals a new one."""
+        if stored is None or grade is None:
+            return stored is grade
+        return abs(float(stored) - float(grade)) < 0.05
 
-        if topic_total_weight > 0:
-            return topic_grade / topic_total_weight
-
-        return 0
+    def delete(self, grade_id):
+        """Delete a grade record."""
+        cursor = self.db.connect()
+        cursor.execute("DELETE FROM Grades WHERE id = %s", (grade_id,))
+        self.db.commit()
 
     def calculate_final_grade(self, user_id, section_id):
-        """Calculate the final grade for a student in a section."""
-        topics = self._fetch_grade_calculation_data(user_id, section_id)
-
-        final_grade = 0
-        total_weight = 0
-
-        for topic in topics:
-            topic_weight = topic['weight']
-            topic_final_grade = self._calculate_topic_grade(topic)
-
-            final_grade += topic_final_grade * topic_weight
-            total_weight += topic_weight
-
-        if total_weight > 0:
-            return round(final_grade / total_weight, 1)
-
-        return 0
+        """Calculate the final grade for a student in a section.
+
+        Raises ValueError with the reason if the student's grades cannot be
+        read.
+        """
+        errors = {}
+        final_grades = self.calculate_final_grades_for_section(
+            section_id, user_ids=[user_id], errors=errors)
+        if user_id in errors:
+            raise ValueError(errors[user_id])
+        return final_grades[user_id]
+
+    def calculate_final_grades_for_section(self, section_id, user_ids=None,
+                                           errors=None):
+        """Calculate the final grades of a section's students in bulk.
+
+        When ``user_ids`` is omitted all enrolled students are included.
+        Returns a dict mapping each user id to its final grade. Students
+        whose grades cannot be read are left out, and the reason is stored
+        under their user id in ``errors`` if given.
+        """
+        gradebook, result = self.engine.calculate_section(section_id,
+                                                          user_ids)
+        if errors is not None:
+            errors.update(gradebook.errors)
+        return self.engine.final_grades(gradebook, result)
+
+    def get_student_breakdown(self, user_id, section_id):
+        """Get the per-topic grade breakdown of a student in a section.
+
+        Raises ValueError with the reason if the student's grades cannot be
+        read.
+        """
+        gradebook, result = self.engine.calculate_section(
+            section_id, user_ids=[user_id])
+        if user_id in gradebook.errors:
+            raise ValueError(gradebook.errors[user_id])
+        return self.engine.student_breakdown(gradebook, result, user_id)
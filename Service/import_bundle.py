@@ -0,0 +1,206 @@
+"""Import Bundle module for importing several files as one unit.
+
+A bundle is a zip archive or a directory holding up to one JSON file per
+import file type, named after the type (``alumnos.json``, ``cursos.json``,
+...). This module reads bundles, orders their file types so every type is
+imported after the types it references, and builds in-memory indexes of the
+keys each file defines so references between files are checked without
+querying the database.
+"""
+
+import json
+import os
+import zipfile
+from graphlib import TopologicalSorter
+
+# File types whose rows must be in the database before a file type imports.
+IMPORT_DEPENDENCIES = {
+    'alumnos': (),
+    'profesores': (),
+    'cursos': (),
+    'salas_clases': (),
+    'instancias_cursos': ('cursos',),
+    'instancias_cursos_secciones': ('instancias_cursos', 'profesores'),
+    'alumnos_seccion': ('alumnos', 'instancias_cursos_secciones'),
+    'notas_alumnos': ('alumnos', 'instancias_cursos_secciones')
+}
+
+
+def import_order(file_types):
+    """Order file types so each one follows the types it depends on."""
+    file_types = set(file_types)
+    sorter = TopologicalSorter({
+        file_type: [dependency
+                    for dependency in IMPORT_DEPENDENCIES[file_type]
+                    if dependency in file_types]
+        for file_type in IMPORT_DEPENDENCIES
+        if file_type in file_types
+    })
+    return list(sorter.static_order())
+
+
+def _bundle_file_type(name):
+    """Get the file type a bundle member is named after, or None."""
+    stem, extension = os.path.splitext(os.path.basename(name))
+    if extension.lower() != '.json' or stem.startswith('.'):
+        return None
+    if stem not in IMPORT_DEPENDENCIES:
+        raise ValueError(f"Tipo de archivo no soportado: {name}")
+    return stem
+
+
+def _add_bundle_file(bundle, name, file):
+    """Parse a bundle member into the bundle, rejecting repeated types."""
+    file_type = _bundle_file_type(name)
+    if file_type is None:
+        return
+    if file_type in bundle:
+        raise ValueError(f"Bundle contains more than one {file_type} file")
+    try:
+        bundle[file_type] = json.load(file)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{name}: {e}") from e
+
+
+def read_bundle(source):
+    """Load the files of a zip archive or directory keyed by file type.
+
+    ``source`` is a directory path, or a path or binary file of a zip
+    archive. Files that are not JSON are ignored. Raises ValueError for
+    unknown or repeated file types, malformed JSON or an empty bundle.
+    """
+    bundle = {}
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and _bundle_file_type(name):
+                with open(path, 'rb') as file:
+                    _add_bundle_file(bundle, name, file)
+    else:
+        try:
+            with zipfile.ZipFile(source) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and _bundle_file_type(info.filename):
+                        with archive.open(info) as file:
+                            _add_bundle_file(bundle, info.filename, file)
+        except zipfile.BadZipFile as e:
+            raise ValueError("Bundle must be a zip archive") from e
+
+    if not bundle:
+        raise ValueError("Bundle contains no import files")
+    return bundle
+
+
+# ----- Reference Indexes ---
+def _activity_keys(secciones):
+    """Get the (topic ID, instance) pair of every activity of the sections."""
+    keys = set()
+    for seccion in secciones:
+        evaluacion = seccion['evaluacion']
+        for topic in evaluacion['combinacion_topicos']:
+            topic_eval = evaluacion['topicos'].get(str(topic['id']), {})
+            keys.update((topic['id'], instance)
+                        for instance in range(
+                            1, len(topic_eval.get('valores', ())) + 1))
+    return keys
+
+
+def build_index(bundle):
+    """Index the keys defined by each file of a validated bundle."""
+    index = {
+        'curso': {curso['id'] for curso in bundle.get('cursos', {})
+                  .get('cursos', ())},
+        'instancia': {instancia['id'] for instancia
+                      in bundle.get('instancias_cursos', {})
+                      .get('instancias', ())},
+        'profesor': {profesor['id'] for profesor
+                     in bundle.get('profesores', {}).get('profesores', ())},
+        'alumno': {alumno['id'] for alumno
+                   in bundle.get('alumnos', {}).get('alumnos', ())}
+    }
+    secciones = bundle.get('instancias_cursos_secciones', {}).get(
+        'secciones', ())
+    index['seccion'] = {seccion['id'] for seccion in secciones}
+    index['actividad'] = _activity_keys(secciones)
+    return index
+
+
+class Reference:
+    """Field of a file type that must name a key defined elsewhere."""
+
+    __slots__ = ('file_type', 'array_key', 'kind', 'field', 'key',
+                 'message')
+
+    def __init__(self, file_type, array_key, kind, field, key, message):
+        """Initialize the reference.
+
+        ``key`` takes a record and returns the referenced key of ``kind``;
+        ``message`` is a format string receiving ``index`` and ``key``.
+        """
+        self.file_type = file_type
+        self.array_key = array_key
+        self.kind = kind
+        self.field = field
+        self.key = key
+        self.message = message
+
+
+REFERENCES = (
+    Reference('instancias_cursos', 'instancias', 'curso', 'curso_id',
+              lambda instancia: instancia['curso_id'],
+              "Instancia {index}: Course {key} not found"),
+    Reference('instancias_cursos_secciones', 'secciones', 'instancia',
+              'instancia_curso',
+              lambda seccion: seccion['instancia_curso'],
+              "Seccion {index}: Course instance {key} not found"),
+    Reference('instancias_cursos_secciones', 'secciones', 'profesor',
+              'profesor_id', lambda seccion: seccion['profesor_id'],
+              "Seccion {index}: Professor {key} not found"),
+    Reference('alumnos_seccion', 'alumnos_seccion', 'alumno', 'alumno_id',
+              lambda entry: entry['alumno_id'],
+              "Enrollment {index}: Student {key} not found"),
+    Reference('alumnos_seccion', 'alumnos_seccion', 'seccion', 'seccion_id',
+              lambda entry: entry['seccion_id'],
+              "Enrollment {index}: Section {key} not found"),
+    Reference('notas_alumnos', 'notas', 'alumno', 'alumno_id',
+              lambda entry: entry['alumno_id'],
+              "Grade {index}: Student {key} not found"),
+    Reference('notas_alumnos', 'notas', 'actividad', 'topico_id',
+              lambda entry: (entry['topico_id'], entry['instancia']),
+              "Grade {index}: Activity for topic {key[0]} instance "
+              "{key[1]} not found")
+)
+
+
+def _iter_references(bundle):
+    """Yield each reference with the record index and referenced key."""
+    for reference in REFERENCES:
+        data = bundle.get(reference.file_type)
+        if data is None:
+            continue
+        for index, record in enumerate(data[reference.array_key]):
+            yield reference, index, reference.key(record)
+
+
+def unresolved_keys(bundle, index):
+    """Get the referenced keys of each kind the bundle does not define."""
+    unresolved = {}
+    for reference, _, key in _iter_references(bundle):
+        if key not in index[reference.kind]:
+            unresolved.setdefault(reference.kind, set()).add(key)
+    return unresolved
+
+
+def reference_errors(bundle, known):
+    """Get an error for every reference to a key missing from ``known``.
+
+    Errors use the RecordValidator format, with the file type of the
+    record added under ``file_type``.
+    """
+    return [
+        {'file_type': reference.file_type, 'index': index,
+         'field': reference.field,
+         'message': reference.message.format(index=index, key=key)}
+        for reference, index, key in _iter_references(bundle)
+        if key not in known[reference.kind]
+    ]
@@ -0,0 +1,246 @@
+"""Import Job Service module for running JSON imports in the background.
+
+This module spools uploaded files to disk and imports them on a pool of
+worker threads, so the upload request returns right away with a job id.
+Each job tracks its status and row counters for the progress endpoint.
+Imports of unrelated file types run in parallel, while a job waits for the
+earlier jobs of the file types it depends on. A bundle job imports several
+file types at once, so it waits for every earlier job and every later job
+waits for it.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import concurrent.futures
+from collections import Counter
+
+from db import DatabaseConnection
+from Service.import_bundle import IMPORT_DEPENDENCIES, read_bundle
+from Service.import_service import (
+    DELTA_FILE_TYPES, STREAM_ARRAY_KEYS, ImportService
+)
+
+DEFAULT_IMPORT_WORKERS = 2
+DEFAULT_KEPT_JOBS = 100
+BUNDLE = 'bundle'
+
+
+class ImportJobService:
+    """Service class queueing imports on a background worker pool."""
+
+    def __init__(self, max_workers=None, spool_dir=None, kept_jobs=None):
+        """Initialize the worker pool and the job registry.
+
+        ``max_workers`` defaults to the IMPORT_WORKERS environment variable;
+        uploads are spooled to ``spool_dir`` (the system temp dir if None).
+        Only the last ``kept_jobs`` finished jobs are kept, defaulting to
+        the IMPORT_KEPT_JOBS environment variable.
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv('IMPORT_WORKERS',
+                                        DEFAULT_IMPORT_WORKERS))
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='import')
+        if kept_jobs is None:
+            kept_jobs = int(os.getenv('IMPORT_KEPT_JOBS', DEFAULT_KEPT_JOBS))
+        self.spool_dir = spool_dir
+        self.kept_jobs = kept_jobs
+        self.jobs = {}
+        self.futures = {}
+        self._lock = threading.Lock()
+
+    def _spool(self, file, suffix='.json'):
+        """Copy an uploaded file to a temporary file and return its path."""
+        handle, path = tempfile.mkstemp(suffix=suffix, dir=self.spool_dir)
+        with os.fdopen(handle, 'wb') as spooled:
+            shutil.copyfileobj(file, spooled)
+        return path
+
+    def _blocking_futures(self, file_type):
+        """Get the futures of queued or running jobs this type must wait for."""
+        if file_type == BUNDLE:
+            blocking_types = {BUNDLE, *IMPORT_DEPENDENCIES}
+        else:
+            blocking_types = {BUNDLE, file_type,
+                              *IMPORT_DEPENDENCIES[file_type]}
+        return [self.futures[job_id]
+                for job_id, job in self.jobs.items()
+                if job['file_type'] in blocking_types
+                and not self.futures[job_id].done()]
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond the ones kept."""
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if self.futures[job_id].done()]
+        for job_id in finished[:max(len(finished) - self.kept_jobs, 0)]:
+            del self.jobs[job_id]
+            del self.futures[job_id]
+
+    def submit(self, file, file_type, filename=None, delta=False,
+               delete_missing=False, resumable=False, dry_run=False,
+               atomic=False):
+        """Spool an upload and queue its import, returning the job id.
+
+        Large file types are validated first and then committed batch by
+        batch. With ``delta`` only the changed rows are applied, deleting
+        the stored rows missing from the file if ``delete_missing`` is set.
+        With ``resumable`` the batches are committed with a checkpoint, and
+        submitting the file again after a failure resumes the import. With
+        ``atomic`` the whole file is imported in a single transaction.
+        With ``dry_run`` the file is validated and its references resolved
+        without writing anything. Raises ValueError for unsupported file
+        types and options.
+        """
+        if file_type not in IMPORT_DEPENDENCIES:
+            raise ValueError(f"Tipo de archivo no soportado: {file_type}")
+        if delta and file_type not in DELTA_FILE_TYPES:
+            raise ValueError(f"Delta import not supported for {file_type}")
+        if resumable and file_type not in STREAM_ARRAY_KEYS:
+            raise ValueError(f"Resumable import not supported for "
+                             f"{file_type}")
+        if delta and resumable:
+            raise ValueError("An import cannot be both delta and resumable")
+        if dry_run and (delta or resumable):
+            raise ValueError("A dry run cannot be delta or resumable")
+        if atomic and (delta or resumable or dry_run):
+            raise ValueError("An atomic import cannot be delta, resumable "
+                             "or a dry run")
+
+        options = {'delta': delta, 'delete_missing': delete_missing,
+                   'resumable': resumable, 'dry_run': dry_run,
+                   'atomic': atomic}
+        return self._queue(file_type, self._spool(file), filename, options)
+
+    def submit_bundle(self, file, filename=None):
+        """Spool a zip bundle and queue its import, returning the job id."""
+        return self._queue(BUNDLE, self._spool(file, suffix='.zip'),
+                           filename)
+
+    def _queue(self, file_type, path, filename, options=None):
+        """Register a job for a spooled file and hand it to the pool."""
+        job = {
+            'id': uuid.uuid4().hex,
+            'file_type': file_type,
+            'filename': filename,
+            'options': options or {},
+            'status': 'queued',
+            'error': None,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'progress': Counter(),
+            'service': None
+        }
+
+        with self._lock:
+            self._prune()
+            blocking = self._blocking_futures(file_type)
+            self.jobs[job['id']] = job
+            self.futures[job['id']] = self.executor.submit(
+                self._run, job, path, blocking)
+        return job['id']
+
+    def _run(self, job, path, blocking):
+        """Worker: wait for the blocking jobs, then import the spooled file."""
+        try:
+            concurrent.futures.wait(blocking)
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+
+            service = ImportService(progress=job['progress'],
+                                    job_id=job['id'])
+            job['service'] = service
+            options = job['options']
+            if job['file_type'] == BUNDLE:
+                service.import_bundle(read_bundle(path))
+            elif options.get('dry_run'):
+                with open(path, 'rb') as spooled:
+                    service.import_json(spooled, job['file_type'],
+                                        dry_run=True)
+            elif options.get('delta'):
+                with open(path, 'rb') as spooled:
+                    counts = service.import_delta(
+                        spooled, job['file_type'],
+                        delete_missing=options['delete_missing'])
+                if counts['skipped']:
+                    job['status'] = 'skipped'
+                    return
+            else:
+                with open(path, 'rb') as spooled:
+                    service.import_json(
+                        spooled, job['file_type'], stream=True,
+                        pipeline=options.get('atomic', False),
+                        checkpoint=options.get('resumable', False))
+            job['status'] = 'completed'
+        except Exception as e:  # pylint: disable=broad-except
+            job['status'] = 'failed'
+            job['error'] = str(e)
+        finally:
+            job['finished_at'] = time.time()
+            DatabaseConnection().release()
+            os.remove(path)
+
+    def _snapshot(self, job):
+        """Build the public view of a job with its counters and rate."""
+        progress = job['progress']
+        started = job['started_at']
+        elapsed = 0.0
+        if started is not None:
+            elapsed = (job['finished_at'] or time.time()) - started
+
+        inserted = progress['inserted']
+        service = job['service']
+        options = job['options']
+        mode = 'full'
+        if options.get('delta'):
+            mode = 'delta'
+        elif options.get('resumable'):
+            mode = 'resumable'
+        elif options.get('dry_run'):
+            mode = 'dry-run'
+        elif options.get('atomic'):
+            mode = 'atomic'
+        return {
+            'id': job['id'],
+            'file_type': job['file_type'],
+            'filename': job['filename'],
+            'mode': mode,
+            'status': job['status'],
+            'error': job['error'],
+            'validated': progress['validated'],
+            'inserted': inserted,
+            'updated': progress['updated'],
+            'deleted': progress['deleted'],
+            'unchanged': progress['unchanged'],
+            'failed': progress['failed'],
+            'resumed': progress['resumed'],
+            'committed': progress['committed'],
+            'stages': service.stages if service else {},
+            'report': service.report.as_dict() if service else None,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(inserted / elapsed, 1) if elapsed else 0.0
+        }
+
+    def get(self, job_id):
+        """Get the progress of a job, or None if the id is unknown."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return self._snapshot(job)
+
+    def get_all(self):
+        """Get the progress of every job, most recent first."""
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return [self._snapshot(job)
+                for job in sorted(jobs, key=lambda job: job['submitted_at'],
+                                  reverse=True)]
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job finishes and return its progress."""
+        self.futures[job_id].result(timeout=timeout)
+        return self.get(job_id)
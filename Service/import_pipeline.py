@@ -0,0 +1,196 @@
+"""Import Pipeline module for overlapping parsing, validation and writes.
+
+An ImportPipeline runs three stages connected by bounded queues: a parse
+thread pulls records from the incremental JSON parser and groups them in
+batches, a validate thread checks every record, and the calling thread
+writes the valid batches to the database. Parsing and validation of the next
+batches overlap with the database round trips of the current one, and the
+bounded queues make a fast stage wait for a slow one instead of buffering
+the whole file.
+
+The write stage stays on the calling thread because database connections
+and units of work are per thread. Each stage records how long it was busy,
+starved (waiting for input) and blocked (waiting for room downstream), and
+each queue records its depth, so the slowest stage can be identified.
+"""
+
+import queue
+import threading
+import time
+
+DEFAULT_QUEUE_SIZE = 8
+STAGES = ('parse', 'validate', 'write')
+QUEUES = ('parsed', 'validated')
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class ImportPipeline:
+    """Parse, validate and write records as concurrent stages."""
+
+    def __init__(self, records, check, write, batch_size,
+                 queue_size=DEFAULT_QUEUE_SIZE, stats=None):
+        """Initialize the pipeline.
+
+        ``records`` is iterated on the parse thread, ``check`` takes a
+        record and its index and returns whether it is valid, and ``write``
+        takes a list of valid records. Once a record is invalid no more
+        batches are written, but every record is still checked. Stage and
+        queue statistics are kept in ``stats`` (a new dict if omitted).
+        """
+        self.records = records
+        self.check = check
+        self.write = write
+        self.batch_size = batch_size
+        self.queues = {name: queue.Queue(maxsize=queue_size)
+                       for name in QUEUES}
+        self.stats = stats if stats is not None else {}
+        self.stats.update({
+            'stages': {name: {'items': 0, 'busy_seconds': 0.0,
+                              'starved_seconds': 0.0,
+                              'blocked_seconds': 0.0}
+                       for name in STAGES},
+            'queues': {name: {'capacity': queue_size, 'depth': 0,
+                              'max_depth': 0, 'mean_depth': 0.0}
+                       for name in QUEUES},
+            'bottleneck': None
+        })
+        self.valid = True
+        self._puts = dict.fromkeys(QUEUES, 0)
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _put(self, stage, name, item):
+        """Put an item on a queue, waiting for room while the pipeline runs."""
+        target = self.queues[name]
+        started = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        self.stats['stages'][stage]['blocked_seconds'] += (
+            time.perf_counter() - started)
+
+        depth = target.qsize()
+        queue_stats = self.stats['queues'][name]
+        self._puts[name] += 1
+        queue_stats['depth'] = depth
+        queue_stats['max_depth'] = max(queue_stats['max_depth'], depth)
+        queue_stats['mean_depth'] += (
+            (depth - queue_stats['mean_depth']) / self._puts[name])
+
+    def _get(self, stage, name):
+        """Take the next item from a queue, waiting while the pipeline runs."""
+        source = self.queues[name]
+        started = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                item = source.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                continue
+        self.stats['stages'][stage]['starved_seconds'] += (
+            time.perf_counter() - started)
+        self.stats['queues'][name]['depth'] = source.qsize()
+        return item
+
+    def _run_stage(self, stage, body):
+        """Run a stage thread body, stopping the pipeline if it fails."""
+        try:
+            body()
+        except PipelineStopped:
+            pass
+        except Exception as e:  # pylint: disable=broad-except
+            self._errors.append(e)
+            self._stop.set()
+
+    def _parse(self):
+        """Stage: group the parsed records in batches."""
+        stats = self.stats['stages']['parse']
+        records = iter(self.records)
+        while True:
+            started = time.perf_counter()
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+            stats['busy_seconds'] += time.perf_counter() - started
+            stats['items'] += len(batch)
+
+            if batch:
+                self._put('parse', 'parsed', batch)
+            if len(batch) < self.batch_size:
+                self._put('parse', 'parsed', _DONE)
+                return
+
+    def _validate(self):
+        """Stage: check every record and forward batches while all are valid."""
+        stats = self.stats['stages']['validate']
+        index = 0
+        while True:
+            batch = self._get('validate', 'parsed')
+            if batch is _DONE:
+                self._put('validate', 'validated', _DONE)
+                return
+
+            started = time.perf_counter()
+            for record in batch:
+                if not self.check(record, index):
+                    self.valid = False
+                index += 1
+            stats['busy_seconds'] += time.perf_counter() - started
+            stats['items'] += len(batch)
+
+            if self.valid:
+                self._put('validate', 'validated', batch)
+
+    def _write(self):
+        """Stage: write the validated batches on the calling thread."""
+        stats = self.stats['stages']['write']
+        while True:
+            batch = self._get('write', 'validated')
+            if batch is _DONE:
+                return
+
+            started = time.perf_counter()
+            self.write(batch)
+            stats['busy_seconds'] += time.perf_counter() - started
+            stats['items'] += len(batch)
+
+    def run(self):
+        """Run every stage to completion and return the statistics.
+
+        Re-raises the first error of any stage once all stages stopped.
+        """
+        threads = [
+            threading.Thread(target=self._run_stage, args=(stage, body),
+                             name=f"import-{stage}", daemon=True)
+            for stage, body in (('parse', self._parse),
+                                ('validate', self._validate))
+        ]
+        for thread in threads:
+            thread.start()
+
+        self._run_stage('write', self._write)
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+
+        stages = self.stats['stages']
+        self.stats['bottleneck'] = max(
+            STAGES, key=lambda stage: stages[stage]['busy_seconds'])
+        if self._errors:
+            raise self._errors[0]
+        return self.stats
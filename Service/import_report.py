@@ -0,0 +1,140 @@
+"""Import Report module for collecting the outcome of an import.
+
+An ImportReport replaces per-row printing: it counts the messages of each
+level, keeps the row counters of the import and holds a capped sample of the
+failures, so a million-row import costs a counter increment per row and the
+user still sees what went wrong. Messages can also be written to a log file
+through a queue drained by a background thread, so writing the log never
+blocks the import.
+"""
+
+import logging
+import logging.handlers
+import queue
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_SAMPLE_SIZE = 50
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(file_type)s] %(message)s"
+
+LEVELS = {
+    'success': logging.INFO,
+    'error': logging.ERROR,
+    'validation_error': logging.WARNING
+}
+
+IMPORT_LOGGER = logging.getLogger('import')
+IMPORT_LOGGER.propagate = False
+# Disabled until start_import_log attaches a file.
+IMPORT_LOGGER.setLevel(logging.CRITICAL + 1)
+
+
+class ImportReport:
+    """Counters and a capped sample of the messages of one import."""
+
+    def __init__(self, file_type=None, progress=None,
+                 sample_size=DEFAULT_SAMPLE_SIZE):
+        """Initialize an empty report.
+
+        ``progress`` is the Counter of validated, inserted, updated,
+        deleted, unchanged and failed rows; a new one is used if omitted.
+        At most ``sample_size`` failures and successes are kept.
+        """
+        self.file_type = file_type
+        self.progress = progress if progress is not None else Counter()
+        self.messages = Counter()
+        self.failures = []
+        self.successes = []
+        self.sample_size = sample_size
+        self.dry_run = False
+        self.timings = {}
+        self._nested = []
+
+    def add(self, level, message):
+        """Record a message of ``level``: success, error or validation_error."""
+        self.messages[level] += 1
+        sample = self.successes if level == 'success' else self.failures
+        if len(sample) < self.sample_size:
+            sample.append({'level': level, 'message': message})
+
+        log_level = LEVELS[level]
+        if IMPORT_LOGGER.isEnabledFor(log_level):
+            IMPORT_LOGGER.log(log_level, message,
+                              extra={'file_type': self.file_type or '-'})
+
+    @contextmanager
+    def timed(self, phase):
+        """Add the seconds spent in the block to ``phase``.
+
+        Time spent in phases timed inside the block is left out, so each
+        phase only counts its own work.
+        """
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            own = elapsed - self._nested.pop()
+            self.timings[phase] = self.timings.get(phase, 0.0) + own
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def timed_iter(self, iterable, phase):
+        """Yield the items of ``iterable``, timing their production."""
+        iterator = iter(iterable)
+        while True:
+            with self.timed(phase):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    @property
+    def failure_count(self):
+        """Total number of error and validation error messages."""
+        return self.messages['error'] + self.messages['validation_error']
+
+    def as_dict(self):
+        """Build a JSON-serializable view of the report."""
+        return {
+            'file_type': self.file_type,
+            'rows': dict(self.progress),
+            'messages': dict(self.messages),
+            'failures': list(self.failures),
+            'omitted_failures': self.failure_count - len(self.failures),
+            'successes': list(self.successes),
+            'dry_run': self.dry_run,
+            'timings': {phase: round(seconds, 4)
+                        for phase, seconds in self.timings.items()}
+        }
+
+
+def start_import_log(path):
+    """Write import messages to ``path`` from a background thread.
+
+    Returns the started QueueListener; pass it to stop_import_log to flush
+    the pending messages and close the file.
+    """
+    log_queue = queue.SimpleQueue()
+    file_handler = logging.FileHandler(path, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+
+    IMPORT_LOGGER.addHandler(logging.handlers.QueueHandler(log_queue))
+    IMPORT_LOGGER.setLevel(logging.INFO)
+    return listener
+
+
+def stop_import_log(listener):
+    """Stop writing the import log started by start_import_log."""
+    for handler in list(IMPORT_LOGGER.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            IMPORT_LOGGER.removeHandler(handler)
+    IMPORT_LOGGER.setLevel(logging.CRITICAL + 1)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
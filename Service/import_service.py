@@ -5,170 +5,136 @@ for the academic management system, including students, professors, courses,
 instances, sections, enrollments, grades, and room data.
 """
 
+import hashlib
 import json
-import re
-from datetime import datetime
+from collections import Counter
 from db import DatabaseConnection
+from Service.batch_writer import BatchWriter, DEFAULT_BATCH_SIZE
+from Service.import_bundle import (
+    build_index, import_order, reference_errors, unresolved_keys
+)
+from Service.import_validator import (
+    SCHEMAS, RecordValidator, check_no_circular_prerequisites,
+    check_prerequisites_exist, is_valid_id, is_valid_name, is_valid_year
+)
+from Service.import_pipeline import ImportPipeline
+from Service.import_report import ImportReport
+from Service.json_stream import iter_json_array
+from Service.prerequisite_graph import prerequisite_graph, topological_order
+
+# Top-level array holding the records of each file type.
+RECORD_ARRAY_KEYS = {
+    **{file_type: schema.array_key for file_type, schema in SCHEMAS.items()},
+    'instancias_cursos': 'instancias',
+    'instancias_cursos_secciones': 'secciones'
+}
+# File types that can be imported in streaming mode.
+STREAM_ARRAY_KEYS = {
+    file_type: RECORD_ARRAY_KEYS[file_type]
+    for file_type in ('alumnos', 'profesores', 'alumnos_seccion',
+                      'notas_alumnos', 'salas_clases')
+}
+# File types that can be imported in delta mode.
+DELTA_FILE_TYPES = ('alumnos', 'profesores', 'notas_alumnos')
+DEFAULT_STREAM_BATCH_SIZE = 500
+# How a dry run reports the rows it would have written.
+DRY_RUN_VERBS = {'Imported': 'Would import', 'Inserted': 'Would insert',
+                 'Added': 'Would add', 'Enrolled': 'Would enroll'}
+LOOKUP_CHUNK_SIZE = 1000
 
 
 class ImportService:
     """Service class for importing and validating JSON data."""
 
-    def __init__(self):
-        """Initialize the import service with database connection."""
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, progress=None,
+                 job_id=None):
+        """Initialize the import service with database connection.
+
+        ``batch_size`` is the number of rows sent per multi-row INSERT.
+        ``progress`` is a Counter advanced with the ``validated``,
+        ``inserted`` and ``failed`` rows; a new one is used if omitted.
+        Messages are collected in ``report``, which each import replaces.
+        ``job_id`` is stored with the checkpoints of resumable imports.
+        """
         self.db = DatabaseConnection()
+        self.batch_size = batch_size
+        self.progress = progress if progress is not None else Counter()
+        self.job_id = job_id
+        self.savepoints = False
+        self.dry_run = False
+        self.stages = {}
+        self.report = ImportReport(progress=self.progress)
+
+    def _start_report(self, file_type):
+        """Replace the report with an empty one for a new import."""
+        self.report = ImportReport(file_type, self.progress)
+        return self.report
 
     def _success(self, message):
-        """Print success message."""
-        print(f"[SUCCESS] {message}")
+        """Record success message."""
+        self.report.add('success', message)
+
+    def _written(self, verb, message):
+        """Record rows written, phrased as what a dry run would write."""
+        if self.dry_run:
+            verb = DRY_RUN_VERBS[verb]
+        self._success(f"{verb} {message}")
 
     def _error(self, message):
-        """Print error message."""
-        print(f"[ERROR] {message}")
+        """Record error message."""
+        self.report.add('error', message)
 
     def _validation_error(self, message):
-        """Print validation error message."""
-        print(f"[VALIDATION ERROR] {message}")
+        """Record validation error message."""
+        self.report.add('validation_error', message)
+
+    def _row_error(self, message):
+        """Record the error of a row that could not be imported."""
+        self.progress['failed'] += 1
+        self._error(message)
+
+    def _report_row_error(self, label, err):
+        """Record the error of a row rejected by a batch insert."""
+        self._error(f"{label}: {err}")
+
+    def _batch_writer(self, cursor, query, written_key='inserted',
+                      depends_on=None):
+        """Create a BatchWriter that reports rejected rows as errors.
+
+        Written rows are counted in the ``written_key`` progress count;
+        ``depends_on`` is a writer whose rows must be written first.
+        """
+        return BatchWriter(cursor, query, self.batch_size,
+                           on_error=self._report_row_error,
+                           progress=self.progress, written_key=written_key,
+                           depends_on=depends_on, savepoints=self.savepoints,
+                           dry_run=self.dry_run)
+
+    def _fingerprint(self, *values):
+        """Hash the values of a record to detect changes."""
+        return hashlib.blake2b(json.dumps(values, default=str).encode(),
+                               digest_size=16).digest()
 
     # ----- Basic Validations ---
-    def _is_valid_email(self, email):
-        """Validate email format."""
-        if not email or not isinstance(email, str):
-            return False
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
-
-    def _is_valid_name(self, name):
-        """Validate name field."""
-        if not name or not isinstance(name, str):
-            return False
-        return len(name.strip()) > 0 and len(name) <= 100
-
-    def _is_valid_nrc(self, nrc):
-        """Validate NRC code format."""
-        if not nrc or not isinstance(nrc, str):
-            return False
-        return len(nrc.strip()) > 0 and len(nrc) <= 50
-
-    def _is_valid_year(self, year):
-        """Validate year format."""
-        if not isinstance(year, int):
-            return False
-        return 1990 <= year <= 2050
-
     def _is_valid_semester(self, semester):
         """Validate semester format."""
         if not isinstance(semester, int):
             return False
         return semester in [1, 2]
 
-    def _is_valid_credits(self, course_credits):
-        """Validate credits field."""
-        if not isinstance(course_credits, int):
-            return False
-        return 1 <= course_credits <= 99
-
-    def _is_valid_capacity(self, capacity):
-        """Validate room capacity."""
-        if not isinstance(capacity, int):
-            return False
-        return capacity > 0
-
-    def _is_valid_grade(self, grade):
-        """Validate grade value."""
-        if not isinstance(grade, (int, float)):
-            return False
-        return 1.0 <= float(grade) <= 7.0
-
-    def _is_valid_id(self, id_value):
-        """Validate ID field."""
-        if not isinstance(id_value, int):
-            return False
-        return id_value > 0
-
-    def _is_valid_instance_number(self, instance):
-        """Validate instance number."""
-        if not isinstance(instance, int):
-            return False
-        return instance > 0
-
     def _is_valid_percentage_value(self, value):
         """Validate percentage value (0.0-100.0 for topic combination)."""
         if not isinstance(value, (int, float)):
             return False
         return 0.0 <= float(value) <= 100.0
 
-    def _is_valid_activity_value(self, value):
-        """Validate activity weight/percentage value (any positive number)."""
-        if not isinstance(value, (int, float)):
-            return False
-        return float(value) > 0
-
     def _is_valid_evaluation_type(self, tipo):
         """Validate evaluation type."""
         if not isinstance(tipo, str):
             return False
         return tipo in ["peso", "porcentaje"]
 
-    # ----- Structure Validations ---
-    def _validate_alumnos_structure(self, data):
-        """Validate alumnos JSON structure."""
-        if not isinstance(data, dict):
-            self._validation_error("Root must be an object")
-            return False
-
-        if 'alumnos' not in data:
-            self._validation_error("Missing 'alumnos' key")
-            return False
-
-        if not isinstance(data['alumnos'], list):
-            self._validation_error("'alumnos' must be an array")
-            return False
-
-        return True
-
     # ----- Logic Validations ---
-    def _validate_unique_emails_across_types(self, data, file_type):
-        """Validate that emails are unique across all users being imported."""
-        if file_type in ['alumnos', 'profesores']:
-            emails = []
-            users_key = 'alumnos' if file_type == 'alumnos' else 'profesores'
-
-            for user in data[users_key]:
-                email = user.get('correo', '').lower()
-                if email in emails:
-                    self._validation_error(f"Duplicate email found: {email}")
-                    return False
-                emails.append(email)
-        return True
-
-    def _validate_unique_import_ids(self, data, file_type):
-        """Validate that import_ids are unique within the file."""
-        if file_type in ['alumnos', 'profesores']:
-            import_ids = []
-            users_key = 'alumnos' if file_type == 'alumnos' else 'profesores'
-
-            for user in data[users_key]:
-                import_id = user.get('id')
-                if import_id in import_ids:
-                    self._validation_error(f"Duplicate import_id found: "
-                                          f"{import_id}")
-                    return False
-                import_ids.append(import_id)
-        return True
-
-    def _validate_admission_dates_logic(self, data):
-        """Validate that admission dates are logical (not future, not old)."""
-        current_year = datetime.now().year
-
-        for index, alumno in enumerate(data['alumnos']):
-            year = alumno.get('anio_ingreso')
-            if year and (year > current_year or year < 1950):
-                self._validation_error(f"Alumno {index}: Admission year "
-                                      f"{year} is not logical")
-                return False
-        return True
-
     def _validate_percentage_sum_per_topic(self, data):
         """Validate that percentages sum to 100% for each topic."""
         for sec_index, seccion in enumerate(data['secciones']):
@@ -245,170 +211,39 @@ class ImportService:
                         return False
         return True
 
-    def _validate_course_prerequisites_exist(self, data):
-        """Validate that prerequisite courses exist in the same data."""
-        course_codes = {curso['codigo'] for curso in data['cursos']}
-
-        for index, curso in enumerate(data['cursos']):
-            for prereq_code in curso['requisitos']:
-                if prereq_code not in course_codes:
-                    self._validation_error(
-                        f"Curso {index}: Prerequisite '{prereq_code}' not "
-                        "found in courses list"
-                    )
-                    return False
-        return True
-
-    def _validate_no_circular_prerequisites(self, data):
-        """Validate that there are no circular dependencies in prerequisites."""
-        def has_circular_dependency(course_code, prerequisites_map, visited,
-                                    rec_stack):
-            visited.add(course_code)
-            rec_stack.add(course_code)
-
-            for prereq in prerequisites_map.get(course_code, []):
-                if prereq not in visited:
-                    if has_circular_dependency(prereq, prerequisites_map,
-                                               visited, rec_stack):
-                        return True
-                elif prereq in rec_stack:
-                    return True
-
-            rec_stack.remove(course_code)
-            return False
-
-        prereq_map = {}
-        for curso in data['cursos']:
-            prereq_map[curso['codigo']] = curso['requisitos']
-
-        visited = set()
-        for course_code in prereq_map:
-            if course_code not in visited:
-                rec_stack = set()
-                if has_circular_dependency(course_code, prereq_map, visited,
-                                           rec_stack):
-                    self._validation_error(f"Circular dependency detected "
-                                          f"involving course: {course_code}")
-                    return False
-
-        return True
-
-    def _validate_self_prerequisites(self, data):
-        """Validate that courses don't have themselves as prerequisites."""
-        for index, curso in enumerate(data['cursos']):
-            course_code = curso['codigo']
-            if course_code in curso['requisitos']:
-                self._validation_error(f"Curso {index}: Course cannot be "
-                                      f"prerequisite of itself: {course_code}")
-                return False
-        return True
-
-    def _validate_grades_within_valid_range(self, data):
-        """Validate that all grades are within the valid range."""
-        for index, entry in enumerate(data['notas']):
-            nota = entry['nota']
-            if not (1.0 <= nota <= 7.0):
-                self._validation_error(f"Nota {index}: Grade {nota} is "
-                                      "outside valid range (1.0-7.0)")
-                return False
-        return True
-
-    def _validate_no_duplicate_enrollments(self, data):
-        """Validate that students aren't enrolled multiple times in section."""
-        enrollments = set()
-
-        for index, entry in enumerate(data['alumnos_seccion']):
-            key = (entry['alumno_id'], entry['seccion_id'])
-            if key in enrollments:
-                self._validation_error(
-                    f"Enrollment {index}: Duplicate enrollment - "
-                    f"Student {entry['alumno_id']} already enrolled in "
-                    f"section {entry['seccion_id']}"
-                )
-                return False
-            enrollments.add(key)
-        return True
-
-    def _validate_no_duplicate_grades(self, data):
-        """Validate that there are no duplicate grades for student/activity."""
-        grades = set()
-
-        for index, entry in enumerate(data['notas']):
-            key = (entry['alumno_id'], entry['topico_id'], entry['instancia'])
-            if key in grades:
-                self._validation_error(
-                    f"Grade {index}: Duplicate grade - "
-                    f"Student {entry['alumno_id']} already has grade for "
-                    f"topic {entry['topico_id']} instance "
-                    f"{entry['instancia']}"
-                )
-                return False
-            grades.add(key)
-        return True
-
-    def _validate_room_capacity_logic(self, data):
-        """Validate that room capacities are reasonable."""
-        for index, sala in enumerate(data['salas']):
-            capacity = sala['capacidad']
-            if capacity > 1000:
-                self._validation_error(f"Room {index}: Capacity {capacity} "
-                                      "seems unreasonably high")
-                return False
-            if capacity < 5:
-                self._validation_error(f"Room {index}: Capacity {capacity} "
-                                      "seems too low for a classroom")
-                return False
-        return True
+    # ----- Advanced Validation Methods ---
+    def _report_validation_errors(self, errors):
+        """Record every collected validation error; True if there were none."""
+        for error in errors:
+            self._validation_error(error['message'])
+        return not errors
 
-    def _validate_credits_range(self, data):
-        """Validate that course credits are in reasonable range."""
-        for index, curso in enumerate(data['cursos']):
-            course_credits = curso['creditos']
-            if course_credits > 20:
-                self._validation_error(f"Course {index}: {course_credits} "
-                                      "credits seems unreasonably high")
-                return False
-        return True
+    def _validate_records(self, file_type, data):
+        """Validate a flat file type in one pass with its RecordSchema."""
+        validator = RecordValidator(SCHEMAS[file_type])
+        return self._report_validation_errors(validator.validate(data))
 
-    # ----- Advanced Validation Methods ---
     def _validate_cursos_data_advanced(self, data):
-        """Enhanced validation for cursos with advanced logic."""
-        if not self._validate_cursos_data(data):
-            return False
+        """Enhanced validation for cursos with advanced logic.
 
-        validations = [
-            self._validate_course_prerequisites_exist(data),
-            self._validate_no_circular_prerequisites(data),
-            self._validate_self_prerequisites(data),
-            self._validate_credits_range(data)
-        ]
+        Prerequisites may also be courses already stored, looked up by NRC
+        once every record is valid.
+        """
+        def find_stored(codes):
+            return self._load_course_ids_by_nrc(self.db.connect(), codes)
 
-        return all(validations)
+        validator = RecordValidator(SCHEMAS['cursos'], file_checks=[
+            lambda cursos: check_prerequisites_exist(cursos, find_stored),
+            check_no_circular_prerequisites])
+        return self._report_validation_errors(validator.validate(data))
 
     def _validate_alumnos_data_advanced(self, data):
         """Enhanced validation for alumnos with advanced logic."""
-        if not self._validate_alumnos_data(data):
-            return False
-
-        validations = [
-            self._validate_unique_emails_across_types(data, 'alumnos'),
-            self._validate_unique_import_ids(data, 'alumnos'),
-            self._validate_admission_dates_logic(data)
-        ]
-
-        return all(validations)
+        return self._validate_records('alumnos', data)
 
     def _validate_profesores_data_advanced(self, data):
         """Enhanced validation for profesores with advanced logic."""
-        if not self._validate_profesores_data(data):
-            return False
-
-        validations = [
-            self._validate_unique_emails_across_types(data, 'profesores'),
-            self._validate_unique_import_ids(data, 'profesores')
-        ]
-
-        return all(validations)
+        return self._validate_records('profesores', data)
 
     def _validate_secciones_data_advanced(self, data):
         """Enhanced validation for secciones with advanced logic."""
@@ -426,37 +261,15 @@ class ImportService:
 
     def _validate_alumnos_seccion_data_advanced(self, data):
         """Enhanced validation for alumnos_seccion with advanced logic."""
-        if not self._validate_alumnos_seccion_data(data):
-            return False
-
-        validations = [
-            self._validate_no_duplicate_enrollments(data)
-        ]
-
-        return all(validations)
+        return self._validate_records('alumnos_seccion', data)
 
     def _validate_notas_alumnos_data_advanced(self, data):
         """Enhanced validation for notas with advanced logic."""
-        if not self._validate_notas_alumnos_data(data):
-            return False
-
-        validations = [
-            self._validate_no_duplicate_grades(data),
-            self._validate_grades_within_valid_range(data)
-        ]
-
-        return all(validations)
+        return self._validate_records('notas_alumnos', data)
 
     def _validate_salas_data_advanced(self, data):
         """Enhanced validation for salas with advanced logic."""
-        if not self._validate_salas_data(data):
-            return False
-
-        validations = [
-            self._validate_room_capacity_logic(data)
-        ]
-
-        return all(validations)
+        return self._validate_records('salas_clases', data)
 
     # ----- Structure and Field Validation Methods ---
     def _validate_instancias_cursos_data(self, data):
@@ -484,28 +297,6 @@ class ImportService:
 
         return True
 
-    def _validate_alumnos_seccion_data(self, data):
-        """Validate complete alumnos_seccion data."""
-        if not self._validate_alumnos_seccion_structure(data):
-            return False
-
-        for index, entry in enumerate(data['alumnos_seccion']):
-            if not self._validate_alumno_seccion_fields(entry, index):
-                return False
-
-        return True
-
-    def _validate_notas_alumnos_data(self, data):
-        """Validate complete notas_alumnos data."""
-        if not self._validate_notas_alumnos_structure(data):
-            return False
-
-        for index, entry in enumerate(data['notas']):
-            if not self._validate_nota_fields(entry, index):
-                return False
-
-        return True
-
     def _validate_instancias_cursos_structure(self, data):
         """Validate instancias_cursos JSON structure."""
         if not isinstance(data, dict):
@@ -528,7 +319,7 @@ class ImportService:
         """Validate instancias_cursos fields."""
         errors = []
 
-        if not self._is_valid_year(data.get('año')):
+        if not is_valid_year(data.get('año')):
             errors.append("'año' must be a valid year (1990-2050)")
 
         if not self._is_valid_semester(data.get('semestre')):
@@ -550,11 +341,11 @@ class ImportService:
             if field not in instancia:
                 errors.append(f"Missing required field '{field}'")
 
-        if 'id' in instancia and not self._is_valid_id(instancia['id']):
+        if 'id' in instancia and not is_valid_id(instancia['id']):
             errors.append("'id' must be a positive integer")
 
         if ('curso_id' in instancia
-                and not self._is_valid_id(instancia['curso_id'])):
+                and not is_valid_id(instancia['curso_id'])):
             errors.append("'curso_id' must be a positive integer")
 
         if errors:
@@ -590,15 +381,15 @@ class ImportService:
             if field not in seccion:
                 errors.append(f"Missing required field '{field}'")
 
-        if 'id' in seccion and not self._is_valid_id(seccion['id']):
+        if 'id' in seccion and not is_valid_id(seccion['id']):
             errors.append("'id' must be a positive integer")
 
         if ('instancia_curso' in seccion
-                and not self._is_valid_id(seccion['instancia_curso'])):
+                and not is_valid_id(seccion['instancia_curso'])):
             errors.append("'instancia_curso' must be a positive integer")
 
         if ('profesor_id' in seccion
-                and not self._is_valid_id(seccion['profesor_id'])):
+                and not is_valid_id(seccion['profesor_id'])):
             errors.append("'profesor_id' must be a positive integer")
 
         if 'evaluacion' in seccion:
@@ -654,11 +445,11 @@ class ImportService:
                 errors.append(f"combinacion_topicos[{index}] missing "
                              f"'{field}' field")
 
-        if 'id' in topic and not self._is_valid_id(topic['id']):
+        if 'id' in topic and not is_valid_id(topic['id']):
             errors.append(f"combinacion_topicos[{index}] 'id' must be a "
                          "positive integer")
 
-        if 'nombre' in topic and not self._is_valid_name(topic['nombre']):
+        if 'nombre' in topic and not is_valid_name(topic['nombre']):
             errors.append(f"combinacion_topicos[{index}] 'nombre' must be a "
                          "non-empty string")
 
@@ -669,315 +460,64 @@ class ImportService:
 
         return errors
 
-    def _validate_alumnos_seccion_structure(self, data):
-        """Validate alumnos_seccion JSON structure."""
-        if not isinstance(data, dict):
-            self._validation_error("Root must be an object")
-            return False
-
-        if 'alumnos_seccion' not in data:
-            self._validation_error("Missing 'alumnos_seccion' key")
-            return False
-
-        if not isinstance(data['alumnos_seccion'], list):
-            self._validation_error("'alumnos_seccion' must be an array")
-            return False
-
-        return True
-
-    def _validate_alumno_seccion_fields(self, entry, index):
-        """Validate individual alumno_seccion fields."""
-        errors = []
-
-        required_fields = ['seccion_id', 'alumno_id']
-        for field in required_fields:
-            if field not in entry:
-                errors.append(f"Missing required field '{field}'")
-
-        if ('seccion_id' in entry
-                and not self._is_valid_id(entry['seccion_id'])):
-            errors.append("'seccion_id' must be a positive integer")
+    # ----- Streaming Validation Methods ---
+    def _validate_stream(self, file, file_type):
+        """Validate a streamed file record by record without loading it.
 
-        if ('alumno_id' in entry
-                and not self._is_valid_id(entry['alumno_id'])):
-            errors.append("'alumno_id' must be a positive integer")
-
-        if errors:
-            for error in errors:
-                self._validation_error(f"Alumno_seccion {index}: {error}")
-            return False
-
-        return True
-
-    def _validate_notas_alumnos_structure(self, data):
-        """Validate notas_alumnos JSON structure."""
-        if not isinstance(data, dict):
-            self._validation_error("Root must be an object")
-            return False
-
-        if 'notas' not in data:
-            self._validation_error("Missing 'notas' key")
-            return False
-
-        if not isinstance(data['notas'], list):
-            self._validation_error("'notas' must be an array")
-            return False
-
-        return True
-
-    def _validate_nota_fields(self, entry, index):
-        """Validate individual nota fields."""
-        errors = []
-
-        required_fields = ['alumno_id', 'topico_id', 'instancia', 'nota']
-        for field in required_fields:
-            if field not in entry:
-                errors.append(f"Missing required field '{field}'")
-
-        if ('alumno_id' in entry
-                and not self._is_valid_id(entry['alumno_id'])):
-            errors.append("'alumno_id' must be a positive integer")
-
-        if ('topico_id' in entry
-                and not self._is_valid_id(entry['topico_id'])):
-            errors.append("'topico_id' must be a positive integer")
-
-        if ('instancia' in entry
-                and not self._is_valid_instance_number(entry['instancia'])):
-            errors.append("'instancia' must be a positive integer")
-
-        if 'nota' in entry and not self._is_valid_grade(entry['nota']):
-            errors.append("'nota' must be between 1.0 and 7.0")
-
-        if errors:
-            for error in errors:
-                self._validation_error(f"Nota {index}: {error}")
-            return False
-
-        return True
-
-    def _validate_alumno_fields(self, alumno, index):
-        """Validate individual alumno fields."""
-        errors = []
-
-        required_fields = ['id', 'nombre', 'correo', 'anio_ingreso']
-        for field in required_fields:
-            if field not in alumno:
-                errors.append(f"Missing required field '{field}'")
-
-        if 'id' in alumno and not self._is_valid_id(alumno['id']):
-            errors.append("'id' must be a positive integer")
-
-        if 'nombre' in alumno and not self._is_valid_name(alumno['nombre']):
-            errors.append("'nombre' must be a non-empty string (max 100 "
-                         "chars)")
-
-        if 'correo' in alumno and not self._is_valid_email(alumno['correo']):
-            errors.append("'correo' must be a valid email address (max 100 "
-                         "chars)")
-
-        if ('anio_ingreso' in alumno
-                and not self._is_valid_year(alumno['anio_ingreso'])):
-            errors.append("'anio_ingreso' must be a valid year (1990-2050)")
-
-        if errors:
-            for error in errors:
-                self._validation_error(f"Alumno {index}: {error}")
-            return False
-
-        return True
-
-    def _validate_profesores_structure(self, data):
-        """Validate profesores JSON structure."""
-        if not isinstance(data, dict):
-            self._validation_error("Root must be an object")
-            return False
-
-        if 'profesores' not in data:
-            self._validation_error("Missing 'profesores' key")
-            return False
-
-        if not isinstance(data['profesores'], list):
-            self._validation_error("'profesores' must be an array")
-            return False
-
-        return True
-
-    def _validate_profesor_fields(self, profesor, index):
-        """Validate individual profesor fields."""
-        errors = []
-
-        required_fields = ['id', 'nombre', 'correo']
-        for field in required_fields:
-            if field not in profesor:
-                errors.append(f"Missing required field '{field}'")
-
-        if 'id' in profesor and not self._is_valid_id(profesor['id']):
-            errors.append("'id' must be a positive integer")
-
-        if ('nombre' in profesor
-                and not self._is_valid_name(profesor['nombre'])):
-            errors.append("'nombre' must be a non-empty string (max 100 "
-                         "chars)")
-
-        if ('correo' in profesor
-                and not self._is_valid_email(profesor['correo'])):
-            errors.append("'correo' must be a valid email address (max 100 "
-                         "chars)")
-
-        if errors:
-            for error in errors:
-                self._validation_error(f"Profesor {index}: {error}")
-            return False
-
-        return True
-
-    def _validate_cursos_structure(self, data):
-        """Validate cursos JSON structure."""
-        if not isinstance(data, dict):
-            self._validation_error("Root must be an object")
-            return False
-
-        if 'cursos' not in data:
-            self._validation_error("Missing 'cursos' key")
-            return False
-
-        if not isinstance(data['cursos'], list):
-            self._validation_error("'cursos' must be an array")
-            return False
-
-        return True
-
-    def _validate_curso_fields(self, curso, index):
-        """Validate individual curso fields."""
-        errors = []
-
-        required_fields = ['id', 'codigo', 'descripcion', 'creditos',
-                           'requisitos']
-        for field in required_fields:
-            if field not in curso:
-                errors.append(f"Missing required field '{field}'")
-
-        if 'id' in curso and not self._is_valid_id(curso['id']):
-            errors.append("'id' must be a positive integer")
-
-        if 'codigo' in curso and not self._is_valid_nrc(curso['codigo']):
-            errors.append("'codigo' must be a non-empty string (max 50 "
-                         "chars)")
-
-        if ('descripcion' in curso
-                and not self._is_valid_name(curso['descripcion'])):
-            errors.append("'descripcion' must be a non-empty string (max "
-                         "100 chars)")
-
-        if ('creditos' in curso
-                and not self._is_valid_credits(curso['creditos'])):
-            errors.append("'creditos' must be an integer between 1 and 99")
-
-        if ('requisitos' in curso
-                and not isinstance(curso['requisitos'], list)):
-            errors.append("'requisitos' must be an array")
-
-        if errors:
-            for error in errors:
-                self._validation_error(f"Curso {index}: {error}")
-            return False
-
-        return True
-
-    def _validate_salas_structure(self, data):
-        """Validate salas JSON structure."""
-        if not isinstance(data, dict):
-            self._validation_error("Root must be an object")
-            return False
-
-        if 'salas' not in data:
-            self._validation_error("Missing 'salas' key")
-            return False
-
-        if not isinstance(data['salas'], list):
-            self._validation_error("'salas' must be an array")
-            return False
-
-        return True
-
-    def _validate_sala_fields(self, sala, index):
-        """Validate individual sala fields."""
-        errors = []
-
-        required_fields = ['id', 'nombre', 'capacidad']
-        for field in required_fields:
-            if field not in sala:
-                errors.append(f"Missing required field '{field}'")
-
-        if 'id' in sala and not self._is_valid_id(sala['id']):
-            errors.append("'id' must be a positive integer")
-
-        if 'nombre' in sala and not self._is_valid_name(sala['nombre']):
-            errors.append("'nombre' must be a non-empty string (max 100 "
-                         "chars)")
-
-        if ('capacidad' in sala
-                and not self._is_valid_capacity(sala['capacidad'])):
-            errors.append("'capacidad' must be a positive integer")
-
-        if errors:
-            for error in errors:
-                self._validation_error(f"Sala {index}: {error}")
-            return False
-
-        return True
-
-    # ----- Validation Methods ---
-    def _validate_alumnos_data(self, data):
-        """Validate complete alumnos data."""
-        if not self._validate_alumnos_structure(data):
-            return False
-
-        for index, alumno in enumerate(data['alumnos']):
-            if not self._validate_alumno_fields(alumno, index):
-                return False
-
-        return True
-
-    def _validate_profesores_data(self, data):
-        """Validate complete profesores data."""
-        if not self._validate_profesores_structure(data):
-            return False
-
-        for index, profesor in enumerate(data['profesores']):
-            if not self._validate_profesor_fields(profesor, index):
-                return False
-
-        return True
-
-    def _validate_cursos_data(self, data):
-        """Validate complete cursos data."""
-        if not self._validate_cursos_structure(data):
-            return False
-
-        for index, curso in enumerate(data['cursos']):
-            if not self._validate_curso_fields(curso, index):
-                return False
-
-        return True
-
-    def _validate_salas_data(self, data):
-        """Validate complete salas data."""
-        if not self._validate_salas_structure(data):
-            return False
-
-        for index, sala in enumerate(data['salas']):
-            if not self._validate_sala_fields(sala, index):
-                return False
-
-        return True
+        Only the uniqueness keys of earlier records are kept in memory.
+        """
+        validator = RecordValidator(SCHEMAS[file_type])
+        try:
+            for index, record in enumerate(self._iter_records(file,
+                                                              file_type)):
+                validator.check(record, index)
+                self.progress['validated'] += 1
+        except ValueError as e:
+            validator.errors.append({'index': None, 'field': None,
+                                     'message': str(e)})
+
+        return self._report_validation_errors(validator.errors)
+
+    def _iter_records(self, file, file_type):
+        """Parse the records of a streamed file, timing it in a dry run."""
+        records = iter_json_array(file, STREAM_ARRAY_KEYS[file_type])
+        if self.dry_run:
+            return self.report.timed_iter(records, 'parse')
+        return records
 
     # ----- Import Methods ---
-    def import_json(self, file, file_type):
-        """Import JSON data based on file type with validation."""
-        data = json.load(file)
+    def import_json(self, file, file_type, stream=False,
+                    batch_size=DEFAULT_STREAM_BATCH_SIZE, pipeline=False,
+                    checkpoint=False, dry_run=False):
+        """Import JSON data based on file type with validation.
+
+        With ``stream`` the file types in STREAM_ARRAY_KEYS are parsed
+        incrementally instead of loaded whole; with ``pipeline`` they are
+        also parsed, validated and written concurrently, and with
+        ``checkpoint`` they are committed batch by batch so an interrupted
+        import can resume. Other types are always loaded whole. With
+        ``dry_run`` nothing is written, see _import_json_dry_run. Returns
+        the ImportReport of the import; if validation fails it is left in
+        ``report``.
+        """
+        report = self._start_report(file_type)
+        if dry_run:
+            self._import_json_dry_run(file, file_type, batch_size)
+        elif checkpoint and file_type in STREAM_ARRAY_KEYS:
+            self._import_json_checkpointed(file, file_type, batch_size)
+        elif pipeline and file_type in STREAM_ARRAY_KEYS:
+            self._import_json_pipeline(file, file_type, batch_size)
+        elif stream and file_type in STREAM_ARRAY_KEYS:
+            self._import_json_stream(file, file_type, batch_size)
+        else:
+            data = json.load(file)
+            if not self._validate_data(file_type, data):
+                raise ValueError(f"Validation failed for {file_type}")
+            self._import_data(file_type, data)
+        return report
 
+    def _validate_data(self, file_type, data):
+        """Validate a loaded file of any type, counting its records."""
         validation_methods = {
             'alumnos': self._validate_alumnos_data_advanced,
             'profesores': self._validate_profesores_data_advanced,
@@ -992,8 +532,13 @@ class ImportService:
 
         if file_type in validation_methods:
             if not validation_methods[file_type](data):
-                raise ValueError(f"Validation failed for {file_type}")
+                return False
+            self.progress['validated'] += len(
+                data.get(RECORD_ARRAY_KEYS[file_type], ()))
+        return True
 
+    def _import_data(self, file_type, data):
+        """Import a validated file with the method of its type."""
         match file_type:
             case 'alumnos':
                 self._import_alumnos(data)
@@ -1014,101 +559,551 @@ class ImportService:
             case _:
                 raise ValueError(f"Tipo de archivo no soportado: {file_type}")
 
-    def _import_alumnos(self, data):
-        """Import student data."""
+    def import_bundle(self, bundle):
+        """Validate and import the files of a bundle in one transaction.
+
+        ``bundle`` maps file types to loaded data, as returned by
+        read_bundle. Files are imported in dependency order. References
+        between files are checked against the keys the other files define,
+        and against the database only for the keys no file defines. A
+        validation error or any row that cannot be imported rolls back the
+        whole bundle. Returns the ImportReport of the import.
+        """
+        report = self._start_report('bundle')
+        order = import_order(bundle)
+        for file_type in order:
+            if not self._validate_data(file_type, bundle[file_type]):
+                raise ValueError(f"Validation failed for {file_type}")
+
+        with self.db.unit_of_work():
+            cursor = self.db.connect()
+            if not self._validate_bundle_references(cursor, bundle):
+                raise ValueError("Validation failed for bundle references")
+
+            failed = self.progress['failed']
+            for file_type in order:
+                self._import_data(file_type, bundle[file_type])
+
+            failed = self.progress['failed'] - failed
+            if failed:
+                raise ValueError(f"Bundle import rolled back: {failed} rows "
+                                 "could not be imported")
+
+        self._success(f"Imported bundle: {', '.join(order)}")
+        return report
+
+    def _validate_bundle_references(self, cursor, bundle):
+        """Check that every reference of a bundle names an existing key."""
+        known = build_index(bundle)
+        for kind, keys in unresolved_keys(bundle, known).items():
+            known[kind] |= self._load_existing_keys(cursor, kind, keys)
+        return self._report_validation_errors(reference_errors(bundle, known))
+
+    def _import_json_stream(self, file, file_type, batch_size):
+        """Validate and import a large file in bounded batches.
+
+        The file is read twice: a first pass validates every record so an
+        invalid file imports nothing, and a second pass hands batches of at
+        most ``batch_size`` records to the regular import method, so memory
+        use does not grow with the file. The file must be seekable.
+        """
+        if not self._validate_stream(file, file_type):
+            raise ValueError(f"Validation failed for {file_type}")
+        file.seek(0)
+        self._import_stream_batches(file, file_type, batch_size)
+
+    def _import_stream_batches(self, file, file_type, batch_size):
+        """Hand the records of a streamed file to its import method."""
+        import_method = self._stream_import_method(file_type)
+        key = STREAM_ARRAY_KEYS[file_type]
+
+        batch = []
+        for record in self._iter_records(file, file_type):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                import_method({key: batch})
+                batch = []
+        if batch:
+            import_method({key: batch})
+
+    def _import_json_dry_run(self, file, file_type, batch_size):
+        """Check a file as an import would, without writing anything.
+
+        Every record is validated and goes through the same lookups of
+        students, professors, sections, activities and prerequisites as a
+        real import, but inserts are only counted: ``inserted`` holds the
+        rows that would be written and ``failed`` the rows that would be
+        rejected for a missing reference. Rows the database would reject on
+        its own constraints, such as duplicate keys, are not detected. The
+        seconds spent parsing, validating and resolving references are kept
+        in the report timings.
+        """
+        report = self.report
+        report.dry_run = True
+        self.dry_run = True
+        try:
+            if file_type in STREAM_ARRAY_KEYS:
+                with report.timed('validate'):
+                    valid = self._validate_stream(file, file_type)
+                if not valid:
+                    raise ValueError(f"Validation failed for {file_type}")
+                file.seek(0)
+                with report.timed('resolve'):
+                    self._import_stream_batches(file, file_type, batch_size)
+            else:
+                with report.timed('parse'):
+                    data = json.load(file)
+                with report.timed('validate'):
+                    valid = self._validate_data(file_type, data)
+                if not valid:
+                    raise ValueError(f"Validation failed for {file_type}")
+                with report.timed('resolve'):
+                    self._import_data(file_type, data)
+        finally:
+            self.dry_run = False
+
+        self._success(f"Dry run of {file_type}: "
+                      f"{self.progress['inserted']} rows would be inserted, "
+                      f"{self.progress['failed']} rejected")
+
+    # ----- Checkpointed Import Methods ---
+    def _import_json_checkpointed(self, file, file_type, batch_size):
+        """Import a large file in batches committed with a checkpoint.
+
+        Every record is validated first, so an invalid file imports
+        nothing. Each batch of at most ``batch_size`` records is then
+        committed together with the offset after its last record, stored in
+        ImportCheckpoints under the file type and content hash, and failed
+        rows roll back to a savepoint without losing the rest of the batch.
+        Importing the same file again after a crash skips the committed
+        records instead of inserting them twice. The checkpoint is removed
+        once the whole file is imported. Work deferred by an active unit of
+        work is committed before the first batch. The file must be seekable.
+        """
+        content_hash = self._content_hash(file)
+        if not self._validate_stream(file, file_type):
+            raise ValueError(f"Validation failed for {file_type}")
+        file.seek(0)
+
+        # Each batch commits as it ends, even inside a request's unit of work,
+        # or a crash would lose the batches its checkpoint says are stored.
+        with self.db.autocommit():
+            cursor = self.db.connect()
+            offset = self._load_checkpoint(cursor, file_type, content_hash)
+            if offset:
+                self.progress['resumed'] = offset
+                self._success(f"Resuming {file_type} import after record "
+                              f"{offset}")
+            self.progress['committed'] = offset
+
+            import_method = self._stream_import_method(file_type)
+            key = STREAM_ARRAY_KEYS[file_type]
+
+            def commit_batch(batch, end):
+                with self.db.unit_of_work():
+                    import_method({key: batch})
+                    self._save_checkpoint(self.db.connect(), file_type,
+                                          content_hash, end)
+                    self.db.commit()
+                self.progress['committed'] = end
+
+            self.savepoints = True
+            try:
+                batch = []
+                for index, record in enumerate(iter_json_array(file, key)):
+                    if index < offset:
+                        continue
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        commit_batch(batch, index + 1)
+                        batch = []
+                if batch:
+                    commit_batch(batch, index + 1)
+            finally:
+                self.savepoints = False
+
+            self._delete_checkpoint(cursor, file_type, content_hash)
+            self.db.commit()
+
+    def _content_hash(self, file):
+        """Hash the content of a seekable file without loading it whole."""
+        digest = hashlib.sha256()
+        while chunk := file.read(1 << 16):
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            digest.update(chunk)
+        file.seek(0)
+        return digest.hexdigest()
+
+    def _load_checkpoint(self, cursor, file_type, content_hash):
+        """Query: Get the committed offset of an interrupted import, or 0."""
+        cursor.execute(
+            "SELECT committed_offset FROM ImportCheckpoints "
+            "WHERE file_type = %s AND content_hash = %s",
+            (file_type, content_hash)
+        )
+        row = cursor.fetchone()
+        return row['committed_offset'] if row else 0
+
+    def _save_checkpoint(self, cursor, file_type, content_hash, offset):
+        """Command: Store the offset after the last committed record."""
+        cursor.execute(
+            "INSERT INTO ImportCheckpoints "
+            "(file_type, content_hash, job_id, committed_offset) "
+            "VALUES (%s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE job_id = VALUES(job_id), "
+            "committed_offset = VALUES(committed_offset), "
+            "updated_at = CURRENT_TIMESTAMP",
+            (file_type, content_hash, self.job_id, offset)
+        )
+
+    def _delete_checkpoint(self, cursor, file_type, content_hash):
+        """Command: Remove the checkpoint of a finished import."""
+        cursor.execute(
+            "DELETE FROM ImportCheckpoints "
+            "WHERE file_type = %s AND content_hash = %s",
+            (file_type, content_hash)
+        )
+
+    # ----- Delta Import Methods ---
+    def import_delta(self, file, file_type, delete_missing=False):
+        """Apply only the changes of a file against the stored rows.
+
+        Each record is fingerprinted and compared with the row stored under
+        its natural key, and only the needed inserts and updates are
+        written. With ``delete_missing`` the stored rows missing from the
+        file are deleted too. A file whose content was already imported is
+        skipped without being parsed. Returns the number of inserted,
+        updated, unchanged and deleted rows, and whether it was skipped;
+        the messages are left in ``report``.
+        """
+        delta_methods = {
+            'alumnos': lambda data: self._delta_users(
+                data, False, delete_missing),
+            'profesores': lambda data: self._delta_users(
+                data, True, delete_missing),
+            'notas_alumnos': lambda data: self._delta_notas_alumnos(
+                data, delete_missing)
+        }
+        if file_type not in delta_methods:
+            raise ValueError(f"Delta import not supported for {file_type}")
+
+        self._start_report(file_type)
+        content = file.read()
+        if isinstance(content, str):
+            content = content.encode()
+        content_hash = hashlib.sha256(content).hexdigest()
+
         cursor = self.db.connect()
-        for alumno in data['alumnos']:
-            import_id = alumno['id']
-            name = alumno['nombre']
-            email = alumno['correo']
-            admission_date = f"{alumno['anio_ingreso']}-01-01"
-            is_professor = False
-
-            query = """
+        if self._is_file_imported(cursor, file_type, content_hash):
+            self._success(f"Skipped {file_type}: file already imported")
+            return {'inserted': 0, 'updated': 0, 'unchanged': 0,
+                    'deleted': 0, 'skipped': True}
+
+        data = json.loads(content)
+        if not self._validate_data(file_type, data):
+            raise ValueError(f"Validation failed for {file_type}")
+
+        failed = self.progress['failed']
+        counts = delta_methods[file_type](data)
+        if self.progress['failed'] == failed:
+            self._record_imported_file(cursor, file_type, content_hash)
+        self.db.commit()
+
+        self._success(f"Applied {file_type} delta: {counts['inserted']} "
+                      f"inserted, {counts['updated']} updated, "
+                      f"{counts['deleted']} deleted, "
+                      f"{counts['unchanged']} unchanged")
+        return {**counts, 'skipped': False}
+
+    def _is_file_imported(self, cursor, file_type, content_hash):
+        """Query: Check if a file with this content was already imported."""
+        cursor.execute(
+            "SELECT id FROM ImportedFiles "
+            "WHERE file_type = %s AND content_hash = %s",
+            (file_type, content_hash)
+        )
+        return cursor.fetchone() is not None
+
+    def _record_imported_file(self, cursor, file_type, content_hash):
+        """Command: Remember the content hash of an imported file."""
+        cursor.execute(
+            "INSERT INTO ImportedFiles (file_type, content_hash) "
+            "VALUES (%s, %s)",
+            (file_type, content_hash)
+        )
+
+    def _apply_delta(self, cursor, queries, changes, unchanged):
+        """Write the changes of a delta import and count them.
+
+        ``queries`` and ``changes`` map ``inserted``, ``updated`` and
+        ``deleted`` to a query and the (row, label) pairs it writes.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': unchanged,
+                  'deleted': 0}
+        for change, rows in changes.items():
+            with self._batch_writer(cursor, queries[change],
+                                    written_key=change) as writer:
+                for row, label in rows:
+                    writer.add(row, label)
+            counts[change] = writer.written
+
+        self.progress['unchanged'] += unchanged
+        return counts
+
+    def _delta_users(self, data, is_professor, delete_missing):
+        """Apply the changes of an alumnos or profesores file.
+
+        Users are matched by import_id; deletes cover every user of the
+        same role missing from the file.
+        """
+        cursor = self.db.connect()
+        records = data['profesores' if is_professor else 'alumnos']
+        import_ids = None if delete_missing else [
+            record['id'] for record in records]
+        existing = self._load_users_by_import_id(cursor, import_ids,
+                                                 is_professor)
+
+        changes = {'inserted': [], 'updated': [], 'deleted': []}
+        unchanged = 0
+        for record in records:
+            admission_date = (None if is_professor
+                              else f"{record['anio_ingreso']}-01-01")
+            values = (record['nombre'], record['correo'], admission_date)
+            row = existing.pop(record['id'], None)
+
+            if row is None:
+                changes['inserted'].append((
+                    (record['id'], *values, is_professor),
+                    f"Inserting user {record['nombre']} ({record['correo']})"))
+            elif self._fingerprint(*values) == self._fingerprint(
+                    row['name'], row['email'], row['admission_date']):
+                unchanged += 1
+            else:
+                changes['updated'].append((
+                    (*values, row['id']),
+                    f"Updating user {record['nombre']} ({record['correo']})"))
+
+        if delete_missing:
+            changes['deleted'] = [
+                ((row['id'],), f"Deleting user with import_id {import_id}")
+                for import_id, row in existing.items()
+            ]
+
+        return self._apply_delta(cursor, {
+            'inserted': """
                 INSERT INTO Users (import_id, name, email, admission_date,
                                    is_professor)
                 VALUES (%s, %s, %s, %s, %s)
-            """
-            values = (import_id, name, email, admission_date, is_professor)
-
+            """,
+            'updated': """
+                UPDATE Users SET name = %s, email = %s, admission_date = %s
+                WHERE id = %s
+            """,
+            'deleted': "DELETE FROM Users WHERE id = %s"
+        }, changes, unchanged)
+
+    def _grade_value(self, grade):
+        """Normalize a grade to the one decimal the Grades table stores."""
+        return None if grade is None else f"{float(grade):.1f}"
+
+    def _delta_notas_alumnos(self, data, delete_missing):
+        """Apply the changes of a notas_alumnos file.
+
+        Grades are matched by student and activity; deletes cover the
+        grades of the activities in the file that the file no longer has.
+        """
+        cursor = self.db.connect()
+        notas = data['notas']
+
+        student_ids = self._load_student_ids(
+            cursor, [entry['alumno_id'] for entry in notas])
+        activity_ids = self._load_activity_ids(
+            cursor, [entry['topico_id'] for entry in notas])
+
+        grades = {}
+        for entry in notas:
+            user_id = student_ids.get(entry['alumno_id'])
+            activity_id = activity_ids.get((entry['topico_id'],
+                                            entry['instancia']))
+            if not user_id:
+                self._row_error(f"No user found for alumno_import_id "
+                                f"{entry['alumno_id']}")
+            elif not activity_id:
+                self._row_error(f"No activity found for topico_id "
+                                f"{entry['topico_id']} and instancia "
+                                f"{entry['instancia']}")
+            else:
+                grades[(user_id, activity_id)] = entry['nota']
+
+        existing = self._load_grades_by_key(
+            cursor, [activity_id for _, activity_id in grades])
+
+        changes = {'inserted': [], 'updated': [], 'deleted': []}
+        unchanged = 0
+        for (user_id, activity_id), grade in grades.items():
+            row = existing.pop((user_id, activity_id), None)
+            label = (f"Grade for user_id {user_id}, activity_id "
+                     f"{activity_id}")
+
+            if row is None:
+                changes['inserted'].append(
+                    ((activity_id, user_id, grade), f"Inserting {label}"))
+            elif (self._fingerprint(self._grade_value(grade))
+                  == self._fingerprint(self._grade_value(row['grade']))):
+                unchanged += 1
+            else:
+                changes['updated'].append(
+                    ((grade, row['id']), f"Updating {label}"))
+
+        if delete_missing:
+            changes['deleted'] = [
+                ((row['id'],), f"Deleting grade {row['id']}")
+                for row in existing.values()
+            ]
+
+        return self._apply_delta(cursor, {
+            'inserted': """
+                INSERT INTO Grades (activity_id, user_id, grade)
+                VALUES (%s, %s, %s)
+            """,
+            'updated': "UPDATE Grades SET grade = %s WHERE id = %s",
+            'deleted': "DELETE FROM Grades WHERE id = %s"
+        }, changes, unchanged)
+
+    def _import_json_pipeline(self, file, file_type, batch_size):
+        """Parse, validate and import a large file as concurrent stages.
+
+        The file is read once; batches of at most ``batch_size`` records
+        are written while later ones are still being parsed and validated.
+        Everything is written in one unit of work, so an invalid record
+        anywhere in the file rolls back the batches already written. Stage
+        timings and queue depths are kept in ``self.stages``.
+        """
+        validator = RecordValidator(SCHEMAS[file_type])
+        import_method = self._stream_import_method(file_type)
+        key = STREAM_ARRAY_KEYS[file_type]
+
+        def records():
             try:
-                cursor.execute(query, values)
-                self._success(f"Imported alumno: {name} ({email})")
-            except (ValueError, KeyError) as err:
-                self._error(f"Inserting alumno {name} ({email}): {err}")
+                yield from iter_json_array(file, key)
+            except ValueError as e:
+                validator.errors.append({'index': None, 'field': None,
+                                         'message': str(e)})
+
+        def check(record, index):
+            self.progress['validated'] += 1
+            return validator.check(record, index)
+
+        pipeline = ImportPipeline(records(), check,
+                                  lambda batch: import_method({key: batch}),
+                                  batch_size)
+        self.stages = pipeline.stats
+        with self.db.unit_of_work():
+            pipeline.run()
+            if not self._report_validation_errors(validator.errors):
+                raise ValueError(f"Validation failed for {file_type}")
+
+        self._success(f"Pipeline finished, slowest stage: "
+                      f"{self.stages['bottleneck']}")
 
+    def _stream_import_method(self, file_type):
+        """Get the import method that takes batches of a streamed type."""
+        return {
+            'alumnos': self._import_alumnos,
+            'profesores': self._import_profesores,
+            'alumnos_seccion': self._import_alumnos_seccion,
+            'notas_alumnos': self._import_notas_alumnos,
+            'salas_clases': self._import_salas_clases
+        }[file_type]
+
+    def _import_alumnos(self, data):
+        """Import student data."""
+        cursor = self.db.connect()
+        query = """
+            INSERT INTO Users (import_id, name, email, admission_date,
+                               is_professor)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+
+        with self._batch_writer(cursor, query) as writer:
+            for alumno in data['alumnos']:
+                name = alumno['nombre']
+                email = alumno['correo']
+                admission_date = f"{alumno['anio_ingreso']}-01-01"
+                writer.add((alumno['id'], name, email, admission_date, False),
+                           f"Inserting alumno {name} ({email})")
+
+        self._written("Imported", f"{writer.written} alumnos")
         self.db.commit()
 
     def _import_profesores(self, data):
         """Import professor data."""
         cursor = self.db.connect()
-        for profesor in data['profesores']:
-            import_id = profesor['id']
-            name = profesor['nombre']
-            email = profesor['correo']
-            admission_date = None
-            is_professor = True
-
-            query = """
-                INSERT INTO Users (import_id, name, email, admission_date,
-                                   is_professor)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            values = (import_id, name, email, admission_date, is_professor)
+        query = """
+            INSERT INTO Users (import_id, name, email, admission_date,
+                               is_professor)
+            VALUES (%s, %s, %s, %s, %s)
+        """
 
-            try:
-                cursor.execute(query, values)
-                self._success(f"Imported profesor: {name} ({email})")
-            except (ValueError, KeyError) as err:
-                self._error(f"Inserting profesor {name} ({email}): {err}")
+        with self._batch_writer(cursor, query) as writer:
+            for profesor in data['profesores']:
+                name = profesor['nombre']
+                email = profesor['correo']
+                writer.add((profesor['id'], name, email, None, True),
+                           f"Inserting profesor {name} ({email})")
 
+        self._written("Imported", f"{writer.written} profesores")
         self.db.commit()
 
     def _import_cursos(self, data):
-        """Import course data."""
+        """Import course data with their prerequisites in one pass.
+
+        Courses are inserted in topological order, so the prerequisites of
+        a course are always queued before it and both tables are written
+        together. Prerequisites outside the file are looked up by NRC.
+        """
         cursor = self.db.connect()
-        cursos = data['cursos']
+        cursos = {curso['codigo']: curso for curso in data['cursos']}
+        course_ids = {codigo: curso['id'] for codigo, curso in cursos.items()}
 
-        for curso in cursos:
-            curso_id = curso['id']
-            codigo = curso['codigo']
-            descripcion = curso['descripcion']
-            course_credits = curso['creditos']
+        external_codes = [code for curso in cursos.values()
+                          for code in curso['requisitos']
+                          if code not in cursos]
+        course_ids.update(self._load_course_ids_by_nrc(cursor,
+                                                       external_codes))
 
-            try:
-                cursor.execute("""
-                    INSERT INTO Courses (id, nrc, name, credits)
-                    VALUES (%s, %s, %s, %s)
-                """, (curso_id, codigo, descripcion, course_credits))
-                self._success(f"Inserted course: {codigo} - {descripcion}")
-            except (ValueError, KeyError) as e:
-                self._error(f"Inserting course {codigo}: {e}")
-
-        for curso in cursos:
-            curso_id = curso['id']
-            requisitos = curso['requisitos']
-
-            for cod_requisito in requisitos:
-                try:
-                    cursor.execute("SELECT id FROM Courses WHERE nrc = %s",
-                                   (cod_requisito,))
-                    result = cursor.fetchone()
-                    if result:
-                        prereq_id = result['id']
-                        cursor.execute("""
-                            INSERT INTO CoursePrerequisites (course_id,
-                                                              prerequisite_id)
-                            VALUES (%s, %s)
-                        """, (curso_id, prereq_id))
-                        self._success(f"Added prerequisite {cod_requisito} "
-                                     f"for course {curso_id}")
+        with self._batch_writer(cursor, """
+            INSERT INTO Courses (id, nrc, name, credits)
+            VALUES (%s, %s, %s, %s)
+        """) as writer, self._batch_writer(cursor, """
+            INSERT INTO CoursePrerequisites (course_id, prerequisite_id)
+            VALUES (%s, %s)
+        """, depends_on=writer) as prereq_writer:
+            for codigo in topological_order(prerequisite_graph(
+                    cursos.values())):
+                curso = cursos.get(codigo)
+                if curso is None:
+                    continue
+
+                curso_id = curso['id']
+                writer.add((curso_id, codigo, curso['descripcion'],
+                            curso['creditos']),
+                           f"Inserting course {codigo}")
+
+                for cod_requisito in curso['requisitos']:
+                    prereq_id = course_ids.get(cod_requisito)
+                    if prereq_id:
+                        prereq_writer.add(
+                            (curso_id, prereq_id),
+                            f"Adding prerequisite {cod_requisito} for "
+                            f"course {curso_id}")
                     else:
-                        self._error(f"Prerequisite course with code "
-                                   f"{cod_requisito} not found")
-                except (ValueError, KeyError) as e:
-                    self._error(f"Adding prerequisite {cod_requisito} for "
-                               f"course {curso_id}: {e}")
+                        self._row_error(f"Prerequisite course with code "
+                                        f"{cod_requisito} not found")
 
+        self._written("Inserted", f"{writer.written} courses")
+        self._written("Added", f"{prereq_writer.written} prerequisites")
         self.db.commit()
 
     def _import_instancias_cursos(self, data):
@@ -1118,43 +1113,160 @@ class ImportService:
         year = data['año']
         semester = data['semestre']
         period = f"{year}-{semester}"
-        instancias = data['instancias']
-
-        for instancia in instancias:
-            instancia_id = instancia['id']
-            curso_id = instancia['curso_id']
-
-            try:
-                cursor.execute("""
-                    INSERT INTO Instances (id, period, course_id)
-                    VALUES (%s, %s, %s)
-                """, (instancia_id, period, curso_id))
-                self._success(f"Inserted instance {instancia_id} for course "
-                             f"{curso_id} in period {period}")
-            except (ValueError, KeyError) as e:
-                self._error(f"Inserting instance {instancia_id}: {e}")
 
+        with self._batch_writer(cursor, """
+            INSERT INTO Instances (id, period, course_id)
+            VALUES (%s, %s, %s)
+        """) as writer:
+            for instancia in data['instancias']:
+                instancia_id = instancia['id']
+                writer.add((instancia_id, period, instancia['curso_id']),
+                           f"Inserting instance {instancia_id}")
+
+        self._written("Inserted", f"{writer.written} instances in period "
+                                  f"{period}")
         self.db.commit()
 
-    def _get_professor_id_by_import_id(self, cursor, profesor_import_id):
-        """Query: Get professor ID by import_id."""
-        cursor.execute("""
-            SELECT id FROM Users WHERE import_id = %s AND is_professor = TRUE
-        """, (profesor_import_id,))
-        result = cursor.fetchone()
-        return result["id"] if result else None
-
-    def _get_next_section_number(self, cursor, instancia_id):
-        """Query: Get the next available section number for an instance."""
-        cursor.execute("""
-            SELECT COUNT(*) FROM Sections WHERE instance_id = %s
-        """, (instancia_id,))
-        current_count = cursor.fetchone()['COUNT(*)']
-        return current_count + 1
+    # ----- Lookup Maps ---
+    def _fetch_in_chunks(self, cursor, query, keys):
+        """Query: Run an IN query over distinct keys, a chunk at a time.
+
+        ``query`` holds a ``{placeholders}`` field for the IN list.
+        """
+        keys = list(dict.fromkeys(keys))
+        rows = []
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(query.format(placeholders=placeholders),
+                           tuple(chunk))
+            rows.extend(cursor.fetchall())
+        return rows
+
+    def _load_user_ids(self, cursor, import_ids, is_professor):
+        """Query: Map import_ids of students or professors to user IDs."""
+        rows = self._fetch_in_chunks(
+            cursor,
+            "SELECT id, import_id FROM Users "
+            f"WHERE is_professor = {'TRUE' if is_professor else 'FALSE'} "
+            "AND import_id IN ({placeholders})",
+            import_ids
+        )
+        return {row['import_id']: row['id'] for row in rows}
+
+    def _load_student_ids(self, cursor, import_ids):
+        """Query: Map student import_ids to user IDs."""
+        return self._load_user_ids(cursor, import_ids, False)
+
+    def _load_professor_ids(self, cursor, import_ids):
+        """Query: Map professor import_ids to user IDs."""
+        return self._load_user_ids(cursor, import_ids, True)
+
+    def _load_section_courses(self, cursor, section_ids):
+        """Query: Map section IDs to the course of their instance."""
+        rows = self._fetch_in_chunks(
+            cursor,
+            "SELECT Sections.id, Instances.course_id "
+            "FROM Sections "
+            "JOIN Instances ON Sections.instance_id = Instances.id "
+            "WHERE Sections.id IN ({placeholders})",
+            section_ids
+        )
+        return {row['id']: row['course_id'] for row in rows}
+
+    def _load_activity_ids(self, cursor, topic_ids):
+        """Query: Map (topic ID, instance) pairs to activity IDs."""
+        rows = self._fetch_in_chunks(
+            cursor,
+            "SELECT id, topic_id, instance FROM Activities "
+            "WHERE topic_id IN ({placeholders})",
+            topic_ids
+        )
+        return {(row['topic_id'], row['instance']): row['id'] for row in rows}
+
+    def _load_course_ids_by_nrc(self, cursor, codes):
+        """Query: Map course NRC codes to course IDs."""
+        rows = self._fetch_in_chunks(
+            cursor,
+            "SELECT id, nrc FROM Courses WHERE nrc IN ({placeholders})",
+            codes
+        )
+        return {row['nrc']: row['id'] for row in rows}
+
+    def _load_users_by_import_id(self, cursor, import_ids, is_professor):
+        """Query: Map import_ids of students or professors to their rows.
+
+        With ``import_ids`` None every user of the role is loaded.
+        """
+        query = ("SELECT id, import_id, name, email, admission_date "
+                 "FROM Users "
+                 f"WHERE is_professor = {'TRUE' if is_professor else 'FALSE'} ")
+        if import_ids is None:
+            cursor.execute(query + "AND import_id IS NOT NULL")
+            rows = cursor.fetchall()
+        else:
+            rows = self._fetch_in_chunks(
+                cursor, query + "AND import_id IN ({placeholders})",
+                import_ids)
+        return {row['import_id']: row for row in rows}
+
+    def _load_grades_by_key(self, cursor, activity_ids):
+        """Query: Map (user ID, activity ID) pairs to the stored grades."""
+        rows = self._fetch_in_chunks(
+            cursor,
+            "SELECT id, user_id, activity_id, grade FROM Grades "
+            "WHERE activity_id IN ({placeholders})",
+            activity_ids
+        )
+        return {(row['user_id'], row['activity_id']): row for row in rows}
+
+    def _load_existing_keys(self, cursor, kind, keys):
+        """Query: Get the keys of a bundle reference kind already stored."""
+        match kind:
+            case 'curso':
+                rows = self._fetch_in_chunks(
+                    cursor,
+                    "SELECT id FROM Courses WHERE id IN ({placeholders})",
+                    keys)
+                return {row['id'] for row in rows}
+            case 'instancia':
+                rows = self._fetch_in_chunks(
+                    cursor,
+                    "SELECT id FROM Instances WHERE id IN ({placeholders})",
+                    keys)
+                return {row['id'] for row in rows}
+            case 'profesor':
+                return set(self._load_professor_ids(cursor, keys))
+            case 'alumno':
+                return set(self._load_student_ids(cursor, keys))
+            case 'seccion':
+                return set(self._load_section_courses(cursor, keys))
+            case 'actividad':
+                topic_ids = [topic_id for topic_id, _ in keys]
+                return set(self._load_activity_ids(cursor, topic_ids)) & keys
+            case _:
+                raise ValueError(f"Unknown reference kind: {kind}")
+
+    def _load_section_counts(self, cursor, instance_ids):
+        """Query: Count the existing sections of each instance."""
+        rows = self._fetch_in_chunks(
+            cursor,
+            "SELECT instance_id, COUNT(*) AS total FROM Sections "
+            "WHERE instance_id IN ({placeholders}) "
+            "GROUP BY instance_id",
+            instance_ids
+        )
+        return {row['instance_id']: row['total'] for row in rows}
+
+    def _execute_insert(self, cursor, query, params):
+        """Command: Run an INSERT and count its row; a dry run only counts."""
+        if not self.dry_run:
+            cursor.execute(query, params)
+        self.progress['inserted'] += 1
 
     def _insert_section(self, cursor, **section_data):
         """Command: Insert a new section into the database."""
-        cursor.execute("""
+        self._execute_insert(cursor, """
             INSERT INTO Sections (id, instance_id, number, professor_id,
                                   weight_or_percentage)
             VALUES (%s, %s, %s, %s, %s)
@@ -1164,7 +1276,7 @@ class ImportService:
 
     def _insert_topic(self, cursor, **topic_data):
         """Command: Insert a new topic into the database."""
-        cursor.execute("""
+        self._execute_insert(cursor, """
             INSERT INTO Topics (id, section_id, name, weight,
                                 weight_or_percentage)
             VALUES (%s, %s, %s, %s, %s)
@@ -1174,7 +1286,7 @@ class ImportService:
 
     def _insert_activity(self, cursor, **activity_data):
         """Command: Insert a new activity into the database."""
-        cursor.execute("""
+        self._execute_insert(cursor, """
             INSERT INTO Activities (topic_id, weight, optional_flag, instance)
             VALUES (%s, %s, %s, %s)
         """, (activity_data['topic_id'], activity_data['activity_weight'],
@@ -1197,8 +1309,8 @@ class ImportService:
                                       activity_weight=activity_weight,
                                       optional_flag=optional_flag,
                                       instance_number=instance_number)
-                self._success(f"Inserted Activity {i} for Topic ID "
-                             f"{topic_id}")
+                self._written("Inserted", f"Activity {i} for Topic ID "
+                                          f"{topic_id}")
             except (ValueError, KeyError) as e:
                 self._error(f"Inserting Activity {i} for Topic ID "
                            f"{topic_id}: {e}")
@@ -1222,8 +1334,8 @@ class ImportService:
                                    topic_name=topic_name,
                                    topic_valor=topic_valor,
                                    topic_weight_or_percentage=topic_weight_or_percentage)
-                self._success(f"Inserted Topic ID {topic_id} for Section ID "
-                             f"{seccion_id}")
+                self._written("Inserted", f"Topic ID {topic_id} for "
+                                          f"Section ID {seccion_id}")
 
                 self._process_topic_activities(cursor, topic_id, topic_eval)
 
@@ -1231,8 +1343,13 @@ class ImportService:
                 self._error(f"Inserting Topic ID {topic_id} in Section ID "
                            f"{seccion_id}: {e}")
 
-    def _process_single_section(self, cursor, seccion):
-        """Process and insert a single section with topics and activities."""
+    def _process_single_section(self, cursor, seccion, professor_ids,
+                                section_counts):
+        """Process and insert a single section with topics and activities.
+
+        ``professor_ids`` and ``section_counts`` are the preloaded lookup
+        maps; the section count of the instance is advanced on success.
+        """
         seccion_id = seccion["id"]
         instancia_id = seccion["instancia_curso"]
         profesor_import_id = seccion["profesor_id"]
@@ -1240,20 +1357,13 @@ class ImportService:
         combinacion_topicos = seccion["evaluacion"]["combinacion_topicos"]
         topicos_dict = seccion["evaluacion"]["topicos"]
 
-        profesor_id = self._get_professor_id_by_import_id(cursor,
-                                                          profesor_import_id)
+        profesor_id = professor_ids.get(profesor_import_id)
         if not profesor_id:
-            self._error(f"No professor found with import_id "
-                       f"{profesor_import_id}")
-            return
-
-        try:
-            number = self._get_next_section_number(cursor, instancia_id)
-        except (ValueError, KeyError) as e:
-            self._error(f"Counting sections for instance_id "
-                       f"{instancia_id}: {e}")
+            self._row_error(f"No professor found with import_id "
+                            f"{profesor_import_id}")
             return
 
+        number = section_counts.get(instancia_id, 0) + 1
         weight_or_percentage = tipo_evaluacion == "porcentaje"
 
         try:
@@ -1263,7 +1373,8 @@ class ImportService:
                                  number=number,
                                  profesor_id=profesor_id,
                                  weight_or_percentage=weight_or_percentage)
-            self._success(f"Inserted Section ID {seccion_id}")
+            section_counts[instancia_id] = number
+            self._written("Inserted", f"Section ID {seccion_id}")
 
             self._process_section_topics(cursor, seccion_id,
                                          combinacion_topicos, topicos_dict)
@@ -1276,8 +1387,14 @@ class ImportService:
         cursor = self.db.connect()
         secciones = data["secciones"]
 
+        professor_ids = self._load_professor_ids(
+            cursor, [seccion["profesor_id"] for seccion in secciones])
+        section_counts = self._load_section_counts(
+            cursor, [seccion["instancia_curso"] for seccion in secciones])
+
         for seccion in secciones:
-            self._process_single_section(cursor, seccion)
+            self._process_single_section(cursor, seccion, professor_ids,
+                                         section_counts)
 
         self.db.commit()
 
@@ -1286,103 +1403,75 @@ class ImportService:
         cursor = self.db.connect()
         alumnos_seccion = data["alumnos_seccion"]
 
-        for entry in alumnos_seccion:
-            seccion_id = entry["seccion_id"]
-            alumno_import_id = entry["alumno_id"]
+        student_ids = self._load_student_ids(
+            cursor, [entry["alumno_id"] for entry in alumnos_seccion])
+        section_courses = self._load_section_courses(
+            cursor, [entry["seccion_id"] for entry in alumnos_seccion])
 
-            try:
-                cursor.execute("""
-                    SELECT id FROM Users WHERE import_id = %s AND
-                           is_professor = FALSE
-                """, (alumno_import_id,))
-                user_row = cursor.fetchone()
-
-                if not user_row:
-                    self._error(f"No user found for alumno_import_id "
-                               f"{alumno_import_id}")
+        with self._batch_writer(cursor, """
+            INSERT INTO Courses_Taken (user_id, section_id, course_id,
+                                       final_grade)
+            VALUES (%s, %s, %s, %s)
+        """) as writer:
+            for entry in alumnos_seccion:
+                seccion_id = entry["seccion_id"]
+                alumno_import_id = entry["alumno_id"]
+
+                alumno_id = student_ids.get(alumno_import_id)
+                if not alumno_id:
+                    self._row_error(f"No user found for alumno_import_id "
+                                    f"{alumno_import_id}")
                     continue
 
-                alumno_id = user_row["id"]
-
-                cursor.execute("""
-                    SELECT Instances.course_id
-                    FROM Sections
-                    JOIN Instances ON Sections.instance_id = Instances.id
-                    WHERE Sections.id = %s
-                """, (seccion_id,))
-                result = cursor.fetchone()
-
-                if not result:
-                    self._error(f"No course found for seccion_id "
-                               f"{seccion_id}")
+                course_id = section_courses.get(seccion_id)
+                if not course_id:
+                    self._row_error(f"No course found for seccion_id "
+                                    f"{seccion_id}")
                     continue
 
-                course_id = result['course_id']
-
-                cursor.execute("""
-                    INSERT INTO Courses_Taken (user_id, section_id, course_id,
-                                               final_grade)
-                    VALUES (%s, %s, %s, %s)
-                """, (alumno_id, seccion_id, course_id, 0))
-
-                self._success(f"Enrolled alumno_id {alumno_id} in "
-                             f"section_id {seccion_id} (course_id "
-                             f"{course_id})")
-
-            except (ValueError, KeyError) as e:
-                self._error(f"Failed to enroll alumno_import_id "
-                           f"{alumno_import_id} in section_id {seccion_id}: "
-                           f"{e}")
+                writer.add((alumno_id, seccion_id, course_id, 0),
+                           f"Failed to enroll alumno_import_id "
+                           f"{alumno_import_id} in section_id {seccion_id}")
 
+        self._written("Enrolled", f"{writer.written} alumnos")
         self.db.commit()
 
     def _import_notas_alumnos(self, data):
         """Import student grade data."""
         cursor = self.db.connect()
-        for entry in data["notas"]:
-            alumno_import_id = entry["alumno_id"]
-            topico_id = entry["topico_id"]
-            instancia = entry["instancia"]
-            nota = entry["nota"]
-
-            try:
-                cursor.execute("""
-                    SELECT id FROM Users WHERE import_id = %s AND
-                           is_professor = FALSE
-                """, (alumno_import_id,))
-                user_row = cursor.fetchone()
-
-                if not user_row:
-                    self._error(f"No user found for alumno_import_id "
-                               f"{alumno_import_id}")
+        notas = data["notas"]
+
+        student_ids = self._load_student_ids(
+            cursor, [entry["alumno_id"] for entry in notas])
+        activity_ids = self._load_activity_ids(
+            cursor, [entry["topico_id"] for entry in notas])
+
+        with self._batch_writer(cursor, """
+            INSERT INTO Grades (activity_id, user_id, grade)
+            VALUES (%s, %s, %s)
+        """) as writer:
+            for entry in notas:
+                alumno_import_id = entry["alumno_id"]
+                topico_id = entry["topico_id"]
+                instancia = entry["instancia"]
+
+                alumno_id = student_ids.get(alumno_import_id)
+                if not alumno_id:
+                    self._row_error(f"No user found for alumno_import_id "
+                                    f"{alumno_import_id}")
                     continue
 
-                alumno_id = user_row["id"]
-
-                cursor.execute("""
-                    SELECT id FROM Activities
-                    WHERE topic_id = %s AND instance = %s
-                """, (topico_id, instancia))
-                result = cursor.fetchone()
-
-                if not result:
-                    self._error(f"No activity found for topico_id "
-                               f"{topico_id} and instancia {instancia}")
+                activity_id = activity_ids.get((topico_id, instancia))
+                if not activity_id:
+                    self._row_error(f"No activity found for topico_id "
+                                    f"{topico_id} and instancia {instancia}")
                     continue
 
-                activity_id = result["id"]
-
-                cursor.execute("""
-                    INSERT INTO Grades (activity_id, user_id, grade)
-                    VALUES (%s, %s, %s)
-                """, (activity_id, alumno_id, nota))
-                self._success(f"Inserted grade for alumno_id {alumno_id}, "
-                             f"activity_id {activity_id}: {nota}")
-            except (ValueError, KeyError) as e:
-                self._error(f"Inserting grade for alumno_id {alumno_id}, "
-                           f"topico_id {topico_id}, instancia {instancia}: "
-                           f"{e}")
+                writer.add((activity_id, alumno_id, entry["nota"]),
+                           f"Inserting grade for alumno_id {alumno_id}, "
+                           f"activity_id {activity_id}")
 
+        self._written("Inserted", f"{writer.written} grades")
         self.db.commit()
 
     def _import_salas_clases(self, data):
@@ -1390,22 +1479,16 @@ class ImportService:
         cursor = self.db.connect()
         salas = data.get("salas", [])
 
-        for sala in salas:
-            room_id = sala["id"]
-            nombre = sala["nombre"]
-            capacidad = sala["capacidad"]
-
-            try:
-                cursor.execute("""
-                    INSERT INTO Rooms (id, name, capacity)
-                    VALUES (%s, %s, %s)
-                """, (room_id, nombre, capacidad))
-
-                self._success(f"Room inserted: id={room_id}, "
-                             f"name='{nombre}', capacidad={capacidad}")
-
-            except (ValueError, KeyError) as e:
-                self._error(f"Failed to insert room id={room_id}, "
-                           f"name='{nombre}': {e}")
-
+        with self._batch_writer(cursor, """
+            INSERT INTO Rooms (id, name, capacity)
+            VALUES (%s, %s, %s)
+        """) as writer:
+            for sala in salas:
+                room_id = sala["id"]
+                nombre = sala["nombre"]
+                writer.add((room_id, nombre, sala["capacidad"]),
+                           f"Failed to insert room id={room_id}, "
+                           f"name='{nombre}'")
+
+        self._written("Inserted", f"{writer.written} rooms")
         self.db.commit()
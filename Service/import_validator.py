@@ -0,0 +1,399 @@
+"""Import Validator module for declarative single-pass record validation.
+
+Each flat import file type is described by a RecordSchema: the array holding
+its records, the required fields and their rules, the keys that must be
+unique, and the logic checks on single records and on the whole file. A
+RecordValidator checks every record in one pass, using hash sets for the
+uniqueness keys and precompiled patterns, and collects every error instead
+of stopping at the first one.
+"""
+
+import re
+from datetime import datetime
+
+from Service.prerequisite_graph import find_cycles, prerequisite_graph
+
+EMAIL_PATTERN = re.compile(
+    r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+MAX_NAME_LENGTH = 100
+MAX_NRC_LENGTH = 50
+
+
+# ----- Field Rules ---
+def is_valid_email(email):
+    """Validate email format."""
+    if not email or not isinstance(email, str):
+        return False
+    return EMAIL_PATTERN.match(email) is not None
+
+
+def is_valid_name(name):
+    """Validate name field."""
+    if not name or not isinstance(name, str):
+        return False
+    return len(name.strip()) > 0 and len(name) <= MAX_NAME_LENGTH
+
+
+def is_valid_nrc(nrc):
+    """Validate NRC code format."""
+    if not nrc or not isinstance(nrc, str):
+        return False
+    return len(nrc.strip()) > 0 and len(nrc) <= MAX_NRC_LENGTH
+
+
+def is_valid_year(year):
+    """Validate year format."""
+    if not isinstance(year, int):
+        return False
+    return 1990 <= year <= 2050
+
+
+def is_valid_credits(course_credits):
+    """Validate credits field."""
+    if not isinstance(course_credits, int):
+        return False
+    return 1 <= course_credits <= 99
+
+
+def is_valid_capacity(capacity):
+    """Validate room capacity."""
+    if not isinstance(capacity, int):
+        return False
+    return capacity > 0
+
+
+def is_valid_grade(grade):
+    """Validate grade value."""
+    if not isinstance(grade, (int, float)):
+        return False
+    return 1.0 <= float(grade) <= 7.0
+
+
+def is_valid_id(id_value):
+    """Validate ID field (also used for instance numbers)."""
+    if not isinstance(id_value, int):
+        return False
+    return id_value > 0
+
+
+def is_list(value):
+    """Validate that a field holds an array."""
+    return isinstance(value, list)
+
+
+# ----- Record Logic Checks ---
+def check_admission_year(alumno, index):
+    """Check that an alumno's admission year is logical."""
+    year = alumno['anio_ingreso']
+    if year > datetime.now().year or year < 1950:
+        return f"Alumno {index}: Admission year {year} is not logical"
+    return None
+
+
+def check_credits_range(curso, index):
+    """Check that course credits are in a reasonable range."""
+    if curso['creditos'] > 20:
+        return (f"Course {index}: {curso['creditos']} credits seems "
+                "unreasonably high")
+    return None
+
+
+def check_self_prerequisite(curso, index):
+    """Check that a course is not its own prerequisite."""
+    if curso['codigo'] in curso['requisitos']:
+        return (f"Curso {index}: Course cannot be prerequisite of itself: "
+                f"{curso['codigo']}")
+    return None
+
+
+def check_room_capacity(sala, index):
+    """Check that a room capacity is reasonable."""
+    capacity = sala['capacidad']
+    if capacity > 1000:
+        return f"Room {index}: Capacity {capacity} seems unreasonably high"
+    if capacity < 5:
+        return f"Room {index}: Capacity {capacity} seems too low for a classroom"
+    return None
+
+
+# ----- File Logic Checks ---
+def check_prerequisites_exist(cursos, find_stored=None):
+    """Check that every prerequisite is a course of the file or stored.
+
+    ``find_stored`` takes the codes missing from the file and returns the
+    ones of courses already stored; without it every prerequisite must be
+    in the file.
+    """
+    course_codes = {curso['codigo'] for curso in cursos}
+    missing = {prereq_code for curso in cursos
+               for prereq_code in curso['requisitos']
+               if prereq_code not in course_codes}
+    if missing and find_stored is not None:
+        course_codes |= set(find_stored(sorted(missing)))
+    return [
+        f"Curso {index}: Prerequisite '{prereq_code}' not found in courses "
+        "list"
+        for index, curso in enumerate(cursos)
+        for prereq_code in curso['requisitos']
+        if prereq_code not in course_codes
+    ]
+
+
+def check_no_circular_prerequisites(cursos):
+    """Check that the prerequisites do not form a cycle.
+
+    Every group of courses that depend on each other is reported once,
+    listed in file order.
+    """
+    graph = prerequisite_graph(cursos)
+    position = {code: index for index, code in enumerate(graph)}
+    return [
+        "Circular dependency detected involving courses: "
+        + ", ".join(sorted(cycle, key=position.get))
+        for cycle in sorted(find_cycles(graph),
+                            key=lambda cycle: min(map(position.get, cycle)))
+    ]
+
+
+# ----- Schemas ---
+class Field:
+    """Required field of a record and the rule its value must follow."""
+
+    __slots__ = ('name', 'check', 'message')
+
+    def __init__(self, name, check, message):
+        """Initialize the rule; ``message`` describes an invalid value."""
+        self.name = name
+        self.check = check
+        self.message = message
+
+
+class Unique:
+    """Key that must not repeat among the records of a file.
+
+    ``message`` is a format string receiving ``index``, ``key`` and
+    ``record``.
+    """
+
+    __slots__ = ('key', 'message')
+
+    def __init__(self, key, message):
+        """Initialize the rule with a key function and an error template."""
+        self.key = key
+        self.message = message
+
+
+class RecordSchema:
+    """Declarative description of one flat import file type."""
+
+    def __init__(self, label, array_key, fields, unique=(), checks=(),
+                 file_checks=()):
+        """Initialize the schema.
+
+        ``checks`` take a record and its index and return an error message
+        or None; ``file_checks`` take every record and return a list of
+        messages. Both only run on records whose fields are valid.
+        """
+        self.label = label
+        self.array_key = array_key
+        self.fields = tuple(fields)
+        self.unique = tuple(unique)
+        self.checks = tuple(checks)
+        self.file_checks = tuple(file_checks)
+
+
+_ID_MESSAGE = "must be a positive integer"
+_NAME_MESSAGE = "must be a non-empty string (max 100 chars)"
+_EMAIL_MESSAGE = "must be a valid email address (max 100 chars)"
+_UNIQUE_EMAIL = Unique(lambda user: user['correo'].lower(),
+                       "Duplicate email found: {key}")
+_UNIQUE_IMPORT_ID = Unique(lambda user: user['id'],
+                           "Duplicate import_id found: {key}")
+
+SCHEMAS = {
+    'alumnos': RecordSchema(
+        'Alumno', 'alumnos',
+        fields=[
+            Field('id', is_valid_id, _ID_MESSAGE),
+            Field('nombre', is_valid_name, _NAME_MESSAGE),
+            Field('correo', is_valid_email, _EMAIL_MESSAGE),
+            Field('anio_ingreso', is_valid_year,
+                  "must be a valid year (1990-2050)")
+        ],
+        unique=[_UNIQUE_EMAIL, _UNIQUE_IMPORT_ID],
+        checks=[check_admission_year]
+    ),
+    'profesores': RecordSchema(
+        'Profesor', 'profesores',
+        fields=[
+            Field('id', is_valid_id, _ID_MESSAGE),
+            Field('nombre', is_valid_name, _NAME_MESSAGE),
+            Field('correo', is_valid_email, _EMAIL_MESSAGE)
+        ],
+        unique=[_UNIQUE_EMAIL, _UNIQUE_IMPORT_ID]
+    ),
+    'cursos': RecordSchema(
+        'Curso', 'cursos',
+        fields=[
+            Field('id', is_valid_id, _ID_MESSAGE),
+            Field('codigo', is_valid_nrc,
+                  "must be a non-empty string (max 50 chars)"),
+            Field('descripcion', is_valid_name, _NAME_MESSAGE),
+            Field('creditos', is_valid_credits,
+                  "must be an integer between 1 and 99"),
+            Field('requisitos', is_list, "must be an array")
+        ],
+        checks=[check_self_prerequisite, check_credits_range],
+        file_checks=[check_prerequisites_exist,
+                     check_no_circular_prerequisites]
+    ),
+    'salas_clases': RecordSchema(
+        'Sala', 'salas',
+        fields=[
+            Field('id', is_valid_id, _ID_MESSAGE),
+            Field('nombre', is_valid_name, _NAME_MESSAGE),
+            Field('capacidad', is_valid_capacity,
+                  "must be a positive integer")
+        ],
+        checks=[check_room_capacity]
+    ),
+    'alumnos_seccion': RecordSchema(
+        'Alumno_seccion', 'alumnos_seccion',
+        fields=[
+            Field('seccion_id', is_valid_id, _ID_MESSAGE),
+            Field('alumno_id', is_valid_id, _ID_MESSAGE)
+        ],
+        unique=[Unique(
+            lambda entry: (entry['alumno_id'], entry['seccion_id']),
+            "Enrollment {index}: Duplicate enrollment - Student "
+            "{record[alumno_id]} already enrolled in section "
+            "{record[seccion_id]}"
+        )]
+    ),
+    'notas_alumnos': RecordSchema(
+        'Nota', 'notas',
+        fields=[
+            Field('alumno_id', is_valid_id, _ID_MESSAGE),
+            Field('topico_id', is_valid_id, _ID_MESSAGE),
+            Field('instancia', is_valid_id, _ID_MESSAGE),
+            Field('nota', is_valid_grade, "must be between 1.0 and 7.0")
+        ],
+        unique=[Unique(
+            lambda entry: (entry['alumno_id'], entry['topico_id'],
+                           entry['instancia']),
+            "Grade {index}: Duplicate grade - Student {record[alumno_id]} "
+            "already has grade for topic {record[topico_id]} instance "
+            "{record[instancia]}"
+        )]
+    )
+}
+
+
+class RecordValidator:
+    """Validate the records of one file type, collecting every error.
+
+    Errors are dicts with the record ``index`` (None for file errors), the
+    ``field`` involved (or None) and the full ``message``.
+    """
+
+    def __init__(self, schema, file_checks=None):
+        """Initialize the validator for ``schema`` with no errors.
+
+        ``file_checks`` replace the whole-file checks of the schema.
+        """
+        self.schema = schema
+        self.file_checks = (schema.file_checks if file_checks is None
+                            else tuple(file_checks))
+        self.errors = []
+        self.seen = [set() for _ in schema.unique]
+        self._rules = tuple((field.name, field.check)
+                            for field in schema.fields)
+        self._unique = tuple((rule.key, rule.message, seen)
+                             for rule, seen in zip(schema.unique, self.seen))
+
+    def _add(self, index, field, message):
+        """Record one error."""
+        self.errors.append({'index': index, 'field': field,
+                            'message': message})
+
+    def _report_fields(self, record, index):
+        """Record the errors of a record that failed a field rule."""
+        label = self.schema.label
+        if not isinstance(record, dict):
+            self._add(index, None, f"{label} {index}: Record must be an object")
+            return
+
+        for field in self.schema.fields:
+            if field.name not in record:
+                self._add(index, field.name,
+                          f"{label} {index}: Missing required field "
+                          f"'{field.name}'")
+            elif not field.check(record[field.name]):
+                self._add(index, field.name,
+                          f"{label} {index}: '{field.name}' {field.message}")
+
+    def check(self, record, index):
+        """Validate one record against the schema and the earlier records.
+
+        Returns True if the record added no errors.
+        """
+        try:
+            for name, rule in self._rules:
+                if not rule(record[name]):
+                    raise KeyError(name)
+        except (KeyError, TypeError):
+            self._report_fields(record, index)
+            return False
+
+        valid = True
+        for key_of, message, seen in self._unique:
+            key = key_of(record)
+            if key in seen:
+                self._add(index, None, message.format(
+                    index=index, key=key, record=record))
+                valid = False
+            else:
+                seen.add(key)
+
+        for record_check in self.schema.checks:
+            message = record_check(record, index)
+            if message:
+                self._add(index, None, message)
+                valid = False
+
+        return valid
+
+    def check_file(self, records):
+        """Run the whole-file checks once every record passed."""
+        if self.errors:
+            return
+        for file_check in self.file_checks:
+            for message in file_check(records):
+                self._add(None, None, message)
+
+    def check_structure(self, data):
+        """Check the root object and its record array."""
+        key = self.schema.array_key
+        if not isinstance(data, dict):
+            self._add(None, None, "Root must be an object")
+        elif key not in data:
+            self._add(None, None, f"Missing '{key}' key")
+        elif not isinstance(data[key], list):
+            self._add(None, None, f"'{key}' must be an array")
+        else:
+            return True
+        return False
+
+    def validate(self, data):
+        """Validate a whole loaded file and return the list of errors."""
+        if self.check_structure(data):
+            records = data[self.schema.array_key]
+            for index, record in enumerate(records):
+                self.check(record, index)
+            self.check_file(records)
+        return self.errors
+
+
+def validate_records(file_type, data):
+    """Validate a loaded file of a flat type and return every error."""
+    return RecordValidator(SCHEMAS[file_type]).validate(data)
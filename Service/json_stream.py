@@ -0,0 +1,153 @@
+"""JSON Stream module for incremental parsing of large import files.
+
+This module reads a JSON document of the form ``{"key": [record, ...]}`` in
+fixed-size chunks and yields the records of the top-level array one at a
+time, so only the current record and a small read buffer are kept in memory
+regardless of the file size. A value that cannot be decoded is only read
+further when the error may come from the end of the buffer cutting it short,
+and no value may grow past a size bound, so a malformed file fails where it
+breaks instead of being read whole.
+"""
+
+import codecs
+import json
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_VALUE_SIZE = 16 * 1024 * 1024
+# Longest token start that may still be completed by the next chunk, as in
+# a \uXXXX escape or a literal such as "fals".
+_PARTIAL_TOKEN_LENGTH = 6
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _ChunkReader:
+    """Sliding text buffer over a binary or text file."""
+
+    def __init__(self, file, chunk_size, max_value_size):
+        """Initialize the reader with an empty buffer."""
+        self.file = file
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Append the next chunk, dropping the part already consumed."""
+        if self.eof:
+            return False
+
+        chunk = self.file.read(self.chunk_size)
+        if isinstance(chunk, bytes):
+            text = self.decoder.decode(chunk, final=not chunk)
+        else:
+            text = chunk
+        if not chunk:
+            self.eof = True
+
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return bool(text) or not self.eof
+
+    def skip_whitespace(self):
+        """Advance past whitespace, reading more input when needed."""
+        while True:
+            while (self.pos < len(self.buffer)
+                   and self.buffer[self.pos] in _WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return
+
+    def peek(self):
+        """Return the next non-whitespace character, or '' at the end."""
+        self.skip_whitespace()
+        if self.pos < len(self.buffer):
+            return self.buffer[self.pos]
+        return ''
+
+    def expect(self, char):
+        """Consume ``char`` or raise ValueError describing what was found."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}, "
+                             f"found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def _truncated(self, error):
+        """Check if a decode error may come from the buffer ending early."""
+        return (error.msg.startswith('Unterminated string')
+                or len(self.buffer) - error.pos <= _PARTIAL_TOKEN_LENGTH)
+
+    def decode_value(self, decoder):
+        """Decode the next JSON value, reading chunks until it is complete.
+
+        Raises ValueError if the value is malformed or longer than
+        ``max_value_size`` characters.
+        """
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._truncated(e):
+                    raise
+                if len(self.buffer) - self.pos > self.max_value_size:
+                    raise ValueError(
+                        f"Value at offset {self.pos} is longer than "
+                        f"{self.max_value_size} characters") from e
+                if not self.fill():
+                    raise
+                continue
+
+            # A number at the very end of the buffer may continue in the
+            # next chunk, so only accept it once more input is available.
+            if end == len(self.buffer) and not self.eof:
+                self.fill()
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_json_array(file, key, chunk_size=DEFAULT_CHUNK_SIZE,
+                    max_value_size=DEFAULT_MAX_VALUE_SIZE):
+    """Yield the records of the top-level array stored under ``key``.
+
+    Other top-level members are parsed and discarded. Raises ValueError if
+    the root is not an object, ``key`` is missing or not an array, the
+    document is malformed, or a value is longer than ``max_value_size``
+    characters.
+    """
+    reader = _ChunkReader(file, chunk_size, max_value_size)
+    decoder = json.JSONDecoder()
+
+    if reader.peek() != '{':
+        raise ValueError("Root must be an object")
+    reader.pos += 1
+
+    if reader.peek() == '}':
+        raise ValueError(f"Missing '{key}' key")
+
+    while True:
+        member = reader.decode_value(decoder)
+        reader.expect(':')
+
+        if member == key:
+            if reader.peek() != '[':
+                raise ValueError(f"'{key}' must be an array")
+            reader.pos += 1
+
+            if reader.peek() == ']':
+                return
+            while True:
+                yield reader.decode_value(decoder)
+                if reader.peek() == ']':
+                    return
+                reader.expect(',')
+
+        reader.decode_value(decoder)
+        if reader.peek() == '}':
+            raise ValueError(f"Missing '{key}' key")
+        reader.expect(',')
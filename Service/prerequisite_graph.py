@@ -0,0 +1,92 @@
+"""Prerequisite Graph module for analyzing course prerequisite graphs.
+
+A prerequisite graph maps each course code to the codes of its
+prerequisites. This module finds its strongly connected components with an
+iterative version of Tarjan's algorithm, which runs in linear time and does
+not recurse, so long prerequisite chains in a large catalog cannot exhaust
+Python's recursion limit. Components come out prerequisites first, which
+gives both every cycle of the graph and an order to insert courses in.
+"""
+
+
+def prerequisite_graph(cursos):
+    """Map each course code of a cursos file to its prerequisite codes."""
+    return {curso['codigo']: curso['requisitos'] for curso in cursos}
+
+
+def strongly_connected_components(graph):
+    """Find the strongly connected components of a graph.
+
+    ``graph`` maps each node to the nodes it points to; nodes that are only
+    pointed to count as nodes without edges. Every component is listed
+    after the components it points to.
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in graph:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph.get(successor, ()))))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+
+def _is_cycle(graph, component):
+    """Check if a component holds a cycle, including a self-loop."""
+    return len(component) > 1 or component[0] in graph.get(component[0], ())
+
+
+def find_cycles(graph):
+    """Get every component of the graph that contains a cycle."""
+    return [component for component in strongly_connected_components(graph)
+            if _is_cycle(graph, component)]
+
+
+def topological_order(graph):
+    """Order the nodes so that every node follows the nodes it points to.
+
+    For a prerequisite graph this lists prerequisites before the courses
+    that require them. Raises ValueError if the graph has a cycle.
+    """
+    order = []
+    for component in strongly_connected_components(graph):
+        if _is_cycle(graph, component):
+            raise ValueError(f"Circular dependency detected involving "
+                             f"courses: {', '.join(map(str, component))}")
+        order.append(component[0])
+    return order
@@ -0,0 +1,97 @@
+"""Schedule Occupancy module for tracking busy hours as bitmasks.
+
+The hours of a day are numbered from the first schedulable hour, and the busy
+hours of each room and each professor on each day are kept as the bits of one
+integer. A class of N credits can start at a precomputed set of blocks, each
+with its own mask, that already leave out blocks crossing the lunch hour or
+ending after the last hour. Checking whether a room and a professor are both
+free for a block is then a single AND, and marking it busy a single OR.
+"""
+
+LUNCH_HOUR = 13
+LAST_START_HOUR = 17
+
+
+def is_valid_time_block(time_block):
+    """Check that a block skips the lunch hour and ends by the last hour."""
+    return LUNCH_HOUR not in time_block and time_block[-1] <= LAST_START_HOUR
+
+
+class ScheduleOccupancy:
+    """Busy hours of rooms and professors, one bitmask per day."""
+
+    def __init__(self, room_ids, hours, days):
+        """Initialize every room as free on every day.
+
+        ``hours`` are the consecutive hours a class can start at and
+        ``days`` the schedulable days; days are addressed by index.
+        """
+        self.hours = list(hours)
+        self.days = list(days)
+        self.rooms = {room_id: [0] * len(self.days) for room_id in room_ids}
+        self.professors = {}
+        self.lunch = 0
+        if LUNCH_HOUR in self.hours:
+            self.lunch = self.mask([LUNCH_HOUR])
+        self.block_masks = {
+            length: self._build_blocks(length)
+            for length in range(1, len(self.hours) + 1)
+        }
+
+    def _build_blocks(self, length):
+        """List the valid blocks of ``length`` hours with their masks."""
+        blocks = []
+        for start in range(len(self.hours) - length + 1):
+            time_block = self.hours[start:start + length]
+            if is_valid_time_block(time_block):
+                blocks.append((time_block, ((1 << length) - 1) << start))
+        return blocks
+
+    def blocks(self, length):
+        """Get the valid (time block, mask) pairs of ``length`` hours."""
+        return self.block_masks.get(length, [])
+
+    def mask(self, time_block):
+        """Build the mask of a block of consecutive hours."""
+        start = self.hours.index(time_block[0])
+        return ((1 << len(time_block)) - 1) << start
+
+    def professor_days(self, prof_id):
+        """Get the per-day masks of a professor, adding a free one."""
+        days = self.professors.get(prof_id)
+        if days is None:
+            days = self.professors[prof_id] = [0] * len(self.days)
+        return days
+
+    def busy(self, room_id, prof_id, day):
+        """Get the hours of a day on which the room or professor is busy."""
+        return self.rooms[room_id][day] | self.professor_days(prof_id)[day]
+
+    def is_free(self, room_id, prof_id, day, mask):
+        """Check that the room and professor are free for a block."""
+        return not self.busy(room_id, prof_id, day) & mask
+
+    def occupy(self, room_id, prof_id, day, mask):
+        """Mark a block busy for the room and the professor."""
+        self.rooms[room_id][day] |= mask
+        self.professor_days(prof_id)[day] |= mask
+
+    def release(self, room_id, prof_id, day, mask):
+        """Mark a block free again for the room and the professor."""
+        self.rooms[room_id][day] &= ~mask
+        self.professor_days(prof_id)[day] &= ~mask
+
+    def gaps(self, busy):
+        """Count the free hours between the classes of a day mask.
+
+        The lunch hour is not a gap, as no class can take it.
+        """
+        if not busy:
+            return 0
+        span = (1 << busy.bit_length()) - (busy & -busy)
+        return bin(span & ~busy & ~self.lunch).count('1')
+
+    def professor_gaps(self):
+        """Count the free hours professors have between classes of a day."""
+        return sum(self.gaps(busy) for days in self.professors.values()
+                   for busy in days)
@@ -0,0 +1,340 @@
+"""Schedule Optimizer module for improving a feasible schedule.
+
+The solver stops at the first schedule that fits, which tends to fill the
+first days and the first rooms it tries. The optimizer then runs simulated
+annealing over the schedule entries, lowering a weighted cost made of:
+
+- spread: the sum of the squared class hours of each day, lowest when the
+  hours are even across days;
+- room fit: the seats a section leaves empty in its room, or the students
+  left without a seat (counted ``OVERFLOW_PENALTY`` times) if it is too small;
+- gaps: the free hours professors have between classes of a day;
+- student conflicts: the students shared by each pair of overlapping
+  sections. Pairs sharing at least ``hard_conflicts`` students are never
+  allowed to overlap at all.
+
+Each step either moves a section to a random free day, block and room, or
+swaps the slots of two sections of the same length. Only the terms a step
+touches are recomputed: the loads of its days, the fit and the student
+conflicts of its sections and the gaps of its professors on those days.
+Worse steps are accepted with a probability that shrinks as the time budget
+runs out, and the best schedule seen is kept.
+"""
+
+import math
+import os
+import random
+import time
+
+from Service.schedule_occupancy import ScheduleOccupancy
+
+DEFAULT_OPTIMIZE_BUDGET = 10.0
+# The optimizer runs while a request waits, so its budget is capped.
+MAX_OPTIMIZE_BUDGET = 30.0
+DEFAULT_WEIGHTS = {'spread': 1.0, 'room_fit': 1.0, 'gaps': 5.0,
+                   'student_conflicts': 10.0}
+OVERFLOW_PENALTY = 10
+# Rejected rises seen before the starting temperature is set to their mean.
+WARMUP_STEPS = 200
+FINAL_TEMPERATURE_RATIO = 0.001
+# The clock is read, and the best schedule kept, every so many steps.
+CHECK_INTERVAL = 256
+# Once cold, or when no change is kept, the search stops early after this
+# many checks without a better schedule.
+STALL_CHECKS = 64
+STALL_TEMPERATURE_RATIO = 0.01
+
+
+class ScheduleOptimizer:
+    """Simulated annealing over the slots of schedule entries."""
+
+    def __init__(self, rooms, hours, days, weights=None, time_budget=None,
+                 seed=None, conflicts=None, hard_conflicts=0):
+        """Initialize the optimizer.
+
+        ``rooms`` need ``name`` and ``capacity``; ``hours`` and ``days`` are
+        the ones the schedule was generated for. ``weights`` override
+        DEFAULT_WEIGHTS, and ``time_budget`` (in seconds) defaults to the
+        SCHEDULE_OPTIMIZE_BUDGET environment variable, capped at
+        MAX_OPTIMIZE_BUDGET. ``conflicts`` is a
+        conflict graph keyed by section ID, as built by conflict_graph; pairs
+        sharing at least ``hard_conflicts`` students (if not 0) must not
+        overlap.
+        """
+        if time_budget is None:
+            time_budget = float(os.getenv('SCHEDULE_OPTIMIZE_BUDGET',
+                                          DEFAULT_OPTIMIZE_BUDGET))
+        self.rooms = rooms
+        self.hours = list(hours)
+        self.days = list(days)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.time_budget = min(time_budget, MAX_OPTIMIZE_BUDGET)
+        self.conflicts = conflicts or {}
+        self.hard_conflicts = hard_conflicts
+        self.rng = random.Random(seed)
+        self.steps = 0
+        self.accepted = 0
+        self.initial_cost = None
+        self.best_cost = None
+
+    # ----- Cost terms ---
+    def _fit(self, index, room):
+        """Get the room fit cost of a section in a room."""
+        spare = self.rooms[room]['capacity'] - self.enrollments[index]
+        if spare >= 0:
+            return spare
+        return -spare * OVERFLOW_PENALTY
+
+    def _professor_gaps(self, keys):
+        """Count the gaps of a set of (professor ID, day) pairs."""
+        occupancy = self.occupancy
+        return sum(occupancy.gaps(occupancy.professor_days(prof_id)[day])
+                   for prof_id, day in keys)
+
+    def _overlap(self, index, other):
+        """Check if two sections are taught at the same hour."""
+        slot, other_slot = self.slots[index], self.slots[other]
+        return slot[0] == other_slot[0] and (
+            self._mask(index, slot) & self._mask(other, other_slot))
+
+    def _student_conflicts(self, indexes):
+        """Count the students shared by overlapping sections.
+
+        Each overlapping pair with a section of ``indexes`` counts once.
+        """
+        shared = 0
+        for index in indexes:
+            for other, count in self.neighbors[index]:
+                if other in indexes and other < index:
+                    continue
+                if self._overlap(index, other):
+                    shared += count
+        return shared
+
+    def _clashes(self, index):
+        """Check if a section overlaps one it must never overlap."""
+        return any(count >= self.hard_conflicts and self._overlap(index, other)
+                   for other, count in self.neighbors[index])
+
+    def _partial_cost(self, placed, days, keys):
+        """Compute the cost terms touched by a change.
+
+        ``placed`` are the (index, slot) pairs of the changed sections,
+        ``days`` the days and ``keys`` the (professor ID, day) pairs whose
+        loads and gaps it changes.
+        """
+        return (self.weights['spread'] * sum(self.loads[day] ** 2
+                                             for day in days)
+                + self.weights['room_fit'] * sum(self._fit(index, slot[2])
+                                                 for index, slot in placed)
+                + self.weights['gaps'] * self._professor_gaps(keys)
+                + self.weights['student_conflicts'] * self._student_conflicts(
+                    {index for index, _ in placed}))
+
+    def _cost(self):
+        """Compute the full weighted cost of the current slots."""
+        spread = sum(load * load for load in self.loads)
+        room_fit = sum(self._fit(index, slot[2])
+                       for index, slot in enumerate(self.slots))
+        gaps = self.occupancy.professor_gaps()
+        shared = self._student_conflicts(set(range(len(self.slots))))
+        return (self.weights['spread'] * spread
+                + self.weights['room_fit'] * room_fit
+                + self.weights['gaps'] * gaps
+                + self.weights['student_conflicts'] * shared)
+
+    # ----- Slots ---
+    def _mask(self, index, slot):
+        """Get the hour mask of a section in a (day, block, room) slot."""
+        return self.blocks[self.lengths[index]][slot[1]][1]
+
+    def _release(self, index):
+        """Free the slot of a section."""
+        day, _, room = slot = self.slots[index]
+        self.occupancy.release(room, self.professors[index], day,
+                               self._mask(index, slot))
+        self.loads[day] -= self.lengths[index]
+
+    def _occupy(self, index, slot):
+        """Take a slot for a section."""
+        day, _, room = slot
+        self.occupancy.occupy(room, self.professors[index], day,
+                              self._mask(index, slot))
+        self.loads[day] += self.lengths[index]
+        self.slots[index] = slot
+
+    def _move(self, changes):
+        """Move sections to new slots if all of them are free.
+
+        ``changes`` are (index, slot) pairs. Returns True if the sections
+        were moved; otherwise they are left where they were.
+        """
+        old = [(index, self.slots[index]) for index, _ in changes]
+        for index, _ in changes:
+            self._release(index)
+        moved = []
+        for index, slot in changes:
+            day, _, room = slot
+            if not self.occupancy.is_free(room, self.professors[index], day,
+                                          self._mask(index, slot)):
+                break
+            self._occupy(index, slot)
+            moved.append(index)
+        else:
+            if not self.hard_conflicts or not any(
+                    self._clashes(index) for index in moved):
+                return True
+
+        for index in moved:
+            self._release(index)
+        for index, slot in old:
+            self._occupy(index, slot)
+        return False
+
+    def _propose(self):
+        """Pick a random move or swap as (index, slot) changes, or None."""
+        index = self.rng.randrange(len(self.slots))
+        length = self.lengths[index]
+        if self.rng.random() < 0.5:
+            mates = self.by_length[length]
+            other = mates[self.rng.randrange(len(mates))]
+            if other == index:
+                return None
+            return [(index, self.slots[other]), (other, self.slots[index])]
+
+        slot = (self.rng.randrange(len(self.days)),
+                self.rng.randrange(len(self.blocks[length])),
+                self.rng.randrange(len(self.rooms)))
+        if slot == self.slots[index]:
+            return None
+        return [(index, slot)]
+
+    def _step(self, temperature):
+        """Try one random change, keeping it if accepted.
+
+        Returns the cost delta of the change (None if it was not possible)
+        and whether it was kept. Without a temperature only changes that do
+        not raise the cost are kept.
+        """
+        changes = self._propose()
+        if changes is None:
+            return None, False
+
+        old = [(index, self.slots[index]) for index, _ in changes]
+        keys = {(self.professors[index], slot[0])
+                for index, slot in old + changes}
+        days = {slot[0] for _, slot in old + changes}
+        before = self._partial_cost(old, days, keys)
+        if not self._move(changes):
+            return None, False
+        delta = self._partial_cost(changes, days, keys) - before
+
+        if delta > 0 and (temperature is None or self.rng.random() >=
+                          math.exp(-delta / temperature)):
+            self._move(old)
+            return delta, False
+        return delta, True
+
+    def _load(self, schedule):
+        """Build the slots and occupancy of a schedule's entries."""
+        room_index = {room['name']: index
+                      for index, room in enumerate(self.rooms)}
+        self.occupancy = ScheduleOccupancy(range(len(self.rooms)),
+                                           self.hours, self.days)
+        self.blocks = {}
+        self.by_length = {}
+        self.lengths = []
+        self.professors = []
+        self.enrollments = []
+        self.slots = []
+        self.loads = [0] * len(self.days)
+        self.neighbors = [()] * len(schedule)
+        if self.conflicts:
+            positions = {entry['section_id']: index
+                         for index, entry in enumerate(schedule)}
+            self.neighbors = [
+                [(positions[other_id], count) for other_id, count in
+                 self.conflicts.get(entry['section_id'], {}).items()
+                 if other_id in positions]
+                for entry in schedule]
+
+        for index, entry in enumerate(schedule):
+            length = entry['end'] - entry['start']
+            if length not in self.blocks:
+                self.blocks[length] = self.occupancy.blocks(length)
+            starts = [time_block[0] for time_block, _ in self.blocks[length]]
+            self.by_length.setdefault(length, []).append(index)
+            self.lengths.append(length)
+            self.professors.append(entry['professor_id'])
+            self.enrollments.append(entry.get('enrollment', 0))
+            self.slots.append(None)
+            self._occupy(index, (self.days.index(entry['day']),
+                                 starts.index(entry['start']),
+                                 room_index[entry['room_name']]))
+
+    def _store(self, schedule, slots):
+        """Write slots back into the schedule entries."""
+        for index, (entry, slot) in enumerate(zip(schedule, slots)):
+            day, block, room = slot
+            time_block = self.blocks[self.lengths[index]][block][0]
+            entry['day'] = self.days[day]
+            entry['start'] = time_block[0]
+            entry['end'] = time_block[-1] + 1
+            entry['room_name'] = self.rooms[room]['name']
+            entry['room_capacity'] = self.rooms[room]['capacity']
+
+    # ----- Search ---
+    def optimize(self, schedule):
+        """Improve a schedule in place and return it.
+
+        Entries need the fields of ScheduleService schedule entries, with
+        ``professor_id`` (and ``section_id`` with a conflict graph);
+        ``enrollment`` is taken as 0 when missing. The search stops at the
+        time budget, or once STALL_CHECKS checks go by without a better
+        schedule while no change is kept (as when no section can move), no
+        worse change has been seen yet, or the temperature is below
+        STALL_TEMPERATURE_RATIO of its start.
+        """
+        if len(schedule) < 2 or not self.rooms:
+            return schedule
+        started = time.perf_counter()
+        self._load(schedule)
+        cost = self.initial_cost = self.best_cost = self._cost()
+        best = list(self.slots)
+
+        rises = []
+        temperature = start_temperature = None
+        stalled = 0
+        accepted = 0
+        while True:
+            delta, kept = self._step(temperature)
+            self.steps += 1
+            if kept:
+                self.accepted += 1
+                cost += delta
+            elif temperature is None and delta:
+                rises.append(delta)
+                if len(rises) == WARMUP_STEPS:
+                    start_temperature = temperature = sum(rises) / len(rises)
+
+            if self.steps % CHECK_INTERVAL:
+                continue
+            if cost < self.best_cost:
+                self.best_cost = cost
+                best = list(self.slots)
+                stalled = 0
+            elif (self.accepted == accepted or temperature is None
+                  or temperature < start_temperature * STALL_TEMPERATURE_RATIO):
+                stalled += 1
+            else:
+                stalled = 0
+            accepted = self.accepted
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.time_budget or stalled >= STALL_CHECKS:
+                break
+            if start_temperature is not None:
+                temperature = start_temperature * (
+                    FINAL_TEMPERATURE_RATIO ** (elapsed / self.time_budget))
+
+        self._store(schedule, best)
+        return schedule
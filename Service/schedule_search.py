@@ -0,0 +1,158 @@
+"""Schedule Search module for running the schedule solver from many starts.
+
+Which schedule the solver finds, and whether it places every section, depends
+on the order in which it visits sections, days and rooms. A search runs the
+solver once with its default order and then with seeded random orders, each
+start in a worker process, so the starts of a search scale with the cores
+instead of sharing one interpreter. Schedules are compared by the number of
+sections left unplaced, then by the free hours professors have between
+classes. The search stops when every start has run, when its wall-clock
+budget is spent, or at the first complete schedule if asked to.
+
+The worker processes are started once and shared by every search, and a
+search returns only after the starts it sent them have finished.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+from Service.schedule_solver import DEFAULT_TIME_BUDGET
+from Service.schedule_worker import run_start
+
+DEFAULT_SEARCH_BUDGET = 30.0
+# The search runs while a request waits, so its budget is capped.
+MAX_SEARCH_BUDGET = 60.0
+DEFAULT_STARTS_PER_WORKER = 4
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(workers):
+    """Return the process pool with this many workers, starting it once."""
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            # Workers are spawned, not forked: a fork would copy the locks
+            # held by other threads of the app and its pooled database
+            # connections.
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'))
+            _executors[workers] = executor
+        return executor
+
+
+def _discard_executor(workers, executor):
+    """Drop a broken process pool so that the next search starts a new one."""
+    with _executors_lock:
+        if _executors.get(workers) is executor:
+            del _executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ScheduleSearch:
+    """Multi-start search over seeded solver orders on a process pool."""
+
+    def __init__(self, workers=None, starts=None, time_budget=None,
+                 first_feasible=False):
+        """Initialize the search settings.
+
+        ``workers`` defaults to the SCHEDULE_WORKERS environment variable or
+        the number of cores, ``starts`` to SCHEDULE_STARTS or a few per
+        worker, and ``time_budget`` (in seconds) to SCHEDULE_TIME_BUDGET,
+        capped at MAX_SEARCH_BUDGET.
+        With ``first_feasible`` the first complete schedule is kept instead
+        of the best one.
+        """
+        if workers is None:
+            workers = int(os.getenv('SCHEDULE_WORKERS', os.cpu_count() or 1))
+        if starts is None:
+            starts = int(os.getenv('SCHEDULE_STARTS',
+                                   workers * DEFAULT_STARTS_PER_WORKER))
+        if time_budget is None:
+            time_budget = float(os.getenv('SCHEDULE_TIME_BUDGET',
+                                          DEFAULT_SEARCH_BUDGET))
+        self.workers = workers
+        self.starts = starts
+        self.time_budget = min(time_budget, MAX_SEARCH_BUDGET)
+        self.first_feasible = first_feasible
+        self.runs = 0
+        self.best_cost = None
+        self.best_seed = None
+        self.best = {}
+
+    def _keep(self, result):
+        """Keep a start's result if it beats the best so far.
+
+        Returns True when the search can stop.
+        """
+        cost, seed, placements = result
+        self.runs += 1
+        if self.best_cost is None or cost < self.best_cost:
+            self.best_cost = cost
+            self.best_seed = seed
+            self.best = placements
+        return self.first_feasible and not self.best_cost[0]
+
+    def _seeds(self):
+        """Yield the default order first, then one seed per other start."""
+        yield None
+        yield from range(1, self.starts)
+
+    def run(self, sections, rooms, hours, days, conflicts=None, order=None):
+        """Search a period and return the placements of the best schedule.
+
+        ``conflicts`` and ``order`` are passed on to ScheduleSolver. The
+        placements map section indexes to (day index, time block, room), as
+        returned by ScheduleSolver.solve.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        self.runs = 0
+        self.best_cost = None
+        self.best_seed = None
+        self.best = {}
+
+        def start_budget():
+            return min(DEFAULT_TIME_BUDGET, deadline - time.perf_counter())
+
+        problem = (sections, rooms, hours, days, conflicts, order)
+        seeds = self._seeds()
+        if self.workers <= 1:
+            for seed in seeds:
+                if (self._keep(run_start(problem, seed, start_budget()))
+                        or start_budget() <= 0):
+                    break
+            return self.best
+
+        executor = _executor(self.workers)
+        pending = set()
+        try:
+            pending = {executor.submit(run_start, problem, seed,
+                                       start_budget())
+                       for _, seed in zip(range(self.workers), seeds)}
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if self._keep(future.result()):
+                        return self.best
+                for _, seed in zip(done, seeds):
+                    if start_budget() <= 0:
+                        break
+                    pending.add(executor.submit(run_start, problem, seed,
+                                                start_budget()))
+        except BrokenProcessPool:
+            _discard_executor(self.workers, executor)
+            raise
+        finally:
+            # Starts still running end within their own budget; wait for
+            # them so that no work of this search outlives the request.
+            for future in pending:
+                future.cancel()
+            concurrent.futures.wait(pending)
+        return self.best
@@ -6,7 +6,21 @@ room and time assignment, avoiding conflicts between professors and rooms.
 
 import csv
 import io
+import os
 from db import DatabaseConnection
+from Service.conflict_graph import (
+    conflict_graph, dsatur_order, section_conflicts
+)
+from Service.schedule_occupancy import ScheduleOccupancy
+from Service.schedule_optimizer import ScheduleOptimizer
+from Service.schedule_search import ScheduleSearch
+from Service.schedule_solver import ScheduleSolver
+
+HOURS = range(9, 18)
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+# Sections sharing at least this many students never overlap; 0 only
+# discourages overlaps when optimizing.
+DEFAULT_HARD_CONFLICTS = 1
 
 
 class ScheduleService:
@@ -16,6 +30,10 @@ class ScheduleService:
         """Initialize the schedule service with database connection."""
         self.db = DatabaseConnection()
         self.last_schedule = []
+        self.last_unplaced = []
+        self.last_conflicts = {}
+        self.hard_conflicts = int(os.getenv('SCHEDULE_HARD_CONFLICTS',
+                                            DEFAULT_HARD_CONFLICTS))
 
     def _fetch_periods_from_database(self):
         """Command: Execute database operations to fetch periods."""
@@ -43,71 +61,58 @@ class ScheduleService:
             SELECT s.id AS section_id, s.number, s.professor_id,
                    c.id AS course_id, c.name AS course_name, c.credits, c.nrc,
                    i.id AS instance_id, i.period,
-                   u.name AS professor_name
+                   u.name AS professor_name,
+                   COALESCE(e.enrollment, 0) AS enrollment
             FROM Sections s
             JOIN Instances i ON s.instance_id = i.id
             JOIN Courses c ON i.course_id = c.id
             JOIN Users u ON s.professor_id = u.id
+            LEFT JOIN (SELECT section_id, COUNT(*) AS enrollment
+                       FROM Courses_Taken GROUP BY section_id) e
+                ON e.section_id = s.id
             WHERE i.period = %s
             ORDER BY c.credits DESC, c.name, s.number
         """, (period,))
         return cursor.fetchall()
 
+    def get_enrollments_by_period(self, period):
+        """Get the (student, section) enrollments of a period's sections."""
+        cursor = self.db.connect()
+        cursor.execute("""
+            SELECT ct.user_id, ct.section_id
+            FROM Courses_Taken ct
+            JOIN Sections s ON ct.section_id = s.id
+            JOIN Instances i ON s.instance_id = i.id
+            WHERE i.period = %s
+        """, (period,))
+        return cursor.fetchall()
+
+    def get_conflict_graph(self, period):
+        """Get the graph of the period's sections that share students."""
+        rows = self.get_enrollments_by_period(period)
+        return conflict_graph((row['user_id'], row['section_id'])
+                              for row in rows)
+
+    def _conflict_constraints(self, sections, graph):
+        """Get the solver's forbidden overlaps and section order."""
+        section_ids = [section['section_id'] for section in sections]
+        conflicts = None
+        if self.hard_conflicts:
+            conflicts = section_conflicts(section_ids, graph,
+                                          self.hard_conflicts)
+        order, _ = dsatur_order(section_ids, graph)
+        return conflicts, order
+
     def _initialize_schedule_data(self, period):
         """Initialize basic data needed for schedule generation."""
         sections = sorted(self.get_sections_by_period(period),
                           key=lambda x: -x['credits'])
         rooms = self.get_rooms()
-        hours = list(range(9, 18))
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-
-        return sections, rooms, hours, days
+        return sections, rooms, list(HOURS), list(DAYS)
 
     def _initialize_occupancy_structures(self, rooms, hours, days):
-        """Create initial occupancy tracking structures."""
-        room_occupancy = {room['id']: {day: {h: False for h in hours}
-                                       for day in days} for room in rooms}
-        teacher_occupancy = {}
-        schedule = []
-
-        return room_occupancy, teacher_occupancy, schedule
-
-    def _is_valid_time_block(self, time_block):
-        """Validate if a time block is valid for scheduling."""
-        if any(h == 13 for h in time_block):
-            return False
-        if time_block[-1] > 17:
-            return False
-        return True
-
-    def _is_time_slot_available(self, **slot_data):
-        """Check if a time slot is available for both room and teacher."""
-        room_id = slot_data['room_id']
-        prof_id = slot_data['prof_id']
-        day = slot_data['day']
-        time_block = slot_data['time_block']
-        room_occupancy = slot_data['room_occupancy']
-        teacher_occupancy = slot_data['teacher_occupancy']
-
-        room_available = all(not room_occupancy[room_id][day][h]
-                             for h in time_block)
-        teacher_available = all(not teacher_occupancy[prof_id][day][h]
-                                for h in time_block)
-
-        return room_available and teacher_available
-
-    def _mark_time_slot_occupied(self, **slot_data):
-        """Mark a time slot as occupied for both room and teacher."""
-        room_id = slot_data['room_id']
-        prof_id = slot_data['prof_id']
-        day = slot_data['day']
-        time_block = slot_data['time_block']
-        room_occupancy = slot_data['room_occupancy']
-        teacher_occupancy = slot_data['teacher_occupancy']
-
-        for h in time_block:
-            room_occupancy[room_id][day][h] = True
-            teacher_occupancy[prof_id][day][h] = True
+        """Create the occupancy that tracks booked rooms and professors."""
+        return ScheduleOccupancy([room['id'] for room in rooms], hours, days)
 
     def _create_schedule_entry(self, section, time_block, day, room):
         """Create a schedule entry object."""
@@ -115,8 +120,11 @@ class ScheduleService:
             'course_name': section['course_name'],
             'nrc': section['nrc'],
             'number': section['number'],
+            'section_id': section.get('section_id'),
+            'professor_id': section['professor_id'],
             'professor_name': section['professor_name'],
             'credits': section['credits'],
+            'enrollment': section.get('enrollment', 0),
             'period': section['period'],
             'start': time_block[0],
             'end': time_block[-1] + 1,
@@ -125,94 +133,74 @@ class ScheduleService:
             'room_capacity': room['capacity']
         }
 
-    def _try_assign_section_to_slot(self, section, room, day, hours,
-                                     **occupancy_data):
-        """Attempt to assign a section to a specific room and day."""
-        room_occupancy = occupancy_data['room_occupancy']
-        teacher_occupancy = occupancy_data['teacher_occupancy']
-        schedule = occupancy_data['schedule']
-
-        course_credits = section['credits']
-        prof_id = section['professor_id']
-
-        for i in range(len(hours) - course_credits + 1):
-            time_block = hours[i:i+course_credits]
-
-            if not self._is_valid_time_block(time_block):
-                continue
-
-            slot_available = self._is_time_slot_available(
-                room_id=room['id'],
-                prof_id=prof_id,
-                day=day,
-                time_block=time_block,
-                room_occupancy=room_occupancy,
-                teacher_occupancy=teacher_occupancy
-            )
-
-            if slot_available:
-                self._mark_time_slot_occupied(
-                    room_id=room['id'],
-                    prof_id=prof_id,
-                    day=day,
-                    time_block=time_block,
-                    room_occupancy=room_occupancy,
-                    teacher_occupancy=teacher_occupancy
-                )
-
-                schedule_entry = self._create_schedule_entry(section,
-                                                             time_block,
-                                                             day, room)
-                schedule.append(schedule_entry)
-
-                return True
-
-        return False
-
-    def _assign_section_to_schedule(self, section, days, rooms, hours,
-                                     **occupancy_data):
-        """Attempt to assign a section to the schedule."""
-        room_occupancy = occupancy_data['room_occupancy']
-        teacher_occupancy = occupancy_data['teacher_occupancy']
-        schedule = occupancy_data['schedule']
-
-        prof_id = section['professor_id']
-
-        if prof_id not in teacher_occupancy:
-            teacher_occupancy[prof_id] = {day: {h: False for h in hours}
-                                          for day in days}
-
-        for day in days:
-            for room in rooms:
-                assignment_successful = self._try_assign_section_to_slot(
-                    section, room, day, hours,
-                    room_occupancy=room_occupancy,
-                    teacher_occupancy=teacher_occupancy,
-                    schedule=schedule
-                )
-                if assignment_successful:
-                    return True
-
-        return False
+    def _build_schedule(self, sections, days, placements):
+        """Turn solver placements into schedule entries.
 
-    def generate_schedule(self, period):
-        """Generate a complete schedule for the given period."""
-        sections, rooms, hours, days = self._initialize_schedule_data(period)
-        room_occupancy, teacher_occupancy, schedule = (
-            self._initialize_occupancy_structures(rooms, hours, days))
-
-        for section in sections:
-            assignment_successful = self._assign_section_to_schedule(
-                section, days, rooms, hours,
-                room_occupancy=room_occupancy,
-                teacher_occupancy=teacher_occupancy,
-                schedule=schedule
-            )
-            if not assignment_successful:
-                return None
+        Sections without a placement are kept in ``last_unplaced``.
+        """
+        schedule = []
+        unplaced = []
+        for index, section in enumerate(sections):
+            if index in placements:
+                day, time_block, room = placements[index]
+                schedule.append(self._create_schedule_entry(
+                    section, time_block, days[day], room))
+            else:
+                unplaced.append(section)
 
         self.last_schedule = schedule
+        self.last_unplaced = unplaced
         return schedule
+
+    def generate_schedule(self, period):
+        """Generate a schedule for the given period.
+
+        Sections are placed by a backtracking search in which sections
+        sharing students do not overlap, and the ones it could not place
+        within its budget are kept in ``last_unplaced``. Returns
+        the schedule, which is partial when some section could not be placed.
+        """
+        sections, rooms, hours, days = self._initialize_schedule_data(period)
+        occupancy = self._initialize_occupancy_structures(
+            rooms, hours, days)
+        self.last_conflicts = self.get_conflict_graph(period)
+        conflicts, order = self._conflict_constraints(sections,
+                                                      self.last_conflicts)
+
+        placements = ScheduleSolver(sections, rooms, occupancy,
+                                    conflicts=conflicts, order=order).solve()
+        return self._build_schedule(sections, days, placements)
+
+    def search_schedule(self, period, search=None):
+        """Generate a schedule trying many section orders in parallel.
+
+        ``search`` is the ScheduleSearch to run, one with the environment
+        settings if None. Returns the best schedule found, as
+        generate_schedule does.
+        """
+        sections, rooms, hours, days = self._initialize_schedule_data(period)
+        if search is None:
+            search = ScheduleSearch()
+        self.last_conflicts = self.get_conflict_graph(period)
+        conflicts, order = self._conflict_constraints(sections,
+                                                      self.last_conflicts)
+
+        placements = search.run(sections, rooms, hours, days, conflicts,
+                                order)
+        return self._build_schedule(sections, days, placements)
+
+    def optimize_schedule(self, optimizer=None):
+        """Improve the last generated schedule in place and return it.
+
+        ``optimizer`` is the ScheduleOptimizer to run, one over every room
+        and the last conflict graph with the environment settings if None.
+        """
+        if optimizer is None:
+            optimizer = ScheduleOptimizer(
+                self.get_rooms(), HOURS, DAYS, conflicts=self.last_conflicts,
+                hard_conflicts=self.hard_conflicts)
+        return optimizer.optimize(self.last_schedule)
+
     # ----- solution ONE LEVEL OF ABSTRACTION error ---
 
     def create_csv(self, period):
@@ -247,4 +235,18 @@ class ScheduleService:
                 s['room_capacity']
             ])
 
+        for s in self.last_unplaced:
+            writer.writerow([
+                s['course_name'],
+                s['nrc'],
+                s['number'],
+                s['professor_name'],
+                s['credits'],
+                s['period'],
+                'Unscheduled',
+                '',
+                '',
+                ''
+            ])
+
         return output.getvalue()
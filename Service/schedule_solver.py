@@ -0,0 +1,336 @@
+"""Schedule Solver module for placing sections with constraint search.
+
+Each section must get a day, a block of consecutive hours as long as its
+credits and a room, with no room or professor booked twice at the same hour.
+The solver treats the (day, block) of every section as a variable: the value
+of a section is only possible while its professor is free for the block, no
+section it must not overlap takes those hours, and at least one room is free
+for it.
+
+The search always branches on the section with the fewest possible values
+left, breaking ties by credits, and after each placement re-counts the
+values of the sections it affects: the sections of the same professor, the
+sections that share students with it when those overlaps are forbidden, and
+every section of a length whose block just lost its last free room. A
+section left without values undoes the placement at once (forward checking)
+instead of failing further down. The search backtracks iteratively, so the
+number of sections is not bounded by the recursion limit. A section that
+cannot fit at all would otherwise keep the search backtracking until its
+budget runs out, so every so many backtracks the section that failed most is
+set aside and the search goes on without it. At the time or backtrack budget
+the search stops with the deepest partial assignment it reached.
+"""
+
+import heapq
+import random
+import time
+
+DEFAULT_TIME_BUDGET = 5.0
+DEFAULT_MAX_BACKTRACKS = 100000
+DEFAULT_DROP_AFTER = 1000
+# Budget checks are spread out, as reading the clock is not free.
+BUDGET_CHECK_INTERVAL = 256
+
+
+class ScheduleSolver:
+    """Backtracking search over the day and block of every section."""
+
+    def __init__(self, sections, rooms, occupancy,
+                 time_budget=DEFAULT_TIME_BUDGET,
+                 max_backtracks=DEFAULT_MAX_BACKTRACKS,
+                 drop_after=DEFAULT_DROP_AFTER, seed=None, conflicts=None,
+                 order=None):
+        """Initialize the solver over a free occupancy.
+
+        ``sections`` need ``credits`` and ``professor_id``; ``rooms`` need
+        ``id`` and are tried in order. The search runs for at most
+        ``time_budget`` seconds and ``max_backtracks`` backtracks, and sets
+        a section aside every ``drop_after`` backtracks. With a ``seed`` the
+        rooms and days are tried in a shuffled order and ties between
+        sections are broken at random, so each seed searches differently.
+        ``conflicts`` list, by section index, the indexes of the sections
+        that must not overlap it (as they share students); ``order`` is a
+        list of section indexes whose order breaks ties between sections
+        when there is no seed.
+        """
+        self.sections = sections
+        self.rooms = rooms
+        self.occupancy = occupancy
+        self.time_budget = time_budget
+        self.max_backtracks = max_backtracks
+        self.drop_after = drop_after
+        self.backtracks = 0
+        self.dropped = []
+        self.complete = False
+
+        self.blocks = []
+        self.blocks_by_length = {}
+        for section in sections:
+            length = section['credits']
+            if length not in self.blocks_by_length:
+                ids = []
+                for time_block, mask in occupancy.blocks(length):
+                    ids.append(len(self.blocks))
+                    self.blocks.append((length, time_block, mask))
+                self.blocks_by_length[length] = ids
+
+        days = range(len(occupancy.days))
+        self.day_order = list(days)
+        self.ties = list(range(len(sections)))
+        if order is not None:
+            for position, index in enumerate(order):
+                self.ties[index] = position
+        if seed is not None:
+            rng = random.Random(seed)
+            self.rooms = rng.sample(rooms, len(rooms))
+            rng.shuffle(self.day_order)
+            rng.shuffle(self.ties)
+
+        self.free_rooms = [[len(rooms)] * len(self.blocks) for _ in days]
+        self.sections_by_professor = {}
+        self.sections_by_length = {}
+        for index, section in enumerate(sections):
+            self.sections_by_professor.setdefault(
+                section['professor_id'], []).append(index)
+            self.sections_by_length.setdefault(
+                section['credits'], []).append(index)
+
+        self.conflicts = conflicts or [()] * len(sections)
+        self.blocked = [[0] * len(occupancy.days) for _ in sections]
+        self.assigned = [False] * len(sections)
+        self.sizes = [self._domain_size(index)
+                      for index in range(len(sections))]
+        self.heap = []
+
+    # ----- Domains ---
+    def _values(self, index):
+        """Yield the (day, block ID) values still possible for a section."""
+        section = self.sections[index]
+        professor = self.occupancy.professor_days(section['professor_id'])
+        for day in self.day_order:
+            busy = professor[day] | self.blocked[index][day]
+            free_rooms = self.free_rooms[day]
+            for block_id in self.blocks_by_length[section['credits']]:
+                if free_rooms[block_id] and not (
+                        busy & self.blocks[block_id][2]):
+                    yield day, block_id
+
+    def _domain_size(self, index):
+        """Count the values still possible for a section."""
+        return sum(1 for _ in self._values(index))
+
+    def _push(self, index):
+        """Queue a section by fewest values, then most credits."""
+        heapq.heappush(self.heap, (self.sizes[index],
+                                   -self.sections[index]['credits'],
+                                   self.ties[index], index))
+
+    def _select(self):
+        """Pop the unassigned section with the fewest values, or None."""
+        while self.heap:
+            size, _, _, index = heapq.heappop(self.heap)
+            if not self.assigned[index] and size == self.sizes[index]:
+                return index
+        return None
+
+    def _room_for(self, day, mask):
+        """Get the first room free for a block on a day."""
+        rooms = self.occupancy.rooms
+        for room in self.rooms:
+            if not rooms[room['id']][day] & mask:
+                return room
+        return None
+
+    # ----- Placement ---
+    def _place(self, index, day, block_id, room):
+        """Place a section and forward check the sections it affects.
+
+        Returns the undo record, and whether every affected section still
+        has a value.
+        """
+        section = self.sections[index]
+        mask = self.blocks[block_id][2]
+        room_days = self.occupancy.rooms[room['id']]
+        before = room_days[day]
+
+        self.assigned[index] = True
+        self.occupancy.occupy(room['id'], section['professor_id'], day, mask)
+
+        affected = [mate for mate in
+                    self.sections_by_professor[section['professor_id']]
+                    if not self.assigned[mate]]
+        old_blocked = []
+        for other in self.conflicts[index]:
+            blocked = self.blocked[other]
+            old_blocked.append((other, blocked[day]))
+            blocked[day] |= mask
+            if not self.assigned[other]:
+                affected.append(other)
+        lost_rooms = []
+        free_rooms = self.free_rooms[day]
+        for other_id, (length, _, other_mask) in enumerate(self.blocks):
+            if other_mask & mask and not other_mask & before:
+                free_rooms[other_id] -= 1
+                lost_rooms.append(other_id)
+                if not free_rooms[other_id]:
+                    affected.extend(
+                        other for other in self.sections_by_length[length]
+                        if not self.assigned[other])
+
+        old_sizes = []
+        consistent = True
+        for other in dict.fromkeys(affected):
+            size = self._domain_size(other)
+            if size != self.sizes[other]:
+                old_sizes.append((other, self.sizes[other]))
+                self.sizes[other] = size
+                self._push(other)
+            if not size:
+                consistent = False
+
+        undo = (index, day, block_id, room, lost_rooms, old_sizes,
+                old_blocked)
+        return undo, consistent
+
+    def _unplace(self, undo):
+        """Undo a placement and restore the counts it changed."""
+        index, day, block_id, room, lost_rooms, old_sizes, old_blocked = undo
+        section = self.sections[index]
+
+        self.occupancy.release(room['id'], section['professor_id'], day,
+                               self.blocks[block_id][2])
+        free_rooms = self.free_rooms[day]
+        for lost in lost_rooms:
+            free_rooms[lost] += 1
+        for other, size in old_sizes:
+            self.sizes[other] = size
+            self._push(other)
+        for other, blocked in reversed(old_blocked):
+            self.blocked[other][day] = blocked
+        self.assigned[index] = False
+
+    def _next_placement(self, frame):
+        """Place the section of a frame at its next consistent value."""
+        index, values, _ = frame
+        for day, block_id in values:
+            room = self._room_for(day, self.blocks[block_id][2])
+            if room is None:
+                continue
+            undo, consistent = self._place(index, day, block_id, room)
+            if consistent:
+                frame[2] = undo
+                return True
+            self._unplace(undo)
+        return False
+
+    # ----- Search ---
+    def _out_of_budget(self, started):
+        """Check if the backtrack or time budget is spent."""
+        return (self.backtracks >= self.max_backtracks
+                or time.perf_counter() - started >= self.time_budget)
+
+    def _assignment(self, stack):
+        """List the placements held by the frames of the search stack."""
+        return [undo[:4] for _, _, undo in stack if undo is not None]
+
+    def _fill(self):
+        """Place the sections left out wherever they still fit.
+
+        Forward checking no longer applies here, so the partial assignment
+        keeps the sections that only failed by leaving no room for others.
+        """
+        placed = []
+        for index in range(len(self.sections)):
+            if self.assigned[index]:
+                continue
+            for day, block_id in self._values(index):
+                room = self._room_for(day, self.blocks[block_id][2])
+                if room is not None:
+                    undo, _ = self._place(index, day, block_id, room)
+                    placed.append(undo[:4])
+                    break
+        return placed
+
+    def _drop(self, failures):
+        """Set aside the unassigned section that failed most often."""
+        index = max((index for index in range(len(self.sections))
+                     if not self.assigned[index]),
+                    key=failures.__getitem__)
+        self.assigned[index] = True
+        self.dropped.append(index)
+
+    def solve(self):
+        """Search for a placement of every section.
+
+        Returns a dict mapping section indexes to (day index, time block,
+        room) and leaves the occupancy holding those placements. Sections
+        without any possible value from the start are left out of the
+        search, and so is the section that failed most often each time
+        ``drop_after`` backtracks go by without placing everything. If the
+        budget runs out first, the deepest partial assignment reached is
+        kept. Sections left out are finally placed wherever they still fit;
+        ``complete`` tells if every section was placed.
+        """
+        started = time.perf_counter()
+        for index in range(len(self.sections)):
+            if self.sizes[index]:
+                self._push(index)
+            else:
+                self.assigned[index] = True
+
+        best = []
+        stack = []
+        failures = [0] * len(self.sections)
+        since_drop = 0
+        spent = False
+        descend = True
+        while True:
+            if descend:
+                index = self._select()
+                if index is None:
+                    break
+                stack.append([index, self._values(index), None])
+
+            frame = stack[-1]
+            if frame[2] is not None:
+                self._unplace(frame[2])
+                frame[2] = None
+
+            descend = self._next_placement(frame)
+            if descend:
+                continue
+
+            if len(stack) - 1 > len(best):
+                best = self._assignment(stack)
+            stack.pop()
+            self._push(frame[0])
+            failures[frame[0]] += 1
+            self.backtracks += 1
+            since_drop += 1
+            if (self.backtracks % BUDGET_CHECK_INTERVAL == 0
+                    or self.backtracks >= self.max_backtracks) and (
+                        self._out_of_budget(started)):
+                spent = True
+                break
+
+            if not stack or since_drop >= self.drop_after:
+                self._drop(failures)
+                failures = [0] * len(self.sections)
+                since_drop = 0
+                descend = True
+
+        placements = self._assignment(stack)
+        if spent and len(best) > len(placements):
+            for frame in reversed(stack):
+                if frame[2] is not None:
+                    self._unplace(frame[2])
+            for index, day, block_id, room in best:
+                self._place(index, day, block_id, room)
+            placements = best
+        for index in self.dropped:
+            self.assigned[index] = False
+        placements += self._fill()
+
+        self.complete = len(placements) == len(self.sections)
+        return {index: (day, self.blocks[block_id][1], room)
+                for index, day, block_id, room in placements}
@@ -0,0 +1,26 @@
+"""Schedule Worker module for running one start of a schedule search.
+
+This is the code a ScheduleSearch runs in its worker processes. It only
+imports the solver and the occupancy it fills, so a worker loads neither the
+app nor its database connection.
+"""
+
+from Service.schedule_occupancy import ScheduleOccupancy
+from Service.schedule_solver import ScheduleSolver
+
+
+def run_start(problem, seed, time_budget):
+    """Run the solver for one seed and return its cost and placements.
+
+    ``problem`` is the (sections, rooms, hours, days, conflicts, order)
+    tuple of the period being searched.
+    """
+    sections, rooms, hours, days, conflicts, order = problem
+    occupancy = ScheduleOccupancy([room['id'] for room in rooms], hours,
+                                  days)
+    solver = ScheduleSolver(sections, rooms, occupancy,
+                            time_budget=time_budget, seed=seed,
+                            conflicts=conflicts, order=order)
+    placements = solver.solve()
+    cost = (len(sections) - len(placements), occupancy.professor_gaps())
+    return cost, seed, placements
@@ -0,0 +1,6 @@
+"""Benchmarks package for measuring the importer at scale.
+
+It holds a seeded generator of synthetic university datasets in the eight
+import formats, a SQLite stand-in for the MySQL database and a harness that
+reports import throughput and peak memory per file type.
+"""
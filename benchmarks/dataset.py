@@ -0,0 +1,229 @@
+"""Dataset module for generating synthetic university import files.
+
+A UniversityDataset builds, from a fixed seed, a consistent semester of
+students, professors, courses with acyclic prerequisites, course instances,
+sections with evaluation schemes, rooms, enrollments and grades, and writes
+it as one valid JSON file per import file type, named after the type so the
+directory can also be imported as a bundle. Records are generated lazily and
+written one at a time, so millions of grades never sit in memory at once.
+"""
+
+import json
+import os
+import random
+
+DEFAULT_SEED = 2025
+PERIOD = (2025, 1)
+
+# Full-scale record counts; ``scaled_counts`` shrinks them for quick runs.
+DEFAULT_COUNTS = {
+    'students': 100_000,
+    'professors': 1_000,
+    'courses': 2_000,
+    'sections': 5_000,
+    'rooms': 300,
+    'sections_per_student': 4
+}
+
+FILE_TYPES = ('alumnos', 'profesores', 'cursos', 'salas_clases',
+              'instancias_cursos', 'instancias_cursos_secciones',
+              'alumnos_seccion', 'notas_alumnos')
+
+
+def scaled_counts(scale, **overrides):
+    """Scale the default counts, keeping at least one record of each kind."""
+    counts = {
+        name: max(1, round(count * scale))
+        for name, count in DEFAULT_COUNTS.items()
+        if name != 'sections_per_student'
+    }
+    counts['sections_per_student'] = min(
+        DEFAULT_COUNTS['sections_per_student'], counts['sections'])
+    counts.update(overrides)
+    return counts
+
+
+def _split(rng, total, parts):
+    """Split ``total`` into ``parts`` positive integers."""
+    cuts = sorted(rng.sample(range(1, total), parts - 1))
+    return [high - low for low, high in zip([0, *cuts], [*cuts, total])]
+
+
+class UniversityDataset:
+    """Seeded synthetic semester that renders every import file type."""
+
+    def __init__(self, seed=DEFAULT_SEED, counts=None):
+        """Build the courses, sections and enrollments of the semester.
+
+        ``counts`` overrides entries of DEFAULT_COUNTS.
+        """
+        self.seed = seed
+        self.counts = {**DEFAULT_COUNTS, **(counts or {})}
+        rng = random.Random(seed)
+
+        self.prerequisites = self._build_prerequisites(rng)
+        self.sections = self._build_sections(rng)
+        self.enrollments = self._build_enrollments(rng)
+
+    def _build_prerequisites(self, rng):
+        """Pick up to three prerequisites per course among earlier courses.
+
+        Prerequisites always point to a lower course ID, so the graph is
+        acyclic.
+        """
+        return [
+            sorted(rng.sample(range(1, course_id),
+                              min(course_id - 1, rng.randint(0, 3))))
+            for course_id in range(1, self.counts['courses'] + 1)
+        ]
+
+    def _build_evaluation(self, rng, first_topic_id):
+        """Build an evaluation scheme with 2 to 4 topics of 1 to 4 activities."""
+        tipo = rng.choice(['porcentaje', 'peso'])
+        topic_count = rng.randint(2, 4)
+        valores = (_split(rng, 100, topic_count) if tipo == 'porcentaje'
+                   else [rng.randint(1, 5) for _ in range(topic_count)])
+
+        combinacion, topicos = [], {}
+        for offset, valor in enumerate(valores):
+            topic_id = first_topic_id + offset
+            topic_tipo = rng.choice(['porcentaje', 'peso'])
+            activities = rng.randint(1, 4)
+            combinacion.append({'id': topic_id,
+                                'nombre': f"Topico {topic_id}",
+                                'valor': valor})
+            topicos[str(topic_id)] = {
+                'tipo': topic_tipo,
+                'valores': (_split(rng, 100, activities)
+                            if topic_tipo == 'porcentaje'
+                            else [rng.randint(1, 5)
+                                  for _ in range(activities)]),
+                'obligatorias': [True] + [rng.random() < 0.7
+                                          for _ in range(activities - 1)]
+            }
+        return {'tipo': tipo, 'combinacion_topicos': combinacion,
+                'topicos': topicos}
+
+    def _build_sections(self, rng):
+        """Build every section with its instance, professor and evaluation."""
+        sections = []
+        topic_id = 1
+        for section_id in range(1, self.counts['sections'] + 1):
+            evaluacion = self._build_evaluation(rng, topic_id)
+            topic_id += len(evaluacion['combinacion_topicos'])
+            sections.append({
+                'id': section_id,
+                'instancia_curso': rng.randint(1, self.counts['courses']),
+                'profesor_id': rng.randint(1, self.counts['professors']),
+                'evaluacion': evaluacion
+            })
+        return sections
+
+    def _build_enrollments(self, rng):
+        """Enroll every student in distinct sections."""
+        section_ids = range(1, self.counts['sections'] + 1)
+        per_student = min(self.counts['sections_per_student'],
+                          self.counts['sections'])
+        return [sorted(rng.sample(section_ids, per_student))
+                for _ in range(self.counts['students'])]
+
+    # ----- Records ---
+    def _alumnos(self):
+        """Generate the students."""
+        rng = random.Random(self.seed + 1)
+        for student_id in range(1, self.counts['students'] + 1):
+            yield {'id': student_id, 'nombre': f"Alumno {student_id}",
+                   'correo': f"alumno{student_id}@uni.cl",
+                   'anio_ingreso': rng.randint(2015, PERIOD[0])}
+
+    def _profesores(self):
+        """Generate the professors."""
+        for professor_id in range(1, self.counts['professors'] + 1):
+            yield {'id': professor_id, 'nombre': f"Profesor {professor_id}",
+                   'correo': f"profesor{professor_id}@uni.cl"}
+
+    def _cursos(self):
+        """Generate the courses with their prerequisite codes."""
+        rng = random.Random(self.seed + 2)
+        for course_id, prerequisites in enumerate(self.prerequisites, 1):
+            yield {'id': course_id, 'codigo': f"ICC{course_id:05d}",
+                   'descripcion': f"Curso {course_id}",
+                   'creditos': rng.randint(1, 10),
+                   'requisitos': [f"ICC{prereq:05d}"
+                                  for prereq in prerequisites]}
+
+    def _salas(self):
+        """Generate the rooms."""
+        rng = random.Random(self.seed + 3)
+        for room_id in range(1, self.counts['rooms'] + 1):
+            yield {'id': room_id, 'nombre': f"Sala {room_id}",
+                   'capacidad': rng.randint(10, 200)}
+
+    def _instancias(self):
+        """Generate one instance per course for the period."""
+        for course_id in range(1, self.counts['courses'] + 1):
+            yield {'id': course_id, 'curso_id': course_id}
+
+    def _alumnos_seccion(self):
+        """Generate the enrollments."""
+        for student_id, section_ids in enumerate(self.enrollments, 1):
+            for section_id in section_ids:
+                yield {'alumno_id': student_id, 'seccion_id': section_id}
+
+    def _notas(self):
+        """Generate a grade for every activity of every enrollment."""
+        rng = random.Random(self.seed + 4)
+        activities = [
+            [(topic['id'],
+              len(section['evaluacion']['topicos'][str(topic['id'])]
+                  ['valores']))
+             for topic in section['evaluacion']['combinacion_topicos']]
+            for section in self.sections
+        ]
+        for student_id, section_ids in enumerate(self.enrollments, 1):
+            for section_id in section_ids:
+                for topic_id, count in activities[section_id - 1]:
+                    for instance in range(1, count + 1):
+                        yield {'alumno_id': student_id, 'topico_id': topic_id,
+                               'instancia': instance,
+                               'nota': round(rng.uniform(1.0, 7.0), 1)}
+
+    def file(self, file_type):
+        """Get the top-level members, array key and records of a file type."""
+        year, semester = PERIOD
+        return {
+            'alumnos': ({}, 'alumnos', self._alumnos),
+            'profesores': ({}, 'profesores', self._profesores),
+            'cursos': ({}, 'cursos', self._cursos),
+            'salas_clases': ({}, 'salas', self._salas),
+            'instancias_cursos': ({'año': year, 'semestre': semester},
+                                  'instancias', self._instancias),
+            'instancias_cursos_secciones': ({}, 'secciones',
+                                            lambda: iter(self.sections)),
+            'alumnos_seccion': ({}, 'alumnos_seccion',
+                                self._alumnos_seccion),
+            'notas_alumnos': ({}, 'notas', self._notas)
+        }[file_type]
+
+    def records(self, file_type):
+        """Iterate over the records of a file type."""
+        return self.file(file_type)[2]()
+
+    def write(self, directory, file_types=FILE_TYPES):
+        """Write one JSON file per file type and return their paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for file_type in file_types:
+            members, key, records = self.file(file_type)
+            path = os.path.join(directory, f"{file_type}.json")
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('{')
+                for name, value in members.items():
+                    file.write(f"{json.dumps(name)}: {json.dumps(value)}, ")
+                file.write(f'{json.dumps(key)}: [')
+                for index, record in enumerate(records()):
+                    file.write(',\n' if index else '\n')
+                    file.write(json.dumps(record, ensure_ascii=False))
+                file.write('\n]}\n')
+            paths[file_type] = path
+        return paths
@@ -0,0 +1,131 @@
+"""Import Benchmark module for measuring import throughput and memory.
+
+It generates a seeded dataset, imports every file type in dependency order
+into a fresh SQLite stand-in, and reports records per second and peak Python
+memory per file type. Throughput and memory are measured in separate runs,
+because tracing allocations slows the import down.
+
+Usage::
+
+    python -m benchmarks.import_benchmark --scale 0.05 --mode pipeline
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.dataset import (
+    DEFAULT_SEED, FILE_TYPES, UniversityDataset, scaled_counts
+)
+from benchmarks.sqlite_db import sqlite_database
+from Service.import_bundle import import_order
+from Service.import_service import ImportService
+
+MODES = ('load', 'stream', 'pipeline')
+
+
+def _import_file(path, file_type, mode):
+    """Import one file and return its progress counters."""
+    with open(path, 'rb') as file:
+        report = ImportService().import_json(file, file_type,
+                                             stream=mode != 'load',
+                                             pipeline=mode == 'pipeline')
+    return report.progress
+
+
+def _run(paths, mode, database_path, trace_memory):
+    """Import every file into a new database and measure each import."""
+    results = {}
+    with sqlite_database(database_path):
+        for file_type in import_order(paths):
+            if trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            progress = _import_file(paths[file_type], file_type, mode)
+            elapsed = time.perf_counter() - started
+
+            result = {'records': progress['validated'],
+                      'inserted': progress['inserted'],
+                      'failed': progress['failed'],
+                      'seconds': elapsed}
+            if trace_memory:
+                result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            results[file_type] = result
+    return results
+
+
+def run_benchmark(paths, mode='pipeline', measure_memory=True,
+                  work_dir=None):
+    """Benchmark the import of generated files.
+
+    ``paths`` maps file types to files, as returned by
+    UniversityDataset.write. Returns one result per file type in import
+    order with its records, inserted and failed rows, seconds, records per
+    second and, if measured, peak traced memory in bytes.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode must be one of {', '.join(MODES)}")
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as directory:
+        results = _run(paths, mode, os.path.join(directory, 'timing.db'),
+                       trace_memory=False)
+        if measure_memory:
+            memory = _run(paths, mode, os.path.join(directory, 'memory.db'),
+                          trace_memory=True)
+            for file_type, result in results.items():
+                result['peak_bytes'] = memory[file_type]['peak_bytes']
+
+    for result in results.values():
+        seconds = result['seconds']
+        result['records_per_second'] = (result['records'] / seconds
+                                        if seconds else 0.0)
+    return results
+
+
+def format_results(results):
+    """Render benchmark results as a text table."""
+    lines = [f"{'file type':<28} {'records':>10} {'failed':>7} "
+             f"{'seconds':>8} {'records/s':>10} {'peak MiB':>9}"]
+    for file_type, result in results.items():
+        peak = result.get('peak_bytes')
+        peak = f"{peak / 2 ** 20:9.1f}" if peak is not None else f"{'-':>9}"
+        lines.append(f"{file_type:<28} {result['records']:>10} "
+                     f"{result['failed']:>7} {result['seconds']:>8.2f} "
+                     f"{result['records_per_second']:>10.0f} {peak}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Generate a dataset and print the import benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scale', type=float, default=0.01,
+                        help="fraction of the full-scale dataset "
+                             "(1.0 = 100k students, 5k sections)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--mode', choices=MODES, default='pipeline')
+    parser.add_argument('--types', nargs='+', choices=FILE_TYPES,
+                        default=FILE_TYPES,
+                        help="file types to generate and import")
+    parser.add_argument('--output',
+                        help="directory to keep the generated files in")
+    parser.add_argument('--skip-memory', action='store_true',
+                        help="do not run the traced memory pass")
+    args = parser.parse_args(argv)
+
+    dataset = UniversityDataset(args.seed, scaled_counts(args.scale))
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        paths = dataset.write(args.output or directory, args.types)
+        print(f"Generated {len(paths)} files in "
+              f"{time.perf_counter() - started:.1f}s")
+
+        results = run_benchmark(paths, args.mode,
+                                measure_memory=not args.skip_memory)
+    print(format_results(results))
+
+
+if __name__ == '__main__':
+    main()
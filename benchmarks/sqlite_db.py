@@ -0,0 +1,139 @@
+"""SQLite module providing a local stand-in for the MySQL database.
+
+The stand-in creates the tables of ``db/db.sql`` in a SQLite file and plugs
+SQLite connections into the DatabaseConnection pool, so the services run
+their own queries, batching, commits and units of work unchanged, without a
+MySQL server. SQLite errors are raised as DatabaseError like driver errors.
+"""
+
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+from db import ConnectionPool, DatabaseConnection, DatabaseError
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                           'db', 'db.sql')
+
+_PLACEHOLDER = re.compile(r'%s')
+
+
+def _translate(query):
+    """Turn a MySQL driver query into its SQLite form."""
+    return _PLACEHOLDER.sub('?', query)
+
+
+class SQLiteCursor:
+    """Cursor returning rows as dicts, like the driver's dictionary cursor."""
+
+    def __init__(self, cursor, dictionary):
+        """Wrap a SQLite cursor."""
+        self.cursor = cursor
+        self.dictionary = dictionary
+
+    def _row(self, row):
+        """Convert a SQLite row to a dict or a tuple."""
+        return dict(row) if self.dictionary else tuple(row)
+
+    def execute(self, query, params=()):
+        """Run one statement."""
+        try:
+            self.cursor.execute(_translate(query), params)
+        except sqlite3.Error as e:
+            raise DatabaseError(msg=str(e)) from e
+
+    def executemany(self, query, rows):
+        """Run one statement for every row."""
+        try:
+            self.cursor.executemany(_translate(query), rows)
+        except sqlite3.Error as e:
+            raise DatabaseError(msg=str(e)) from e
+
+    def fetchone(self):
+        """Get the next row, or None."""
+        row = self.cursor.fetchone()
+        return None if row is None else self._row(row)
+
+    def fetchall(self):
+        """Get the remaining rows."""
+        return [self._row(row) for row in self.cursor.fetchall()]
+
+    @property
+    def lastrowid(self):
+        """ID generated by the last insert."""
+        return self.cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        """Number of rows changed by the last statement."""
+        return self.cursor.rowcount
+
+    def close(self):
+        """Close the cursor."""
+        self.cursor.close()
+
+
+class SQLiteConnection:
+    """Connection with the subset of the driver API the pool and services use."""
+
+    def __init__(self, path):
+        """Open the SQLite file with foreign keys enforced."""
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.open = True
+
+    def cursor(self, dictionary=False):
+        """Create a cursor."""
+        return SQLiteCursor(self.connection.cursor(), dictionary)
+
+    def commit(self):
+        """Commit the current transaction."""
+        self.connection.commit()
+
+    def rollback(self):
+        """Roll back the current transaction."""
+        self.connection.rollback()
+
+    def is_connected(self):
+        """Check if the connection is still open."""
+        return self.open
+
+    def close(self):
+        """Close the connection."""
+        self.open = False
+        self.connection.close()
+
+
+def create_schema(path, schema_path=SCHEMA_PATH):
+    """Create the tables of the MySQL schema in a new SQLite file."""
+    with open(schema_path, encoding='utf-8') as file:
+        schema = file.read()
+    schema = schema.replace('INT PRIMARY KEY AUTO_INCREMENT',
+                            'INTEGER PRIMARY KEY')
+
+    connection = sqlite3.connect(path)
+    try:
+        connection.executescript(schema)
+        connection.execute("PRAGMA journal_mode = WAL")
+    finally:
+        connection.close()
+
+
+@contextmanager
+def sqlite_database(path):
+    """Point DatabaseConnection at a new SQLite database for a block.
+
+    The previous pool is restored afterwards.
+    """
+    create_schema(path)
+    db = DatabaseConnection()
+    db.release()
+    previous = db.pool
+    db.pool = ConnectionPool(lambda: SQLiteConnection(path))
+    try:
+        yield db
+    finally:
+        db.release()
+        db.pool = previous
@@ -1,27 +1,292 @@
+"""Database connection module backed by a thread-safe connection pool.
+
+This module keeps the ``DatabaseConnection`` singleton used by every service,
+but instead of sharing one MySQL socket it checks out a pooled connection per
+thread, so concurrent requests under a threaded WSGI server run in parallel.
+It also provides a per-thread unit of work that turns the services' commits
+into a single transaction.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
 
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
 
+DEFAULT_POOL_SIZE = 5
+DEFAULT_CHECKOUT_TIMEOUT = 30
+
+# Base class of the errors raised by the driver, for callers that recover
+# from failed statements without importing mysql.connector themselves.
+DatabaseError = mysql.connector.Error
+
+
+def _open_connection():
+    """Open a new MySQL connection using the environment settings."""
+    return mysql.connector.connect(
+        host=os.getenv('MYSQL_HOST'),
+        port=os.getenv('MYSQL_PORT'),
+        user=os.getenv('MYSQL_USER'),
+        password=os.getenv('MYSQL_PASSWORD'),
+        database=os.getenv('MYSQL_DATABASE')
+    )
+
+
+class ConnectionPool:
+    """Fixed-size pool of connections with health checks and wait stats."""
+
+    def __init__(self, factory, size=DEFAULT_POOL_SIZE,
+                 timeout=DEFAULT_CHECKOUT_TIMEOUT):
+        """Initialize an empty pool; connections are opened on demand."""
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        # Notified whenever a connection is returned or a slot is freed.
+        self._available = threading.Condition(self._lock)
+        self._stats = {
+            'created': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0
+        }
+
+    def _reserve_slot(self):
+        """Reserve capacity for a new connection if the pool is not full.
+
+        The caller holds the pool lock.
+        """
+        open_connections = self._stats['created'] - self._stats['discarded']
+        if open_connections >= self.size:
+            return False
+        self._stats['created'] += 1
+        return True
+
+    def _free_slot(self):
+        """Release the slot of a connection that is gone, waking a waiter."""
+        with self._available:
+            self._stats['discarded'] += 1
+            self._available.notify()
+
+    def _create(self):
+        """Open a new connection for a slot that was already reserved."""
+        try:
+            return self.factory()
+        except Exception:
+            self._free_slot()
+            raise
+
+    def _discard(self, conn):
+        """Close a connection and free its slot in the pool."""
+        self._free_slot()
+        try:
+            conn.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def _is_healthy(self, conn):
+        """Check that a pooled connection is still usable."""
+        try:
+            return conn.is_connected()
+        except Exception:  # pylint: disable=broad-except
+            return False
+
+    def _wait_for_idle(self):
+        """Block until a connection is returned or a slot is freed.
+
+        Returns the returned connection, or None when a slot was reserved
+        for a new one, and records the wait.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._available:
+            while not self._idle and not self._reserve_slot():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a "
+                        "database connection")
+                self._available.wait(remaining)
+            conn = self._idle.pop() if self._idle else None
+
+            waited = time.monotonic() - started
+            self._stats['waits'] += 1
+            self._stats['total_wait_seconds'] += waited
+            self._stats['max_wait_seconds'] = max(
+                self._stats['max_wait_seconds'], waited)
+        return conn
+
+    def checkout(self):
+        """Take a healthy connection from the pool, opening one if needed."""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+                reserved = conn is None and self._reserve_slot()
+            if conn is None and not reserved:
+                conn = self._wait_for_idle()
+
+            if conn is None:
+                conn = self._create()
+                break
+            if self._is_healthy(conn):
+                break
+            self._discard(conn)
+
+        with self._lock:
+            self._stats['checkouts'] += 1
+        return conn
+
+    def checkin(self, conn):
+        """Return a connection to the pool, ending any open transaction."""
+        try:
+            conn.rollback()
+        except Exception:  # pylint: disable=broad-except
+            self._discard(conn)
+            return
+
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def stats(self):
+        """Return a snapshot of the pool usage counters."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            idle = len(self._idle)
+
+        snapshot['size'] = self.size
+        snapshot['idle'] = idle
+        snapshot['in_use'] = snapshot['created'] - snapshot['discarded'] - idle
+        return snapshot
+
+
 class DatabaseConnection:
+    """Process-wide access point handing each thread its pooled connection."""
+
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(DatabaseConnection, cls).__new__(cls)
-            cls._instance.conn = mysql.connector.connect(
-                        host=os.getenv('MYSQL_HOST'),
-                        port=os.getenv('MYSQL_PORT'),
-                        user=os.getenv('MYSQL_USER'),
-                        password=os.getenv('MYSQL_PASSWORD'),
-                        database=os.getenv('MYSQL_DATABASE')
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(DatabaseConnection, cls).__new__(cls)
+                    instance.pool = ConnectionPool(
+                        _open_connection,
+                        size=int(os.getenv('MYSQL_POOL_SIZE',
+                                           DEFAULT_POOL_SIZE)),
+                        timeout=float(os.getenv('MYSQL_POOL_TIMEOUT',
+                                                DEFAULT_CHECKOUT_TIMEOUT))
                     )
+                    instance.local = threading.local()
+                    cls._instance = instance
         return cls._instance
-    
+
+    @property
+    def conn(self):
+        """Connection held by the current thread, checked out on first use."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.pool.checkout()
+            self.local.conn = conn
+        return conn
+
     def connect(self):
+        """Return a dictionary cursor on the current thread's connection."""
         return self.conn.cursor(dictionary=True)
-    
+
     def commit(self):
-        return self.conn.commit()
\ No newline at end of file
+        """Commit the current thread's connection.
+
+        Inside a unit of work the commit is deferred until the unit of work
+        completes, so every service write joins the same transaction.
+        """
+        if self.in_unit_of_work():
+            self.local.pending_commit = True
+            return None
+        return self.conn.commit()
+
+    def in_unit_of_work(self):
+        """Check if the current thread is inside an active unit of work."""
+        return getattr(self.local, 'unit_of_work', False)
+
+    def begin_unit_of_work(self):
+        """Start deferring commits on the current thread."""
+        self.local.unit_of_work = True
+        self.local.pending_commit = False
+
+    def complete_unit_of_work(self):
+        """Commit the deferred work once and end the unit of work."""
+        pending = getattr(self.local, 'pending_commit', False)
+        self.local.unit_of_work = False
+        self.local.pending_commit = False
+        if pending:
+            self.conn.commit()
+
+    def abort_unit_of_work(self):
+        """Roll back the deferred work and end the unit of work."""
+        if not self.in_unit_of_work():
+            return
+        self.local.unit_of_work = False
+        self.local.pending_commit = False
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.rollback()
+
+    @contextmanager
+    def unit_of_work(self):
+        """Run a block as one transaction, joining an active unit of work."""
+        if self.in_unit_of_work():
+            yield self
+            return
+
+        self.begin_unit_of_work()
+        try:
+            yield self
+        except BaseException:
+            self.abort_unit_of_work()
+            raise
+        self.complete_unit_of_work()
+
+    @contextmanager
+    def autocommit(self):
+        """Opt out of the unit of work for a long job.
+
+        Work deferred so far is committed first; inside the block every
+        commit goes straight to the database and a unit of work is a
+        transaction of its own, as the checkpointed import needs for its
+        batches. The unit of work resumes afterwards, even if the block
+        fails.
+        """
+        if not self.in_unit_of_work():
+            yield self
+            return
+
+        self.complete_unit_of_work()
+        try:
+            yield self
+        finally:
+            self.begin_unit_of_work()
+
+    def release(self):
+        """Return the current thread's connection to the pool, if any."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            return
+        self.local.conn = None
+        self.pool.checkin(conn)
+
+    def pool_stats(self):
+        """Return usage and wait statistics for the connection pool."""
+        return self.pool.stats()
@@ -87,4 +87,21 @@ CREATE TABLE Rooms (
     id INT PRIMARY KEY AUTO_INCREMENT,
     name VARCHAR(100) UNIQUE,
     capacity INT
+);
+
+CREATE TABLE ImportedFiles (
+    id INT PRIMARY KEY AUTO_INCREMENT,
+    file_type VARCHAR(50),
+    content_hash CHAR(64),
+    imported_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (file_type, content_hash)
+);
+
+CREATE TABLE ImportCheckpoints (
+    file_type VARCHAR(50),
+    content_hash CHAR(64),
+    job_id CHAR(32),
+    committed_offset INT NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (file_type, content_hash)
 );
\ No newline at end of file
@@ -8,4 +8,6 @@ DROP TABLE IF EXISTS Instances;
 DROP TABLE IF EXISTS Courses;
 DROP TABLE IF EXISTS Users;
 DROP TABLE IF EXISTS registros;
-DROP TABLE IF EXISTS Rooms;
\ No newline at end of file
+DROP TABLE IF EXISTS Rooms;
+DROP TABLE IF EXISTS ImportedFiles;
+DROP TABLE IF EXISTS ImportCheckpoints;
\ No newline at end of file
@@ -4,7 +4,12 @@ This module implements a comprehensive academic management system with CRUD oper
 for courses, professors, students, instances, sections, topics, activities, and grades.
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, Response
+import atexit
+import os
+
+from flask import (Flask, render_template, request, redirect, url_for, flash,
+                   Response, jsonify)
+from db import DatabaseConnection
 from Service.course_service import CourseService
 from Service.user_service import UserService
 from Service.section_service import SectionService
@@ -12,6 +17,8 @@ from Service.course_taken_service import CourseTakenService
 from Service.topic_service import TopicService
 from Service.activity_service import ActivityService
 from Service.import_service import ImportService
+from Service.import_job_service import ImportJobService
+from Service.import_report import start_import_log, stop_import_log
 from Service.instance_service import InstanceService
 from Service.room_service import RoomService
 from Service.grade_service import GradeService
@@ -27,12 +34,46 @@ course_taken_service = CourseTakenService()
 topic_service = TopicService()
 activity_service = ActivityService()
 import_service = ImportService()
+import_job_service = ImportJobService()
+# Schedule search workers are spawned and import this module as __mp_main__;
+# only the app itself writes the import log.
+if os.getenv('IMPORT_LOG_FILE') and __name__ != '__mp_main__':
+    atexit.register(stop_import_log,
+                    start_import_log(os.getenv('IMPORT_LOG_FILE')))
 instance_service = InstanceService()
 room_service = RoomService()
 grade_service = GradeService()
 schedule_service = ScheduleService()
 
 
+@app.before_request
+def begin_unit_of_work():
+    """Group every write made while handling a request in one transaction."""
+    DatabaseConnection().begin_unit_of_work()
+
+
+@app.after_request
+def complete_unit_of_work(response):
+    """Commit the request's transaction unless it ended in a server error."""
+    if response.status_code >= 500:
+        DatabaseConnection().abort_unit_of_work()
+    else:
+        DatabaseConnection().complete_unit_of_work()
+    return response
+
+
+@app.teardown_request
+def abort_unit_of_work(_exception=None):
+    """Roll back the request's transaction if it was not committed."""
+    DatabaseConnection().abort_unit_of_work()
+
+
+@app.teardown_appcontext
+def release_db_connection(_exception=None):
+    """Return the request's pooled database connection."""
+    DatabaseConnection().release()
+
+
 @app.route('/')
 def index():
     """Render home page."""
@@ -662,117 +703,19 @@ def _validate_student_and_section(section_id, user_id):
     return section, student, None, None
 
 
+def _student_not_enrolled(section_id):
+    """Flash that a student is not in a section and go back to its list."""
+    flash("Student is not enrolled in this section.", "danger")
+    return redirect(url_for('list_students_in_section',
+                            section_id=section_id))
+
+
 def _get_grade_calculation_context(section):
     """Get context data for grade calculation."""
     instance = instance_service.get_by_id(section['instance_id'])
     course = course_service.get_by_id(instance['course_id'])
-    topics = topic_service.get_by_section_id(section['id'])
-
-    return instance, course, topics
-
-
-def _calculate_activity_contribution(activity, topic, user_id):
-    """Calculate an activity's contribution to the topic grade."""
-    grade = grade_service.get_by_activity_and_student(activity['id'], user_id)
-
-    activity_calculation = {
-        'activity': activity,
-        'grade': None,
-        'contribution': 0
-    }
-
-    if grade:
-        activity_calculation['grade'] = float(grade['grade'])
-        grade_value = float(grade['grade'])
-    elif activity['optional_flag']:
-        return activity_calculation, 0, 0, True
-    else:
-        activity_calculation['grade'] = 1.0
-        grade_value = 1.0
-
-    if topic['weight_or_percentage']:
-        activity_weight = float(activity['weight']) / 10.0
-        contribution = grade_value * (activity_weight / 100.0)
-        total_weight_contribution = activity_weight / 100.0
-    else:
-        contribution = grade_value * float(activity['weight'])
-        total_weight_contribution = float(activity['weight'])
-
-    activity_calculation['contribution'] = contribution
-    return activity_calculation, contribution, total_weight_contribution, False
-
-
-def _calculate_topic_grade(topic, user_id):
-    """Calculate a topic's grade for a student."""
-    topic_calculation = {
-        'topic': topic,
-        'activities': [],
-        'grade': 0,
-        'total_weight': 0,
-        'missing_percentage': 0,
-        'final_contribution': 0
-    }
-
-    activities = activity_service.get_by_topic_id(topic['id'])
-    topic_grade = 0
-    topic_total_weight = 0
-
-    for activity in activities:
-        activity_calc, contribution, weight_contrib, skip = (
-            _calculate_activity_contribution(activity, topic, user_id))
-
-        if skip:
-            topic_calculation['activities'].append(activity_calc)
-            continue
-
-        topic_grade += contribution
-        topic_total_weight += weight_contrib
-        topic_calculation['activities'].append(activity_calc)
-
-    if topic_total_weight > 0:
-        if topic['weight_or_percentage']:
-            expected_total = 1.0
-            if abs(topic_total_weight - expected_total) > 0.001:
-                missing_percentage = (expected_total - topic_total_weight) * 100
-                topic_calculation['missing_percentage'] = missing_percentage
-            topic_grade = topic_grade / topic_total_weight
-        else:
-            topic_grade = topic_grade / topic_total_weight
-    else:
-        topic_grade = 1.0
-
-    topic_calculation['grade'] = topic_grade
-    topic_calculation['total_weight'] = topic_total_weight
-
-    return topic_calculation
-
-
-def _calculate_final_grade_from_topics(topic_calculations, section):
-    """Calculate final grade from topic calculations."""
-    final_grade = 0
-    total_weight = 0
-
-    for topic_calculation in topic_calculations:
-        topic = topic_calculation['topic']
-        topic_grade = topic_calculation['grade']
-
-        if section['weight_or_percentage']:
-            topic_weight = float(topic['weight']) / 10.0
-            topic_contribution = topic_grade * (topic_weight / 100.0)
-            total_weight += topic_weight / 100.0
-        else:
-            topic_contribution = topic_grade * float(topic['weight'])
-            total_weight += float(topic['weight'])
-
-        topic_calculation['final_contribution'] = topic_contribution
-        final_grade += topic_contribution
-
-    if total_weight > 0:
-        final_grade = final_grade / total_weight
-    else:
-        final_grade = 1.0
 
-    return round(final_grade * 10) / 10, total_weight
+    return instance, course
 
 
 @app.route('/sections/<int:section_id>/students/<int:user_id>/calculate_grade')
@@ -782,18 +725,20 @@ def calculate_student_grade(section_id, user_id):
         _validate_student_and_section(section_id, user_id))
     if error_msg:
         return error_msg, error_code
+    if not course_taken_service.is_student_enrolled(user_id, section_id):
+        return _student_not_enrolled(section_id)
 
-    instance, course, topics = _get_grade_calculation_context(section)
-
-    topic_calculations = []
-    for topic in topics:
-        topic_calculation = _calculate_topic_grade(topic, user_id)
-        topic_calculations.append(topic_calculation)
+    try:
+        breakdown = grade_service.get_student_breakdown(user_id, section_id)
+    except ValueError as e:
+        flash(f"Error calculating grade: {str(e)}", "danger")
+        return redirect(url_for('list_students_in_section',
+                                section_id=section_id))
 
-    final_grade, total_weight = _calculate_final_grade_from_topics(
-        topic_calculations, section)
+    instance, course = _get_grade_calculation_context(section)
 
-    course_taken_service.update_final_grade(user_id, section_id, final_grade)
+    course_taken_service.update_final_grade(user_id, section_id,
+                                            breakdown['final_grade'])
 
     return render_template(
         'sections/student_grade_calculation.html',
@@ -801,16 +746,29 @@ def calculate_student_grade(section_id, user_id):
         section=section,
         instance=instance,
         course=course,
-        topic_calculations=topic_calculations,
-        final_grade=final_grade,
-        total_weight=total_weight
+        topic_calculations=breakdown['topic_calculations'],
+        final_grade=breakdown['final_grade'],
+        total_weight=breakdown['total_weight']
     )
 
 
 @app.route('/sections/<int:section_id>/students/<int:user_id>/recalculate')
 def recalculate_grade(section_id, user_id):
     """Recalculate a student's grade."""
-    final_grade = grade_service.calculate_final_grade(user_id, section_id)
+    _, _, error_msg, error_code = _validate_student_and_section(section_id,
+                                                                user_id)
+    if error_msg:
+        return error_msg, error_code
+    if not course_taken_service.is_student_enrolled(user_id, section_id):
+        return _student_not_enrolled(section_id)
+
+    try:
+        final_grade = grade_service.calculate_final_grade(user_id, section_id)
+    except ValueError as e:
+        flash(f"Error calculating grade: {str(e)}", "danger")
+        return redirect(url_for('list_students_in_section',
+                                section_id=section_id))
+
     course_taken_service.update_final_grade(user_id, section_id, final_grade)
 
     flash("Grade has been recalculated successfully", "success")
@@ -820,22 +778,20 @@ def recalculate_grade(section_id, user_id):
 
 def _calculate_all_students_final_grades(section_id):
     """Calculate final grades for all students in a section."""
-    enrollments = course_taken_service.get_students_by_section(section_id)
-    calculated_count = 0
-
-    for enrollment in enrollments:
-        user_id = enrollment['user_id']
-        try:
-            final_grade = grade_service.calculate_final_grade(user_id,
-                                                              section_id)
-            course_taken_service.update_final_grade(user_id, section_id,
-                                                     final_grade)
-            calculated_count += 1
-        except (ValueError, KeyError) as e:
+    errors = {}
+    final_grades = grade_service.calculate_final_grades_for_section(
+        section_id, errors=errors)
+    course_taken_service.update_final_grades(section_id, final_grades)
+
+    if errors:
+        names = {enrollment['user_id']: enrollment['user_name']
+                 for enrollment in
+                 course_taken_service.get_students_by_section(section_id)}
+        for user_id, error in errors.items():
             flash(f"Error calculating grade for student "
-                  f"{enrollment['user_name']}: {str(e)}", "warning")
+                  f"{names.get(user_id, user_id)}: {error}", "warning")
 
-    return calculated_count
+    return len(final_grades)
 
 
 @app.route('/sections/<int:section_id>/close', methods=['POST'])
@@ -1382,34 +1338,27 @@ def _get_evaluation_context(activity):
     return topic, section, instance, course
 
 
-def _build_student_with_grade(enrollment, activity_id):
+def _build_student_with_grade(enrollment):
     """Build student data with grade information."""
-    grade = grade_service.get_by_activity_and_student(activity_id,
-                                                      enrollment['user_id'])
-
     student = {
         'id': enrollment['user_id'],
         'name': enrollment['user_name'],
         'email': enrollment['user_email']
     }
 
-    if grade:
-        student['grade'] = grade['grade']
-        student['grade_id'] = grade['id']
+    if enrollment['grade_id'] is not None:
+        student['grade'] = enrollment['grade']
+        student['grade_id'] = enrollment['grade_id']
 
     return student
 
 
 def _get_students_with_grades(section_id, activity_id):
     """Get students with their grades for an activity."""
-    enrollments = course_taken_service.get_students_by_section(section_id)
-    students = []
-
-    for enrollment in enrollments:
-        student = _build_student_with_grade(enrollment, activity_id)
-        students.append(student)
-
-    return students
+    enrollments = course_taken_service.get_students_with_activity_grade(
+        section_id, activity_id)
+    return [_build_student_with_grade(enrollment)
+            for enrollment in enrollments]
 
 
 @app.route('/activities/<int:activity_id>/evaluate',
@@ -1446,29 +1395,25 @@ def save_grades(activity_id):
     section = section_service.get_by_id(topic['section_id'])
     enrollments = course_taken_service.get_students_by_section(section['id'])
 
+    grades = {}
     for enrollment in enrollments:
         user_id = enrollment['user_id']
         grade_key = f'grade_{user_id}'
-        grade_id_key = f'grade_id_{user_id}'
 
         if grade_key in request.form:
             try:
                 grade_value = float(request.form[grade_key])
-                grade_value = max(1.0, min(7.0, grade_value))
-                grade_value = round(grade_value * 10) / 10
-
-                if grade_id_key in request.form:
-                    grade_id = request.form[grade_id_key]
-                    grade_service.update(grade_id, grade_value)
-                else:
-                    grade_service.create(grade_value, user_id, activity_id)
-
             except ValueError:
                 flash(f"Invalid grade format for student "
                       f"{enrollment['user_name']}", "danger")
                 return redirect(url_for('evaluate_students',
                                         activity_id=activity_id))
 
+            grade_value = max(1.0, min(7.0, grade_value))
+            grades[user_id] = round(grade_value * 10) / 10
+
+    grade_service.bulk_upsert(activity_id, grades)
+
     flash("Grades saved successfully", "success")
     return redirect(url_for('list_activities', topic_id=topic['id']))
 
@@ -1497,15 +1442,54 @@ def import_data():
             flash("Please select a file and a file type.")
             return redirect(request.url)
 
+        dry_run = bool(request.form.get('dry_run'))
         try:
-            import_service.import_json(uploaded_file, selected_type)
-            flash(f"Correctly imported {selected_type} data")
+            job_id = import_job_service.submit(
+                uploaded_file, selected_type, uploaded_file.filename,
+                delta=bool(request.form.get('delta')),
+                delete_missing=bool(request.form.get('delete_missing')),
+                resumable=bool(request.form.get('resumable')),
+                dry_run=dry_run,
+                atomic=bool(request.form.get('atomic')))
+            action = "Dry run" if dry_run else "Import"
+            flash(f"{action} of {selected_type} data queued as job {job_id}")
         except (ValueError, KeyError) as e:
             flash(f"Error importing data: {str(e)}")
 
         return redirect(url_for('import_data'))
 
-    return render_template('import/upload.html', file_types=file_types)
+    return render_template('import/upload.html', file_types=file_types,
+                           jobs=import_job_service.get_all())
+
+
+@app.route('/import/bundle', methods=['POST'])
+def import_bundle():
+    """Queue the import of a zip bundle holding one file per data type."""
+    uploaded_file = request.files.get('bundle_file')
+
+    if not uploaded_file:
+        flash("Please select a zip bundle.")
+        return redirect(url_for('import_data'))
+
+    job_id = import_job_service.submit_bundle(uploaded_file,
+                                              uploaded_file.filename)
+    flash(f"Import of bundle {uploaded_file.filename} queued as job {job_id}")
+    return redirect(url_for('import_data'))
+
+
+@app.route('/import/jobs', methods=['GET'])
+def list_import_jobs():
+    """Report the progress of every import job as JSON."""
+    return jsonify(import_job_service.get_all())
+
+
+@app.route('/import/jobs/<job_id>', methods=['GET'])
+def import_job_status(job_id):
+    """Report the progress and final status of an import job as JSON."""
+    job = import_job_service.get(job_id)
+    if not job:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job)
 
 
 # ---------------- Schedule ----------------
@@ -1530,13 +1514,19 @@ def generate_schedule():
         flash("No period selected.", "danger")
         return redirect(url_for('schedule_page'))
 
-    schedule = schedule_service.generate_schedule(period)
+    if request.form.get('search'):
+        schedule = schedule_service.search_schedule(period)
+    else:
+        schedule = schedule_service.generate_schedule(period)
 
     if not schedule:
         flash("Could not generate a valid schedule. Please review room or "
               "teacher availability.", "danger")
         return redirect(url_for('schedule_page'))
 
+    if request.form.get('optimize'):
+        schedule_service.optimize_schedule()
+
     csv_content = schedule_service.create_csv(period)
     return Response(
         csv_content,
@@ -1568,16 +1558,16 @@ def _generate_topic_instance_report(activity_id):
     instance = instance_service.get_by_id(section['instance_id'])
     course = course_service.get_by_id(instance['course_id'])
 
-    enrollments = course_taken_service.get_students_by_section(section['id'])
+    enrollments = course_taken_service.get_students_with_activity_grade(
+        section['id'], activity_id)
     grades_data = []
 
     for enrollment in enrollments:
-        grade = grade_service.get_by_activity_and_student(
-            activity_id, enrollment['user_id'])
+        graded = enrollment['grade_id'] is not None
         grades_data.append({
             'student_name': enrollment['user_name'],
             'student_email': enrollment['user_email'],
-            'grade': grade['grade'] if grade else 'Not graded'
+            'grade': enrollment['grade'] if graded else 'Not graded'
         })
 
     context = {
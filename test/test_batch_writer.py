@@ -0,0 +1,161 @@
+"""Unit tests for the batch_writer module.
+
+This module contains tests for the BatchWriter class, including chunking,
+the row-by-row fallback and error reporting.
+"""
+
+import pytest
+from collections import Counter
+from unittest.mock import Mock
+from db import DatabaseError
+from Service.batch_writer import BatchWriter
+
+QUERY = "INSERT INTO Rooms (id, name, capacity) VALUES (%s, %s, %s)"
+
+
+@pytest.fixture
+def mock_cursor():
+    """Create a mock database cursor."""
+    return Mock()
+
+
+def test_batch_writer_rejects_invalid_size(mock_cursor):
+    """Test that a batch needs room for at least one row."""
+    with pytest.raises(ValueError, match="at least 1"):
+        BatchWriter(mock_cursor, QUERY, batch_size=0)
+
+
+def test_add_writes_full_chunks(mock_cursor):
+    """Test that a chunk is written as soon as it is full."""
+    writer = BatchWriter(mock_cursor, QUERY, batch_size=2)
+
+    writer.add((1, 'A', 30))
+    mock_cursor.executemany.assert_not_called()
+    writer.add((2, 'B', 40))
+
+    mock_cursor.executemany.assert_called_once_with(
+        QUERY, [(1, 'A', 30), (2, 'B', 40)])
+    assert writer.written == 2
+
+
+def test_context_manager_flushes_remaining_rows(mock_cursor):
+    """Test that leaving the block writes the last partial chunk."""
+    with BatchWriter(mock_cursor, QUERY, batch_size=10) as writer:
+        writer.add((1, 'A', 30))
+
+    mock_cursor.executemany.assert_called_once_with(QUERY, [(1, 'A', 30)])
+
+
+def test_context_manager_does_not_flush_on_error(mock_cursor):
+    """Test that rows are not written when the block raises."""
+    with pytest.raises(KeyError):
+        with BatchWriter(mock_cursor, QUERY) as writer:
+            writer.add((1, 'A', 30))
+            raise KeyError('capacidad')
+
+    mock_cursor.executemany.assert_not_called()
+
+
+def test_flush_without_rows_is_noop(mock_cursor):
+    """Test that flushing an empty buffer sends nothing."""
+    BatchWriter(mock_cursor, QUERY).flush()
+
+    mock_cursor.executemany.assert_not_called()
+
+
+def test_failed_chunk_falls_back_to_single_rows(mock_cursor):
+    """Test that a failed chunk reports only the offending row."""
+    on_error = Mock()
+    error = DatabaseError("Duplicate entry '2'")
+    mock_cursor.executemany.side_effect = DatabaseError("Duplicate entry")
+    mock_cursor.execute.side_effect = [None, error, None]
+    writer = BatchWriter(mock_cursor, QUERY, on_error=on_error)
+
+    for room_id in (1, 2, 3):
+        writer.add((room_id, f'Sala {room_id}', 30), f"room {room_id}")
+    writer.flush()
+
+    assert mock_cursor.execute.call_count == 3
+    assert writer.written == 2
+    assert writer.failed == [("room 2", error)]
+    on_error.assert_called_once_with("room 2", error)
+
+
+def test_flush_advances_progress_counters(mock_cursor):
+    """Test that written and failed rows are added to the progress counts."""
+    progress = Counter()
+    mock_cursor.executemany.side_effect = DatabaseError("Duplicate entry")
+    mock_cursor.execute.side_effect = [None, DatabaseError("Duplicate entry")]
+    writer = BatchWriter(mock_cursor, QUERY, progress=progress)
+
+    writer.add((1, 'A', 30))
+    writer.add((2, 'B', 40))
+    writer.flush()
+
+    assert progress == Counter(inserted=1, failed=1)
+
+
+def test_progress_uses_written_key(mock_cursor):
+    """Test that written rows are counted under the given progress key."""
+    progress = Counter()
+
+    with BatchWriter(mock_cursor, QUERY, progress=progress,
+                     written_key='updated') as writer:
+        writer.add((1, 'A', 30))
+
+    assert progress == Counter(updated=1)
+
+
+def test_flush_writes_dependency_first(mock_cursor):
+    """Test that rows referenced by a chunk are written before it."""
+    parents = BatchWriter(mock_cursor, "INSERT INTO Courses VALUES (%s)")
+    children = BatchWriter(mock_cursor, QUERY, batch_size=1,
+                           depends_on=parents)
+
+    parents.add((1,))
+    children.add((1, 'A', 30))
+
+    queries = [call.args[0] for call in mock_cursor.executemany.call_args_list]
+    assert queries == ["INSERT INTO Courses VALUES (%s)", QUERY]
+
+
+def test_savepoints_roll_back_failed_chunk_and_rows(mock_cursor):
+    """Test that failed statements are undone up to their savepoint."""
+    error = DatabaseError("Duplicate entry '2'")
+    mock_cursor.executemany.side_effect = DatabaseError("Duplicate entry")
+
+    def execute(query, row=None):
+        if row == (2, 'Sala 2', 30):
+            raise error
+
+    mock_cursor.execute.side_effect = execute
+    writer = BatchWriter(mock_cursor, QUERY, savepoints=True)
+
+    for room_id in (1, 2):
+        writer.add((room_id, f'Sala {room_id}', 30), f"room {room_id}")
+    writer.flush()
+
+    statements = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    assert statements == [
+        "SAVEPOINT batch_chunk", "ROLLBACK TO SAVEPOINT batch_chunk",
+        "SAVEPOINT batch_row", QUERY,
+        "SAVEPOINT batch_row", QUERY, "ROLLBACK TO SAVEPOINT batch_row"
+    ]
+    assert writer.written == 1
+    assert writer.failed == [("room 2", error)]
+
+
+def test_dry_run_counts_rows_without_writing(mock_cursor):
+    """Test that a dry-run writer only counts the rows it would write."""
+    progress = Counter()
+    writer = BatchWriter(mock_cursor, QUERY, batch_size=2, progress=progress,
+                         dry_run=True)
+
+    for room_id in (1, 2, 3):
+        writer.add((room_id, f'Sala {room_id}', 30))
+    writer.flush()
+
+    mock_cursor.executemany.assert_not_called()
+    mock_cursor.execute.assert_not_called()
+    assert writer.written == 3
+    assert progress['inserted'] == 3
@@ -0,0 +1,100 @@
+"""Unit tests for the benchmarks package.
+
+This module contains tests for the synthetic dataset generator and for the
+import benchmark run against the SQLite stand-in database.
+"""
+
+import json
+from unittest.mock import patch
+import pytest
+from benchmarks.dataset import FILE_TYPES, UniversityDataset, scaled_counts
+from benchmarks.import_benchmark import format_results, run_benchmark
+from benchmarks.sqlite_db import sqlite_database
+from db import DatabaseConnection, DatabaseError
+from Service.import_service import ImportService
+
+SMALL_COUNTS = {'students': 40, 'professors': 4, 'courses': 12,
+                'sections': 6, 'rooms': 3, 'sections_per_student': 2}
+
+
+@pytest.fixture
+def dataset_files(tmp_path):
+    """Write a small dataset and return the path of each file."""
+    return UniversityDataset(seed=7, counts=SMALL_COUNTS).write(
+        str(tmp_path / 'dataset'))
+
+
+def test_scaled_counts_keeps_at_least_one_record():
+    """Test that tiny scales still generate every kind of record."""
+    counts = scaled_counts(0.00001)
+
+    assert all(count >= 1 for count in counts.values())
+    assert counts['sections_per_student'] == 1
+
+
+def test_dataset_is_reproducible_from_seed():
+    """Test that the same seed generates the same records."""
+    first = UniversityDataset(seed=3, counts=SMALL_COUNTS)
+    second = UniversityDataset(seed=3, counts=SMALL_COUNTS)
+    other = UniversityDataset(seed=4, counts=SMALL_COUNTS)
+
+    for file_type in FILE_TYPES:
+        assert (list(first.records(file_type))
+                == list(second.records(file_type)))
+    assert (list(first.records('notas_alumnos'))
+            != list(other.records('notas_alumnos')))
+
+
+def test_generated_files_pass_validation(dataset_files):
+    """Test that every generated file is valid for the importer."""
+    with patch('Service.import_service.DatabaseConnection'):
+        service = ImportService()
+
+    for file_type, path in dataset_files.items():
+        with open(path, encoding='utf-8') as file:
+            assert service._validate_data(file_type, json.load(file)), file_type
+
+
+def test_generated_prerequisites_point_to_earlier_courses():
+    """Test that the prerequisite graph is acyclic by construction."""
+    dataset = UniversityDataset(seed=1, counts=SMALL_COUNTS)
+
+    for course_id, prerequisites in enumerate(dataset.prerequisites, 1):
+        assert all(prereq < course_id for prereq in prerequisites)
+
+
+def test_sqlite_database_reports_driver_errors(tmp_path):
+    """Test that constraint violations surface as DatabaseError."""
+    with sqlite_database(str(tmp_path / 'test.db')) as db:
+        cursor = db.connect()
+        cursor.execute("INSERT INTO Rooms (name, capacity) VALUES (%s, %s)",
+                       ('Sala A', 30))
+        with pytest.raises(DatabaseError, match="UNIQUE"):
+            cursor.execute(
+                "INSERT INTO Rooms (name, capacity) VALUES (%s, %s)",
+                ('Sala A', 40))
+
+
+def test_run_benchmark_imports_every_file(dataset_files, tmp_path):
+    """Test a full benchmark run against the SQLite stand-in."""
+    previous_pool = DatabaseConnection().pool
+
+    results = run_benchmark(dataset_files, mode='pipeline',
+                            work_dir=str(tmp_path))
+
+    assert list(results)[:4] == ['alumnos', 'profesores', 'cursos',
+                                 'salas_clases']
+    assert set(results) == set(FILE_TYPES)
+    for file_type, result in results.items():
+        assert result['failed'] == 0, file_type
+        assert result['records'] > 0
+        assert result['peak_bytes'] > 0
+    assert results['alumnos_seccion']['inserted'] == 80
+    assert DatabaseConnection().pool is previous_pool
+    assert "notas_alumnos" in format_results(results)
+
+
+def test_run_benchmark_rejects_unknown_mode(dataset_files):
+    """Test that only the import modes can be benchmarked."""
+    with pytest.raises(ValueError, match="Mode must be one of"):
+        run_benchmark(dataset_files, mode='parallel')
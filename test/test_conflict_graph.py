@@ -0,0 +1,72 @@
+"""Unit tests for the conflict_graph module.
+
+This module contains tests for building the weighted section conflict graph
+from enrollments, listing forbidden overlaps by index and DSatur ordering.
+"""
+
+import random
+import time
+from Service.conflict_graph import (
+    conflict_graph, dsatur_order, section_conflicts
+)
+
+
+def test_conflict_graph_counts_students_shared_by_each_pair():
+    """Test the weights of a small graph."""
+    enrollments = [(1, 'A'), (1, 'B'), (1, 'C'),
+                   (2, 'A'), (2, 'B'),
+                   (3, 'D')]
+
+    assert conflict_graph(enrollments) == {
+        'A': {'B': 2, 'C': 1},
+        'B': {'A': 2, 'C': 1},
+        'C': {'A': 1, 'B': 1}
+    }
+
+
+def test_conflict_graph_ignores_repeated_enrollments():
+    """Test that a student counts once for each pair."""
+    assert conflict_graph([(1, 'A'), (1, 'A'), (1, 'B')]) == {
+        'A': {'B': 1}, 'B': {'A': 1}
+    }
+
+
+def test_section_conflicts_keep_pairs_sharing_enough_students():
+    """Test the threshold for forbidden overlaps."""
+    graph = conflict_graph([(1, 'A'), (1, 'B'), (1, 'C'), (2, 'A'), (2, 'B')])
+
+    assert section_conflicts(['A', 'B', 'C'], graph) == [[1, 2], [0, 2],
+                                                         [0, 1]]
+    assert section_conflicts(['A', 'B', 'C'], graph, min_shared=2) == [
+        [1], [0], []
+    ]
+    assert section_conflicts(['C', 'E'], graph) == [[], []]
+
+
+def test_dsatur_order_colors_conflicting_sections_apart():
+    """Test that the order starts at the busiest section and colors it."""
+    graph = conflict_graph([(1, 'A'), (1, 'B'), (2, 'B'), (2, 'C'),
+                            (3, 'B'), (3, 'D'), (4, 'C'), (4, 'D')])
+    section_ids = ['A', 'B', 'C', 'D', 'E']
+
+    order, colors = dsatur_order(section_ids, graph)
+
+    assert order[0] == 1
+    assert sorted(order) == [0, 1, 2, 3, 4]
+    for index, section_id in enumerate(section_ids):
+        for other_id in graph.get(section_id, {}):
+            assert colors[index] != colors[section_ids.index(other_id)]
+    assert max(colors) == 2
+
+
+def test_conflict_graph_is_fast_for_50k_enrollments():
+    """Test that building the graph and its order stays well under a second."""
+    rng = random.Random(1)
+    enrollments = [(student, section) for student in range(10000)
+                   for section in rng.sample(range(1500), 5)]
+
+    started = time.perf_counter()
+    graph = conflict_graph(enrollments)
+    dsatur_order(list(range(1500)), graph)
+
+    assert time.perf_counter() - started < 2
@@ -126,6 +126,33 @@ def test_get_students_by_section_returns_empty_when_none(course_taken_service, m
     assert result == []
 
 
+def test_get_students_with_activity_grade_uses_single_query(course_taken_service, mock_db):
+    """Test getting a section's students and activity grades in one query."""
+    _, mock_cursor = mock_db
+    expected_rows = [
+        {'user_id': 1, 'user_name': 'Juan Pérez', 'user_email': 'juan@email.com',
+         'final_grade': None, 'grade_id': 4, 'grade': 6.0},
+        {'user_id': 2, 'user_name': 'María García', 'user_email': 'maria@email.com',
+         'final_grade': None, 'grade_id': None, 'grade': None}
+    ]
+    mock_cursor.fetchall.return_value = expected_rows
+
+    result = course_taken_service.get_students_with_activity_grade(1, 7)
+
+    expected_query = (
+        "SELECT u.id AS user_id, u.name AS user_name, "
+        "u.email AS user_email, ct.final_grade, "
+        "g.id AS grade_id, g.grade "
+        "FROM Courses_Taken ct "
+        "JOIN Users u ON ct.user_id = u.id "
+        "LEFT JOIN Grades g ON g.user_id = ct.user_id "
+        "AND g.activity_id = %s "
+        "WHERE ct.section_id = %s"
+    )
+    mock_cursor.execute.assert_called_once_with(expected_query, (7, 1))
+    assert result == expected_rows
+
+
 def test_get_courses_taken_by_user_returns_user_courses(course_taken_service, mock_db):
     """Test getting all courses taken by a specific user."""
     _, mock_cursor = mock_db
@@ -236,6 +263,32 @@ def test_update_final_grade_success(course_taken_service, mock_db):
     mock_db_instance.commit.assert_called_once()
 
 
+def test_update_final_grades_updates_all_students(course_taken_service, mock_db):
+    """Test updating several final grades in one batch."""
+    mock_db_instance, mock_cursor = mock_db
+
+    course_taken_service.update_final_grades(3, {1: 6.5, 2: 4.0})
+
+    expected_query = (
+        "UPDATE Courses_Taken SET final_grade = %s "
+        "WHERE user_id = %s AND section_id = %s"
+    )
+    mock_cursor.executemany.assert_called_once_with(
+        expected_query, [(6.5, 1, 3), (4.0, 2, 3)]
+    )
+    mock_db_instance.commit.assert_called_once()
+
+
+def test_update_final_grades_with_no_grades(course_taken_service, mock_db):
+    """Test that an empty batch does not touch the database."""
+    mock_db_instance, mock_cursor = mock_db
+
+    course_taken_service.update_final_grades(3, {})
+
+    mock_cursor.executemany.assert_not_called()
+    mock_db_instance.commit.assert_not_called()
+
+
 def test_is_student_enrolled_returns_true_when_enrolled(course_taken_service, mock_db):
     """Test checking enrollment when student is enrolled."""
     _, mock_cursor = mock_db
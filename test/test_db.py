@@ -0,0 +1,301 @@
+"""Unit tests for the db module.
+
+This module contains tests for the ConnectionPool class and the pooled
+DatabaseConnection singleton, including checkout, health checks and stats.
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from db import ConnectionPool, DatabaseConnection
+
+
+def make_connection(healthy=True):
+    """Create a mock MySQL connection."""
+    conn = Mock()
+    conn.is_connected.return_value = healthy
+    return conn
+
+
+@pytest.fixture
+def factory():
+    """Create a connection factory that returns a new mock every call."""
+    return Mock(side_effect=lambda: make_connection())
+
+
+@pytest.fixture
+def database_connection():
+    """Create a fresh DatabaseConnection singleton with a mocked pool."""
+    DatabaseConnection._instance = None
+    with patch('db._open_connection', side_effect=make_connection):
+        yield DatabaseConnection()
+    DatabaseConnection._instance = None
+
+
+def test_pool_rejects_invalid_size(factory):
+    """Test that a pool needs room for at least one connection."""
+    with pytest.raises(ValueError, match="at least 1"):
+        ConnectionPool(factory, size=0)
+
+
+def test_checkout_opens_connections_lazily(factory):
+    """Test that connections are only opened when checked out."""
+    pool = ConnectionPool(factory, size=2)
+    assert factory.call_count == 0
+
+    pool.checkout()
+
+    assert factory.call_count == 1
+    assert pool.stats()['in_use'] == 1
+
+
+def test_checkin_reuses_connection(factory):
+    """Test that a returned connection is handed out again."""
+    pool = ConnectionPool(factory, size=2)
+    conn = pool.checkout()
+    pool.checkin(conn)
+
+    assert pool.checkout() is conn
+    assert factory.call_count == 1
+    conn.rollback.assert_called_once()
+
+
+def test_checkout_discards_unhealthy_connection(factory):
+    """Test that a dead idle connection is replaced on checkout."""
+    pool = ConnectionPool(factory, size=1)
+    conn = pool.checkout()
+    pool.checkin(conn)
+    conn.is_connected.return_value = False
+
+    new_conn = pool.checkout()
+
+    assert new_conn is not conn
+    conn.close.assert_called_once()
+    assert pool.stats()['discarded'] == 1
+
+
+def test_checkin_discards_connection_that_fails_rollback(factory):
+    """Test that a broken connection is not returned to the pool."""
+    pool = ConnectionPool(factory, size=1)
+    conn = pool.checkout()
+    conn.rollback.side_effect = Exception("Lost connection")
+
+    pool.checkin(conn)
+
+    assert pool.stats()['idle'] == 0
+    assert pool.checkout() is not conn
+
+
+def test_checkout_times_out_when_pool_exhausted(factory):
+    """Test that checkout gives up after the configured timeout."""
+    pool = ConnectionPool(factory, size=1, timeout=0.01)
+    pool.checkout()
+
+    with pytest.raises(TimeoutError, match="waiting for a database"):
+        pool.checkout()
+
+
+def test_checkout_waits_for_returned_connection(factory):
+    """Test that a blocked checkout is served by a checkin and recorded."""
+    pool = ConnectionPool(factory, size=1, timeout=5)
+    conn = pool.checkout()
+    timer = threading.Timer(0.05, pool.checkin, args=(conn,))
+    timer.start()
+
+    assert pool.checkout() is conn
+    timer.join()
+
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['max_wait_seconds'] > 0
+    assert stats['checkouts'] == 2
+
+
+def test_checkout_waits_for_discarded_connection(factory):
+    """Test that a blocked checkout opens a connection once one is dropped."""
+    pool = ConnectionPool(factory, size=1, timeout=5)
+    conn = pool.checkout()
+    conn.rollback.side_effect = Exception("Lost connection")
+    timer = threading.Timer(0.05, pool.checkin, args=(conn,))
+    timer.start()
+
+    new_conn = pool.checkout()
+    timer.join()
+
+    assert new_conn is not conn
+    assert factory.call_count == 2
+    stats = pool.stats()
+    assert stats['waits'] == 1
+    assert stats['discarded'] == 1
+    assert stats['in_use'] == 1
+
+
+def test_failed_open_frees_reserved_slot():
+    """Test that a connection error does not leak pool capacity."""
+    factory = Mock(side_effect=[Exception("Cannot connect"),
+                                make_connection()])
+    pool = ConnectionPool(factory, size=1)
+
+    with pytest.raises(Exception, match="Cannot connect"):
+        pool.checkout()
+
+    assert pool.checkout() is not None
+
+
+def test_database_connection_is_singleton(database_connection):
+    """Test that every DatabaseConnection() is the same object."""
+    assert DatabaseConnection() is database_connection
+
+
+def test_database_connection_does_not_connect_on_creation(database_connection):
+    """Test that creating the singleton does not open a connection."""
+    assert database_connection.pool_stats()['created'] == 0
+
+
+def test_connect_returns_dictionary_cursor(database_connection):
+    """Test that connect checks out a connection and returns a cursor."""
+    cursor = database_connection.connect()
+
+    database_connection.conn.cursor.assert_called_once_with(dictionary=True)
+    assert cursor == database_connection.conn.cursor.return_value
+
+
+def test_threads_get_different_connections(database_connection):
+    """Test that concurrent threads do not share a connection."""
+    connections = []
+
+    def worker():
+        connections.append(database_connection.conn)
+        database_connection.release()
+
+    main_conn = database_connection.conn
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert connections[0] is not main_conn
+
+
+def test_release_returns_connection_to_pool(database_connection):
+    """Test that release checks the thread's connection back in."""
+    conn = database_connection.conn
+    database_connection.release()
+
+    assert database_connection.pool_stats()['idle'] == 1
+    assert database_connection.conn is conn
+
+
+def test_release_without_connection_is_noop(database_connection):
+    """Test that releasing when nothing was checked out does nothing."""
+    database_connection.release()
+
+    assert database_connection.pool_stats()['checkouts'] == 0
+
+
+def test_commit_is_deferred_inside_unit_of_work(database_connection):
+    """Test that service commits wait for the unit of work to complete."""
+    conn = database_connection.conn
+    database_connection.begin_unit_of_work()
+
+    database_connection.commit()
+    database_connection.commit()
+    conn.commit.assert_not_called()
+
+    database_connection.complete_unit_of_work()
+    conn.commit.assert_called_once()
+
+
+def test_complete_unit_of_work_without_writes_does_not_commit(database_connection):
+    """Test that a read-only unit of work skips the commit round trip."""
+    database_connection.begin_unit_of_work()
+    database_connection.complete_unit_of_work()
+
+    assert database_connection.pool_stats()['checkouts'] == 0
+
+
+def test_abort_unit_of_work_rolls_back(database_connection):
+    """Test that aborting discards the deferred writes."""
+    conn = database_connection.conn
+    database_connection.begin_unit_of_work()
+    database_connection.commit()
+
+    database_connection.abort_unit_of_work()
+
+    conn.commit.assert_not_called()
+    conn.rollback.assert_called_once()
+    assert database_connection.in_unit_of_work() is False
+
+
+def test_abort_outside_unit_of_work_is_noop(database_connection):
+    """Test that aborting after completion does not roll back."""
+    conn = database_connection.conn
+    database_connection.abort_unit_of_work()
+
+    conn.rollback.assert_not_called()
+
+
+def test_commit_outside_unit_of_work_is_immediate(database_connection):
+    """Test that commits outside a unit of work reach the database."""
+    database_connection.commit()
+
+    database_connection.conn.commit.assert_called_once()
+
+
+def test_unit_of_work_context_rolls_back_on_error(database_connection):
+    """Test that an exception inside the block rolls everything back."""
+    conn = database_connection.conn
+
+    with pytest.raises(ValueError):
+        with database_connection.unit_of_work():
+            database_connection.commit()
+            raise ValueError("Invalid grade")
+
+    conn.commit.assert_not_called()
+    conn.rollback.assert_called_once()
+
+
+def test_nested_unit_of_work_joins_outer(database_connection):
+    """Test that an inner unit of work does not commit on its own."""
+    conn = database_connection.conn
+
+    with database_connection.unit_of_work():
+        with database_connection.unit_of_work():
+            database_connection.commit()
+        conn.commit.assert_not_called()
+
+    conn.commit.assert_called_once()
+
+
+def test_autocommit_opts_out_of_unit_of_work(database_connection):
+    """Test that long jobs commit immediately and the unit of work resumes."""
+    conn = database_connection.conn
+    database_connection.begin_unit_of_work()
+    database_connection.commit()
+
+    with database_connection.autocommit():
+        assert conn.commit.call_count == 1
+        database_connection.commit()
+        assert conn.commit.call_count == 2
+
+    assert database_connection.in_unit_of_work() is True
+    database_connection.complete_unit_of_work()
+    assert conn.commit.call_count == 2
+
+
+def test_autocommit_runs_inner_units_of_work_on_their_own(database_connection):
+    """Test that units of work inside autocommit commit on their own."""
+    conn = database_connection.conn
+    database_connection.begin_unit_of_work()
+
+    with pytest.raises(RuntimeError):
+        with database_connection.autocommit():
+            with database_connection.unit_of_work():
+                database_connection.commit()
+            assert conn.commit.call_count == 1
+            with database_connection.unit_of_work():
+                database_connection.commit()
+                raise RuntimeError("Lost connection")
+
+    conn.rollback.assert_called_once()
+    assert conn.commit.call_count == 1
+    assert database_connection.in_unit_of_work() is True
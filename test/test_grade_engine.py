@@ -0,0 +1,251 @@
+"""Unit tests for GradeEngine module.
+
+This module contains tests for the SectionGradebook arrays and the
+vectorized topic and final grade computations of the GradeEngine class.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import Mock, patch
+from Service.grade_engine import GradeEngine, SectionGradebook
+
+
+@pytest.fixture
+def mock_db():
+    """Create a mock database connection."""
+    mock_db = Mock()
+    mock_cursor = Mock()
+    mock_db.connect.return_value = mock_cursor
+    return mock_db, mock_cursor
+
+
+@pytest.fixture
+def grade_engine(mock_db):
+    """Create GradeEngine instance with mocked database."""
+    mock_db_instance, _ = mock_db
+    with patch('Service.grade_engine.DatabaseConnection') as mock_db_class:
+        mock_db_class.return_value = mock_db_instance
+        return GradeEngine()
+
+
+@pytest.fixture
+def weight_gradebook():
+    """Create a weight-based section with two topics and three students."""
+    section = {'id': 1, 'weight_or_percentage': False}
+    topics = [
+        {'id': 1, 'name': 'Controles', 'weight': 60, 'weight_or_percentage': False},
+        {'id': 2, 'name': 'Tareas', 'weight': 40, 'weight_or_percentage': False}
+    ]
+    activities = [
+        {'id': 10, 'topic_id': 1, 'instance': 1, 'weight': 1, 'optional_flag': False},
+        {'id': 11, 'topic_id': 1, 'instance': 2, 'weight': 1, 'optional_flag': True},
+        {'id': 20, 'topic_id': 2, 'instance': 1, 'weight': 2, 'optional_flag': False}
+    ]
+    grades = [
+        {'user_id': 1, 'activity_id': 10, 'grade': 6.0},
+        {'user_id': 1, 'activity_id': 20, 'grade': 5.0},
+        {'user_id': 2, 'activity_id': 10, 'grade': 4.0},
+        {'user_id': 2, 'activity_id': 11, 'grade': 6.0},
+        {'user_id': 2, 'activity_id': 20, 'grade': 7.0}
+    ]
+    return SectionGradebook(section, topics, activities, [1, 2, 3], grades)
+
+
+@pytest.fixture
+def percentage_gradebook():
+    """Create a percentage section whose topic percentages are incomplete."""
+    section = {'id': 2, 'weight_or_percentage': True}
+    topics = [
+        {'id': 1, 'name': 'Pruebas', 'weight': 700, 'weight_or_percentage': True},
+        {'id': 2, 'name': 'Proyecto', 'weight': 300, 'weight_or_percentage': False}
+    ]
+    activities = [
+        {'id': 10, 'topic_id': 1, 'instance': 1, 'weight': 400, 'optional_flag': False},
+        {'id': 11, 'topic_id': 1, 'instance': 2, 'weight': 600, 'optional_flag': True},
+        {'id': 20, 'topic_id': 2, 'instance': 1, 'weight': 5, 'optional_flag': False}
+    ]
+    grades = [
+        {'user_id': 7, 'activity_id': 10, 'grade': 5.0},
+        {'user_id': 7, 'activity_id': 20, 'grade': 6.0}
+    ]
+    return SectionGradebook(section, topics, activities, [7], grades)
+
+
+def test_gradebook_builds_grade_matrix(weight_gradebook):
+    """Test that grades land in a students x activities matrix."""
+    assert weight_gradebook.grades.shape == (3, 3)
+    assert weight_gradebook.grades[0, 0] == 6.0
+    assert np.isnan(weight_gradebook.grades[0, 1])
+    assert np.isnan(weight_gradebook.grades[2]).all()
+
+
+def test_gradebook_builds_topic_membership(weight_gradebook):
+    """Test that every activity belongs to exactly one topic column."""
+    assert weight_gradebook.membership.tolist() == [
+        [1.0, 0.0], [1.0, 0.0], [0.0, 1.0]
+    ]
+    assert [cols.tolist() for cols in weight_gradebook.topic_columns] == [
+        [0, 1], [2]
+    ]
+
+
+def test_gradebook_scales_percentages(percentage_gradebook):
+    """Test that stored percentages are converted to fractions."""
+    assert percentage_gradebook.activity_weights.tolist() == [0.4, 0.6, 5.0]
+    assert percentage_gradebook.topic_weights.tolist() == [0.7, 0.3]
+
+
+def test_gradebook_ignores_grades_outside_section(weight_gradebook):
+    """Test that grades of unknown students or activities are dropped."""
+    gradebook = SectionGradebook(
+        weight_gradebook.section, weight_gradebook.topics,
+        weight_gradebook.activities, [1],
+        [{'user_id': 1, 'activity_id': 99, 'grade': 7.0},
+         {'user_id': 5, 'activity_id': 10, 'grade': 7.0}])
+
+    assert np.isnan(gradebook.grades).all()
+
+
+def test_gradebook_reports_students_with_invalid_grades(grade_engine,
+                                                        weight_gradebook):
+    """Test that a bad grade skips its student while NULL counts as missing."""
+    gradebook = SectionGradebook(
+        weight_gradebook.section, weight_gradebook.topics,
+        weight_gradebook.activities, [1, 2],
+        [{'user_id': 1, 'activity_id': 10, 'grade': None},
+         {'user_id': 2, 'activity_id': 10, 'grade': 'n/a'}])
+
+    assert gradebook.errors == {2: "Invalid grade 'n/a' for activity 10"}
+    result = grade_engine.compute(gradebook)
+    assert grade_engine.final_grades(gradebook, result) == {1: 1.0}
+
+
+def test_compute_weight_based_final_grades(grade_engine, weight_gradebook):
+    """Test final grades with weights, optional and missing activities."""
+    result = grade_engine.compute(weight_gradebook)
+
+    assert result['topic_grades'].tolist() == [[6.0, 5.0], [5.0, 7.0], [1.0, 1.0]]
+    assert grade_engine.final_grades(weight_gradebook, result) == {
+        1: pytest.approx(5.6), 2: pytest.approx(5.8), 3: 1.0
+    }
+
+
+def test_compute_skips_missing_optional_activities(grade_engine, weight_gradebook):
+    """Test that missing optional activities do not count as 1.0."""
+    result = grade_engine.compute(weight_gradebook)
+
+    assert result['included'][0].tolist() == [True, False, True]
+    assert result['included'][2].tolist() == [True, False, True]
+    assert result['topic_total_weights'][0].tolist() == [1.0, 2.0]
+
+
+def test_compute_reports_missing_percentage(grade_engine, percentage_gradebook):
+    """Test that an incomplete percentage topic is redistributed."""
+    result = grade_engine.compute(percentage_gradebook)
+
+    assert result['topic_grades'][0, 0] == pytest.approx(5.0)
+    assert result['missing_percentages'][0].tolist() == [pytest.approx(60.0), 0.0]
+    assert result['final_grades'][0] == pytest.approx(5.3)
+    assert result['total_weight'] == pytest.approx(1.0)
+
+
+def test_compute_without_topics_defaults_to_minimum(grade_engine):
+    """Test that a section without evaluation scheme grades 1.0."""
+    gradebook = SectionGradebook({'id': 1, 'weight_or_percentage': False},
+                                 [], [], [1, 2], [])
+
+    result = grade_engine.compute(gradebook)
+
+    assert result['final_grades'].tolist() == [1.0, 1.0]
+    assert result['total_weight'] == 0
+
+
+def test_compute_topic_without_activities_defaults_to_minimum(grade_engine):
+    """Test that a topic with no weighted activities grades 1.0."""
+    gradebook = SectionGradebook(
+        {'id': 1, 'weight_or_percentage': False},
+        [{'id': 1, 'name': 'Vacío', 'weight': 10, 'weight_or_percentage': False}],
+        [], [1], [])
+
+    result = grade_engine.compute(gradebook)
+
+    assert result['topic_grades'].tolist() == [[1.0]]
+
+
+def test_student_breakdown_matches_template_structure(grade_engine, weight_gradebook):
+    """Test the per-student breakdown rendered by the grade page."""
+    result = grade_engine.compute(weight_gradebook)
+
+    breakdown = grade_engine.student_breakdown(weight_gradebook, result, 1)
+
+    assert breakdown['final_grade'] == pytest.approx(5.6)
+    assert breakdown['total_weight'] == 100.0
+    controles = breakdown['topic_calculations'][0]
+    assert controles['topic']['name'] == 'Controles'
+    assert controles['grade'] == 6.0
+    assert controles['final_contribution'] == pytest.approx(360.0)
+    assert [a['grade'] for a in controles['activities']] == [6.0, None]
+    assert [a['contribution'] for a in controles['activities']] == [6.0, 0.0]
+
+
+def test_student_breakdown_marks_missing_mandatory_grade(grade_engine, weight_gradebook):
+    """Test that a missing mandatory grade is shown as 1.0."""
+    result = grade_engine.compute(weight_gradebook)
+
+    breakdown = grade_engine.student_breakdown(weight_gradebook, result, 3)
+
+    activities = breakdown['topic_calculations'][0]['activities']
+    assert activities[0]['grade'] == 1.0
+    assert activities[1]['grade'] is None
+
+
+def test_load_section_uses_constant_queries(grade_engine, mock_db):
+    """Test that a section is loaded with five queries."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [
+        [{'id': 1, 'name': 'Controles', 'weight': 1, 'weight_or_percentage': False}],
+        [{'id': 10, 'topic_id': 1, 'instance': 1, 'weight': 1, 'optional_flag': False}],
+        [{'user_id': 1}, {'user_id': 2}],
+        [{'user_id': 2, 'activity_id': 10, 'grade': 6.5}]
+    ]
+
+    gradebook = grade_engine.load_section(1)
+
+    assert mock_cursor.execute.call_count == 5
+    assert gradebook.user_ids == [1, 2]
+    assert gradebook.grades[1, 0] == 6.5
+
+
+def test_load_section_with_explicit_users(grade_engine, mock_db):
+    """Test that explicit user ids skip the enrollment query."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [[], [], []]
+
+    grade_engine.load_section(1, user_ids=[4])
+
+    query, params = mock_cursor.execute.call_args[0]
+    assert "g.user_id IN (%s)" in query
+    assert params == (1, 4)
+    assert mock_cursor.execute.call_count == 4
+
+
+def test_load_section_not_found(grade_engine, mock_db):
+    """Test that loading an unknown section raises ValueError."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = None
+
+    with pytest.raises(ValueError, match="Section not found"):
+        grade_engine.load_section(999)
+
+
+def test_calculate_section_loads_and_computes(grade_engine, weight_gradebook):
+    """Test the load and compute shortcut."""
+    with patch.object(grade_engine, 'load_section',
+                      return_value=weight_gradebook) as mock_load:
+        gradebook, result = grade_engine.calculate_section(1, user_ids=[1])
+
+    mock_load.assert_called_once_with(1, [1])
+    assert gradebook is weight_gradebook
+    assert result['final_grades'].shape == (3,)
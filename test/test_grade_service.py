@@ -22,8 +22,10 @@ def mock_db():
 def grade_service(mock_db):
     """Create GradeService instance with mocked database."""
     mock_db_instance, _ = mock_db
-    with patch('Service.grade_service.DatabaseConnection') as mock_db_class:
+    with patch('Service.grade_service.DatabaseConnection') as mock_db_class, \
+         patch('Service.grade_engine.DatabaseConnection') as mock_engine_db_class:
         mock_db_class.return_value = mock_db_instance
+        mock_engine_db_class.return_value = mock_db_instance
         return GradeService()
 
 
@@ -207,236 +209,227 @@ def test_update_grade_success(grade_service, mock_db):
     mock_db_instance.commit.assert_called_once()
 
 
-def test_delete_grade_success(grade_service, mock_db):
-    """Test successful deletion of a grade."""
+def test_bulk_upsert_writes_all_grades_in_one_statement(grade_service, mock_db):
+    """Test that new and changed grades are written in one batch."""
     mock_db_instance, mock_cursor = mock_db
-    grade_id = 1
+    mock_cursor.fetchall.return_value = [
+        {'user_id': 1, 'grade': 5.0},
+        {'user_id': 2, 'grade': 6.0}
+    ]
 
-    grade_service.delete(grade_id)
+    counts = grade_service.bulk_upsert(3, {1: 5.5, 2: 6.0, 4: 7.0})
 
-    expected_query = "DELETE FROM Grades WHERE id = %s"
-    mock_cursor.execute.assert_called_once_with(expected_query, (grade_id,))
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 1}
+    assert mock_cursor.execute.call_count == 2
+    query, params = mock_cursor.execute.call_args[0]
+    assert query == (
+        "INSERT INTO Grades (grade, user_id, activity_id) "
+        "VALUES (%s, %s, %s), (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE grade = VALUES(grade)"
+    )
+    assert params == (5.5, 1, 3, 7.0, 4, 3)
     mock_db_instance.commit.assert_called_once()
 
 
-def test_fetch_grade_calculation_data_returns_structured_data(grade_service, mock_db):
-    """Test fetching grade calculation data with proper structure."""
-    _, mock_cursor = mock_db
-    user_id = 1
-    section_id = 1
-    
-    topics = [{'id': 1, 'name': 'Controles', 'weight': 500, 'weight_or_percentage': True}]
-    activities = [{'id': 1, 'instance': 1, 'weight': 300, 'optional_flag': False}]
-    grade_result = {'grade': 5.5}
-    
-    mock_cursor.fetchall.side_effect = [topics, activities]
-    mock_cursor.fetchone.return_value = grade_result
-
-    result = grade_service._fetch_grade_calculation_data(user_id, section_id)
-
-    mock_cursor.execute.assert_any_call(
-        "SELECT id, name, weight, weight_or_percentage "
-        "FROM Topics WHERE section_id = %s",
-        (section_id,)
-    )
+def test_bulk_upsert_skips_write_when_nothing_changed(grade_service, mock_db):
+    """Test that unchanged grades do not issue a write."""
+    mock_db_instance, mock_cursor = mock_db
+    mock_cursor.fetchall.return_value = [{'user_id': 1, 'grade': 5.5}]
 
-    assert len(result) == 1
-    assert result[0]['activities'][0]['grade_result'] == grade_result
+    counts = grade_service.bulk_upsert(3, {1: 5.5})
 
+    assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+    assert mock_cursor.execute.call_count == 1
+    mock_db_instance.commit.assert_not_called()
 
-def test_calculate_activity_grade_with_percentage_system(grade_service, mock_db):
-    """Test calculating activity grade contribution with percentage system."""
-    activity = {
-        'weight': 30,
-        'optional_flag': False,
-        'grade_result': {'grade': 6.0}
-    }
-    is_percentage = True
 
-    contribution, weight_contribution = grade_service._calculate_activity_grade(
-        activity, is_percentage
-    )
+def test_bulk_upsert_counts_null_grades_as_updated(grade_service, mock_db):
+    """Test that filling in a stored NULL grade counts as an update."""
+    mock_db_instance, mock_cursor = mock_db
+    mock_cursor.fetchall.return_value = [{'user_id': 1, 'grade': None},
+                                         {'user_id': 2, 'grade': None}]
 
-    assert contribution == pytest.approx(1.8)
-    assert weight_contribution == pytest.approx(0.3)
+    counts = grade_service.bulk_upsert(3, {1: 6.0, 2: None})
 
+    assert counts == {'inserted': 0, 'updated': 1, 'unchanged': 1}
+    assert mock_cursor.execute.call_args[0][1] == (6.0, 1, 3)
+    mock_db_instance.commit.assert_called_once()
 
-def test_calculate_activity_grade_with_weight_system(grade_service, mock_db):
-    """Test calculating activity grade contribution with weight system."""
-    activity = {
-        'weight': 300,
-        'optional_flag': False,
-        'grade_result': {'grade': 5.5}
-    }
-    is_percentage = False
 
-    contribution, weight_contribution = grade_service._calculate_activity_grade(
-        activity, is_percentage
-    )
+def test_bulk_upsert_with_no_grades(grade_service, mock_db):
+    """Test that an empty batch does not touch the database."""
+    mock_db_instance, mock_cursor = mock_db
 
-    assert contribution == 1650
-    assert weight_contribution == 300
+    counts = grade_service.bulk_upsert(3, {})
 
+    assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    mock_cursor.execute.assert_not_called()
+    mock_db_instance.commit.assert_not_called()
 
-def test_calculate_activity_grade_optional_without_grade(grade_service, mock_db):
-    """Test calculating activity grade for optional activity without grade."""
-    activity = {
-        'weight': 300,
-        'optional_flag': True,
-        'grade_result': None
-    }
-    is_percentage = False
 
-    contribution, weight_contribution = grade_service._calculate_activity_grade(
-        activity, is_percentage
-    )
+def test_delete_grade_success(grade_service, mock_db):
+    """Test successful deletion of a grade."""
+    mock_db_instance, mock_cursor = mock_db
+    grade_id = 1
 
-    assert contribution == 0
-    assert weight_contribution == 0
+    grade_service.delete(grade_id)
 
+    expected_query = "DELETE FROM Grades WHERE id = %s"
+    mock_cursor.execute.assert_called_once_with(expected_query, (grade_id,))
+    mock_db_instance.commit.assert_called_once()
 
-def test_calculate_activity_grade_mandatory_without_grade(grade_service, mock_db):
-    """Test calculating activity grade for mandatory activity without grade."""
-    activity = {
-        'weight': 300,
-        'optional_flag': False,
-        'grade_result': None
-    }
-    is_percentage = False
 
-    contribution, weight_contribution = grade_service._calculate_activity_grade(
-        activity, is_percentage
-    )
+@pytest.fixture
+def section_rows():
+    """Create the rows of a weight-based section with three students."""
+    topics = [
+        {'id': 1, 'name': 'Controles', 'weight': 600, 'weight_or_percentage': False},
+        {'id': 2, 'name': 'Tareas', 'weight': 400, 'weight_or_percentage': False}
+    ]
+    activities = [
+        {'id': 10, 'topic_id': 1, 'instance': 1, 'weight': 1, 'optional_flag': False},
+        {'id': 11, 'topic_id': 1, 'instance': 2, 'weight': 1, 'optional_flag': True},
+        {'id': 20, 'topic_id': 2, 'instance': 1, 'weight': 1, 'optional_flag': False}
+    ]
+    enrollments = [{'user_id': 1}, {'user_id': 2}, {'user_id': 3}]
+    grades = [
+        {'user_id': 1, 'activity_id': 10, 'grade': 6.0},
+        {'user_id': 1, 'activity_id': 20, 'grade': 5.0},
+        {'user_id': 2, 'activity_id': 10, 'grade': 4.0},
+        {'user_id': 2, 'activity_id': 11, 'grade': 6.0},
+        {'user_id': 2, 'activity_id': 20, 'grade': 7.0}
+    ]
+    return topics, activities, enrollments, grades
 
-    assert contribution == 300
-    assert weight_contribution == 300
-
-
-def test_calculate_topic_grade_with_activities(grade_service, mock_db):
-    """Test calculating final grade for a topic with activities."""
-    topic = {
-        'weight_or_percentage': False,
-        'activities': [
-            {
-                'weight': 300,
-                'optional_flag': False,
-                'grade_result': {'grade': 6.0}
-            },
-            {
-                'weight': 200,
-                'optional_flag': False,
-                'grade_result': {'grade': 5.0}
-            }
-        ]
-    }
 
-    result = grade_service._calculate_topic_grade(topic)
+def test_calculate_final_grades_for_section_uses_constant_queries(grade_service, mock_db, section_rows):
+    """Test that a whole section is graded with five queries."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = list(section_rows)
+
+    result = grade_service.calculate_final_grades_for_section(1)
 
-    assert result == pytest.approx(5.6)
+    assert mock_cursor.execute.call_count == 5
+    assert result == {1: pytest.approx(5.6), 2: pytest.approx(5.8), 3: 1.0}
 
 
-def test_calculate_topic_grade_with_no_activities(grade_service, mock_db):
-    """Test calculating topic grade when there are no activities."""
-    topic = {
-        'weight_or_percentage': False,
-        'activities': []
-    }
+def test_calculate_final_grades_for_section_filters_requested_users(grade_service, mock_db):
+    """Test that explicit user ids skip the enrollment query."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 7, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [[], [], []]
 
-    result = grade_service._calculate_topic_grade(topic)
+    grade_service.calculate_final_grades_for_section(7, user_ids=[1, 2])
 
-    assert result == 0
+    query, params = mock_cursor.execute.call_args[0]
+    assert "g.user_id IN (%s, %s)" in query
+    assert params == (7, 1, 2)
+    assert mock_cursor.execute.call_count == 4
 
 
-def test_calculate_topic_grade_with_only_optional_activities_no_grades(grade_service, mock_db):
-    """Test calculating topic grade with only optional activities without grades."""
-    topic = {
-        'weight_or_percentage': False,
-        'activities': [
-            {
-                'weight': 300,
-                'optional_flag': True,
-                'grade_result': None
-            }
-        ]
-    }
+def test_calculate_final_grades_for_section_without_students(grade_service, mock_db):
+    """Test that an empty section does not query grades."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [[], [], []]
 
-    result = grade_service._calculate_topic_grade(topic)
+    result = grade_service.calculate_final_grades_for_section(1)
 
-    assert result == 0
+    assert result == {}
+    assert mock_cursor.execute.call_count == 4
 
 
-def test_calculate_final_grade_with_multiple_topics(grade_service, mock_db):
-    """Test calculating final grade with multiple topics."""
+def test_calculate_final_grade_for_single_student(grade_service, mock_db, section_rows):
+    """Test calculating one student's final grade through the engine."""
     _, mock_cursor = mock_db
-    user_id = 1
-    section_id = 1
+    topics, activities, _, grades = section_rows
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [
+        topics, activities, [g for g in grades if g['user_id'] == 2]
+    ]
 
-    topics_data = [
-        {
-            'id': 1, 'name': 'Controles', 'weight': 600, 'weight_or_percentage': False,
-            'activities': [
-                {
-                    'weight': 300,
-                    'optional_flag': False,
-                    'grade_result': {'grade': 6.0}
-                }
-            ]
-        },
-        {
-            'id': 2, 'name': 'Tareas', 'weight': 400, 'weight_or_percentage': False,
-            'activities': [
-                {
-                    'weight': 200,
-                    'optional_flag': False,
-                    'grade_result': {'grade': 5.0}
-                }
-            ]
-        }
+    result = grade_service.calculate_final_grade(2, 1)
+
+    assert result == pytest.approx(5.8)
+
+
+def test_calculate_final_grade_reports_invalid_grades(grade_service, mock_db, section_rows):
+    """Test that a grade that is not a number raises with the reason."""
+    _, mock_cursor = mock_db
+    topics, activities, _, _ = section_rows
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [
+        topics, activities, [{'user_id': 2, 'activity_id': 20, 'grade': 'x'}]
     ]
-    
-    with patch.object(grade_service, '_fetch_grade_calculation_data', 
-                      return_value=topics_data):
-        result = grade_service.calculate_final_grade(user_id, section_id)
 
-    assert result == pytest.approx(5.6)
+    with pytest.raises(ValueError, match="Invalid grade 'x' for activity 20"):
+        grade_service.calculate_final_grade(2, 1)
 
 
 def test_calculate_final_grade_with_no_topics(grade_service, mock_db):
-    """Test calculating final grade when there are no topics."""
-    user_id = 1
-    section_id = 1
+    """Test that a section without topics grades the minimum."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [[], [], []]
 
-    with patch.object(grade_service, '_fetch_grade_calculation_data', 
-                      return_value=[]):
-        result = grade_service.calculate_final_grade(user_id, section_id)
+    result = grade_service.calculate_final_grade(1, 1)
 
-    assert result == 0
+    assert result == 1.0
+
+
+def test_calculate_final_grade_with_percentage_section(grade_service, mock_db):
+    """Test that stored percentages are weighted like the grade page."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': True}
+    mock_cursor.fetchall.side_effect = [
+        [{'id': 1, 'name': 'Pruebas', 'weight': 1000, 'weight_or_percentage': True}],
+        [
+            {'id': 10, 'topic_id': 1, 'instance': 1, 'weight': 300, 'optional_flag': False},
+            {'id': 11, 'topic_id': 1, 'instance': 2, 'weight': 700, 'optional_flag': False}
+        ],
+        [
+            {'user_id': 1, 'activity_id': 10, 'grade': 4.0},
+            {'user_id': 1, 'activity_id': 11, 'grade': 6.0}
+        ]
+    ]
+
+    result = grade_service.calculate_final_grade(1, 1)
+
+    assert result == pytest.approx(5.4)
 
 
 def test_calculate_final_grade_rounds_to_one_decimal(grade_service, mock_db):
     """Test that final grade is rounded to one decimal place."""
-    user_id = 1
-    section_id = 1
-    
-    topics_data = [
-        {
-            'id': 1, 'name': 'Test', 'weight': 300, 'weight_or_percentage': False,
-            'activities': [
-                {
-                    'weight': 100,
-                    'optional_flag': False,
-                    'grade_result': {'grade': 5.567}
-                }
-            ]
-        }
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [
+        [{'id': 1, 'name': 'Test', 'weight': 300, 'weight_or_percentage': False}],
+        [{'id': 10, 'topic_id': 1, 'instance': 1, 'weight': 100, 'optional_flag': False}],
+        [{'user_id': 1, 'activity_id': 10, 'grade': 5.567}]
     ]
-    
-    with patch.object(grade_service, '_fetch_grade_calculation_data', 
-                      return_value=topics_data):
-        result = grade_service.calculate_final_grade(user_id, section_id)
+
+    result = grade_service.calculate_final_grade(1, 1)
 
     assert isinstance(result, float)
-    assert len(str(result).split('.')[-1]) <= 1
+    assert result == 5.6
+
+
+def test_get_student_breakdown_returns_topic_calculations(grade_service, mock_db, section_rows):
+    """Test that the breakdown contains every topic and activity."""
+    _, mock_cursor = mock_db
+    topics, activities, _, grades = section_rows
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [
+        topics, activities, [g for g in grades if g['user_id'] == 1]
+    ]
+
+    breakdown = grade_service.get_student_breakdown(1, 1)
+
+    assert breakdown['final_grade'] == pytest.approx(5.6)
+    assert breakdown['total_weight'] == 1000.0
+    assert [t['grade'] for t in breakdown['topic_calculations']] == [6.0, 5.0]
+    assert mock_cursor.execute.call_count == 4
 
 
 @pytest.mark.parametrize("grade,user_id,activity_id", [
@@ -516,6 +509,19 @@ def test_database_error_handling_on_get_by_section(grade_service, mock_db):
         grade_service.get_by_section(1)
 
 
+def test_get_student_breakdown_reports_invalid_grades(grade_service, mock_db, section_rows):
+    """Test that the breakdown does not count a bad grade as missing."""
+    _, mock_cursor = mock_db
+    topics, activities, _, _ = section_rows
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.side_effect = [
+        topics, activities, [{'user_id': 1, 'activity_id': 10, 'grade': 'x'}]
+    ]
+
+    with pytest.raises(ValueError, match="Invalid grade 'x' for activity 10"):
+        grade_service.get_student_breakdown(1, 1)
+
+
 def test_database_error_handling_on_calculate_final_grade(grade_service, mock_db):
     """Test that database errors during calculate_final_grade are properly raised."""
     mock_db_instance, mock_cursor = mock_db
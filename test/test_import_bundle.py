@@ -0,0 +1,136 @@
+"""Unit tests for the import_bundle module.
+
+This module contains tests for reading zip and directory bundles, ordering
+their file types and checking references between their files.
+"""
+
+import json
+import zipfile
+from io import BytesIO
+import pytest
+from Service.import_bundle import (
+    IMPORT_DEPENDENCIES, build_index, import_order, read_bundle,
+    reference_errors, unresolved_keys
+)
+
+SECCION = {
+    'id': 10, 'instancia_curso': 5, 'profesor_id': 2,
+    'evaluacion': {
+        'tipo': 'porcentaje',
+        'combinacion_topicos': [{'id': 7, 'nombre': 'Pruebas', 'valor': 100}],
+        'topicos': {'7': {'tipo': 'porcentaje', 'valores': [50, 50],
+                          'obligatorias': [True, True]}}
+    }
+}
+
+
+@pytest.fixture
+def bundle():
+    """Create a loaded bundle whose files reference each other."""
+    return {
+        'alumnos': {'alumnos': [{'id': 1}]},
+        'profesores': {'profesores': [{'id': 2}]},
+        'cursos': {'cursos': [{'id': 3}]},
+        'instancias_cursos': {'instancias': [{'id': 5, 'curso_id': 3}]},
+        'instancias_cursos_secciones': {'secciones': [SECCION]},
+        'alumnos_seccion': {'alumnos_seccion': [
+            {'alumno_id': 1, 'seccion_id': 10}]},
+        'notas_alumnos': {'notas': [
+            {'alumno_id': 1, 'topico_id': 7, 'instancia': 2, 'nota': 6.0}]}
+    }
+
+
+def _zip(files):
+    """Build an in-memory zip archive from a name to content mapping."""
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def test_import_order_puts_dependencies_first():
+    """Test that every file type follows the types it depends on."""
+    order = import_order(IMPORT_DEPENDENCIES)
+
+    assert sorted(order) == sorted(IMPORT_DEPENDENCIES)
+    for file_type, dependencies in IMPORT_DEPENDENCIES.items():
+        for dependency in dependencies:
+            assert order.index(dependency) < order.index(file_type)
+
+
+def test_import_order_ignores_types_missing_from_bundle():
+    """Test ordering a bundle that only holds some of the file types."""
+    assert import_order(['notas_alumnos', 'alumnos']) == [
+        'alumnos', 'notas_alumnos']
+
+
+def test_read_bundle_from_zip():
+    """Test that zip members are keyed by the file type they are named after."""
+    archive = _zip({
+        'semestre/alumnos.json': json.dumps({'alumnos': []}),
+        'semestre/cursos.json': json.dumps({'cursos': []}),
+        'semestre/LEEME.txt': 'ignored'
+    })
+
+    assert read_bundle(archive) == {'alumnos': {'alumnos': []},
+                                    'cursos': {'cursos': []}}
+
+
+def test_read_bundle_from_directory(tmp_path):
+    """Test that a directory of JSON files is read as a bundle."""
+    (tmp_path / 'salas_clases.json').write_text('{"salas": []}')
+
+    assert read_bundle(str(tmp_path)) == {'salas_clases': {'salas': []}}
+
+
+@pytest.mark.parametrize("files, message", [
+    ({'otros.json': '{}'}, "no soportado"),
+    ({'a/alumnos.json': '{}', 'b/alumnos.json': '{}'}, "more than one"),
+    ({'alumnos.json': '{'}, "alumnos.json"),
+    ({'LEEME.txt': ''}, "no import files")
+])
+def test_read_bundle_rejects_invalid_bundles(files, message):
+    """Test the errors for unknown, repeated, malformed or missing files."""
+    with pytest.raises(ValueError, match=message):
+        read_bundle(_zip(files))
+
+
+def test_read_bundle_rejects_non_zip_file():
+    """Test that a file that is not a zip archive is rejected."""
+    with pytest.raises(ValueError, match="zip archive"):
+        read_bundle(BytesIO(b'{"alumnos": []}'))
+
+
+def test_build_index_collects_keys_of_every_file(bundle):
+    """Test the keys indexed for each reference kind."""
+    index = build_index(bundle)
+
+    assert index == {'curso': {3}, 'instancia': {5}, 'profesor': {2},
+                     'alumno': {1}, 'seccion': {10},
+                     'actividad': {(7, 1), (7, 2)}}
+
+
+def test_references_resolved_within_bundle(bundle):
+    """Test that a self-contained bundle has no unresolved references."""
+    index = build_index(bundle)
+
+    assert unresolved_keys(bundle, index) == {}
+    assert reference_errors(bundle, index) == []
+
+
+def test_references_missing_from_bundle(bundle):
+    """Test that references to keys outside the bundle are reported."""
+    del bundle['alumnos']
+    bundle['notas_alumnos']['notas'][0]['instancia'] = 3
+    index = build_index(bundle)
+
+    assert unresolved_keys(bundle, index) == {'alumno': {1},
+                                              'actividad': {(7, 3)}}
+    messages = [error['message'] for error in reference_errors(bundle, index)]
+    assert messages == [
+        "Enrollment 0: Student 1 not found",
+        "Grade 0: Student 1 not found",
+        "Grade 0: Activity for topic 7 instance 3 not found"
+    ]
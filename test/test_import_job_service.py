@@ -0,0 +1,286 @@
+"""Unit tests for ImportJobService module.
+
+This module contains tests for the ImportJobService class, including job
+status tracking, progress counters and ordering of dependent file types.
+"""
+
+import os
+import threading
+from collections import Counter
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import patch
+import pytest
+from Service.import_job_service import ImportJobService
+from Service.import_report import ImportReport
+
+
+@pytest.fixture
+def mock_import_service():
+    """Patch the ImportService and database used by the workers."""
+    with patch('Service.import_job_service.ImportService') as mock_class, \
+         patch('Service.import_job_service.DatabaseConnection'):
+        yield mock_class
+
+
+@pytest.fixture
+def job_service(tmp_path):
+    """Create an ImportJobService spooling to a temporary directory."""
+    service = ImportJobService(max_workers=2, spool_dir=str(tmp_path))
+    yield service
+    service.executor.shutdown(wait=True)
+
+
+def test_submit_rejects_unsupported_type(job_service):
+    """Test that unknown file types are rejected before spooling."""
+    with pytest.raises(ValueError, match="no soportado"):
+        job_service.submit(BytesIO(b'{}'), 'unknown')
+
+    assert job_service.jobs == {}
+
+
+def test_job_completes_and_reports_progress(job_service, mock_import_service,
+                                            tmp_path):
+    """Test that a job imports the spooled file and reports its counters."""
+    def import_json(file, file_type, stream, pipeline, checkpoint):
+        assert file.read() == b'{"alumnos": []}'
+        assert (file_type, stream, pipeline, checkpoint) == (
+            'alumnos', True, False, False)
+        progress = mock_import_service.call_args.kwargs['progress']
+        progress.update(validated=3, inserted=2, failed=1)
+
+    mock_import_service.return_value.import_json.side_effect = import_json
+
+    job_id = job_service.submit(BytesIO(b'{"alumnos": []}'), 'alumnos',
+                                'alumnos.json')
+    job = job_service.wait(job_id, timeout=5)
+
+    assert job['status'] == 'completed'
+    assert job['filename'] == 'alumnos.json'
+    assert (job['validated'], job['inserted'], job['failed']) == (3, 2, 1)
+    assert job['error'] is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_resumable_job_imports_with_checkpoints(job_service,
+                                                mock_import_service):
+    """Test that a resumable job commits checkpoints instead of pipelining."""
+    def import_json(file, file_type, stream, pipeline, checkpoint):
+        assert (pipeline, checkpoint) == (False, True)
+        progress = mock_import_service.call_args.kwargs['progress']
+        progress.update(resumed=500, committed=800)
+
+    mock_import_service.return_value.import_json.side_effect = import_json
+
+    job_id = job_service.submit(BytesIO(b'{"notas": []}'), 'notas_alumnos',
+                                resumable=True)
+    job = job_service.wait(job_id, timeout=5)
+
+    assert job['status'] == 'completed'
+    assert job['mode'] == 'resumable'
+    assert mock_import_service.call_args.kwargs['job_id'] == job_id
+    assert (job['resumed'], job['committed']) == (500, 800)
+
+
+def test_atomic_job_imports_in_one_transaction(job_service,
+                                               mock_import_service):
+    """Test that an atomic job pipelines the file in a single transaction."""
+    job_id = job_service.submit(BytesIO(b'{"alumnos": []}'), 'alumnos',
+                                atomic=True)
+    job = job_service.wait(job_id, timeout=5)
+
+    assert job['status'] == 'completed'
+    assert job['mode'] == 'atomic'
+    import_json = mock_import_service.return_value.import_json
+    assert import_json.call_args.kwargs == {'stream': True, 'pipeline': True,
+                                            'checkpoint': False}
+
+
+def test_dry_run_job_writes_nothing(job_service, mock_import_service):
+    """Test that a dry-run job runs the import in dry-run mode."""
+    job_id = job_service.submit(BytesIO(b'{"cursos": []}'), 'cursos',
+                                dry_run=True)
+    job = job_service.wait(job_id, timeout=5)
+
+    assert job['status'] == 'completed'
+    assert job['mode'] == 'dry-run'
+    import_json = mock_import_service.return_value.import_json
+    assert import_json.call_args.args[1] == 'cursos'
+    assert import_json.call_args.kwargs == {'dry_run': True}
+
+
+@pytest.mark.parametrize("file_type,options,message", [
+    ('cursos', {'resumable': True}, "Resumable import not supported"),
+    ('alumnos', {'resumable': True, 'delta': True}, "both delta and"),
+    ('alumnos', {'dry_run': True, 'delta': True}, "dry run cannot"),
+    ('alumnos', {'atomic': True, 'resumable': True}, "atomic import"),
+])
+def test_submit_rejects_unsupported_resumable_imports(job_service, file_type,
+                                                      options, message):
+    """Test that checkpoints are only offered for streamed file types."""
+    with pytest.raises(ValueError, match=message):
+        job_service.submit(BytesIO(b'{}'), file_type, **options)
+
+
+def test_failed_job_records_error(job_service, mock_import_service):
+    """Test that an import error marks the job as failed."""
+    mock_import_service.return_value.import_json.side_effect = ValueError(
+        "Missing 'alumnos' key")
+
+    job_id = job_service.submit(BytesIO(b'{}'), 'alumnos')
+    job = job_service.wait(job_id, timeout=5)
+
+    assert job['status'] == 'failed'
+    assert job['error'] == "Missing 'alumnos' key"
+
+
+def test_dependent_job_waits_for_its_dependencies(job_service,
+                                                  mock_import_service):
+    """Test that enrollments wait for students while rooms run in parallel."""
+    release = threading.Event()
+    order = []
+
+    def import_json(file, file_type, **options):
+        if file_type == 'alumnos':
+            assert release.wait(timeout=5)
+        order.append(file_type)
+
+    mock_import_service.return_value.import_json.side_effect = import_json
+
+    alumnos_id = job_service.submit(BytesIO(b'{}'), 'alumnos')
+    seccion_id = job_service.submit(BytesIO(b'{}'), 'alumnos_seccion')
+    with pytest.raises(TimeoutError):
+        job_service.wait(seccion_id, timeout=0.2)
+    assert job_service.get(seccion_id)['status'] == 'queued'
+
+    release.set()
+    job_service.wait(seccion_id, timeout=5)
+
+    assert order == ['alumnos', 'alumnos_seccion']
+    assert job_service.get(alumnos_id)['status'] == 'completed'
+
+
+def test_get_unknown_job_returns_none(job_service):
+    """Test that unknown job ids have no progress."""
+    assert job_service.get('missing') is None
+
+
+def test_get_all_returns_most_recent_first(job_service, mock_import_service):
+    """Test that every job is listed, newest first."""
+    first = job_service.submit(BytesIO(b'{}'), 'cursos')
+    job_service.wait(first, timeout=5)
+    second = job_service.submit(BytesIO(b'{}'), 'salas_clases')
+    job_service.wait(second, timeout=5)
+
+    assert [job['id'] for job in job_service.get_all()] == [second, first]
+
+
+def test_snapshot_computes_rows_per_second(job_service):
+    """Test the insert rate of a finished job."""
+    job = {'id': 'a', 'file_type': 'alumnos', 'filename': None,
+           'status': 'completed', 'error': None, 'submitted_at': 0.0,
+           'started_at': 10.0, 'finished_at': 12.0,
+           'options': {}, 'service': None,
+           'progress': Counter(validated=500, inserted=400)}
+
+    snapshot = job_service._snapshot(job)
+
+    assert snapshot['elapsed_seconds'] == 2.0
+    assert snapshot['rows_per_second'] == 200.0
+
+
+def test_snapshot_includes_import_report(job_service):
+    """Test that a job exposes the report of its import service."""
+    report = ImportReport('alumnos', Counter(validated=1, failed=1))
+    report.add('error', "Inserting alumno Ana: Duplicate entry")
+    job = {'id': 'a', 'file_type': 'alumnos', 'filename': None,
+           'status': 'completed', 'error': None, 'submitted_at': 0.0,
+           'started_at': None, 'finished_at': None, 'options': {},
+           'service': SimpleNamespace(stages={}, report=report),
+           'progress': report.progress}
+
+    snapshot = job_service._snapshot(job)
+
+    assert snapshot['report']['failures'] == [
+        {'level': 'error', 'message': "Inserting alumno Ana: Duplicate entry"}
+    ]
+    assert snapshot['report']['rows'] == {'validated': 1, 'failed': 1}
+
+
+def test_bundle_job_imports_bundle(job_service, mock_import_service):
+    """Test that a bundle job reads the spooled zip and imports it."""
+    with patch('Service.import_job_service.read_bundle',
+               return_value={'cursos': {'cursos': []}}) as mock_read:
+        job_id = job_service.submit_bundle(BytesIO(b'PK'), 'semestre.zip')
+        job = job_service.wait(job_id, timeout=5)
+
+    assert job['status'] == 'completed'
+    assert job['file_type'] == 'bundle'
+    assert mock_read.call_args.args[0].endswith('.zip')
+    mock_import_service.return_value.import_bundle.assert_called_once_with(
+        {'cursos': {'cursos': []}})
+
+
+def test_jobs_wait_for_running_bundle(job_service, mock_import_service):
+    """Test that a single file import waits for an earlier bundle."""
+    release = threading.Event()
+    mock_import_service.return_value.import_bundle.side_effect = (
+        lambda bundle: release.wait(timeout=5))
+
+    with patch('Service.import_job_service.read_bundle', return_value={}):
+        job_service.submit_bundle(BytesIO(b'PK'))
+        salas_id = job_service.submit(BytesIO(b'{}'), 'salas_clases')
+
+        with pytest.raises(TimeoutError):
+            job_service.wait(salas_id, timeout=0.2)
+        assert job_service.get(salas_id)['status'] == 'queued'
+
+        release.set()
+        assert job_service.wait(salas_id, timeout=5)['status'] == 'completed'
+
+
+def test_delta_job_applies_changes(job_service, mock_import_service):
+    """Test that a delta job runs the delta import with its options."""
+    import_delta = mock_import_service.return_value.import_delta
+    import_delta.return_value = {'skipped': False}
+
+    job_id = job_service.submit(BytesIO(b'{}'), 'notas_alumnos', delta=True,
+                                delete_missing=True)
+    job = job_service.wait(job_id, timeout=5)
+
+    assert (job['status'], job['mode']) == ('completed', 'delta')
+    assert import_delta.call_args.args[1] == 'notas_alumnos'
+    assert import_delta.call_args.kwargs == {'delete_missing': True}
+    mock_import_service.return_value.import_json.assert_not_called()
+
+
+def test_delta_job_for_already_imported_file_is_skipped(job_service,
+                                                        mock_import_service):
+    """Test that a file already imported marks the job as skipped."""
+    mock_import_service.return_value.import_delta.return_value = {
+        'skipped': True}
+
+    job_id = job_service.submit(BytesIO(b'{}'), 'alumnos', delta=True)
+
+    assert job_service.wait(job_id, timeout=5)['status'] == 'skipped'
+
+
+def test_submit_rejects_delta_for_unsupported_type(job_service):
+    """Test that delta mode is only offered for the supported types."""
+    with pytest.raises(ValueError, match="Delta import not supported"):
+        job_service.submit(BytesIO(b'{}'), 'cursos', delta=True)
+
+
+def test_only_the_last_finished_jobs_are_kept(tmp_path, mock_import_service):
+    """Test that the oldest finished jobs are forgotten on submit."""
+    service = ImportJobService(max_workers=1, spool_dir=str(tmp_path),
+                               kept_jobs=2)
+    job_ids = []
+    for _ in range(4):
+        job_ids.append(service.submit(BytesIO(b'{}'), 'salas_clases'))
+        service.wait(job_ids[-1], timeout=5)
+    service.executor.shutdown(wait=True)
+
+    assert list(service.jobs) == job_ids[1:]
+    assert service.get(job_ids[0]) is None
+    assert list(service.futures) == job_ids[1:]
@@ -0,0 +1,96 @@
+"""Unit tests for the import_pipeline module.
+
+This module contains tests for the ImportPipeline class, including batching,
+stopping writes after invalid records, error propagation between stages and
+the stage and queue statistics.
+"""
+
+import itertools
+import threading
+import pytest
+from Service.import_pipeline import ImportPipeline
+
+
+def _always_valid(record, index):
+    """Accept every record."""
+    return True
+
+
+def test_pipeline_writes_every_record_in_batches():
+    """Test that records reach the writer in order and in bounded batches."""
+    batches = []
+    pipeline = ImportPipeline(range(7), _always_valid, batches.append,
+                              batch_size=3)
+
+    stats = pipeline.run()
+
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert pipeline.valid
+    assert [stats['stages'][stage]['items']
+            for stage in ('parse', 'validate', 'write')] == [7, 7, 7]
+    assert stats['bottleneck'] in ('parse', 'validate', 'write')
+
+
+def test_pipeline_writes_on_calling_thread():
+    """Test that the write stage runs on the thread owning the connection."""
+    writers = set()
+    pipeline = ImportPipeline(range(4), _always_valid,
+                              lambda batch: writers.add(threading.get_ident()),
+                              batch_size=1)
+
+    pipeline.run()
+
+    assert writers == {threading.get_ident()}
+
+
+def test_pipeline_stops_writing_after_invalid_record():
+    """Test that every record is checked but later batches are not written."""
+    checked = []
+    batches = []
+
+    def check(record, index):
+        checked.append(index)
+        return record != 3
+
+    pipeline = ImportPipeline(range(8), check, batches.append, batch_size=2)
+    pipeline.run()
+
+    assert not pipeline.valid
+    assert checked == list(range(8))
+    assert batches == [[0, 1]]
+
+
+def test_pipeline_reraises_parse_errors():
+    """Test that an error while parsing stops the pipeline."""
+    def records():
+        yield 1
+        raise ValueError("Expected ',' at offset 10")
+
+    with pytest.raises(ValueError, match="offset 10"):
+        ImportPipeline(records(), _always_valid, lambda batch: None,
+                       batch_size=1).run()
+
+
+def test_pipeline_write_error_stops_upstream_stages():
+    """Test that a failing writer does not leave the parser blocked."""
+    def write(batch):
+        raise RuntimeError("Lost connection")
+
+    pipeline = ImportPipeline(itertools.count(), _always_valid, write,
+                              batch_size=10, queue_size=2)
+
+    with pytest.raises(RuntimeError, match="Lost connection"):
+        pipeline.run()
+
+
+def test_pipeline_queues_stay_bounded():
+    """Test that queue depths never exceed their capacity."""
+    pipeline = ImportPipeline(range(1000), _always_valid, lambda batch: None,
+                              batch_size=5, queue_size=3)
+
+    stats = pipeline.run()
+
+    for queue_stats in stats['queues'].values():
+        assert queue_stats['capacity'] == 3
+        assert 0 <= queue_stats['max_depth'] <= 3
+        assert queue_stats['mean_depth'] <= queue_stats['max_depth']
@@ -0,0 +1,94 @@
+"""Unit tests for the import_report module.
+
+This module contains tests for the ImportReport counters and failure sample
+and for the asynchronous import log file.
+"""
+
+import logging
+import logging.handlers
+import time
+from collections import Counter
+from Service.import_report import (
+    IMPORT_LOGGER, ImportReport, start_import_log, stop_import_log
+)
+
+
+def test_report_counts_every_message_and_samples_failures():
+    """Test that counts are exact while the failure sample is capped."""
+    report = ImportReport('alumnos', sample_size=2)
+
+    for index in range(5):
+        report.add('validation_error', f"Alumno {index}: invalid")
+    report.add('error', "Inserting alumno 9: Duplicate entry")
+    report.add('success', "Imported 0 alumnos")
+
+    assert report.messages == {'validation_error': 5, 'error': 1,
+                               'success': 1}
+    assert report.failure_count == 6
+    assert [failure['message'] for failure in report.failures] == [
+        "Alumno 0: invalid", "Alumno 1: invalid"
+    ]
+    assert report.successes == [{'level': 'success',
+                                 'message': "Imported 0 alumnos"}]
+
+
+def test_report_as_dict_includes_rows_and_omitted_failures():
+    """Test the serializable view of a report."""
+    progress = Counter(validated=3, inserted=2, failed=1)
+    report = ImportReport('salas_clases', progress, sample_size=1)
+    report.add('error', "Inserting sala A: Duplicate entry")
+    report.add('error', "Inserting sala B: Duplicate entry")
+
+    assert report.as_dict() == {
+        'file_type': 'salas_clases',
+        'rows': {'validated': 3, 'inserted': 2, 'failed': 1},
+        'messages': {'error': 2},
+        'failures': [{'level': 'error',
+                      'message': "Inserting sala A: Duplicate entry"}],
+        'omitted_failures': 1,
+        'successes': [],
+        'dry_run': False,
+        'timings': {}
+    }
+
+
+def test_import_log_is_disabled_by_default():
+    """Test that reports do not log until a log file is started."""
+    assert not IMPORT_LOGGER.isEnabledFor(logging.CRITICAL)
+    assert not IMPORT_LOGGER.propagate
+
+
+def test_import_log_writes_every_message(tmp_path):
+    """Test that the log file gets the messages left out of the sample."""
+    path = tmp_path / 'import.log'
+    listener = start_import_log(str(path))
+    try:
+        report = ImportReport('alumnos', sample_size=1)
+        report.add('validation_error', "Alumno 0: invalid")
+        report.add('error', "Inserting alumno 1: Duplicate entry")
+    finally:
+        stop_import_log(listener)
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("WARNING [alumnos] Alumno 0: invalid")
+    assert lines[1].endswith(
+        "ERROR [alumnos] Inserting alumno 1: Duplicate entry")
+    assert not any(isinstance(handler, logging.handlers.QueueHandler)
+               for handler in IMPORT_LOGGER.handlers)
+
+
+def test_timed_phases_exclude_nested_phases():
+    """Test that time spent producing items is not counted twice."""
+    report = ImportReport('alumnos')
+
+    def slow_records():
+        for record in range(2):
+            time.sleep(0.02)
+            yield record
+
+    with report.timed('validate'):
+        assert list(report.timed_iter(slow_records(), 'parse')) == [0, 1]
+
+    assert report.timings['parse'] >= 0.04
+    assert report.timings['validate'] < report.timings['parse']
@@ -4,10 +4,13 @@ This module contains comprehensive tests for the ImportService class,
 including JSON validation, data import operations, and error handling.
 """
 
+import hashlib
 import pytest
 import json
+from decimal import Decimal
 from io import StringIO
-from unittest.mock import Mock, patch, mock_open
+from unittest.mock import MagicMock, Mock, patch, mock_open
+from db import DatabaseConnection
 from Service.import_service import ImportService
 
 
@@ -29,6 +32,13 @@ def import_service(mock_db):
         return ImportService()
 
 
+def reported(service):
+    """Join the messages collected in the report of a service."""
+    report = service.report
+    return "\n".join(entry['message']
+                     for entry in report.failures + report.successes)
+
+
 def test_init_creates_database_connection():
     """Test that ImportService initializes with database connection."""
     with patch('Service.import_service.DatabaseConnection') as mock_db_class:
@@ -37,79 +47,6 @@ def test_init_creates_database_connection():
         assert service.db is not None
 
 
-def test_is_valid_email_with_valid_emails(import_service):
-    """Test email validation with valid email addresses."""
-    valid_emails = [
-        "test@example.com",
-        "user.name@domain.co.uk",
-        "student123@university.edu",
-        "professor+research@institution.org"
-    ]
-    
-    for email in valid_emails:
-        assert import_service._is_valid_email(email) is True
-
-
-def test_is_valid_email_with_invalid_emails(import_service):
-    """Test email validation with invalid email addresses."""
-    invalid_emails = [
-        "",
-        None,
-        "invalid-email",
-        "@domain.com",
-        "user@",
-        "user@@domain.com",
-        123,
-        "user name@domain.com"
-    ]
-    
-    for email in invalid_emails:
-        assert import_service._is_valid_email(email) is False
-
-
-def test_is_valid_name_with_valid_names(import_service):
-    """Test name validation with valid names."""
-    valid_names = [
-        "Juan Pérez",
-        "María García-López",
-        "José",
-        "Ana María de los Santos"
-    ]
-    
-    for name in valid_names:
-        assert import_service._is_valid_name(name) is True
-
-
-def test_is_valid_name_with_invalid_names(import_service):
-    """Test name validation with invalid names."""
-    invalid_names = [
-        "",
-        None,
-        "   ",
-        123,
-        "a" * 101,
-    ]
-    
-    for name in invalid_names:
-        assert import_service._is_valid_name(name) is False
-
-
-def test_is_valid_year_with_valid_years(import_service):
-    """Test year validation with valid years."""
-    valid_years = [1990, 2000, 2025, 2050]
-    
-    for year in valid_years:
-        assert import_service._is_valid_year(year) is True
-
-
-def test_is_valid_year_with_invalid_years(import_service):
-    """Test year validation with invalid years."""
-    invalid_years = [1989, 2051, "2025", None, 0]
-    
-    for year in invalid_years:
-        assert import_service._is_valid_year(year) is False
-
-
 def test_is_valid_semester_with_valid_semesters(import_service):
     """Test semester validation with valid semesters."""
     valid_semesters = [1, 2]
@@ -126,38 +63,6 @@ def test_is_valid_semester_with_invalid_semesters(import_service):
         assert import_service._is_valid_semester(semester) is False
 
 
-def test_is_valid_credits_with_valid_credits(import_service):
-    """Test credits validation with valid credit values."""
-    valid_credits = [1, 5, 10, 99]
-    
-    for credits in valid_credits:
-        assert import_service._is_valid_credits(credits) is True
-
-
-def test_is_valid_credits_with_invalid_credits(import_service):
-    """Test credits validation with invalid credit values."""
-    invalid_credits = [0, 100, "5", None, -1, 1.5]
-    
-    for credits in invalid_credits:
-        assert import_service._is_valid_credits(credits) is False
-
-
-def test_is_valid_grade_with_valid_grades(import_service):
-    """Test grade validation with valid grade values."""
-    valid_grades = [1.0, 4.5, 5.8, 7.0, 6]
-    
-    for grade in valid_grades:
-        assert import_service._is_valid_grade(grade) is True
-
-
-def test_is_valid_grade_with_invalid_grades(import_service):
-    """Test grade validation with invalid grade values."""
-    invalid_grades = [0.9, 7.1, "5.5", None, -1]
-    
-    for grade in invalid_grades:
-        assert import_service._is_valid_grade(grade) is False
-
-
 def test_validate_alumnos_structure_valid(import_service):
     """Test validation of valid alumnos structure."""
     valid_data = {
@@ -166,38 +71,25 @@ def test_validate_alumnos_structure_valid(import_service):
         ]
     }
     
-    result = import_service._validate_alumnos_structure(valid_data)
+    result = import_service._validate_alumnos_data_advanced(valid_data)
     assert result is True
 
 
 def test_validate_alumnos_structure_invalid(import_service):
     """Test validation of invalid alumnos structure."""
     invalid_data1 = {"students": []}
-    result1 = import_service._validate_alumnos_structure(invalid_data1)
+    result1 = import_service._validate_alumnos_data_advanced(invalid_data1)
     assert result1 is False
 
     invalid_data2 = {"alumnos": "not a list"}
-    result2 = import_service._validate_alumnos_structure(invalid_data2)
+    result2 = import_service._validate_alumnos_data_advanced(invalid_data2)
     assert result2 is False
 
     invalid_data3 = "not a dict"
-    result3 = import_service._validate_alumnos_structure(invalid_data3)
+    result3 = import_service._validate_alumnos_data_advanced(invalid_data3)
     assert result3 is False
 
 
-def test_validate_alumno_fields_valid(import_service):
-    """Test validation of valid alumno fields."""
-    valid_alumno = {
-        "id": 1,
-        "nombre": "Juan Pérez",
-        "correo": "juan@test.com",
-        "anio_ingreso": 2020
-    }
-    
-    result = import_service._validate_alumno_fields(valid_alumno, 0)
-    assert result is True
-
-
 def test_validate_alumno_fields_invalid(import_service):
     """Test validation of invalid alumno fields."""
     invalid_alumno1 = {
@@ -205,7 +97,8 @@ def test_validate_alumno_fields_invalid(import_service):
         "correo": "juan@test.com",
         "anio_ingreso": 2020
     }
-    result1 = import_service._validate_alumno_fields(invalid_alumno1, 0)
+    result1 = import_service._validate_alumnos_data_advanced(
+        {"alumnos": [invalid_alumno1]})
     assert result1 is False
 
     invalid_alumno2 = {
@@ -214,36 +107,42 @@ def test_validate_alumno_fields_invalid(import_service):
         "correo": "invalid-email",
         "anio_ingreso": 2020
     }
-    result2 = import_service._validate_alumno_fields(invalid_alumno2, 0)
+    result2 = import_service._validate_alumnos_data_advanced(
+        {"alumnos": [invalid_alumno2]})
     assert result2 is False
 
 
-def test_validate_unique_emails_across_types_valid(import_service):
-    """Test validation of unique emails in alumnos data."""
-    valid_data = {
-        "alumnos": [
-            {"correo": "juan@test.com"},
-            {"correo": "maria@test.com"}
-        ]
-    }
-    
-    result = import_service._validate_unique_emails_across_types(valid_data, 'alumnos')
-    assert result is True
-
-
 def test_validate_unique_emails_across_types_invalid(import_service):
     """Test validation when duplicate emails exist."""
     invalid_data = {
-        "alumnos": [
-            {"correo": "juan@test.com"},
-            {"correo": "juan@test.com"}
+        "profesores": [
+            {"id": 1, "nombre": "Juan", "correo": "juan@test.com"},
+            {"id": 2, "nombre": "Juana", "correo": "JUAN@test.com"}
         ]
     }
     
-    result = import_service._validate_unique_emails_across_types(invalid_data, 'alumnos')
+    result = import_service._validate_profesores_data_advanced(invalid_data)
     assert result is False
 
 
+def test_validation_reports_every_error(import_service):
+    """Test that validation reports all errors instead of the first one."""
+    data = {
+        "salas": [
+            {"id": 0, "nombre": "A", "capacidad": 30},
+            {"id": 2, "nombre": "", "capacidad": 30},
+            {"id": 3, "nombre": "C", "capacidad": 2000}
+        ]
+    }
+
+    assert import_service._validate_salas_data_advanced(data) is False
+
+    output = reported(import_service)
+    assert "Sala 0: 'id' must be a positive integer" in output
+    assert "Sala 1: 'nombre' must be a non-empty string" in output
+    assert "Room 2: Capacity 2000 seems unreasonably high" in output
+
+
 def test_validate_percentage_sum_per_topic_valid(import_service):
     """Test validation when percentages sum to 100%."""
     valid_data = {
@@ -305,13 +204,13 @@ def test_import_alumnos_success(import_service, mock_db):
     import_service._import_alumnos(data)
     
     expected_query = """
-                INSERT INTO Users (import_id, name, email, admission_date,
-                                   is_professor)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-    mock_cursor.execute.assert_called_with(
+            INSERT INTO Users (import_id, name, email, admission_date,
+                               is_professor)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+    mock_cursor.executemany.assert_called_once_with(
         expected_query,
-        (1, "Juan Pérez", "juan@test.com", "2020-01-01", False)
+        [(1, "Juan Pérez", "juan@test.com", "2020-01-01", False)]
     )
     mock_db_instance.commit.assert_called_once()
 
@@ -333,13 +232,13 @@ def test_import_profesores_success(import_service, mock_db):
     import_service._import_profesores(data)
     
     expected_query = """
-                INSERT INTO Users (import_id, name, email, admission_date,
-                                   is_professor)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-    mock_cursor.execute.assert_called_with(
+            INSERT INTO Users (import_id, name, email, admission_date,
+                               is_professor)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+    mock_cursor.executemany.assert_called_once_with(
         expected_query,
-        (1, "Dr. García", "garcia@test.com", None, True)
+        [(1, "Dr. García", "garcia@test.com", None, True)]
     )
     mock_db_instance.commit.assert_called_once()
 
@@ -363,16 +262,57 @@ def test_import_cursos_success(import_service, mock_db):
     import_service._import_cursos(data)
     
     expected_query = """
-                    INSERT INTO Courses (id, nrc, name, credits)
-                    VALUES (%s, %s, %s, %s)
-                """
-    mock_cursor.execute.assert_any_call(
+            INSERT INTO Courses (id, nrc, name, credits)
+            VALUES (%s, %s, %s, %s)
+        """
+    mock_cursor.executemany.assert_called_once_with(
         expected_query,
-        (1, "ICC5130", "Diseño de Software", 3)
+        [(1, "ICC5130", "Diseño de Software", 3)]
     )
     mock_db_instance.commit.assert_called_once()
 
 
+def test_validate_cursos_accepts_stored_prerequisites(import_service,
+                                                      mock_db):
+    """Test that a prerequisite already in the database passes validation."""
+    _, mock_cursor = mock_db
+    data = {"cursos": [
+        {"id": 1, "codigo": "C1", "descripcion": "Curso 1", "creditos": 3,
+         "requisitos": ["EXT", "GONE"]}
+    ]}
+    mock_cursor.fetchall.return_value = [{"id": 9, "nrc": "EXT"}]
+
+    assert not import_service._validate_cursos_data_advanced(data)
+
+    assert mock_cursor.execute.call_args.args[1] == ("EXT", "GONE")
+    assert "Prerequisite 'GONE' not found" in reported(import_service)
+    assert "Prerequisite 'EXT'" not in reported(import_service)
+
+
+def test_import_cursos_inserts_prerequisites_in_one_pass(import_service,
+                                                         mock_db):
+    """Test that courses are queued after their prerequisites."""
+    _, mock_cursor = mock_db
+    data = {"cursos": [
+        {"id": 3, "codigo": "C3", "descripcion": "Curso 3", "creditos": 3,
+         "requisitos": ["C2", "C1"]},
+        {"id": 1, "codigo": "C1", "descripcion": "Curso 1", "creditos": 3,
+         "requisitos": []},
+        {"id": 2, "codigo": "C2", "descripcion": "Curso 2", "creditos": 3,
+         "requisitos": ["C1", "EXT"]}
+    ]}
+    mock_cursor.fetchall.return_value = [{"id": 9, "nrc": "EXT"}]
+
+    import_service._import_cursos(data)
+
+    lookup_query, lookup_params = mock_cursor.execute.call_args.args
+    assert "nrc IN (%s)" in lookup_query
+    assert lookup_params == ("EXT",)
+    courses_call, prereqs_call = mock_cursor.executemany.call_args_list
+    assert [row[0] for row in courses_call.args[1]] == [1, 2, 3]
+    assert prereqs_call.args[1] == [(2, 1), (2, 9), (3, 2), (3, 1)]
+
+
 def test_import_instancias_cursos_success(import_service, mock_db):
     """Test successful import of instancias cursos data."""
     mock_db_instance, mock_cursor = mock_db
@@ -391,16 +331,55 @@ def test_import_instancias_cursos_success(import_service, mock_db):
     import_service._import_instancias_cursos(data)
     
     expected_query = """
-                    INSERT INTO Instances (id, period, course_id)
-                    VALUES (%s, %s, %s)
-                """
-    mock_cursor.execute.assert_called_with(
+            INSERT INTO Instances (id, period, course_id)
+            VALUES (%s, %s, %s)
+        """
+    mock_cursor.executemany.assert_called_once_with(
         expected_query,
-        (1, "2025-1", 1)
+        [(1, "2025-1", 1)]
     )
     mock_db_instance.commit.assert_called_once()
 
 
+def test_import_salas_clases_in_chunks(mock_db):
+    """Test that rows are sent in chunks of the configured batch size."""
+    mock_db_instance, mock_cursor = mock_db
+    with patch('Service.import_service.DatabaseConnection') as mock_db_class:
+        mock_db_class.return_value = mock_db_instance
+        service = ImportService(batch_size=2)
+
+    data = {"salas": [{"id": i, "nombre": f"Sala {i}", "capacidad": 30}
+                      for i in range(1, 6)]}
+
+    service._import_salas_clases(data)
+
+    chunks = [call.args[1] for call in mock_cursor.executemany.call_args_list]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    mock_cursor.execute.assert_not_called()
+    mock_db_instance.commit.assert_called_once()
+
+
+def test_import_alumnos_reports_offending_row(import_service, mock_db):
+    """Test that a failed chunk is retried to report the bad row."""
+    from db import DatabaseError
+
+    _, mock_cursor = mock_db
+    mock_cursor.executemany.side_effect = DatabaseError("Duplicate entry")
+    mock_cursor.execute.side_effect = [None, DatabaseError("Duplicate entry")]
+    data = {"alumnos": [
+        {"id": 1, "nombre": "Ana", "correo": "ana@test.com",
+         "anio_ingreso": 2020},
+        {"id": 2, "nombre": "Luis", "correo": "luis@test.com",
+         "anio_ingreso": 2021}
+    ]}
+
+    import_service._import_alumnos(data)
+
+    output = reported(import_service)
+    assert "Inserting alumno Luis (luis@test.com): Duplicate entry" in output
+    assert "Imported 1 alumnos" in output
+
+
 def test_import_json_with_valid_alumnos_file(import_service):
     """Test importing JSON file with valid alumnos data."""
     valid_data = {
@@ -441,42 +420,611 @@ def test_import_json_with_validation_failure(import_service):
         import_service.import_json(mock_file, 'alumnos')
 
 
-def test_get_professor_id_by_import_id_found(import_service, mock_db):
-    """Test getting professor ID when professor exists."""
+def test_import_json_stream_imports_in_batches(import_service):
+    """Test that streaming mode hands bounded batches to the importer."""
+    alumnos = [
+        {"id": i, "nombre": f"Alumno {i}", "correo": f"a{i}@test.com",
+         "anio_ingreso": 2020}
+        for i in range(1, 6)
+    ]
+    mock_file = StringIO(json.dumps({"alumnos": alumnos}))
+
+    with patch.object(import_service, '_import_alumnos') as mock_import:
+        import_service.import_json(mock_file, 'alumnos', stream=True,
+                                   batch_size=2)
+
+    batches = [call.args[0]['alumnos'] for call in mock_import.call_args_list]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[2] == [alumnos[4]]
+
+
+def test_import_json_stream_validates_before_importing(import_service):
+    """Test that a bad record late in the file imports nothing."""
+    notas = [
+        {"alumno_id": 1, "topico_id": 1, "instancia": 1, "nota": 5.0},
+        {"alumno_id": 2, "topico_id": 1, "instancia": 1, "nota": 6.0},
+        {"alumno_id": 1, "topico_id": 1, "instancia": 1, "nota": 4.0}
+    ]
+    mock_file = StringIO(json.dumps({"notas": notas}))
+
+    with patch.object(import_service, '_import_notas_alumnos') as mock_import, \
+         pytest.raises(ValueError, match="Validation failed"):
+        import_service.import_json(mock_file, 'notas_alumnos', stream=True,
+                                   batch_size=1)
+
+    mock_import.assert_not_called()
+    assert "Grade 2: Duplicate grade" in reported(import_service)
+
+
+def notas_file(count):
+    """Build a notas_alumnos file with ``count`` valid grades."""
+    return StringIO(json.dumps({"notas": [
+        {"alumno_id": i, "topico_id": 1, "instancia": 1, "nota": 5.0}
+        for i in range(1, count + 1)
+    ]}))
+
+
+def checkpoint_offsets(mock_cursor):
+    """Get the offsets saved in ImportCheckpoints, in order."""
+    return [call.args[1][3] for call in mock_cursor.execute.call_args_list
+            if "INTO ImportCheckpoints" in call.args[0]]
+
+
+def test_import_json_checkpoint_commits_each_batch(import_service, mock_db):
+    """Test that every batch is committed with the offset after it."""
+    mock_db_instance, mock_cursor = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+    mock_db_instance.autocommit.return_value = MagicMock()
+    mock_cursor.fetchone.return_value = None
+    import_service.job_id = 'job1'
+
+    with patch.object(import_service, '_import_notas_alumnos') as mock_import:
+        import_service.import_json(notas_file(5), 'notas_alumnos',
+                                   batch_size=2, checkpoint=True)
+
+    assert [len(call.args[0]['notas'])
+            for call in mock_import.call_args_list] == [2, 2, 1]
+    assert checkpoint_offsets(mock_cursor) == [2, 4, 5]
+    assert mock_db_instance.unit_of_work.call_count == 3
+    saved = [call.args[1] for call in mock_cursor.execute.call_args_list
+             if "INTO ImportCheckpoints" in call.args[0]][0]
+    assert saved[0] == 'notas_alumnos' and saved[2] == 'job1'
+    assert "DELETE FROM ImportCheckpoints" in (
+        mock_cursor.execute.call_args_list[-1].args[0])
+    assert import_service.progress['committed'] == 5
+    assert import_service.savepoints is False
+
+
+def test_import_json_checkpoint_resumes_after_committed_records(
+        import_service, mock_db):
+    """Test that a restarted import skips the records already committed."""
+    mock_db_instance, mock_cursor = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+    mock_db_instance.autocommit.return_value = MagicMock()
+    mock_cursor.fetchone.return_value = {'committed_offset': 3}
+
+    with patch.object(import_service, '_import_notas_alumnos') as mock_import:
+        import_service.import_json(notas_file(5), 'notas_alumnos',
+                                   batch_size=2, checkpoint=True)
+
+    batch = mock_import.call_args.args[0]['notas']
+    assert mock_import.call_count == 1
+    assert [entry['alumno_id'] for entry in batch] == [4, 5]
+    assert checkpoint_offsets(mock_cursor) == [5]
+    assert import_service.progress['resumed'] == 3
+    assert "Resuming notas_alumnos import after record 3" in (
+        reported(import_service))
+
+
+def test_import_json_checkpoint_keeps_offset_of_interrupted_import(
+        import_service, mock_db):
+    """Test that a failing batch leaves the last committed checkpoint."""
+    mock_db_instance, mock_cursor = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+    mock_db_instance.autocommit.return_value = MagicMock()
+    mock_cursor.fetchone.return_value = None
+
+    def import_notas(data):
+        if data['notas'][0]['alumno_id'] == 3:
+            raise RuntimeError("Lost connection")
+        assert import_service.savepoints is True
+
+    with patch.object(import_service, '_import_notas_alumnos',
+                      side_effect=import_notas), \
+         pytest.raises(RuntimeError):
+        import_service.import_json(notas_file(5), 'notas_alumnos',
+                                   batch_size=2, checkpoint=True)
+
+    assert checkpoint_offsets(mock_cursor) == [2]
+    assert import_service.progress['committed'] == 2
+    assert not any("DELETE FROM ImportCheckpoints" in call.args[0]
+                   for call in mock_cursor.execute.call_args_list)
+
+
+def test_import_json_checkpoint_commits_inside_a_unit_of_work():
+    """Test that batches commit even while a request's unit of work is open."""
+    cursor = Mock()
+    cursor.fetchone.return_value = None
+    conn = Mock()
+    conn.cursor.return_value = cursor
+    committed = []
+    conn.commit.side_effect = lambda: committed.append(
+        checkpoint_offsets(cursor)[-1:])
+
+    DatabaseConnection._instance = None
+    try:
+        with patch('db._open_connection', return_value=conn):
+            service = ImportService()
+            service.db.begin_unit_of_work()
+            with patch.object(service, '_import_notas_alumnos'):
+                service.import_json(notas_file(5), 'notas_alumnos',
+                                    batch_size=2, checkpoint=True)
+
+            assert committed == [[2], [4], [5], [5]]
+            assert service.db.in_unit_of_work()
+            service.db.complete_unit_of_work()
+    finally:
+        DatabaseConnection._instance = None
+
+
+def test_import_json_dry_run_resolves_references_without_writing(
+        import_service, mock_db):
+    """Test that a dry run counts the rows it would insert or reject."""
     _, mock_cursor = mock_db
-    mock_cursor.fetchone.return_value = {"id": 5}
-    
-    result = import_service._get_professor_id_by_import_id(mock_cursor, 123)
-    
-    expected_query = """
-            SELECT id FROM Users WHERE import_id = %s AND is_professor = TRUE
-        """
-    mock_cursor.execute.assert_called_once_with(expected_query, (123,))
-    assert result == 5
+    mock_cursor.fetchall.side_effect = [
+        [{'id': 10, 'import_id': 1}, {'id': 20, 'import_id': 2}],
+        [{'id': 7, 'topic_id': 1, 'instance': 1}]
+    ]
+
+    report = import_service.import_json(notas_file(3), 'notas_alumnos',
+                                        dry_run=True)
 
+    queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    assert all(query.startswith("SELECT") for query in queries)
+    mock_cursor.executemany.assert_not_called()
+    assert report.dry_run is True
+    assert report.progress == {'validated': 3, 'inserted': 2, 'failed': 1}
+    assert "No user found for alumno_import_id 3" in reported(import_service)
+    assert "Would insert 2 grades" in reported(import_service)
+    assert "Inserted" not in reported(import_service)
+    assert set(report.timings) == {'parse', 'validate', 'resolve'}
+    assert import_service.dry_run is False
 
-def test_get_professor_id_by_import_id_not_found(import_service, mock_db):
-    """Test getting professor ID when professor doesn't exist."""
+
+def test_dry_run_counts_section_rows_without_inserting(import_service,
+                                                     mock_db):
+    """Test that sections, topics and activities are counted, not inserted."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.side_effect = [[{"id": 8, "import_id": 4}], []]
+    evaluacion = {"tipo": "peso",
+                  "combinacion_topicos": [{"id": 3, "nombre": "Tareas",
+                                           "valor": 1}],
+                  "topicos": {"3": {"tipo": "peso", "valores": [1, 2],
+                                    "obligatorias": [True, False]}}}
+    data = {"secciones": [
+        {"id": 11, "instancia_curso": 1, "profesor_id": 4,
+         "evaluacion": evaluacion},
+        {"id": 12, "instancia_curso": 1, "profesor_id": 9,
+         "evaluacion": evaluacion}
+    ]}
+    import_service.dry_run = True
+
+    import_service._import_instancias_cursos_secciones(data)
+
+    assert not any("INSERT" in call.args[0]
+                   for call in mock_cursor.execute.call_args_list)
+    assert import_service.progress == {'inserted': 4, 'failed': 1}
+
+
+def test_import_json_dry_run_fails_validation(import_service):
+    """Test that an invalid file fails a dry run like an import."""
+    mock_file = StringIO(json.dumps({"salas": [{"id": 1}]}))
+
+    with pytest.raises(ValueError, match="Validation failed"):
+        import_service.import_json(mock_file, 'salas_clases', dry_run=True)
+
+    assert 'validate' in import_service.report.timings
+    assert 'resolve' not in import_service.report.timings
+
+
+def test_import_json_stream_reports_structure_errors(import_service):
+    """Test that a missing array is reported as a validation error."""
+    mock_file = StringIO(json.dumps({"rooms": []}))
+
+    with pytest.raises(ValueError, match="Validation failed"):
+        import_service.import_json(mock_file, 'salas_clases', stream=True)
+
+    assert "Missing 'salas' key" in reported(import_service)
+
+
+def test_import_json_stream_loads_other_types_whole(import_service):
+    """Test that types without a streaming mode are loaded whole."""
+    data = {"cursos": []}
+    mock_file = StringIO(json.dumps(data))
+
+    with patch.object(import_service, '_import_cursos') as mock_import, \
+         patch.object(import_service, '_validate_cursos_data_advanced',
+                      return_value=True):
+        import_service.import_json(mock_file, 'cursos', stream=True)
+
+    mock_import.assert_called_once_with(data)
+
+
+def test_import_json_pipeline_writes_batches_in_one_unit_of_work(
+        import_service, mock_db):
+    """Test that pipelined mode imports every batch inside one transaction."""
+    mock_db_instance, _ = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+    salas = [{"id": i, "nombre": f"Sala {i}", "capacidad": 30}
+             for i in range(1, 6)]
+    mock_file = StringIO(json.dumps({"salas": salas}))
+
+    with patch.object(import_service, '_import_salas_clases') as mock_import:
+        import_service.import_json(mock_file, 'salas_clases', batch_size=2,
+                                   pipeline=True)
+
+    batches = [call.args[0]['salas'] for call in mock_import.call_args_list]
+    assert batches == [salas[0:2], salas[2:4], salas[4:]]
+    mock_db_instance.unit_of_work.assert_called_once()
+    assert import_service.progress['validated'] == 5
+    assert import_service.stages['stages']['write']['items'] == 5
+
+
+def test_import_json_pipeline_rolls_back_invalid_file(import_service, mock_db):
+    """Test that an invalid record late in the file fails the transaction."""
+    mock_db_instance, _ = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+    salas = [{"id": i, "nombre": f"Sala {i}", "capacidad": 30}
+             for i in range(1, 5)]
+    salas[3]["capacidad"] = 0
+    mock_file = StringIO(json.dumps({"salas": salas}))
+
+    with patch.object(import_service, '_import_salas_clases'), \
+         pytest.raises(ValueError, match="Validation failed"):
+        import_service.import_json(mock_file, 'salas_clases', batch_size=1,
+                                   pipeline=True)
+
+    unit_of_work = mock_db_instance.unit_of_work.return_value
+    assert unit_of_work.__exit__.call_args.args[0] is ValueError
+    assert "Sala 3: 'capacidad' must be a positive integer" in (
+        reported(import_service))
+
+
+def test_import_json_pipeline_reports_parse_errors(import_service, mock_db):
+    """Test that malformed JSON is reported as a validation error."""
+    mock_db_instance, _ = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+
+    with pytest.raises(ValueError, match="Validation failed"):
+        import_service.import_json(StringIO('{"salas": 3}'), 'salas_clases',
+                                   pipeline=True)
+
+    assert "'salas' must be an array" in reported(import_service)
+
+
+def _valid_bundle():
+    """Create a bundle of valid alumnos and rooms files."""
+    return {
+        "salas_clases": {"salas": [
+            {"id": 1, "nombre": "Sala A", "capacidad": 30}]},
+        "alumnos": {"alumnos": [
+            {"id": 1, "nombre": "Ana", "correo": "ana@test.com",
+             "anio_ingreso": 2020}]}
+    }
+
+
+def test_import_bundle_imports_every_file_in_one_unit_of_work(import_service,
+                                                             mock_db):
+    """Test that a bundle is imported in dependency order in one transaction."""
+    mock_db_instance, _ = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+    bundle = _valid_bundle()
+    bundle["alumnos_seccion"] = {"alumnos_seccion": [
+        {"alumno_id": 1, "seccion_id": 10}]}
+
+    with patch.object(import_service, '_import_data') as mock_import, \
+         patch.object(import_service, '_load_existing_keys',
+                      return_value={10}) as mock_load:
+        import_service.import_bundle(bundle)
+
+    mock_db_instance.unit_of_work.assert_called_once()
+    order = [call.args[0] for call in mock_import.call_args_list]
+    assert set(order) == {"salas_clases", "alumnos", "alumnos_seccion"}
+    assert order.index("alumnos") < order.index("alumnos_seccion")
+    mock_load.assert_called_once_with(mock_load.call_args.args[0],
+                                      'seccion', {10})
+    assert import_service.progress['validated'] == 3
+
+
+def test_import_bundle_rejects_dangling_references(import_service, mock_db):
+    """Test that references found in no file nor the database import nothing."""
+    mock_db_instance, _ = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+    bundle = _valid_bundle()
+    bundle["alumnos_seccion"] = {"alumnos_seccion": [
+        {"alumno_id": 2, "seccion_id": 10}]}
+
+    with patch.object(import_service, '_import_data') as mock_import, \
+         patch.object(import_service, '_load_existing_keys',
+                      return_value=set()), \
+         pytest.raises(ValueError, match="bundle references"):
+        import_service.import_bundle(bundle)
+
+    mock_import.assert_not_called()
+    output = reported(import_service)
+    assert "Enrollment 0: Student 2 not found" in output
+    assert "Enrollment 0: Section 10 not found" in output
+
+
+def test_import_bundle_validates_every_file_first(import_service, mock_db):
+    """Test that an invalid file stops the bundle before any write."""
+    mock_db_instance, _ = mock_db
+    bundle = _valid_bundle()
+    bundle["salas_clases"]["salas"][0]["capacidad"] = 0
+
+    with pytest.raises(ValueError, match="Validation failed for salas_clases"):
+        import_service.import_bundle(bundle)
+
+    mock_db_instance.unit_of_work.assert_not_called()
+
+
+def test_import_bundle_rolls_back_on_rejected_rows(import_service, mock_db):
+    """Test that a row rejected by the database fails the whole bundle."""
+    mock_db_instance, _ = mock_db
+    mock_db_instance.unit_of_work.return_value = MagicMock()
+
+    def reject_row(file_type, data):
+        import_service.progress['failed'] += 1
+
+    with patch.object(import_service, '_import_data', side_effect=reject_row), \
+         pytest.raises(ValueError, match="rolled back: 2 rows"):
+        import_service.import_bundle(_valid_bundle())
+
+    unit_of_work = mock_db_instance.unit_of_work.return_value
+    assert unit_of_work.__exit__.call_args.args[0] is ValueError
+
+
+def test_load_existing_keys_for_activities(import_service, mock_db):
+    """Test that only the stored (topic, instance) pairs are returned."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.return_value = [
+        {"id": 1, "topic_id": 7, "instance": 1},
+        {"id": 2, "topic_id": 7, "instance": 2}
+    ]
+
+    keys = import_service._load_existing_keys(mock_cursor, 'actividad',
+                                              {(7, 2), (7, 3)})
+
+    assert keys == {(7, 2)}
+
+
+ALUMNOS_FILE = json.dumps({"alumnos": [
+    {"id": 1, "nombre": "Ana", "correo": "ana@test.com", "anio_ingreso": 2020},
+    {"id": 2, "nombre": "Luis", "correo": "luis@test.com", "anio_ingreso": 2021},
+    {"id": 3, "nombre": "Eva", "correo": "eva@test.com", "anio_ingreso": 2022}
+]})
+
+
+def test_import_delta_applies_only_changed_users(import_service, mock_db):
+    """Test that unchanged students are skipped and changed ones updated."""
+    from datetime import date
     _, mock_cursor = mock_db
     mock_cursor.fetchone.return_value = None
-    
-    result = import_service._get_professor_id_by_import_id(mock_cursor, 999)
-    
-    assert result is None
+    mock_cursor.fetchall.return_value = [
+        {"id": 10, "import_id": 1, "name": "Ana", "email": "ana@test.com",
+         "admission_date": date(2020, 1, 1)},
+        {"id": 11, "import_id": 2, "name": "Luis", "email": "old@test.com",
+         "admission_date": date(2021, 1, 1)}
+    ]
 
+    counts = import_service.import_delta(StringIO(ALUMNOS_FILE), 'alumnos')
 
-def test_get_next_section_number(import_service, mock_db):
-    """Test getting next section number for an instance."""
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 1,
+                      'deleted': 0, 'skipped': False}
+    queries = {call.args[0].split()[0]: call.args[1]
+               for call in mock_cursor.executemany.call_args_list}
+    assert queries['UPDATE'] == [("Luis", "luis@test.com", "2021-01-01", 11)]
+    assert queries['INSERT'] == [(3, "Eva", "eva@test.com", "2022-01-01",
+                                  False)]
+    assert 'DELETE' not in queries
+    record_call = mock_cursor.execute.call_args_list[-1]
+    assert "INSERT INTO ImportedFiles" in record_call.args[0]
+    assert import_service.progress['updated'] == 1
+    assert import_service.progress['unchanged'] == 1
+
+
+def test_import_delta_deletes_missing_users(import_service, mock_db):
+    """Test that stored users missing from the file are deleted on request."""
     _, mock_cursor = mock_db
-    mock_cursor.fetchone.return_value = {'COUNT(*)': 2}
-    
-    result = import_service._get_next_section_number(mock_cursor, 1)
-    
-    expected_query = """
-            SELECT COUNT(*) FROM Sections WHERE instance_id = %s
-        """
-    mock_cursor.execute.assert_called_once_with(expected_query, (1,))
-    assert result == 3
+    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchall.return_value = [
+        {"id": 12, "import_id": 9, "name": "Old", "email": "old@test.com",
+         "admission_date": None}
+    ]
+
+    counts = import_service.import_delta(StringIO(ALUMNOS_FILE), 'alumnos',
+                                         delete_missing=True)
+
+    assert (counts['inserted'], counts['deleted']) == (3, 1)
+    load_query = mock_cursor.execute.call_args_list[1].args[0]
+    assert "import_id IS NOT NULL" in load_query
+    mock_cursor.executemany.assert_any_call(
+        "DELETE FROM Users WHERE id = %s", [(12,)])
+
+
+def test_import_delta_skips_already_imported_file(import_service, mock_db):
+    """Test that a file with a known content hash is not parsed."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchone.return_value = {"id": 1}
+
+    counts = import_service.import_delta(StringIO("not even json"), 'alumnos')
+
+    assert counts['skipped'] is True
+    hash_query, params = mock_cursor.execute.call_args.args
+    assert "FROM ImportedFiles" in hash_query
+    assert params[1] == hashlib.sha256(b"not even json").hexdigest()
+    mock_cursor.executemany.assert_not_called()
+
+
+def test_import_delta_rejects_unsupported_type(import_service):
+    """Test that delta mode is limited to the supported file types."""
+    with pytest.raises(ValueError, match="Delta import not supported"):
+        import_service.import_delta(StringIO("{}"), 'cursos')
+
+
+def test_delta_notas_alumnos_compares_stored_grades(import_service, mock_db):
+    """Test that grades are matched by student and activity."""
+    _, mock_cursor = mock_db
+    data = {"notas": [
+        {"alumno_id": 1, "topico_id": 7, "instancia": 1, "nota": 6.0},
+        {"alumno_id": 1, "topico_id": 7, "instancia": 2, "nota": 5.5},
+        {"alumno_id": 1, "topico_id": 7, "instancia": 3, "nota": 4.0}
+    ]}
+    mock_cursor.fetchall.side_effect = [
+        [{"id": 100, "import_id": 1}],
+        [{"id": 1, "topic_id": 7, "instance": 1},
+         {"id": 2, "topic_id": 7, "instance": 2},
+         {"id": 3, "topic_id": 7, "instance": 3}],
+        [{"id": 50, "user_id": 100, "activity_id": 1, "grade": Decimal("6.0")},
+         {"id": 51, "user_id": 100, "activity_id": 2, "grade": Decimal("4.0")},
+         {"id": 52, "user_id": 101, "activity_id": 3, "grade": Decimal("7.0")}]
+    ]
+
+    counts = import_service._delta_notas_alumnos(data, delete_missing=True)
+
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 1,
+                      'deleted': 1}
+    mock_cursor.executemany.assert_any_call(
+        "UPDATE Grades SET grade = %s WHERE id = %s", [(5.5, 51)])
+    mock_cursor.executemany.assert_any_call(
+        "DELETE FROM Grades WHERE id = %s", [(52,)])
+
+
+def test_load_professor_ids(import_service, mock_db):
+    """Test mapping professor import_ids to user IDs in one query."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.return_value = [{"id": 5, "import_id": 123}]
+
+    result = import_service._load_professor_ids(mock_cursor, [123, 999, 123])
+
+    expected_query = (
+        "SELECT id, import_id FROM Users "
+        "WHERE is_professor = TRUE "
+        "AND import_id IN (%s, %s)"
+    )
+    mock_cursor.execute.assert_called_once_with(expected_query, (123, 999))
+    assert result == {123: 5}
+
+
+def test_load_section_counts(import_service, mock_db):
+    """Test counting existing sections per instance in one query."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.return_value = [{"instance_id": 1, "total": 2}]
+
+    result = import_service._load_section_counts(mock_cursor, [1, 2])
+
+    expected_query = (
+        "SELECT instance_id, COUNT(*) AS total FROM Sections "
+        "WHERE instance_id IN (%s, %s) "
+        "GROUP BY instance_id"
+    )
+    mock_cursor.execute.assert_called_once_with(expected_query, (1, 2))
+    assert result == {1: 2}
+
+
+def test_fetch_in_chunks_splits_large_key_lists(import_service, mock_db):
+    """Test that long IN lists are sent in bounded chunks."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.side_effect = [[{"id": 1}], [{"id": 2}]]
+
+    with patch('Service.import_service.LOOKUP_CHUNK_SIZE', 3):
+        rows = import_service._fetch_in_chunks(
+            mock_cursor, "SELECT id FROM Rooms WHERE id IN ({placeholders})",
+            [1, 2, 3, 4])
+
+    assert mock_cursor.execute.call_count == 2
+    assert mock_cursor.execute.call_args[0] == (
+        "SELECT id FROM Rooms WHERE id IN (%s)", (4,))
+    assert rows == [{"id": 1}, {"id": 2}]
+
+
+def test_fetch_in_chunks_without_keys(import_service, mock_db):
+    """Test that an empty key list does not query the database."""
+    _, mock_cursor = mock_db
+
+    assert import_service._fetch_in_chunks(
+        mock_cursor, "SELECT id FROM Rooms WHERE id IN ({placeholders})",
+        []) == []
+    mock_cursor.execute.assert_not_called()
+
+
+def test_import_notas_alumnos_resolves_keys_in_memory(import_service, mock_db):
+    """Test that grades are resolved with two lookups for the whole file."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.side_effect = [
+        [{"id": 10, "import_id": 1}, {"id": 20, "import_id": 2}],
+        [{"id": 100, "topic_id": 7, "instance": 1}]
+    ]
+    data = {"notas": [
+        {"alumno_id": 1, "topico_id": 7, "instancia": 1, "nota": 5.5},
+        {"alumno_id": 2, "topico_id": 7, "instancia": 1, "nota": 6.0},
+        {"alumno_id": 3, "topico_id": 7, "instancia": 1, "nota": 4.0},
+        {"alumno_id": 1, "topico_id": 7, "instancia": 2, "nota": 7.0}
+    ]}
+
+    import_service._import_notas_alumnos(data)
+
+    assert mock_cursor.execute.call_count == 2
+    rows = mock_cursor.executemany.call_args[0][1]
+    assert rows == [(100, 10, 5.5), (100, 20, 6.0)]
+    output = reported(import_service)
+    assert "No user found for alumno_import_id 3" in output
+    assert "No activity found for topico_id 7 and instancia 2" in output
+
+
+def test_import_alumnos_seccion_resolves_keys_in_memory(import_service, mock_db):
+    """Test that enrollments are resolved with two lookups."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.side_effect = [
+        [{"id": 10, "import_id": 1}, {"id": 20, "import_id": 2}],
+        [{"id": 5, "course_id": 3}]
+    ]
+    data = {"alumnos_seccion": [
+        {"alumno_id": 1, "seccion_id": 5},
+        {"alumno_id": 2, "seccion_id": 5}
+    ]}
+
+    import_service._import_alumnos_seccion(data)
+
+    assert mock_cursor.execute.call_count == 2
+    mock_cursor.executemany.assert_called_once()
+    assert mock_cursor.executemany.call_args[0][1] == [
+        (10, 5, 3, 0), (20, 5, 3, 0)
+    ]
+
+
+def test_import_secciones_numbers_sections_in_memory(import_service, mock_db):
+    """Test that section numbers continue from the preloaded counts."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.side_effect = [
+        [{"id": 8, "import_id": 4}],
+        [{"instance_id": 1, "total": 2}]
+    ]
+    evaluacion = {"tipo": "peso", "combinacion_topicos": [], "topicos": {}}
+    data = {"secciones": [
+        {"id": 11, "instancia_curso": 1, "profesor_id": 4,
+         "evaluacion": evaluacion},
+        {"id": 12, "instancia_curso": 1, "profesor_id": 4,
+         "evaluacion": evaluacion}
+    ]}
+
+    with patch.object(import_service, '_insert_section') as mock_insert:
+        import_service._import_instancias_cursos_secciones(data)
+
+    assert mock_cursor.execute.call_count == 2
+    numbers = [call.kwargs['number'] for call in mock_insert.call_args_list]
+    assert numbers == [3, 4]
+    assert mock_insert.call_args.kwargs['profesor_id'] == 8
 
 
 @pytest.mark.parametrize("file_type,expected_method", [
@@ -566,22 +1114,34 @@ def test_insert_activity_command(import_service, mock_db):
         (1, 100, False, 1)
     )
 
-def test_success_message_printing(import_service, capsys):
-    """Test that success messages are printed correctly."""
+def test_message_helpers_record_into_report(import_service, capsys):
+    """Test that messages are collected in the report instead of printed."""
     import_service._success("Test message")
-    captured = capsys.readouterr()
-    assert "[SUCCESS] Test message" in captured.out
+    import_service._error("Test error")
+    import_service._validation_error("Test validation error")
 
+    report = import_service.report
+    assert capsys.readouterr().out == ""
+    assert report.messages == {'success': 1, 'error': 1,
+                               'validation_error': 1}
+    assert report.successes == [{'level': 'success',
+                                 'message': "Test message"}]
+    assert report.failures == [
+        {'level': 'error', 'message': "Test error"},
+        {'level': 'validation_error', 'message': "Test validation error"}
+    ]
 
-def test_error_message_printing(import_service, capsys):
-    """Test that error messages are printed correctly."""
-    import_service._error("Test error")
-    captured = capsys.readouterr()
-    assert "[ERROR] Test error" in captured.out
 
+def test_import_json_returns_report(import_service):
+    """Test that each import returns a new report with its counters."""
+    import_service._validation_error("Earlier import")
+    mock_file = StringIO(json.dumps({"salas": [
+        {"id": 1, "nombre": "Sala 1", "capacidad": 30}]}))
 
-def test_validation_error_message_printing(import_service, capsys):
-    """Test that validation error messages are printed correctly."""
-    import_service._validation_error("Test validation error")
-    captured = capsys.readouterr()
-    assert "[VALIDATION ERROR] Test validation error" in captured.out
\ No newline at end of file
+    with patch.object(import_service, '_import_salas_clases'):
+        report = import_service.import_json(mock_file, 'salas_clases')
+
+    assert report is import_service.report
+    assert report.file_type == 'salas_clases'
+    assert report.failures == []
+    assert report.as_dict()['rows'] == {'validated': 1}
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""Unit tests for the import_validator module.
+
+This module contains tests for the field rules, the declarative record
+schemas and the single-pass RecordValidator.
+"""
+
+import pytest
+from Service.import_validator import (
+    SCHEMAS, RecordValidator, check_no_circular_prerequisites,
+    check_prerequisites_exist, is_valid_credits, is_valid_email,
+    is_valid_grade, is_valid_name, is_valid_year, validate_records
+)
+
+
+def alumno(import_id, email=None, year=2020):
+    """Build a valid alumno record."""
+    return {"id": import_id, "nombre": f"Alumno {import_id}",
+            "correo": email or f"a{import_id}@test.com",
+            "anio_ingreso": year}
+
+
+def curso(course_id, code, requisitos=()):
+    """Build a valid curso record."""
+    return {"id": course_id, "codigo": code, "descripcion": f"Curso {code}",
+            "creditos": 5, "requisitos": list(requisitos)}
+
+
+def messages(errors):
+    """Extract the messages of a list of errors."""
+    return [error['message'] for error in errors]
+
+
+@pytest.mark.parametrize("email,expected", [
+    ("user.name@domain.co.uk", True),
+    ("professor+research@institution.org", True),
+    ("invalid-email", False),
+    ("@domain.com", False),
+    (None, False),
+])
+def test_is_valid_email(email, expected):
+    """Test the precompiled email rule."""
+    assert is_valid_email(email) is expected
+
+
+def test_is_valid_email_with_valid_emails():
+    """Test email validation with valid email addresses."""
+    valid_emails = [
+        "test@example.com",
+        "user.name@domain.co.uk",
+        "student123@university.edu",
+        "professor+research@institution.org"
+    ]
+    
+    for email in valid_emails:
+        assert is_valid_email(email) is True
+
+
+def test_is_valid_email_with_invalid_emails():
+    """Test email validation with invalid email addresses."""
+    invalid_emails = [
+        "",
+        None,
+        "invalid-email",
+        "@domain.com",
+        "user@",
+        "user@@domain.com",
+        123,
+        "user name@domain.com"
+    ]
+    
+    for email in invalid_emails:
+        assert is_valid_email(email) is False
+
+
+def test_is_valid_name_with_valid_names():
+    """Test name validation with valid names."""
+    valid_names = [
+        "Juan Pérez",
+        "María García-López",
+        "José",
+        "Ana María de los Santos"
+    ]
+    
+    for name in valid_names:
+        assert is_valid_name(name) is True
+
+
+def test_is_valid_name_with_invalid_names():
+    """Test name validation with invalid names."""
+    invalid_names = [
+        "",
+        None,
+        "   ",
+        123,
+        "a" * 101,
+    ]
+    
+    for name in invalid_names:
+        assert is_valid_name(name) is False
+
+
+def test_is_valid_year_with_valid_years():
+    """Test year validation with valid years."""
+    valid_years = [1990, 2000, 2025, 2050]
+    
+    for year in valid_years:
+        assert is_valid_year(year) is True
+
+
+def test_is_valid_year_with_invalid_years():
+    """Test year validation with invalid years."""
+    invalid_years = [1989, 2051, "2025", None, 0]
+    
+    for year in invalid_years:
+        assert is_valid_year(year) is False
+
+
+def test_is_valid_credits_with_valid_credits():
+    """Test credits validation with valid credit values."""
+    valid_credits = [1, 5, 10, 99]
+    
+    for credits in valid_credits:
+        assert is_valid_credits(credits) is True
+
+
+def test_is_valid_credits_with_invalid_credits():
+    """Test credits validation with invalid credit values."""
+    invalid_credits = [0, 100, "5", None, -1, 1.5]
+    
+    for credits in invalid_credits:
+        assert is_valid_credits(credits) is False
+
+
+def test_is_valid_grade_with_valid_grades():
+    """Test grade validation with valid grade values."""
+    valid_grades = [1.0, 4.5, 5.8, 7.0, 6]
+    
+    for grade in valid_grades:
+        assert is_valid_grade(grade) is True
+
+
+def test_is_valid_grade_with_invalid_grades():
+    """Test grade validation with invalid grade values."""
+    invalid_grades = [0.9, 7.1, "5.5", None, -1]
+    
+    for grade in invalid_grades:
+        assert is_valid_grade(grade) is False
+
+
+def test_validate_records_accepts_valid_file():
+    """Test that a valid file has no errors."""
+    data = {"alumnos": [alumno(1), alumno(2)]}
+
+    assert validate_records('alumnos', data) == []
+
+
+@pytest.mark.parametrize("data,message", [
+    ("not a dict", "Root must be an object"),
+    ({"students": []}, "Missing 'alumnos' key"),
+    ({"alumnos": "not a list"}, "'alumnos' must be an array"),
+])
+def test_validate_records_checks_structure(data, message):
+    """Test that structural problems are reported as file errors."""
+    errors = validate_records('alumnos', data)
+
+    assert errors == [{'index': None, 'field': None, 'message': message}]
+
+
+def test_validate_records_collects_every_field_error():
+    """Test that all invalid fields of all records are reported."""
+    data = {"alumnos": [
+        {"nombre": "Juan", "correo": "bad", "anio_ingreso": 2020},
+        alumno(2, year=1800)
+    ]}
+
+    errors = validate_records('alumnos', data)
+
+    assert messages(errors) == [
+        "Alumno 0: Missing required field 'id'",
+        "Alumno 0: 'correo' must be a valid email address (max 100 chars)",
+        "Alumno 1: 'anio_ingreso' must be a valid year (1990-2050)"
+    ]
+    assert [error['field'] for error in errors] == ['id', 'correo',
+                                                    'anio_ingreso']
+
+
+def test_validate_records_reports_duplicates_with_sets():
+    """Test that repeated emails and import ids are all reported."""
+    data = {"alumnos": [
+        alumno(1, "dup@test.com"), alumno(2, "DUP@test.com"), alumno(1)
+    ]}
+
+    errors = validate_records('alumnos', data)
+
+    assert messages(errors) == [
+        "Duplicate email found: dup@test.com",
+        "Duplicate import_id found: 1"
+    ]
+    assert [error['index'] for error in errors] == [1, 2]
+
+
+def test_validate_records_runs_logic_checks():
+    """Test the per-record logic checks."""
+    data = {"alumnos": [alumno(1, year=2049)]}
+
+    assert messages(validate_records('alumnos', data)) == [
+        "Alumno 0: Admission year 2049 is not logical"
+    ]
+
+
+def test_validate_records_reports_duplicate_grades():
+    """Test the composite uniqueness key of grades."""
+    nota = {"alumno_id": 1, "topico_id": 2, "instancia": 3, "nota": 5.0}
+    data = {"notas": [nota, dict(nota, nota=6.0)]}
+
+    assert messages(validate_records('notas_alumnos', data)) == [
+        "Grade 1: Duplicate grade - Student 1 already has grade for topic 2 "
+        "instance 3"
+    ]
+
+
+def test_validate_records_checks_prerequisites():
+    """Test the whole-file prerequisite checks of cursos."""
+    data = {"cursos": [
+        curso(1, "A", ["B"]), curso(2, "B", ["A"]), curso(3, "C", ["Z"])
+    ]}
+
+    assert messages(validate_records('cursos', data)) == [
+        "Curso 2: Prerequisite 'Z' not found in courses list",
+        "Circular dependency detected involving courses: A, B"
+    ]
+
+
+def test_check_prerequisites_exist_accepts_stored_courses():
+    """Test that prerequisites outside the file may already be stored."""
+    cursos = [curso(1, "A", ["B", "S1"]), curso(2, "B", ["S2", "S1"])]
+    lookups = []
+
+    def find_stored(codes):
+        lookups.append(codes)
+        return {"S1"}
+
+    assert check_prerequisites_exist(cursos, find_stored) == [
+        "Curso 1: Prerequisite 'S2' not found in courses list"
+    ]
+    assert lookups == [["S1", "S2"]]
+
+
+def test_check_no_circular_prerequisites_reports_every_cycle():
+    """Test that each group of mutually dependent courses is reported."""
+    cursos = [
+        curso(1, "A", ["B"]), curso(2, "B", ["C"]), curso(3, "C", ["A"]),
+        curso(4, "D", []), curso(5, "E", ["F"]), curso(6, "F", ["E", "D"])
+    ]
+
+    assert check_no_circular_prerequisites(cursos) == [
+        "Circular dependency detected involving courses: A, B, C",
+        "Circular dependency detected involving courses: E, F"
+    ]
+
+
+def test_check_no_circular_prerequisites_handles_long_chains():
+    """Test that a chain longer than the recursion limit is analyzed."""
+    cursos = [curso(i + 1, f"C{i}", [f"C{i + 1}"] if i < 4999 else [])
+              for i in range(5000)]
+
+    assert check_no_circular_prerequisites(cursos) == []
+
+
+def test_validate_records_skips_file_checks_after_record_errors():
+    """Test that file checks only run on records with valid fields."""
+    data = {"cursos": [curso(1, "A", ["A"]), {"id": 2}]}
+
+    errors = validate_records('cursos', data)
+
+    assert "Curso 0: Course cannot be prerequisite of itself: A" in messages(errors)
+    assert not any("Circular" in message for message in messages(errors))
+
+
+def test_record_validator_checks_records_incrementally():
+    """Test that records can be fed one at a time, as when streaming."""
+    validator = RecordValidator(SCHEMAS['salas_clases'])
+
+    assert validator.check({"id": 1, "nombre": "A", "capacidad": 30}, 0)
+    assert not validator.check([1, 2], 1)
+    assert not validator.check({"id": 2, "nombre": "B", "capacidad": 3}, 2)
+
+    assert messages(validator.errors) == [
+        "Sala 1: Record must be an object",
+        "Room 2: Capacity 3 seems too low for a classroom"
+    ]
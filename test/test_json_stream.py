@@ -0,0 +1,91 @@
+"""Unit tests for the json_stream module.
+
+This module contains tests for incremental parsing of the top-level array of
+an import file, including records split across read chunks.
+"""
+
+import json
+from io import BytesIO, StringIO
+import pytest
+from Service.json_stream import iter_json_array
+
+
+def test_iter_json_array_yields_records():
+    """Test that every record of the array is yielded in order."""
+    records = [{'id': 1, 'nombre': 'Ana'}, {'id': 2, 'nombre': 'Luis'}]
+    file = StringIO(json.dumps({'alumnos': records}))
+
+    assert list(iter_json_array(file, 'alumnos')) == records
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+def test_iter_json_array_handles_records_split_across_chunks(chunk_size):
+    """Test that records, numbers and UTF-8 characters may span chunks."""
+    records = [{'id': 12345, 'nombre': 'José Muñoz', 'nota': 6.75},
+               {'id': 7, 'nombre': 'Ñandú', 'nota': 1}]
+    raw = (b'\xef\xbb\xbf'
+           + json.dumps({'alumnos': records}, ensure_ascii=False).encode())
+
+    result = list(iter_json_array(BytesIO(raw), 'alumnos',
+                                  chunk_size=chunk_size))
+
+    assert result == records
+
+
+def test_iter_json_array_skips_other_members():
+    """Test that members before the array are parsed and ignored."""
+    file = StringIO('{"version": {"n": [1, 2]}, "salas": [{"id": 3}], "x": 1}')
+
+    assert list(iter_json_array(file, 'salas')) == [{'id': 3}]
+
+
+def test_iter_json_array_with_empty_array():
+    """Test that an empty array yields nothing."""
+    file = StringIO('{ "notas" : [ ] }')
+
+    assert list(iter_json_array(file, 'notas')) == []
+
+
+def test_iter_json_array_is_lazy():
+    """Test that records are yielded before the rest is read."""
+    file = StringIO('{"notas": [{"id": 1}, this is not json')
+    records = iter_json_array(file, 'notas')
+
+    assert next(records) == {'id': 1}
+    with pytest.raises(ValueError):
+        next(records)
+
+
+@pytest.mark.parametrize("document,message", [
+    ('[1, 2]', "Root must be an object"),
+    ('{}', "Missing 'alumnos' key"),
+    ('{"otros": []}', "Missing 'alumnos' key"),
+    ('{"alumnos": "not a list"}', "'alumnos' must be an array"),
+    ('{"alumnos": [{"id": 1} {"id": 2}]}', "Expected ','"),
+])
+def test_iter_json_array_rejects_invalid_documents(document, message):
+    """Test that structural problems raise ValueError."""
+    with pytest.raises(ValueError, match=message):
+        list(iter_json_array(StringIO(document), 'alumnos'))
+
+
+def test_iter_json_array_stops_at_a_malformed_record():
+    """Test that a broken record does not make the reader buffer the rest."""
+    tail = ', '.join(['{"id": 2, "nombre": "Luis"}'] * 100000)
+    file = StringIO('{"alumnos": [{"id": 1,, "nombre": "Ana"}, ' + tail + ']}')
+
+    with pytest.raises(ValueError, match="Expecting property name"):
+        list(iter_json_array(file, 'alumnos', chunk_size=1024))
+
+    assert file.tell() <= 2048
+
+
+def test_iter_json_array_bounds_the_size_of_a_value():
+    """Test that a value that never ends is not read into memory whole."""
+    file = StringIO('{"alumnos": [{"nombre": "' + 'a' * 100000)
+
+    with pytest.raises(ValueError, match="longer than 4096 characters"):
+        list(iter_json_array(file, 'alumnos', chunk_size=1024,
+                             max_value_size=4096))
+
+    assert file.tell() < 8192
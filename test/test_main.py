@@ -19,6 +19,7 @@ def app():
          patch('main.TopicService'), \
          patch('main.ActivityService'), \
          patch('main.ImportService'), \
+         patch('main.ImportJobService'), \
          patch('main.InstanceService'), \
          patch('main.RoomService'), \
          patch('main.GradeService'), \
@@ -47,6 +48,7 @@ def mock_services():
         'topic_service': Mock(),
         'activity_service': Mock(),
         'import_service': Mock(),
+        'import_job_service': Mock(),
         'instance_service': Mock(),
         'room_service': Mock(),
         'grade_service': Mock(),
@@ -69,6 +71,36 @@ class TestHomeRoute:
         mock_render.assert_called_once_with('home.html')
 
 
+class TestUnitOfWork:
+    """Test cases for the request-scoped database transaction."""
+
+    @patch('main.DatabaseConnection')
+    def test_request_commits_unit_of_work_once(self, mock_db_class, client, mock_services):
+        """Test that a successful request commits its writes once."""
+        mock_db = mock_db_class.return_value
+
+        response = client.post('/courses/delete/1', follow_redirects=False)
+
+        assert response.status_code == 302
+        mock_db.begin_unit_of_work.assert_called_once()
+        mock_db.complete_unit_of_work.assert_called_once()
+        mock_db.release.assert_called_once()
+
+    @patch('main.DatabaseConnection')
+    def test_failed_request_does_not_commit(self, mock_db_class, app, mock_services):
+        """Test that an unhandled error skips the commit and rolls back."""
+        mock_db = mock_db_class.return_value
+        mock_services['course_service'].delete.side_effect = RuntimeError("boom")
+        app.config['PROPAGATE_EXCEPTIONS'] = False
+
+        response = app.test_client().post('/courses/delete/1')
+
+        app.config['PROPAGATE_EXCEPTIONS'] = None
+        assert response.status_code == 500
+        mock_db.complete_unit_of_work.assert_not_called()
+        mock_db.abort_unit_of_work.assert_called()
+
+
 class TestCourseRoutes:
     """Test cases for course-related routes."""
     
@@ -890,7 +922,10 @@ class TestGradeRoutes:
         mock_instance = {'id': 1, 'course_id': 1}
         mock_course = {'id': 1, 'name': 'Test Course'}
         mock_enrollments = [
-            {'user_id': 1, 'user_name': 'Student 1', 'user_email': 'student1@test.com'}
+            {'user_id': 1, 'user_name': 'Student 1', 'user_email': 'student1@test.com',
+             'grade_id': None, 'grade': None},
+            {'user_id': 2, 'user_name': 'Student 2', 'user_email': 'student2@test.com',
+             'grade_id': 5, 'grade': 6.5}
         ]
         
         mock_services['activity_service'].get_by_id.return_value = mock_activity
@@ -898,13 +933,18 @@ class TestGradeRoutes:
         mock_services['section_service'].get_by_id.return_value = mock_section
         mock_services['instance_service'].get_by_id.return_value = mock_instance
         mock_services['course_service'].get_by_id.return_value = mock_course
-        mock_services['course_taken_service'].get_students_by_section.return_value = mock_enrollments
-        mock_services['grade_service'].get_by_activity_and_student.return_value = None
+        mock_services['course_taken_service'].get_students_with_activity_grade.return_value = mock_enrollments
         mock_render.return_value = "Evaluate Students Form"
         
         response = client.get('/activities/1/evaluate')
         
         assert response.status_code == 200
+        mock_services['course_taken_service'].get_students_with_activity_grade.assert_called_once_with(1, 1)
+        mock_services['grade_service'].get_by_activity_and_student.assert_not_called()
+        students = mock_render.call_args[1]['students']
+        assert 'grade_id' not in students[0]
+        assert students[1]['grade'] == 6.5
+        assert students[1]['grade_id'] == 5
 
     def test_evaluate_students_invalid_activity(self, client, mock_services):
         """Test evaluating students for non-existent activity."""
@@ -933,7 +973,8 @@ class TestGradeRoutes:
         response = client.post('/activities/1/save_grades', data=form_data, follow_redirects=False)
         
         assert response.status_code == 302
-        mock_services['grade_service'].create.assert_called_once_with(6.5, 1, 1)
+        mock_services['grade_service'].bulk_upsert.assert_called_once_with(1, {1: 6.5})
+        mock_services['grade_service'].create.assert_not_called()
 
     def test_save_grades_invalid_format(self, client, mock_services):
         """Test saving grades with invalid format."""
@@ -955,6 +996,190 @@ class TestGradeRoutes:
         
         assert response.status_code == 302
         mock_services['grade_service'].create.assert_not_called()
+        mock_services['grade_service'].bulk_upsert.assert_not_called()
+
+    def test_save_grades_clamps_and_batches_all_students(self, client, mock_services):
+        """Test that every student's grade is saved in one batch."""
+        mock_services['activity_service'].get_by_id.return_value = {'id': 1, 'topic_id': 1}
+        mock_services['topic_service'].get_by_id.return_value = {'id': 1, 'section_id': 1}
+        mock_services['section_service'].get_by_id.return_value = {'id': 1}
+        mock_services['course_taken_service'].get_students_by_section.return_value = [
+            {'user_id': 1, 'user_name': 'Student 1'},
+            {'user_id': 2, 'user_name': 'Student 2'},
+            {'user_id': 3, 'user_name': 'Student 3'}
+        ]
+
+        form_data = {'grade_1': '9', 'grade_2': '4.46', 'grade_id_2': '8'}
+
+        response = client.post('/activities/1/save_grades', data=form_data, follow_redirects=False)
+
+        assert response.status_code == 302
+        mock_services['grade_service'].bulk_upsert.assert_called_once_with(
+            1, {1: 7.0, 2: 4.5})
+        mock_services['grade_service'].update.assert_not_called()
+
+
+@pytest.fixture
+def engine_grade_service():
+    """Create a real GradeService over a section without topics or grades."""
+    from Service.grade_service import GradeService
+
+    mock_cursor = Mock()
+    mock_cursor.fetchone.return_value = {'id': 1, 'weight_or_percentage': False}
+    mock_cursor.fetchall.return_value = []
+    mock_db = Mock()
+    mock_db.connect.return_value = mock_cursor
+    with patch('Service.grade_service.DatabaseConnection', return_value=mock_db), \
+         patch('Service.grade_engine.DatabaseConnection', return_value=mock_db):
+        return GradeService()
+
+
+class TestSectionGradeRoutes:
+    """Test cases for final grade calculation routes."""
+
+    def test_close_section_calculates_grades_in_batch(self, client, mock_services):
+        """Test that closing a section grades every student at once."""
+        mock_services['section_service'].get_by_id.return_value = {
+            'id': 1, 'number': 1, 'instance_id': 2
+        }
+        final_grades = {1: 5.5, 2: 6.0}
+        mock_services['grade_service'].calculate_final_grades_for_section.return_value = final_grades
+
+        response = client.post('/sections/1/close', follow_redirects=False)
+
+        assert response.status_code == 302
+        mock_services['grade_service'].calculate_final_grades_for_section.assert_called_once_with(1, errors={})
+        mock_services['course_taken_service'].update_final_grades.assert_called_once_with(1, final_grades)
+        mock_services['grade_service'].calculate_final_grade.assert_not_called()
+        mock_services['section_service'].close_section.assert_called_once_with(1)
+
+    def test_close_section_reports_students_that_failed(self, client, mock_services):
+        """Test that a student with a bad grade is flashed and skipped."""
+        mock_services['section_service'].get_by_id.return_value = {
+            'id': 1, 'number': 1, 'instance_id': 2
+        }
+
+        def calculate(section_id, errors):
+            errors[2] = "Invalid grade 'x' for activity 10"
+            return {1: 5.5}
+
+        mock_services['grade_service'].calculate_final_grades_for_section.side_effect = calculate
+        mock_services['course_taken_service'].get_students_by_section.return_value = [
+            {'user_id': 1, 'user_name': 'Ana'}, {'user_id': 2, 'user_name': 'Luis'}
+        ]
+
+        response = client.post('/sections/1/close', follow_redirects=False)
+
+        assert response.status_code == 302
+        mock_services['course_taken_service'].update_final_grades.assert_called_once_with(1, {1: 5.5})
+        with client.session_transaction() as session:
+            flashes = session['_flashes']
+        assert ('warning', "Error calculating grade for student Luis: "
+                "Invalid grade 'x' for activity 10") in flashes
+        assert any("Final grades calculated for 1 students" in message
+                   for _, message in flashes)
+
+    def test_calculate_student_grade_renders_engine_breakdown(self, client, mock_services):
+        """Test that the grade page renders the engine's breakdown."""
+        mock_services['section_service'].get_by_id.return_value = {'id': 1, 'instance_id': 2}
+        mock_services['user_service'].get_by_id.return_value = {'id': 4, 'name': 'Ana'}
+        mock_services['instance_service'].get_by_id.return_value = {'id': 2, 'course_id': 3}
+        mock_services['course_service'].get_by_id.return_value = {'id': 3, 'name': 'Curso'}
+        breakdown = {'topic_calculations': [], 'final_grade': 5.5, 'total_weight': 1.0}
+        mock_services['grade_service'].get_student_breakdown.return_value = breakdown
+
+        with patch('main.render_template', return_value="Grade Page") as mock_render:
+            response = client.get('/sections/1/students/4/calculate_grade')
+
+        assert response.status_code == 200
+        mock_services['grade_service'].get_student_breakdown.assert_called_once_with(4, 1)
+        mock_services['grade_service'].get_by_activity_and_student.assert_not_called()
+        mock_services['course_taken_service'].update_final_grade.assert_called_once_with(4, 1, 5.5)
+        assert mock_render.call_args[1]['final_grade'] == 5.5
+
+    def test_calculate_student_grade_unknown_student(self, client, mock_services):
+        """Test that the grade page returns 404 for an unknown student."""
+        mock_services['section_service'].get_by_id.return_value = {'id': 1, 'instance_id': 2}
+        mock_services['user_service'].get_by_id.return_value = None
+
+        response = client.get('/sections/1/students/4/calculate_grade')
+
+        assert response.status_code == 404
+
+    def test_recalculate_grade_stores_the_final_grade(self, client, mock_services):
+        """Test that recalculating one student stores its final grade."""
+        mock_services['grade_service'].calculate_final_grade.return_value = 6.2
+
+        response = client.get('/sections/1/students/4/recalculate', follow_redirects=False)
+
+        assert response.status_code == 302
+        mock_services['grade_service'].calculate_final_grade.assert_called_once_with(4, 1)
+        mock_services['course_taken_service'].update_final_grade.assert_called_once_with(4, 1, 6.2)
+
+    def test_calculate_student_grade_reports_invalid_grades(self, client, mock_services,
+                                                            engine_grade_service):
+        """Test that a student with a bad grade row is flashed, not graded."""
+        mock_services['section_service'].get_by_id.return_value = {'id': 1, 'instance_id': 2}
+        mock_services['user_service'].get_by_id.return_value = {'id': 4, 'name': 'Ana'}
+        engine_grade_service.db.connect.return_value.fetchall.side_effect = [
+            [{'id': 1, 'name': 'Tareas', 'weight': 100, 'weight_or_percentage': False}],
+            [{'id': 10, 'topic_id': 1, 'instance': 1, 'weight': 1, 'optional_flag': False}],
+            [{'user_id': 4, 'activity_id': 10, 'grade': 'n/a'}]
+        ]
+
+        with patch('main.grade_service', engine_grade_service):
+            response = client.get('/sections/1/students/4/calculate_grade')
+
+        assert response.status_code == 302
+        assert response.location.endswith('/sections/1/students')
+        mock_services['course_taken_service'].update_final_grade.assert_not_called()
+        with client.session_transaction() as session:
+            assert session['_flashes'] == [
+                ('danger', "Error calculating grade: Invalid grade 'n/a' for activity 10")]
+
+    def test_recalculate_grade_unknown_section(self, client, mock_services):
+        """Test that recalculating in an unknown section returns 404."""
+        mock_services['section_service'].get_by_id.return_value = None
+
+        response = client.get('/sections/1/students/4/recalculate')
+
+        assert response.status_code == 404
+        mock_services['grade_service'].calculate_final_grades_for_section.assert_not_called()
+
+    def test_recalculate_grade_student_not_enrolled(self, client, mock_services,
+                                                    engine_grade_service):
+        """Test that a student outside the section gets no made-up grade."""
+        mock_services['section_service'].get_by_id.return_value = {'id': 1, 'instance_id': 2}
+        mock_services['user_service'].get_by_id.return_value = {'id': 4, 'name': 'Ana'}
+        mock_services['course_taken_service'].is_student_enrolled.return_value = False
+        # The engine grades any user id it is given, enrolled or not.
+        assert engine_grade_service.calculate_final_grades_for_section(
+            1, user_ids=[4]) == {4: 1.0}
+
+        with patch('main.grade_service', engine_grade_service):
+            response = client.get('/sections/1/students/4/recalculate', follow_redirects=False)
+
+        assert response.status_code == 302
+        assert response.location.endswith('/sections/1/students')
+        mock_services['course_taken_service'].is_student_enrolled.assert_called_once_with(4, 1)
+        mock_services['course_taken_service'].update_final_grade.assert_not_called()
+        with client.session_transaction() as session:
+            assert session['_flashes'] == [
+                ('danger', "Student is not enrolled in this section.")]
+
+    def test_calculate_student_grade_student_not_enrolled(self, client, mock_services,
+                                                          engine_grade_service):
+        """Test that the grade page does not store a grade for outsiders."""
+        mock_services['section_service'].get_by_id.return_value = {'id': 1, 'instance_id': 2}
+        mock_services['user_service'].get_by_id.return_value = {'id': 4, 'name': 'Ana'}
+        mock_services['course_taken_service'].is_student_enrolled.return_value = False
+
+        with patch('main.grade_service', engine_grade_service):
+            response = client.get('/sections/1/students/4/calculate_grade')
+
+        assert response.status_code == 302
+        assert response.location.endswith('/sections/1/students')
+        mock_services['course_taken_service'].update_final_grade.assert_not_called()
 
 
 class TestUploadRoutes:
@@ -988,10 +1213,123 @@ class TestUploadRoutes:
             'json_file': (BytesIO(file_data), 'test.json')
         }
         
+        mock_services['import_job_service'].submit.return_value = 'abc123'
+
         response = client.post('/import', data=form_data, 
                              content_type='multipart/form-data', follow_redirects=False)
         
         assert response.status_code == 302
+        submit = mock_services['import_job_service'].submit
+        assert submit.call_args[0][1:] == ('alumnos', 'test.json')
+        assert submit.call_args[1] == {'delta': False, 'delete_missing': False,
+                                       'resumable': False, 'dry_run': False,
+                                       'atomic': False}
+
+    def test_import_data_delta(self, client, mock_services):
+        """Test that the delta options are passed to the job queue."""
+        from io import BytesIO
+
+        form_data = {
+            'data_type': 'notas_alumnos',
+            'delta': '1',
+            'json_file': (BytesIO(b'{}'), 'notas.json')
+        }
+
+        response = client.post('/import', data=form_data,
+                               content_type='multipart/form-data', follow_redirects=False)
+
+        assert response.status_code == 302
+        submit = mock_services['import_job_service'].submit
+        assert submit.call_args[1] == {'delta': True, 'delete_missing': False,
+                                       'resumable': False, 'dry_run': False,
+                                       'atomic': False}
+
+    def test_import_data_dry_run(self, client, mock_services):
+        """Test that a queued dry run is not announced as an import."""
+        from io import BytesIO
+
+        mock_services['import_job_service'].submit.return_value = 'abc123'
+        form_data = {
+            'data_type': 'alumnos',
+            'dry_run': '1',
+            'json_file': (BytesIO(b'{}'), 'test.json')
+        }
+
+        response = client.post('/import', data=form_data,
+                               content_type='multipart/form-data', follow_redirects=False)
+
+        assert response.status_code == 302
+        submit = mock_services['import_job_service'].submit
+        assert submit.call_args[1]['dry_run'] is True
+        with client.session_transaction() as session:
+            flashes = [message for _, message in session['_flashes']]
+        assert flashes == ["Dry run of alumnos data queued as job abc123"]
+
+    def test_import_data_unsupported_type(self, client, mock_services):
+        """Test import with a type the job queue rejects."""
+        from io import BytesIO
+
+        mock_services['import_job_service'].submit.side_effect = ValueError("bad type")
+        form_data = {
+            'data_type': 'unknown',
+            'json_file': (BytesIO(b'{}'), 'test.json')
+        }
+
+        response = client.post('/import', data=form_data,
+                               content_type='multipart/form-data', follow_redirects=False)
+
+        assert response.status_code == 302
+
+    def test_import_bundle_queues_job(self, client, mock_services):
+        """Test that an uploaded zip bundle is queued as one job."""
+        from io import BytesIO
+
+        mock_services['import_job_service'].submit_bundle.return_value = 'abc123'
+        form_data = {'bundle_file': (BytesIO(b'PK'), 'semestre.zip')}
+
+        response = client.post('/import/bundle', data=form_data,
+                               content_type='multipart/form-data', follow_redirects=False)
+
+        assert response.status_code == 302
+        args = mock_services['import_job_service'].submit_bundle.call_args[0]
+        assert args[1] == 'semestre.zip'
+
+    def test_import_bundle_missing_file(self, client, mock_services):
+        """Test bundle import without a file."""
+        response = client.post('/import/bundle', data={}, follow_redirects=False)
+
+        assert response.status_code == 302
+        mock_services['import_job_service'].submit_bundle.assert_not_called()
+
+    def test_import_job_status(self, client, mock_services):
+        """Test progress endpoint of a known job."""
+        job = {'id': 'abc123', 'status': 'running', 'validated': 10,
+               'inserted': 5, 'failed': 0, 'rows_per_second': 50.0}
+        mock_services['import_job_service'].get.return_value = job
+
+        response = client.get('/import/jobs/abc123')
+
+        assert response.status_code == 200
+        assert response.get_json() == job
+        mock_services['import_job_service'].get.assert_called_once_with('abc123')
+
+    def test_import_job_status_not_found(self, client, mock_services):
+        """Test progress endpoint of an unknown job."""
+        mock_services['import_job_service'].get.return_value = None
+
+        response = client.get('/import/jobs/missing')
+
+        assert response.status_code == 404
+        assert 'error' in response.get_json()
+
+    def test_list_import_jobs(self, client, mock_services):
+        """Test listing every import job."""
+        mock_services['import_job_service'].get_all.return_value = [{'id': 'a'}]
+
+        response = client.get('/import/jobs')
+
+        assert response.status_code == 200
+        assert response.get_json() == [{'id': 'a'}]
 
 
 class TestScheduleRoutes:
@@ -1036,6 +1374,29 @@ class TestScheduleRoutes:
         mock_services['schedule_service'].generate_schedule.assert_called_once_with('2025-1')
         mock_services['schedule_service'].create_csv.assert_called_once_with('2025-1')
 
+    def test_generate_schedule_with_search(self, client, mock_services):
+        """Test that the search option runs the multi-start search."""
+        mock_services['schedule_service'].search_schedule.return_value = [{'day': 'Monday'}]
+        mock_services['schedule_service'].create_csv.return_value = "csv,content"
+
+        response = client.post('/schedule/generate',
+                               data={'period': '2025-1', 'search': '1'})
+
+        assert response.status_code == 200
+        mock_services['schedule_service'].search_schedule.assert_called_once_with('2025-1')
+        mock_services['schedule_service'].generate_schedule.assert_not_called()
+
+    def test_generate_schedule_with_optimize(self, client, mock_services):
+        """Test that the optimize option improves the schedule before export."""
+        mock_services['schedule_service'].generate_schedule.return_value = [{'day': 'Monday'}]
+        mock_services['schedule_service'].create_csv.return_value = "csv,content"
+
+        response = client.post('/schedule/generate',
+                               data={'period': '2025-1', 'optimize': '1'})
+
+        assert response.status_code == 200
+        mock_services['schedule_service'].optimize_schedule.assert_called_once_with()
+
 
 class TestReportRoutes:
     """Test cases for report-related routes."""
@@ -1070,15 +1431,19 @@ class TestReportRoutes:
         mock_section = {'id': 1, 'instance_id': 1}
         mock_instance = {'id': 1, 'course_id': 1}
         mock_course = {'id': 1, 'name': 'Test Course'}
-        mock_enrollments = [{'user_id': 1, 'user_name': 'Student 1', 'user_email': 'student1@test.com'}]
+        mock_enrollments = [
+            {'user_id': 1, 'user_name': 'Student 1', 'user_email': 'student1@test.com',
+             'grade_id': 3, 'grade': 6.5},
+            {'user_id': 2, 'user_name': 'Student 2', 'user_email': 'student2@test.com',
+             'grade_id': None, 'grade': None}
+        ]
         
         mock_services['activity_service'].get_by_id.return_value = mock_activity
         mock_services['topic_service'].get_by_id.return_value = mock_topic
         mock_services['section_service'].get_by_id.return_value = mock_section
         mock_services['instance_service'].get_by_id.return_value = mock_instance
         mock_services['course_service'].get_by_id.return_value = mock_course
-        mock_services['course_taken_service'].get_students_by_section.return_value = mock_enrollments
-        mock_services['grade_service'].get_by_activity_and_student.return_value = {'grade': 6.5}
+        mock_services['course_taken_service'].get_students_with_activity_grade.return_value = mock_enrollments
         mock_services['user_service'].get_all.return_value = []
         mock_services['section_service'].get_closed_sections.return_value = []
         mock_services['activity_service'].get_all_with_context.return_value = []
@@ -1092,6 +1457,9 @@ class TestReportRoutes:
         response = client.post('/reports', data=form_data)
         
         assert response.status_code == 200
+        mock_services['grade_service'].get_by_activity_and_student.assert_not_called()
+        grades_data = mock_render.call_args[1]['report_context']['grades_data']
+        assert [row['grade'] for row in grades_data] == [6.5, 'Not graded']
 
 
 @pytest.mark.parametrize("route,expected_code", [
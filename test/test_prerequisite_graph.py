@@ -0,0 +1,66 @@
+"""Unit tests for the prerequisite_graph module.
+
+This module contains tests for the strongly connected components, cycle
+detection and topological ordering of prerequisite graphs.
+"""
+
+import pytest
+from Service.prerequisite_graph import (
+    find_cycles, prerequisite_graph, strongly_connected_components,
+    topological_order
+)
+
+
+def test_prerequisite_graph_maps_codes_to_prerequisites():
+    """Test building the graph from cursos records."""
+    cursos = [{"codigo": "A", "requisitos": ["B"]},
+              {"codigo": "B", "requisitos": []}]
+
+    assert prerequisite_graph(cursos) == {"A": ["B"], "B": []}
+
+
+def test_components_list_prerequisites_first():
+    """Test that each component follows the components it points to."""
+    graph = {"A": ["B", "C"], "B": ["C"], "C": [], "D": ["A"]}
+
+    components = strongly_connected_components(graph)
+
+    assert components == [["C"], ["B"], ["A"], ["D"]]
+
+
+def test_components_group_mutual_dependencies():
+    """Test that every node of a cycle lands in the same component."""
+    graph = {"A": ["B"], "B": ["C"], "C": ["A", "D"], "D": ["E"],
+             "E": ["D"], "F": []}
+
+    components = {frozenset(c) for c in strongly_connected_components(graph)}
+
+    assert components == {frozenset("ABC"), frozenset("DE"), frozenset("F")}
+
+
+def test_find_cycles_includes_self_loops():
+    """Test that a node pointing to itself is a cycle."""
+    graph = {"A": ["A"], "B": ["C"], "C": []}
+
+    assert find_cycles(graph) == [["A"]]
+
+
+def test_nodes_only_pointed_to_have_no_edges():
+    """Test that prerequisites missing from the graph are leaf nodes."""
+    assert topological_order({"A": ["X"]}) == ["X", "A"]
+
+
+def test_topological_order_of_long_chain():
+    """Test a chain far longer than the recursion limit."""
+    size = 20000
+    graph = {i: [i + 1] for i in range(size)}
+
+    order = topological_order(graph)
+
+    assert order == list(range(size, -1, -1))
+
+
+def test_topological_order_rejects_cycles():
+    """Test that a cyclic graph has no topological order."""
+    with pytest.raises(ValueError, match="Circular dependency"):
+        topological_order({"A": ["B"], "B": ["A"]})
@@ -0,0 +1,75 @@
+"""Unit tests for the schedule_occupancy module.
+
+This module contains tests for the valid time blocks, their precomputed masks
+and the bitmask occupancy of rooms and professors.
+"""
+
+import pytest
+from Service.schedule_occupancy import ScheduleOccupancy, is_valid_time_block
+
+HOURS = list(range(9, 18))
+DAYS = ['Monday', 'Tuesday']
+
+
+@pytest.fixture
+def occupancy():
+    """Create a free occupancy of two rooms over a full day."""
+    return ScheduleOccupancy([1, 2], HOURS, DAYS)
+
+
+@pytest.mark.parametrize("time_block,expected", [
+    ([9, 10], True),
+    ([12, 13], False),
+    ([14, 15, 16, 17], True),
+    ([17, 18], False),
+])
+def test_is_valid_time_block(time_block, expected):
+    """Test the lunch hour and last hour rules."""
+    assert is_valid_time_block(time_block) is expected
+
+
+def test_blocks_are_precomputed_without_invalid_hours(occupancy):
+    """Test that every block of a length skips the lunch hour."""
+    blocks = occupancy.blocks(2)
+
+    assert [time_block for time_block, _ in blocks] == [
+        [9, 10], [10, 11], [11, 12], [14, 15], [15, 16], [16, 17]
+    ]
+    assert blocks[0][1] == 0b11
+    assert blocks[3][1] == 0b11 << 5
+    assert occupancy.blocks(10) == []
+
+
+def test_masks_match_their_blocks(occupancy):
+    """Test that each precomputed mask covers exactly its hours."""
+    for length in range(1, len(HOURS) + 1):
+        for time_block, mask in occupancy.blocks(length):
+            assert mask == occupancy.mask(time_block)
+            assert bin(mask).count('1') == length
+
+
+def test_occupy_and_release_track_room_and_professor(occupancy):
+    """Test that a block is busy for its room and professor only."""
+    mask = occupancy.mask([10, 11])
+
+    occupancy.occupy(1, 7, 0, mask)
+
+    assert not occupancy.is_free(1, 8, 0, occupancy.mask([11]))
+    assert not occupancy.is_free(2, 7, 0, occupancy.mask([9, 10]))
+    assert occupancy.is_free(2, 8, 0, mask)
+    assert occupancy.is_free(1, 7, 1, mask)
+
+    occupancy.release(1, 7, 0, mask)
+
+    assert occupancy.rooms[1] == [0, 0]
+    assert occupancy.professors[7] == [0, 0]
+
+
+def test_professor_gaps_skip_the_lunch_hour(occupancy):
+    """Test the free hours counted between a professor's classes."""
+    occupancy.occupy(1, 7, 0, occupancy.mask([9, 10]))
+    occupancy.occupy(2, 7, 0, occupancy.mask([12]))
+    occupancy.occupy(1, 7, 0, occupancy.mask([15]))
+    occupancy.occupy(1, 8, 1, occupancy.mask([9, 10, 11]))
+
+    assert occupancy.professor_gaps() == 2
@@ -0,0 +1,210 @@
+"""Unit tests for the schedule_optimizer module.
+
+This module contains tests for each term of the optimizer's cost, for its
+incremental cost updates and for the schedules it writes back.
+"""
+
+import itertools
+import random
+import time
+from unittest.mock import patch
+import pytest
+from Service.schedule_optimizer import CHECK_INTERVAL, ScheduleOptimizer
+
+HOURS = list(range(9, 18))
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+
+def make_entry(prof_id, day, start, end, room, enrollment=0):
+    """Build a schedule entry with the fields the optimizer reads."""
+    return {'professor_id': prof_id, 'day': day, 'start': start,
+            'end': end, 'room_name': room['name'],
+            'room_capacity': room['capacity'], 'enrollment': enrollment}
+
+
+def assert_valid(schedule):
+    """Check that no room or professor is booked twice at the same hour."""
+    booked = set()
+    for entry in schedule:
+        hours = range(entry['start'], entry['end'])
+        assert 13 not in hours and entry['end'] <= 18
+        for hour in hours:
+            keys = {('room', entry['room_name'], entry['day'], hour),
+                    ('professor', entry['professor_id'], entry['day'], hour)}
+            assert not keys & booked
+            booked |= keys
+
+
+def optimize(schedule, rooms, **weights):
+    """Run a short seeded optimization with the given cost weights."""
+    optimizer = ScheduleOptimizer(rooms, HOURS, DAYS, weights=weights,
+                                  time_budget=0.2, seed=1)
+    optimizer.optimize(schedule)
+    return optimizer
+
+
+def test_optimize_spreads_classes_across_days():
+    """Test that classes packed into one day are spread over the week."""
+    rooms = [{'name': f"Room {index}", 'capacity': 30}
+             for index in range(5)]
+    schedule = [make_entry(index, 'Monday', 9, 11, room)
+                for index, room in enumerate(rooms)]
+
+    optimize(schedule, rooms, room_fit=0, gaps=0)
+
+    assert sorted(entry['day'] for entry in schedule) == sorted(DAYS)
+    assert_valid(schedule)
+
+
+def test_optimize_fits_rooms_to_enrollment():
+    """Test that sections move to the room closest to their size."""
+    small = {'name': 'Small', 'capacity': 20}
+    large = {'name': 'Large', 'capacity': 60}
+    schedule = [make_entry(1, 'Monday', 9, 11, small, enrollment=55),
+                make_entry(2, 'Monday', 9, 11, large, enrollment=15)]
+
+    optimize(schedule, [small, large], spread=0, gaps=0)
+
+    assert [(entry['room_name'], entry['room_capacity'])
+            for entry in schedule] == [('Large', 60), ('Small', 20)]
+    assert_valid(schedule)
+
+
+def test_optimize_closes_professor_gaps():
+    """Test that a professor's free hours between classes are removed."""
+    room = {'name': 'Room', 'capacity': 30}
+    schedule = [make_entry(1, 'Monday', 9, 10, room),
+                make_entry(1, 'Monday', 16, 18, room)]
+
+    optimizer = optimize(schedule, [room], spread=0, room_fit=0)
+
+    assert optimizer.initial_cost == 5 * 5
+    assert optimizer.best_cost == 0
+    assert_valid(schedule)
+
+
+def test_optimize_keeps_the_cost_it_reports():
+    """Test that incremental cost updates match a full recount."""
+    rng = random.Random(3)
+    rooms = [{'name': f"Room {index}", 'capacity': rng.choice([20, 40, 80])}
+             for index in range(4)]
+    schedule = []
+    for day in DAYS[:2]:
+        for room in rooms:
+            for start, end in ((9, 11), (11, 13), (14, 16), (16, 18)):
+                if rng.random() < 0.7:
+                    schedule.append(make_entry(
+                        len(schedule) % 7, day, start, end, room,
+                        enrollment=rng.randint(10, 70)))
+    schedule = [entry for entry in schedule
+                if not any(other['professor_id'] == entry['professor_id']
+                           and other['day'] == entry['day']
+                           and other['start'] == entry['start']
+                           for other in schedule if other is not entry)]
+
+    optimizer = optimize(schedule, rooms)
+    recount = ScheduleOptimizer(rooms, HOURS, DAYS, time_budget=0)
+    recount.optimize(schedule)
+
+    assert optimizer.best_cost < optimizer.initial_cost
+    assert recount.initial_cost == optimizer.best_cost
+    assert_valid(schedule)
+
+
+def test_optimize_leaves_an_empty_schedule_alone():
+    """Test that there is nothing to do without entries."""
+    optimizer = ScheduleOptimizer([{'name': 'Room', 'capacity': 30}], HOURS,
+                                  DAYS, time_budget=1)
+
+    assert optimizer.optimize([]) == []
+    assert optimizer.steps == 0
+
+
+def test_optimize_moves_sections_sharing_students_apart():
+    """Test that overlapping sections with shared students are separated."""
+    rooms = [{'name': 'Room A', 'capacity': 30},
+             {'name': 'Room B', 'capacity': 30}]
+    schedule = [make_entry(1, 'Monday', 9, 11, rooms[0]),
+                make_entry(2, 'Monday', 9, 11, rooms[1])]
+    schedule[0]['section_id'], schedule[1]['section_id'] = 10, 20
+    conflicts = {10: {20: 3}, 20: {10: 3}}
+
+    optimizer = ScheduleOptimizer(rooms, HOURS, DAYS[:1],
+                                  weights={'spread': 0, 'room_fit': 0,
+                                           'gaps': 0},
+                                  time_budget=0.2, seed=1,
+                                  conflicts=conflicts)
+    optimizer.optimize(schedule)
+
+    assert optimizer.initial_cost == 30
+    assert optimizer.best_cost == 0
+    assert schedule[0]['start'] != schedule[1]['start']
+
+
+@pytest.mark.parametrize("hard_conflicts,moved", [
+    (1, False),
+    (3, False),
+    (4, True),
+    (0, True),
+])
+def test_move_rejects_overlapping_hard_conflicts(hard_conflicts, moved):
+    """Test that only pairs under the hard threshold may overlap."""
+    rooms = [{'name': 'Room A', 'capacity': 30},
+             {'name': 'Room B', 'capacity': 30}]
+    schedule = [make_entry(1, 'Monday', 9, 11, rooms[0]),
+                make_entry(2, 'Monday', 15, 17, rooms[1])]
+    schedule[0]['section_id'], schedule[1]['section_id'] = 10, 20
+    optimizer = ScheduleOptimizer(rooms, HOURS, DAYS[:1], time_budget=0,
+                                  conflicts={10: {20: 3}, 20: {10: 3}},
+                                  hard_conflicts=hard_conflicts)
+    optimizer._load(schedule)
+    slot = optimizer.slots[1]
+
+    assert optimizer._move([(1, (0, 1, 1))]) is moved
+    assert optimizer.slots[1] == ((0, 1, 1) if moved else slot)
+    assert not optimizer.occupancy.is_free(
+        1, 2, 0, optimizer._mask(1, optimizer.slots[1]))
+
+
+def test_optimize_stops_early_when_nothing_improves():
+    """Test that a schedule that cannot improve returns before the budget."""
+    room = {'name': 'Room', 'capacity': 30}
+    schedule = [make_entry(1, 'Monday', 9, 13, room),
+                make_entry(2, 'Monday', 14, 18, room)]
+    optimizer = ScheduleOptimizer([room], HOURS, ['Monday'], time_budget=10,
+                                  seed=1)
+
+    started = time.perf_counter()
+    optimizer.optimize(schedule)
+
+    assert time.perf_counter() - started < 2
+    assert optimizer.best_cost == optimizer.initial_cost
+    assert_valid(schedule)
+
+
+def test_optimize_skips_a_single_section():
+    """Test that one section is left where it is without searching."""
+    room = {'name': 'Room', 'capacity': 30}
+    schedule = [make_entry(1, 'Monday', 9, 11, room)]
+    optimizer = ScheduleOptimizer([room], HOURS, DAYS, time_budget=10)
+
+    assert optimizer.optimize(schedule) == schedule
+    assert optimizer.steps == 0
+
+
+def test_optimize_keeps_searching_while_hot():
+    """Test that a stall at a high temperature does not end the run."""
+    rooms = [{'name': 'Room', 'capacity': 30}]
+    schedule = [make_entry(index, day, 9, 10, rooms[0], enrollment=30)
+                for index, day in enumerate(DAYS)]
+    optimizer = ScheduleOptimizer(rooms, HOURS, DAYS, time_budget=1, seed=1)
+    clock = itertools.count(step=0.01)
+
+    with patch('Service.schedule_optimizer.time.perf_counter',
+               side_effect=lambda: next(clock)):
+        optimizer.optimize(schedule)
+
+    # The run lasts 100 checks, only the last third of them cold.
+    assert optimizer.best_cost == optimizer.initial_cost
+    assert optimizer.steps >= 99 * CHECK_INTERVAL
+    assert_valid(schedule)
@@ -0,0 +1,152 @@
+"""Unit tests for the schedule_search module.
+
+This module contains tests for the multi-start search: the order of its
+starts, how their schedules are compared, its budget and its process pool.
+"""
+
+import concurrent.futures
+import threading
+import time
+from unittest.mock import patch
+from Service import schedule_search
+from Service.schedule_search import ScheduleSearch
+
+HOURS = list(range(9, 18))
+DAYS = ['Monday', 'Tuesday']
+ROOMS = [{'id': 1}, {'id': 2}]
+
+
+def make_sections(*specs):
+    """Build sections from (credits, professor ID) pairs."""
+    return [{'credits': credits, 'professor_id': prof_id}
+            for credits, prof_id in specs]
+
+
+def test_run_tries_the_default_order_first_and_keeps_the_best():
+    """Test that every start runs and the lowest cost wins."""
+    costs = {None: (1, 0), 1: (0, 3), 2: (0, 1), 3: (0, 1)}
+
+    def run_start(_problem, seed, _time_budget):
+        return costs[seed], seed, {'seed': seed}
+
+    search = ScheduleSearch(workers=1, starts=4, time_budget=10)
+    with patch.object(schedule_search, 'run_start',
+                      side_effect=run_start) as mock_run:
+        best = search.run([], ROOMS, HOURS, DAYS)
+
+    assert [call.args[1] for call in mock_run.call_args_list] == [
+        None, 1, 2, 3
+    ]
+    assert best == {'seed': 2}
+    assert search.best_cost == (0, 1)
+    assert search.runs == 4
+
+
+def test_run_stops_at_the_first_feasible_schedule():
+    """Test that first_feasible skips the remaining starts."""
+    sections = make_sections((2, 1), (2, 1), (3, 2))
+    search = ScheduleSearch(workers=1, starts=5, time_budget=10,
+                            first_feasible=True)
+
+    best = search.run(sections, ROOMS, HOURS, DAYS)
+
+    assert sorted(best) == [0, 1, 2]
+    assert search.runs == 1
+    assert search.best_seed is None
+
+
+def test_run_stops_when_the_time_budget_is_spent():
+    """Test that no start begins after the budget."""
+    sections = make_sections((2, 1), (3, 2))
+    search = ScheduleSearch(workers=1, starts=5, time_budget=0)
+
+    best = search.run(sections, ROOMS, HOURS, DAYS)
+
+    assert search.runs == 1
+    assert sorted(best) == [0, 1]
+
+
+def test_run_on_a_process_pool():
+    """Test that starts run in worker processes and report back."""
+    sections = make_sections((4, 1), (4, 3), (4, 2), (2, 1), (1, 3))
+    search = ScheduleSearch(workers=2, starts=4, time_budget=30)
+
+    best = search.run(sections, ROOMS, HOURS, ['Monday'])
+
+    assert search.runs == 4
+    assert search.best_cost[0] == 0
+    assert sorted(best) == [0, 1, 2, 3, 4]
+
+
+def test_searches_share_one_process_pool():
+    """Test that the worker processes are started once, not per search."""
+    assert schedule_search._executor(2) is schedule_search._executor(2)
+
+
+def test_run_waits_for_its_running_starts():
+    """Test that no start of a search is still running when it returns."""
+    finished = []
+    running = threading.Event()
+
+    def run_start(_problem, seed, _time_budget):
+        if seed is None:
+            running.wait(5)
+        else:
+            running.set()
+            time.sleep(0.2)
+        finished.append(seed)
+        return (0, 0), seed, {}
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    search = ScheduleSearch(workers=2, starts=10, time_budget=10,
+                            first_feasible=True)
+    with patch.object(schedule_search, 'run_start', side_effect=run_start), \
+            patch.object(schedule_search, '_executor',
+                         return_value=executor):
+        search.run([], ROOMS, HOURS, DAYS)
+
+    assert search.runs == 1
+    assert sorted(finished, key=str) == [1, None]
+    executor.shutdown()
+
+
+def test_run_starts_nothing_once_the_budget_is_spent():
+    """Test that a spent budget leaves the remaining seeds unsent."""
+    started = []
+    lock = threading.Lock()
+
+    def run_start(_problem, seed, _time_budget):
+        with lock:
+            started.append(seed)
+        time.sleep(0.1)
+        return (1, 0), seed, {}
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    search = ScheduleSearch(workers=2, starts=50, time_budget=0.25)
+    with patch.object(schedule_search, 'run_start', side_effect=run_start), \
+            patch.object(schedule_search, '_executor',
+                         return_value=executor):
+        search.run([], ROOMS, HOURS, DAYS)
+
+    assert search.runs == len(started) < 50
+    executor.shutdown()
+
+
+def test_settings_default_to_the_environment(monkeypatch):
+    """Test the environment variables read by the search."""
+    monkeypatch.setenv('SCHEDULE_WORKERS', '3')
+    monkeypatch.setenv('SCHEDULE_TIME_BUDGET', '2.5')
+    monkeypatch.delenv('SCHEDULE_STARTS', raising=False)
+
+    search = ScheduleSearch()
+
+    assert search.workers == 3
+    assert search.starts == 3 * schedule_search.DEFAULT_STARTS_PER_WORKER
+    assert search.time_budget == 2.5
+
+
+def test_time_budget_is_capped():
+    """Test that a request cannot wait longer than the maximum budget."""
+    search = ScheduleSearch(workers=1, time_budget=3600)
+
+    assert search.time_budget == schedule_search.MAX_SEARCH_BUDGET
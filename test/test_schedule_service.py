@@ -14,6 +14,7 @@ def mock_db():
     """Create a mock database connection."""
     mock_db = Mock()
     mock_cursor = Mock()
+    mock_cursor.fetchall.return_value = []
     mock_db.connect.return_value = mock_cursor
     return mock_db, mock_cursor
 
@@ -34,6 +35,7 @@ def test_init_creates_database_connection_and_empty_schedule():
         mock_db_class.assert_called_once()
         assert service.db is not None
         assert service.last_schedule == []
+        assert service.last_unplaced == []
 
 
 def test_fetch_periods_from_database_query(schedule_service, mock_db):
@@ -111,11 +113,15 @@ def test_get_sections_by_period_returns_sections_with_details(schedule_service,
             SELECT s.id AS section_id, s.number, s.professor_id,
                    c.id AS course_id, c.name AS course_name, c.credits, c.nrc,
                    i.id AS instance_id, i.period,
-                   u.name AS professor_name
+                   u.name AS professor_name,
+                   COALESCE(e.enrollment, 0) AS enrollment
             FROM Sections s
             JOIN Instances i ON s.instance_id = i.id
             JOIN Courses c ON i.course_id = c.id
             JOIN Users u ON s.professor_id = u.id
+            LEFT JOIN (SELECT section_id, COUNT(*) AS enrollment
+                       FROM Courses_Taken GROUP BY section_id) e
+                ON e.section_id = s.id
             WHERE i.period = %s
             ORDER BY c.credits DESC, c.name, s.number
         """
@@ -163,138 +169,13 @@ def test_initialize_occupancy_structures_creates_proper_data_structures(schedule
     hours = [9, 10, 11]
     days = ['Monday', 'Tuesday']
     
-    room_occupancy, teacher_occupancy, schedule = schedule_service._initialize_occupancy_structures(
+    occupancy = schedule_service._initialize_occupancy_structures(
         rooms, hours, days
     )
     
-    assert len(room_occupancy) == 2
-    assert 1 in room_occupancy
-    assert 2 in room_occupancy
-    assert room_occupancy[1]['Monday'][9] is False
-    assert room_occupancy[2]['Tuesday'][11] is False
-    assert teacher_occupancy == {}
-    assert schedule == []
-
-
-def test_is_valid_time_block_rejects_lunch_hour(schedule_service):
-    """Test that time blocks containing lunch hour (13:00) are invalid."""
-    invalid_blocks = [
-        [13],
-        [12, 13],
-        [13, 14],
-        [12, 13, 14],
-    ]
-    
-    for block in invalid_blocks:
-        result = schedule_service._is_valid_time_block(block)
-        assert result is False, f"Block {block} should be invalid due to lunch hour"
-
-
-def test_is_valid_time_block_rejects_late_hours(schedule_service):
-    """Test that time blocks ending after 17:00 are invalid."""
-    invalid_blocks = [
-        [17, 18],
-        [16, 17, 18],
-        [15, 16, 17, 18, 19],
-    ]
-    
-    for block in invalid_blocks:
-        result = schedule_service._is_valid_time_block(block)
-        assert result is False, f"Block {block} should be invalid due to late ending"
-
-
-def test_is_valid_time_block_accepts_valid_blocks(schedule_service):
-    """Test that valid time blocks are accepted."""
-    valid_blocks = [
-        [9],
-        [9, 10],
-        [14, 15, 16],
-        [10, 11, 12],
-        [15, 16, 17],
-    ]
-    
-    for block in valid_blocks:
-        result = schedule_service._is_valid_time_block(block)
-        assert result is True, f"Block {block} should be valid"
-
-
-def test_is_time_slot_available_returns_true_when_free(schedule_service):
-    """Test time slot availability when both room and teacher are free."""
-    room_occupancy = {1: {'Monday': {9: False, 10: False}}}
-    teacher_occupancy = {1: {'Monday': {9: False, 10: False}}}
-    
-    slot_data = {
-        'room_id': 1,
-        'prof_id': 1,
-        'day': 'Monday',
-        'time_block': [9, 10],
-        'room_occupancy': room_occupancy,
-        'teacher_occupancy': teacher_occupancy
-    }
-    
-    result = schedule_service._is_time_slot_available(**slot_data)
-    
-    assert result is True
-
-
-def test_is_time_slot_available_returns_false_when_room_occupied(schedule_service):
-    """Test time slot availability when room is occupied."""
-    room_occupancy = {1: {'Monday': {9: True, 10: False}}}
-    teacher_occupancy = {1: {'Monday': {9: False, 10: False}}}
-    
-    slot_data = {
-        'room_id': 1,
-        'prof_id': 1,
-        'day': 'Monday',
-        'time_block': [9, 10],
-        'room_occupancy': room_occupancy,
-        'teacher_occupancy': teacher_occupancy
-    }
-    
-    result = schedule_service._is_time_slot_available(**slot_data)
-    
-    assert result is False
-
-
-def test_is_time_slot_available_returns_false_when_teacher_occupied(schedule_service):
-    """Test time slot availability when teacher is occupied."""
-    room_occupancy = {1: {'Monday': {9: False, 10: False}}}
-    teacher_occupancy = {1: {'Monday': {9: False, 10: True}}}
-    
-    slot_data = {
-        'room_id': 1,
-        'prof_id': 1,
-        'day': 'Monday',
-        'time_block': [9, 10],
-        'room_occupancy': room_occupancy,
-        'teacher_occupancy': teacher_occupancy
-    }
-    
-    result = schedule_service._is_time_slot_available(**slot_data)
-    
-    assert result is False
-
-
-def test_mark_time_slot_occupied_updates_both_occupancies(schedule_service):
-    """Test that marking time slot as occupied updates both room and teacher."""
-    room_occupancy = {1: {'Monday': {9: False, 10: False}}}
-    teacher_occupancy = {1: {'Monday': {9: False, 10: False}}}
-    
-    slot_data = {
-        'room_id': 1,
-        'prof_id': 1,
-        'day': 'Monday',
-        'time_block': [9, 10],
-        'room_occupancy': room_occupancy,
-        'teacher_occupancy': teacher_occupancy
-    }
-    
-    schedule_service._mark_time_slot_occupied(**slot_data)
-    
-    assert room_occupancy[1]['Monday'][9] is True
-    assert room_occupancy[1]['Monday'][10] is True
-    assert teacher_occupancy[1]['Monday'][9] is True
-    assert teacher_occupancy[1]['Monday'][10] is True
+    assert occupancy.rooms == {1: [0, 0], 2: [0, 0]}
+    assert occupancy.days == days
+    assert occupancy.professors == {}
 
 
 def test_create_schedule_entry_creates_proper_structure(schedule_service):
@@ -303,8 +184,11 @@ def test_create_schedule_entry_creates_proper_structure(schedule_service):
         'course_name': 'Diseño de Software',
         'nrc': 'ICC5130',
         'number': 1,
+        'section_id': 12,
+        'professor_id': 4,
         'professor_name': 'Dr. García',
         'credits': 3,
+        'enrollment': 25,
         'period': '2025-1'
     }
     time_block = [9, 10, 11]
@@ -317,8 +201,11 @@ def test_create_schedule_entry_creates_proper_structure(schedule_service):
         'course_name': 'Diseño de Software',
         'nrc': 'ICC5130',
         'number': 1,
+        'section_id': 12,
+        'professor_id': 4,
         'professor_name': 'Dr. García',
         'credits': 3,
+        'enrollment': 25,
         'period': '2025-1',
         'start': 9,
         'end': 12,
@@ -330,149 +217,169 @@ def test_create_schedule_entry_creates_proper_structure(schedule_service):
     assert result == expected_entry
 
 
-def test_try_assign_section_to_slot_succeeds_when_available(schedule_service):
-    """Test successful assignment when time slot is available."""
-    section = {
-        'credits': 2, 
-        'professor_id': 1, 
-        'course_name': 'Test Course',
-        'nrc': 'TEST123',
-        'number': 1,
-        'professor_name': 'Test Professor',
-        'period': '2025-1'
-    }
-    room = {'id': 1, 'name': 'Test Room', 'capacity': 30}
-    day = 'Monday'
-    hours = [9, 10, 11, 12]
-    
-    room_occupancy = {1: {'Monday': {h: False for h in hours}}}
-    teacher_occupancy = {1: {'Monday': {h: False for h in hours}}}
-    schedule = []
-    
-    occupancy_data = {
-        'room_occupancy': room_occupancy,
-        'teacher_occupancy': teacher_occupancy,
-        'schedule': schedule
-    }
-    
-    result = schedule_service._try_assign_section_to_slot(
-        section, room, day, hours, **occupancy_data
-    )
-    
-    assert result is True
-    assert len(schedule) == 1
-    assert room_occupancy[1]['Monday'][9] is True
-    assert room_occupancy[1]['Monday'][10] is True
-    assert teacher_occupancy[1]['Monday'][9] is True
-    assert teacher_occupancy[1]['Monday'][10] is True
-
-
-def test_try_assign_section_to_slot_fails_when_no_space(schedule_service):
-    """Test assignment failure when no time slot is available."""
-    section = {
-        'credits': 3, 
-        'professor_id': 1,
-        'course_name': 'Test Course',
-        'nrc': 'TEST123',
-        'number': 1,
-        'professor_name': 'Test Professor',
-        'period': '2025-1'
-    }
-    room = {'id': 1, 'name': 'Test Room', 'capacity': 30}
-    day = 'Monday'
-    hours = [9, 10]
-    
-    room_occupancy = {1: {'Monday': {h: False for h in hours}}}
-    teacher_occupancy = {1: {'Monday': {h: False for h in hours}}}
-    schedule = []
-    
-    occupancy_data = {
-        'room_occupancy': room_occupancy,
-        'teacher_occupancy': teacher_occupancy,
-        'schedule': schedule
-    }
-    
-    result = schedule_service._try_assign_section_to_slot(
-        section, room, day, hours, **occupancy_data
-    )
-    
-    assert result is False
-    assert len(schedule) == 0
-
-
-def test_assign_section_to_schedule_creates_teacher_occupancy(schedule_service):
-    """Test that assign section creates teacher occupancy if it doesn't exist."""
-    section = {
-        'credits': 1, 
-        'professor_id': 99,
-        'course_name': 'Test Course',
-        'nrc': 'TEST123',
-        'number': 1,
-        'professor_name': 'Test Professor',
-        'period': '2025-1'
-    }
-    days = ['Monday']
-    rooms = [{'id': 1, 'name': 'Test Room', 'capacity': 30}]
-    hours = [9, 10, 11]
-    
-    room_occupancy = {1: {'Monday': {h: False for h in hours}}}
-    teacher_occupancy = {}
-    schedule = []
-    
-    occupancy_data = {
-        'room_occupancy': room_occupancy,
-        'teacher_occupancy': teacher_occupancy,
-        'schedule': schedule
-    }
-    
-    with patch.object(schedule_service, '_try_assign_section_to_slot', return_value=True):
-        result = schedule_service._assign_section_to_schedule(
-            section, days, rooms, hours, **occupancy_data
-        )
-    
-    assert result is True
-    assert 99 in teacher_occupancy
-    assert teacher_occupancy[99]['Monday'][9] is False
-
-
-def test_generate_schedule_returns_none_when_impossible(schedule_service):
-    """Test that generate_schedule returns None when assignment is impossible."""
+def test_generate_schedule_keeps_unplaced_sections_when_impossible(schedule_service):
+    """Test that sections that cannot be placed are left out and kept."""
     period = '2025-1'
 
-    mock_sections = [{'credits': 10, 'professor_id': 1}]
+    mock_sections = [{'section_id': 1, 'credits': 10, 'professor_id': 1}]
     mock_rooms = [{'id': 1, 'name': 'Test Room'}]
     
     with patch.object(schedule_service, '_initialize_schedule_data', 
                       return_value=(mock_sections, mock_rooms, list(range(9, 18)), 
-                                   ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])), \
-         patch.object(schedule_service, '_initialize_occupancy_structures',
-                      return_value=({}, {}, [])), \
-         patch.object(schedule_service, '_assign_section_to_schedule', return_value=False):
+                                   ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])):
         
         result = schedule_service.generate_schedule(period)
     
-    assert result is None
+    assert result == []
+    assert schedule_service.last_unplaced == mock_sections
+
+
+def test_generate_schedule_returns_partial_schedule(schedule_service):
+    """Test that the sections that fit are scheduled when others do not."""
+    period = '2025-1'
+
+    mock_sections = [
+        {'section_id': 1, 'credits': 4, 'professor_id': 1,
+         'course_name': 'Long Course',
+         'nrc': 'LONG', 'number': 1, 'professor_name': 'Test Professor',
+         'period': period},
+        {'section_id': 2, 'credits': 10, 'professor_id': 1,
+         'course_name': 'Too Long',
+         'nrc': 'NONE', 'number': 1, 'professor_name': 'Test Professor',
+         'period': period}
+    ]
+    mock_rooms = [{'id': 1, 'name': 'Test Room', 'capacity': 30}]
+
+    with patch.object(schedule_service, '_initialize_schedule_data',
+                      return_value=(mock_sections, mock_rooms, list(range(9, 18)),
+                                   ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])):
+
+        result = schedule_service.generate_schedule(period)
+
+    assert [(entry['nrc'], entry['start'], entry['end']) for entry in result] == [
+        ('LONG', 9, 13)
+    ]
+    assert schedule_service.last_unplaced == [mock_sections[1]]
+    assert schedule_service.create_csv(period).strip().split('\n')[-1].strip() == (
+        'Too Long;NONE;1;Test Professor;10;2025-1;Unscheduled;;;')
 
 
 def test_generate_schedule_returns_schedule_when_successful(schedule_service):
     """Test that generate_schedule returns schedule when all sections can be assigned."""
     period = '2025-1'
     
-    mock_sections = [{'credits': 2, 'professor_id': 1}]
-    mock_rooms = [{'id': 1, 'name': 'Test Room'}]
-    expected_schedule = [{'course_name': 'Test Course', 'start': 9, 'end': 11}]
+    mock_sections = [
+        {'section_id': 1, 'credits': 2, 'professor_id': 1,
+         'course_name': 'Test Course', 'nrc': 'TEST123', 'number': 1, 'professor_name': 'Test Professor',
+         'period': period},
+        {'section_id': 2, 'credits': 2, 'professor_id': 1,
+         'course_name': 'Test Course', 'nrc': 'TEST123', 'number': 2, 'professor_name': 'Test Professor',
+         'period': period}
+    ]
+    mock_rooms = [{'id': 1, 'name': 'Test Room', 'capacity': 30},
+                  {'id': 2, 'name': 'Other Room', 'capacity': 30}]
     
     with patch.object(schedule_service, '_initialize_schedule_data', 
                       return_value=(mock_sections, mock_rooms, list(range(9, 18)), 
-                                   ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])), \
-         patch.object(schedule_service, '_initialize_occupancy_structures',
-                      return_value=({}, {}, expected_schedule)), \
-         patch.object(schedule_service, '_assign_section_to_schedule', return_value=True):
+                                   ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])):
         
         result = schedule_service.generate_schedule(period)
     
-    assert result == expected_schedule
-    assert schedule_service.last_schedule == expected_schedule
+    assert [(entry['start'], entry['room_name']) for entry in result] == [
+        (9, 'Test Room'), (11, 'Test Room')
+    ]
+    assert schedule_service.last_schedule == result
+
+
+def test_get_conflict_graph_counts_shared_students(schedule_service, mock_db):
+    """Test that the period's enrollments are fetched in one query."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.return_value = [
+        {'user_id': 1, 'section_id': 10}, {'user_id': 1, 'section_id': 20},
+        {'user_id': 2, 'section_id': 10}, {'user_id': 2, 'section_id': 20},
+        {'user_id': 3, 'section_id': 30}
+    ]
+
+    graph = schedule_service.get_conflict_graph('2025-1')
+
+    mock_cursor.execute.assert_called_once()
+    query, params = mock_cursor.execute.call_args[0]
+    assert "FROM Courses_Taken ct" in query
+    assert params == ('2025-1',)
+    assert graph == {10: {20: 2}, 20: {10: 2}}
+
+
+@pytest.mark.parametrize("hard_conflicts,expected_starts", [
+    (1, [9, 14]),
+    (0, [9, 9]),
+])
+def test_generate_schedule_keeps_shared_students_apart(
+        schedule_service, mock_db, hard_conflicts, expected_starts):
+    """Test that sections sharing students only overlap if allowed."""
+    _, mock_cursor = mock_db
+    mock_cursor.fetchall.return_value = [
+        {'user_id': 1, 'section_id': 10}, {'user_id': 1, 'section_id': 20}
+    ]
+    mock_sections = [
+        {'section_id': section_id, 'credits': 4, 'professor_id': prof_id,
+         'course_name': 'Course', 'nrc': 'NRC', 'number': 1,
+         'professor_name': 'Professor', 'period': '2025-1'}
+        for section_id, prof_id in ((10, 1), (20, 2))
+    ]
+    mock_rooms = [{'id': 1, 'name': 'Room A', 'capacity': 30},
+                  {'id': 2, 'name': 'Room B', 'capacity': 30}]
+    schedule_service.hard_conflicts = hard_conflicts
+
+    with patch.object(schedule_service, '_initialize_schedule_data',
+                      return_value=(mock_sections, mock_rooms,
+                                    list(range(9, 18)), ['Monday'])):
+        result = schedule_service.generate_schedule('2025-1')
+
+    assert sorted(entry['start'] for entry in result) == expected_starts
+    assert schedule_service.last_conflicts == {10: {20: 1}, 20: {10: 1}}
+
+
+def test_search_schedule_builds_the_best_schedule(schedule_service):
+    """Test that the multi-start search result becomes the schedule."""
+    period = '2025-1'
+    mock_sections = [
+        {'section_id': 1, 'credits': 2, 'professor_id': 1,
+         'course_name': 'Test Course', 'nrc': 'TEST123', 'number': 1, 'professor_name': 'Test Professor',
+         'period': period},
+        {'section_id': 2, 'credits': 10, 'professor_id': 1,
+         'course_name': 'Too Long',
+         'nrc': 'NONE', 'number': 1, 'professor_name': 'Test Professor',
+         'period': period}
+    ]
+    mock_rooms = [{'id': 1, 'name': 'Test Room', 'capacity': 30}]
+    search = Mock()
+    search.run.return_value = {0: (1, [14, 15], mock_rooms[0])}
+
+    with patch.object(schedule_service, '_initialize_schedule_data',
+                      return_value=(mock_sections, mock_rooms, list(range(9, 18)),
+                                   ['Monday', 'Tuesday'])):
+
+        result = schedule_service.search_schedule(period, search)
+
+    search.run.assert_called_once_with(mock_sections, mock_rooms,
+                                       list(range(9, 18)),
+                                       ['Monday', 'Tuesday'], [[], []], [0, 1])
+    assert [(entry['day'], entry['start'], entry['end']) for entry in result] == [
+        ('Tuesday', 14, 16)
+    ]
+    assert schedule_service.last_unplaced == [mock_sections[1]]
+
+
+def test_optimize_schedule_runs_on_the_last_schedule(schedule_service):
+    """Test that the optimizer improves the last schedule in place."""
+    schedule_service.last_schedule = [{'day': 'Monday'}]
+    optimizer = Mock()
+    optimizer.optimize.return_value = schedule_service.last_schedule
+
+    result = schedule_service.optimize_schedule(optimizer)
+
+    optimizer.optimize.assert_called_once_with([{'day': 'Monday'}])
+    assert result is schedule_service.last_schedule
 
 
 def test_create_csv_generates_proper_format(schedule_service):
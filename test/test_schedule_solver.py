@@ -0,0 +1,127 @@
+"""Unit tests for the schedule_solver module.
+
+This module contains tests for the backtracking search over sections, its
+partial assignments and its budget.
+"""
+
+from Service.schedule_occupancy import ScheduleOccupancy
+from Service.schedule_solver import BUDGET_CHECK_INTERVAL, ScheduleSolver
+
+HOURS = list(range(9, 18))
+ROOMS = [{'id': 1}, {'id': 2}]
+
+
+def make_sections(*specs):
+    """Build sections from (credits, professor ID) pairs."""
+    return [{'credits': credits, 'professor_id': prof_id}
+            for credits, prof_id in specs]
+
+
+def assert_no_conflicts(sections, placements, occupancy):
+    """Check that no room or professor is booked twice at the same hour."""
+    booked = set()
+    for index, (day, time_block, room) in placements.items():
+        for hour in time_block:
+            room_key = ('room', room['id'], day, hour)
+            prof_key = ('professor', sections[index]['professor_id'], day,
+                        hour)
+            assert room_key not in booked and prof_key not in booked
+            booked.update((room_key, prof_key))
+        assert not occupancy.is_free(room['id'],
+                                     sections[index]['professor_id'], day,
+                                     occupancy.mask(time_block))
+
+
+def test_solve_places_sections_that_first_fit_cannot():
+    """Test a case where placing in order leaves the last section out."""
+    sections = make_sections((4, 1), (4, 3), (4, 2), (2, 1), (1, 3))
+    occupancy = ScheduleOccupancy([1, 2], HOURS, ['Monday'])
+
+    placements = ScheduleSolver(sections, ROOMS, occupancy).solve()
+
+    assert sorted(placements) == [0, 1, 2, 3, 4]
+    assert_no_conflicts(sections, placements, occupancy)
+
+
+def test_solve_returns_partial_assignment_when_sections_do_not_fit():
+    """Test that the sections that fit are kept and flagged incomplete."""
+    sections = make_sections((4, 1), (4, 2), (4, 3), (10, 4))
+    occupancy = ScheduleOccupancy([1], HOURS, ['Monday'])
+
+    solver = ScheduleSolver(sections, ROOMS[:1], occupancy)
+    placements = solver.solve()
+
+    assert len(placements) == 2
+    assert 3 not in placements
+    assert not solver.complete
+    assert_no_conflicts(sections, placements, occupancy)
+
+
+def test_solve_stops_at_the_backtrack_budget():
+    """Test that an impossible search stops and keeps its best placements."""
+    sections = make_sections(*[(1, prof_id) for prof_id in range(9)])
+    occupancy = ScheduleOccupancy([1], HOURS, ['Monday'])
+
+    solver = ScheduleSolver(sections, ROOMS[:1], occupancy,
+                            max_backtracks=10)
+    placements = solver.solve()
+
+    assert solver.backtracks == 10
+    assert not solver.complete
+    assert len(placements) == 8
+    assert_no_conflicts(sections, placements, occupancy)
+
+
+def test_solve_stops_at_the_time_budget():
+    """Test that the clock is read every few backtracks."""
+    sections = make_sections(*[(1, prof_id) for prof_id in range(9)])
+    occupancy = ScheduleOccupancy([1], HOURS, ['Monday'])
+
+    solver = ScheduleSolver(sections, ROOMS[:1], occupancy, time_budget=0)
+    solver.solve()
+
+    assert solver.backtracks == BUDGET_CHECK_INTERVAL
+    assert not solver.complete
+
+
+def test_solve_sets_aside_sections_that_keep_failing():
+    """Test that an overloaded professor does not use up the budget."""
+    sections = make_sections(*[(1, 1)] * 9, (2, 2), (3, 3))
+    occupancy = ScheduleOccupancy([1, 2, 3], HOURS, ['Monday'])
+
+    solver = ScheduleSolver(sections, ROOMS + [{'id': 3}], occupancy,
+                            drop_after=5)
+    placements = solver.solve()
+
+    assert len(placements) == 10
+    assert len(solver.dropped) == 1
+    assert solver.dropped[0] not in placements
+    assert solver.backtracks == 5
+    assert not solver.complete
+    assert_no_conflicts(sections, placements, occupancy)
+
+
+def test_seeded_solvers_are_repeatable():
+    """Test that a seed always searches in the same order."""
+    sections = make_sections((2, 1), (2, 2), (1, 3), (3, 1))
+    days = ['Monday', 'Tuesday', 'Wednesday']
+    rooms = ROOMS + [{'id': 3}]
+
+    def solve(seed):
+        occupancy = ScheduleOccupancy([1, 2, 3], HOURS, days)
+        return ScheduleSolver(sections, rooms, occupancy, seed=seed).solve()
+
+    assert solve(7) == solve(7)
+    assert len(solve(7)) == 4
+
+
+def test_solve_keeps_conflicting_sections_apart():
+    """Test that sections listed as conflicts never overlap."""
+    sections = make_sections((4, 1), (4, 2), (4, 3))
+    occupancy = ScheduleOccupancy([1, 2, 3], HOURS, ['Monday'])
+
+    placements = ScheduleSolver(sections, ROOMS + [{'id': 3}], occupancy,
+                                conflicts=[[1], [0], []]).solve()
+
+    assert placements[0][1] != placements[1][1]
+    assert sorted(placements) == [0, 1, 2]